@@ -11,11 +11,12 @@ from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pwdlib import PasswordHash
 from dotenv import load_dotenv
-from typing import Optional
+from typing import Annotated, Optional
 from models.schemas.user_schema import UserMe
-from dependencies import get_session
+from dependencies import AsyncSessionDep, SessionDep
 from models.db_models.table_models import User
 from sqlmodel import select, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 import logging
 
 
@@ -86,29 +87,51 @@ def authenticate_user(
 
 # Dependencies
 
-def get_current_user(
-        token: str = Depends(oauth2_scheme),
-        session: Session = Depends(get_session))\
-        -> User:
-    """Validate JWT token and load the user from DB using email (sub)."""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=401,
         detail="Could not validate credentials.",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _token_email(token: str) -> str:
+    """The email (sub) of a valid JWT token."""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str | None = payload.get("sub")
         if not email:
-            raise credentials_exception
+            raise _credentials_exception()
     except InvalidTokenError:
-        raise credentials_exception
+        raise _credentials_exception()
+    return email
+
 
+def get_current_user(
+        token: Annotated[str, Depends(oauth2_scheme)],
+        session: SessionDep)\
+        -> User:
+    """Validate JWT token and load the user from DB using email (sub)."""
+    email = _token_email(token)
     stmt = (select(User)
             .where(User.email == email))
     user = session.exec(stmt).first()
     if not user:
-        raise credentials_exception
+        raise _credentials_exception()
+    return user
+
+
+async def get_current_user_async(
+        token: Annotated[str, Depends(oauth2_scheme)],
+        session: AsyncSessionDep)\
+        -> User:
+    """Async variant of get_current_user (DB_BACKEND=async)."""
+    email = _token_email(token)
+    stmt = (select(User)
+            .where(User.email == email))
+    user = (await session.exec(stmt)).first()
+    if not user:
+        raise _credentials_exception()
     return user
 
 
@@ -60,4 +60,6 @@ def create_test_campaign(session: Session, user: User):
         diceset_repo,
         None
     )
-    return service.create_campaign(payload)
+    campaign = service.create_campaign(payload)
+    session.commit()  # Test data outside of a request
+    return campaign
@@ -0,0 +1,104 @@
+"""
+bench_db_backend.py
+
+Load benchmark: the sync routes (threadpool, Session) against the
+async routes (event loop, AsyncSession) on the same database, for
+the routes with a hand-written async variant (the dice log list).
+
+Run from the project root:
+    python -m benchmarks.bench_db_backend
+Set DATABASE_URL to benchmark another database (default:
+a temporary SQLite file).
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+
+import httpx
+from fastapi import FastAPI
+from sqlmodel import Session
+from auth.auth import create_access_token
+from dependencies import create_db_and_tables, dispose_async_engines, engine
+from models.db_models.table_models import User
+from rate_limit import limiter
+from routes.async_routes import async_router
+from routes.dicelog import dicelogs
+
+
+REQUESTS = 2000
+CONCURRENCY = (1, 10, 50)
+
+
+def make_app(backend: str) -> FastAPI:
+    """An app with the dice log routes on a backend."""
+    app = FastAPI()
+    app.state.limiter = limiter
+    router = dicelogs.router
+    app.include_router(async_router(router) if backend == "async" else router)
+    return app
+
+
+def seed() -> str:
+    """A user to list the logs of, returns its token."""
+    create_db_and_tables()
+    with Session(engine) as session:
+        user = User(user_name="bench", email="bench@example.com", hashed_password="x")
+        session.add(user)
+        session.commit()
+        return create_access_token({"sub": user.email})
+
+
+async def run_load(app: FastAPI, url: str, token: str, concurrency: int) -> tuple:
+    """Send REQUESTS requests, `concurrency` at a time.
+    Returns (requests per second, p95 latency in ms)."""
+    latencies = []
+    remaining = iter(range(REQUESTS))
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for _ in remaining:
+                start = time.perf_counter()
+                response = await client.get(url, headers=headers)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    p95 = statistics.quantiles(latencies, n=20)[-1] * 1000
+    return REQUESTS / elapsed, p95
+
+
+async def run_all(token: str):
+    """All runs on one event loop (the async engine is bound to it)."""
+    for url in ("/dicelogs/",):
+        for backend in ("sync", "async"):
+            app = make_app(backend)
+            for concurrency in CONCURRENCY:
+                rate, p95 = await run_load(app, url, token, concurrency)
+                print(
+                    f"{url:<16} {backend:<6} c={concurrency:<3} "
+                    f"{rate:8.0f} req/s  p95 {p95:6.1f} ms"
+                )
+    await dispose_async_engines()  # Close the driver connections
+
+
+def main():
+    """Print throughput and p95 latency per backend and concurrency."""
+    limiter.enabled = False  # Measure the routes, not the rate limit
+    token = seed()
+    print(f"{REQUESTS} requests per run on {engine.url.drivername}")
+    asyncio.run(run_all(token))
+
+
+if __name__ == "__main__":
+    main()
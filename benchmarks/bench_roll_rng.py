@@ -0,0 +1,54 @@
+"""
+bench_roll_rng.py
+
+Microbenchmark: random.randint against the entropy pool.
+
+Run from the project root:
+    python -m benchmarks.bench_roll_rng
+"""
+import random
+import timeit
+
+from services.dice import entropy_pool
+
+
+ROLLS = 100_000
+REPEAT = 5
+
+
+def randint_single():
+    """Old path: one random.randint call per die."""
+    for _ in range(ROLLS):
+        random.randint(1, 20)
+
+
+def pool_single():
+    """Entropy pool: one call per die."""
+    for _ in range(ROLLS):
+        entropy_pool.roll_face(20)
+
+
+def pool_bulk():
+    """Entropy pool: all dice in one call."""
+    entropy_pool.roll_faces(20, ROLLS)
+
+
+def main():
+    """Print the best time per die for each path."""
+    print(f"{ROLLS} rolls of a d20, best of {REPEAT}")
+    baseline = None
+    for name, func in (
+            ("random.randint", randint_single),
+            ("entropy pool (single)", pool_single),
+            ("entropy pool (bulk)", pool_bulk)):
+        best = min(timeit.repeat(func, number=1, repeat=REPEAT))
+        per_roll = best / ROLLS * 1e9
+        baseline = baseline or per_roll
+        print(
+            f"{name:<24} {per_roll:8.1f} ns/roll "
+            f"({baseline / per_roll:5.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
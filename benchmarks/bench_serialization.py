@@ -0,0 +1,102 @@
+"""
+bench_serialization.py
+
+Microbenchmark: response serialization of the list endpoints,
+FastAPI's default path (validate the response model, dump to
+Python objects, json.dumps) against FastJSONRoute (cached
+TypeAdapter, dump_json straight to bytes).
+
+Run from the project root:
+    python -m benchmarks.bench_serialization
+"""
+import asyncio
+import timeit
+from datetime import datetime
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from models.schemas.campaign_schema import CampaignPublic
+from models.schemas.class_schema import ClassPublic, ClassSkills
+from models.schemas.dice_schema import DicePublic
+from models.schemas.dicelog_schema import DiceLogPublic
+from models.schemas.diceset_schema import DiceSetPublic
+from routes.fast_json import dump_json, type_adapter
+
+
+ITEMS = 100  # A full page
+NUMBER = 200
+REPEAT = 5
+NOW = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def pages() -> dict:
+    """A page of each list endpoint, as the repositories return it."""
+    dices = [DicePublic(id=i, name=f"d{s}", sides=s) for i, s in enumerate((4, 6, 8, 12, 20))]
+    return {
+        "GET /campaigns/": (List[CampaignPublic], [
+            CampaignPublic(
+                id=i, title=f"Campaign {i}", genre="Fantasy",
+                description="A long story " * 10, max_classes=4,
+                created_by=1, created_at=NOW
+            ) for i in range(ITEMS)
+        ]),
+        "GET /classes/": (List[ClassPublic], [
+            ClassPublic(
+                id=i, name=f"Class {i}", dnd_class="Fighter", race="Human",
+                skills=ClassSkills(), user_id=1, notes="Notes", inventory="Sword"
+            ) for i in range(ITEMS)
+        ]),
+        "GET /dicesets/": (List[DiceSetPublic], [
+            DiceSetPublic(id=i, name=f"Set {i}", user_id=1, dices=dices)
+            for i in range(ITEMS)
+        ]),
+        "GET /dicelogs/": (List[DiceLogPublic], [
+            DiceLogPublic(
+                id=i, user_id=1, campaign_id=1, dnd_class_id=1, diceset_id=1,
+                roll="Set: d20 -> 17", result=17, timestamp=NOW
+            ) for i in range(ITEMS)
+        ]),
+    }
+
+
+def fastapi_path(response_model, content):
+    """FastAPI default: validate, dump_python, JSONResponse (json.dumps)."""
+    field = create_model_field(name="Response", type_=response_model, mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def run():
+        value = loop.run_until_complete(
+            serialize_response(field=field, response_content=content)
+        )
+        return JSONResponse(value).body
+    return run
+
+
+def fast_json_path(response_model, content):
+    """FastJSONRoute: cached TypeAdapter, dump_json to bytes."""
+    adapter = type_adapter(response_model)
+    return lambda: dump_json(adapter, content)
+
+
+def main():
+    """Print the best time per response of both paths per endpoint."""
+    print(f"{ITEMS} items per response, best of {REPEAT} x {NUMBER}")
+    for endpoint, (response_model, content) in pages().items():
+        before = fastapi_path(response_model, content)
+        after = fast_json_path(response_model, content)
+        assert before() == after(), f"{endpoint}: different JSON"
+        times = [
+            min(timeit.repeat(path, number=NUMBER, repeat=REPEAT)) / NUMBER * 1e6
+            for path in (before, after)
+        ]
+        print(
+            f"{endpoint:<18} fastapi {times[0]:8.1f} us  "
+            f"fast_json {times[1]:8.1f} us  ({times[0] / times[1]:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
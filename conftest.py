@@ -22,13 +22,16 @@ if not os.environ.get('SECRET_KEY'):
 # Import after environment setup
 from fastapi.testclient import TestClient
 from models.db_models.test_db import get_session as get_test_session, test_engine
+from models.db_models.test_db import get_async_session as get_test_async_session
 from sqlmodel import Session
 from auth.test_helpers import create_test_user, get_test_token
 from main import app
 from dependencies import get_session as prod_get_session
+from dependencies import get_async_session as prod_get_async_session
 
-# Override the DB dependency for tests
+# Override the DB dependencies for tests
 app.dependency_overrides[prod_get_session] = get_test_session
+app.dependency_overrides[prod_get_async_session] = get_test_async_session
 
 
 @contextmanager
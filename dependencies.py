@@ -3,11 +3,27 @@ dependencies.py
 
 DB-Session, Config...
 """
-from typing import Annotated
-from fastapi import Depends, Query
-from sqlmodel import create_engine,select, Session, SQLModel
+from typing import Annotated, Any, Literal, Optional, Sequence, Tuple
+from datetime import datetime
+from fastapi import Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import create_engine,select, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from models.db_models.table_models import Dice
+from models.schemas.campaign_schema import (
+    CAMPAIGN_EXPANDS,
+    CAMPAIGN_FIELDS,
+    CAMPAIGN_LARGE_FIELDS
+)
+from models.schemas.class_schema import CLASS_FIELDS, CLASS_LARGE_FIELDS
+from migrations import migrate
+from repositories.routing_session import RoutingSession
+from repositories.unit_of_work import transaction
+from engine_settings import EngineSettings, apply_sqlite_pragmas, register_pool_gauges
 from dotenv import load_dotenv
+import base64
+import binascii
+import json
 import os
 
 load_dotenv()
@@ -16,14 +32,51 @@ DATABASE_URL = os.getenv(
     "sqlite:///./models/db_models/test.db.sql"
 )
 
-engine = create_engine(DATABASE_URL, echo=False) # Set echo True for debug mode
+# Read replicas for GET requests (comma separated, empty: primary only)
+DATABASE_REPLICA_URLS = [
+    url.strip()
+    for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+# Requests after a write read from the primary this long (replica lag)
+REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", 5))
+PRIMARY_COOKIE = "db_primary"
+
+engine_settings = EngineSettings.from_env()
+
+
+def create_db_engine(url: str):
+    """Engine with the pool settings and SQLite pragmas."""
+    db_engine = create_engine(url, **engine_settings.engine_kwargs(url))
+    apply_sqlite_pragmas(db_engine, engine_settings)
+    return db_engine
+
+
+engine = create_db_engine(DATABASE_URL)
+register_pool_gauges(engine)
+replica_engines = [create_db_engine(url) for url in DATABASE_REPLICA_URLS]
+
+# "sync": routes run in the threadpool on Session,
+# "async": routes run on the event loop on AsyncSession
+DB_BACKEND = os.getenv("DB_BACKEND", "sync")
+if DB_BACKEND not in ("sync", "async"):
+    raise ValueError(f"Unknown DB_BACKEND {DB_BACKEND!r}, use sync or async")
 
+# Async drivers for the dialects of DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+_async_engine: AsyncEngine | None = None
+_async_replica_engines: list[AsyncEngine] = []
 
 
 def create_db_and_tables():
-    """Create db and tables with
-    the fixed dice table."""
-    SQLModel.metadata.create_all(engine)
+    """Migrate the db to the newest schema
+    version and insert the fixed dice table."""
+    migrate(engine)
 
     with Session(engine) as session:
         dice = [
@@ -46,28 +99,274 @@ def create_db_and_tables():
         session.commit()
 
 
-def get_session():
-    """Get a database session and close it"""
-    with Session(engine) as session:
+def reads_from_replica(request: Request) -> bool:
+    """Whether a request may read from a replica: read-only
+    methods and no recent write of the client (cookie)."""
+    return (
+        request.method in ("GET", "HEAD")
+        and PRIMARY_COOKIE not in request.cookies
+    )
+
+
+def _mark_written(request: Request):
+    request.state.db_wrote = True
+
+
+async def stick_to_primary(request: Request, call_next):
+    """Middleware: after a request that wrote, the client reads
+    from the primary for REPLICA_STICKY_SECONDS (read your writes)."""
+    response = await call_next(request)
+    if getattr(request.state, "db_wrote", False) and DATABASE_REPLICA_URLS:
+        response.set_cookie(
+            PRIMARY_COOKIE,
+            "1",
+            max_age=REPLICA_STICKY_SECONDS,
+            httponly=True,
+            samesite="lax"
+        )
+    return response
+
+
+def get_session(request: Request):
+    """Get a database session for one request (unit of work):
+    repositories only flush, the request commits once at the
+    end or rolls back on an error, then the session is closed.
+    Read-only requests read from a replica (RoutingSession)."""
+    with RoutingSession(
+            engine,
+            replicas=replica_engines,
+            use_replica=reads_from_replica(request),
+            on_write=lambda: _mark_written(request)
+    ) as session, transaction(session):
         yield session
 
 
-SessionDep = Annotated[Session, Depends(get_session)]
+# scope="function": the transaction ends (commit, rollback) when the
+# endpoint returns, before the response is sent. A failed commit is a
+# 500 and clients never see a response before their write is stored.
+# Every use of the session has the same scope (one session per request).
+SessionDep = Annotated[Session, Depends(get_session, scope="function")]
+
+
+def async_database_url(url: str) -> str:
+    """The URL of a database with its async driver
+    (aiosqlite for SQLite, asyncpg for Postgres)."""
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+", 1)[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for {scheme}")
+    return f"{ASYNC_DRIVERS[dialect]}://{rest}"
+
+
+def get_async_engine() -> AsyncEngine:
+    """The async engine of DATABASE_URL, created on first use
+    (the sync backend runs without the async drivers)."""
+    global _async_engine
+    if _async_engine is None:
+        url = async_database_url(DATABASE_URL)
+        _async_engine = create_async_engine(
+            url, **engine_settings.engine_kwargs(url, is_async=True)
+        )
+        apply_sqlite_pragmas(_async_engine.sync_engine, engine_settings)
+        register_pool_gauges(_async_engine.sync_engine, "db_async_pool")
+        for replica_url in map(async_database_url, DATABASE_REPLICA_URLS):
+            replica = create_async_engine(
+                replica_url, **engine_settings.engine_kwargs(replica_url, is_async=True)
+            )
+            apply_sqlite_pragmas(replica.sync_engine, engine_settings)
+            _async_replica_engines.append(replica)
+    return _async_engine
+
+
+async def dispose_async_engines():
+    """Close the connections of the async engines (shutdown)."""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    for replica in _async_replica_engines:
+        await replica.dispose()
+
+
+async def get_async_session(request: Request):
+    """Async variant of get_session (DB_BACKEND=async):
+    one transaction per request, committed at the end
+    or rolled back on an error. Loaded objects are not expired
+    by the commit: lazy loads outside run_sync are not possible."""
+    async with AsyncSession(
+            get_async_engine(),
+            expire_on_commit=False,
+            sync_session_class=RoutingSession,
+            replicas=[replica.sync_engine for replica in _async_replica_engines],
+            use_replica=reads_from_replica(request),
+            on_write=lambda: _mark_written(request)
+    ) as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+AsyncSessionDep = Annotated[
+    AsyncSession, Depends(get_async_session, scope="function")
+]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last item as opaque cursor."""
+    raw = json.dumps(
+        list(values),
+        default=lambda v: v.isoformat()
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Decode a cursor to the sort key values (ValueError if malformed)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("Malformed cursor")
+    if not isinstance(values, list) or not values:
+        raise ValueError("Malformed cursor")
+    return values
 
 
 class Pagination:
-    """Pagination parameters for endpoints."""
+    """Pagination parameters for endpoints.
+    Offset paging or keyset paging: a full page sets the
+    X-Next-Cursor header, pass it as ?cursor= for the next page."""
     def __init__(
             self,
             offset: Annotated[int, Query(ge=0)] = 0,
-            limit: Annotated[int, Query(le=100)] = 100
+            limit: Annotated[int, Query(le=100)] = 100,
+            cursor: Annotated[str | None, Query(
+                description="Cursor from the X-Next-Cursor header of the previous page."
+            )] = None,
+            response: Response = None
     ):
-        self.offset = offset
+        self.offset = 0 if cursor else offset  # The cursor marks the position
         self.limit = limit
+        self.cursor = cursor
+        self.response = response
+
+
+    def after(self, *types) -> Optional[tuple]:
+        """The sort key of the cursor, converted to the given types
+        (None on the first page). Invalid cursors are a 400."""
+        if not self.cursor:
+            return None
+        try:
+            values = decode_cursor(self.cursor)
+            if len(values) != len(types):
+                raise ValueError("Cursor does not match the sort key")
+            return tuple(
+                datetime.fromisoformat(value) if kind is datetime else kind(value)
+                for kind, value in zip(types, values)
+            )
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+    def after_id(self) -> Optional[int]:
+        """The ID of the cursor (for lists ordered by ID)."""
+        key = self.after(int)
+        return key[0] if key else None
+
+
+    def next_cursor(self, items: Sequence, *fields: str) -> Optional[str]:
+        """Cursor after the last item of a full page (None on the
+        last page), also set as X-Next-Cursor response header."""
+        if not items or len(items) < self.limit:
+            return None
+        cursor = encode_cursor(getattr(items[-1], field) for field in fields)
+        if self.response is not None:
+            self.response.headers["X-Next-Cursor"] = cursor
+        return cursor
 
 
 # Query parameter classes
 
+View = Annotated[Literal["summary", "full"], Query(
+    description="summary: without the large text and JSON fields, full: all fields."
+)]
+Fields = Annotated[str | None, Query(
+    description="Comma separated fields to return (id is always included), "
+                "overrides view."
+)]
+
+
+def select_fields(
+        view: str,
+        fields: Optional[str],
+        all_fields: Sequence[str],
+        large_fields: Sequence[str]) -> Tuple[str, ...]:
+    """The fields of a list response, in model order.
+    Unknown fields are a 400."""
+    if fields:
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = requested - set(all_fields)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}."
+            )
+        return tuple(f for f in all_fields if f == "id" or f in requested)
+    if view == "full":
+        return tuple(all_fields)
+    return tuple(f for f in all_fields if f not in large_fields)
+
+
+def parse_expand(expand: Optional[str], allowed: Sequence[str]) \
+        -> Tuple[str, ...]:
+    """The collections of ?expand=, in the order of allowed.
+    Unknown names are a 400."""
+    if not expand:
+        return ()
+    requested = {name.strip() for name in expand.split(",") if name.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown expand: {', '.join(sorted(unknown))}."
+        )
+    return tuple(name for name in allowed if name in requested)
+
+
+class CampaignExpandParams:
+    """Collections to embed in a campaign."""
+    def __init__(
+            self,
+            expand: str | None = Query(
+                None,
+                description="Comma separated collections to embed: "
+                            "classes, dicesets (of the classes), recent_logs.")):
+        self.expand = parse_expand(expand, CAMPAIGN_EXPANDS)
+
+
+class SearchQueryParams:
+    """Text and options of the search endpoints."""
+    def __init__(
+            self,
+            q: str = Query(
+                ...,
+                min_length=1,
+                max_length=100,
+                description="Text to search for."),
+            prefix: bool = Query(
+                False,
+                description="Autocomplete: names starting with q."),
+            limit: int = Query(
+                10,
+                ge=1,
+                le=50,
+                description="Max. number of results.")):
+        self.q = q
+        self.prefix = prefix
+        self.limit = limit
+
+
 class UserQueryParams:
     """Optional filters for users."""
     def __init__(
@@ -88,9 +387,14 @@ class CampaignQueryParams:
                 description="Filter by user ID."),
             name: str | None = Query(
                 None,
-                description="Filter by campaign title.")):
+                description="Filter by campaign title."),
+            view: View = "summary",
+            fields: Fields = None):
         self.user_id = user_id
         self.name = name
+        self.fields = select_fields(
+            view, fields, CAMPAIGN_FIELDS, CAMPAIGN_LARGE_FIELDS
+        )
 
 
 class ClassQueryParams:
@@ -103,6 +407,11 @@ class ClassQueryParams:
         description="Filter by campaign ID."),
     name: str | None = Query(
         None,
-        description="Filter by dnd_class name.")):
+        description="Filter by dnd_class name."),
+    view: View = "summary",
+    fields: Fields = None):
         self.campaign_id = campaign_id
         self.name = name
+        self.fields = select_fields(
+            view, fields, CLASS_FIELDS, CLASS_LARGE_FIELDS
+        )
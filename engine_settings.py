@@ -0,0 +1,186 @@
+"""
+engine_settings.py
+
+Engine and connection pool settings from environment variables,
+SQLite performance pragmas and pool checkout metrics.
+
+| Variable | Default | |
+|---|---|---|
+| DB_POOL_SIZE | 5 | connections kept open |
+| DB_MAX_OVERFLOW | 10 | extra connections under load |
+| DB_POOL_TIMEOUT | 30 | seconds to wait for a free connection |
+| DB_POOL_PRE_PING | true | test connections on checkout |
+| DB_POOL_RECYCLE | 1800 | seconds until a connection is replaced (off: never) |
+| DB_STATEMENT_TIMEOUT_MS | off | PostgreSQL statement_timeout |
+| DB_ECHO | false | log all SQL |
+| SQLITE_JOURNAL_MODE | WAL | readers do not block the writer |
+| SQLITE_SYNCHRONOUS | NORMAL | fsync on checkpoints only (safe with WAL) |
+| SQLITE_BUSY_TIMEOUT_MS | 5000 | wait for locks instead of "database is locked" |
+| SQLITE_MMAP_SIZE | 268435456 | bytes of the file read through mmap |
+| SQLITE_CACHE_SIZE_KIB | 65536 | page cache per connection |
+"""
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from metrics import registry
+import os
+import time
+import logging
+
+
+
+logger = logging.getLogger(__name__)
+
+pool_checkout_seconds = registry.summary(
+    "db_pool_checkout_seconds",
+    "Wait for a connection from the pool (incl. connecting)."
+)
+pool_timeouts_total = registry.counter(
+    "db_pool_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT."
+)
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    """Read an int setting (empty or "off" disables it)."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    value = value.strip().lower()
+    return int(value) if value and value != "off" else None
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class EngineSettings:
+    """Pool sizing and driver settings of an engine."""
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    pool_pre_ping: bool = True
+    pool_recycle: int = 1800
+    statement_timeout_ms: Optional[int] = None
+    echo: bool = False
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kib: int = 64 * 1024
+
+    @classmethod
+    def from_env(cls) -> "EngineSettings":
+        """Build the settings from the environment."""
+        return cls(
+            pool_size=_env_int("DB_POOL_SIZE", 5),
+            max_overflow=_env_int("DB_MAX_OVERFLOW", 10),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", 30)),
+            pool_pre_ping=_env_bool("DB_POOL_PRE_PING", True),
+            pool_recycle=_env_int("DB_POOL_RECYCLE", 1800) or -1,
+            statement_timeout_ms=_env_int("DB_STATEMENT_TIMEOUT_MS", None),
+            echo=_env_bool("DB_ECHO", False),
+            sqlite_journal_mode=os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+            sqlite_synchronous=os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+            sqlite_busy_timeout_ms=_env_int("SQLITE_BUSY_TIMEOUT_MS", 5000),
+            sqlite_mmap_size=_env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024),
+            sqlite_cache_size_kib=_env_int("SQLITE_CACHE_SIZE_KIB", 64 * 1024)
+        )
+
+
+    def sqlite_pragmas(self) -> list:
+        """PRAGMA statements for every new SQLite connection."""
+        return [
+            f"PRAGMA journal_mode={self.sqlite_journal_mode}",
+            f"PRAGMA synchronous={self.sqlite_synchronous}",
+            f"PRAGMA busy_timeout={int(self.sqlite_busy_timeout_ms)}",
+            f"PRAGMA mmap_size={int(self.sqlite_mmap_size)}",
+            f"PRAGMA cache_size={-int(self.sqlite_cache_size_kib)}",  # Negative: KiB
+        ]
+
+
+    def engine_kwargs(self, url: str, is_async: bool = False) -> dict:
+        """Keyword arguments of create_engine / create_async_engine."""
+        parsed = make_url(url)
+        kwargs = {"echo": self.echo}
+        if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+            return kwargs  # One shared in-memory connection, no pool to size
+        kwargs.update(
+            poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+            pool_pre_ping=self.pool_pre_ping,
+            pool_recycle=self.pool_recycle,
+        )
+        if parsed.get_backend_name() == "postgresql" and self.statement_timeout_ms:
+            timeout = int(self.statement_timeout_ms)
+            kwargs["connect_args"] = (
+                {"server_settings": {"statement_timeout": str(timeout)}}
+                if parsed.get_driver_name() == "asyncpg"
+                else {"options": f"-c statement_timeout={timeout}"}
+            )
+        return kwargs
+
+
+class _TimedCheckout:
+    """Pool mixin: observe the wait for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_timeouts_total.inc()
+            logger.warning(f"Connection pool exhausted after {self._timeout}s")
+            raise
+        finally:
+            pool_checkout_seconds.observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool with checkout wait metrics."""
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout wait metrics."""
+
+
+def apply_sqlite_pragmas(engine: Engine, settings: EngineSettings):
+    """Run the pragmas on every new connection of a SQLite engine."""
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = settings.sqlite_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def register_pool_gauges(engine: Engine, prefix: str = "db_pool"):
+    """Expose size and usage of the pool of an engine."""
+    if not isinstance(engine.pool, QueuePool):
+        return
+    # engine.pool is replaced by dispose(), so look it up on every read
+    registry.gauge(
+        f"{prefix}_checked_out",
+        "Connections in use.",
+        callback=lambda: engine.pool.checkedout()
+    )
+    registry.gauge(
+        f"{prefix}_overflow",
+        "Connections above pool_size (negative: not yet opened).",
+        callback=lambda: engine.pool.overflow()
+    )
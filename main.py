@@ -4,7 +4,14 @@ main.py
 Webserver entry and links to routes.
 """
 from fastapi import FastAPI
-from dependencies import create_db_and_tables
+from dependencies import (
+    DB_BACKEND,
+    create_db_and_tables,
+    dispose_async_engines,
+    engine,
+    stick_to_primary
+)
+from sqlmodel import Session
 from contextlib import asynccontextmanager
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.middleware import SlowAPIMiddleware
@@ -17,7 +24,18 @@ from routes.diceset import dicesets
 from routes.dicelog import dicelogs
 from routes.dice import dices
 from routes.campaign import campaigns
+from routes.roll import rolls
+from routes.simulation import simulations
+from routes.metrics import metrics
+from routes.job import jobs
+from routes.batch import batch
+from services.simulation.simulation_service import shutdown_process_pool
+from services.dice.dice_catalog import load_catalog
+from repositories.sql_dice_repository import SqlAlchemyDiceRepository
+from repositories.dicelog_writer import start_dicelog_writer, stop_dicelog_writer
+from services.job.job_worker import start_job_worker, stop_job_worker
 from routes.auth import auth_routes
+from routes.async_routes import async_router
 import logging
 
 
@@ -28,8 +46,16 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Create the tables and start and stop the DB session"""
     create_db_and_tables() # Create the tables
+    with Session(engine) as session:
+        load_catalog(SqlAlchemyDiceRepository(session)) # Dice lookups without DB
+    start_dicelog_writer(engine) # Write roll logs in the background
+    start_job_worker(engine) # Run and resume the background deletions
     logger.info("Server started and DB tables ensured")
     yield
+    stop_job_worker() # Open jobs resume on the next start
+    stop_dicelog_writer() # Write the queued roll logs
+    shutdown_process_pool() # Stop the simulation workers
+    await dispose_async_engines() # Close the async driver connections
     logger.info("Server stopped!")
 
 app = FastAPI(lifespan=lifespan, title="Mythic Access DnD")
@@ -51,6 +77,10 @@ app.add_middleware(SlowAPIMiddleware)
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 
+# Read from the primary after a write (read replicas)
+app.middleware("http")(stick_to_primary)
+
+
 # CORS middleware
 origins = [
     "https://www.mythic-access-dnd.com",
@@ -62,18 +92,32 @@ app.add_middleware(
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Location"]  # Keyset pagination, queued jobs
 )
 
 
+# Routes on the database backend (DB_BACKEND)
+db_routers = [
+    users.router,
+    campaigns.router,
+    dnd_classes.router,
+    dices.router,
+    dicesets.router,
+    dicelogs.router,
+    rolls.router,
+    jobs.router,
+    batch.router,
+]
+if DB_BACKEND == "async":
+    db_routers = [async_router(router) for router in db_routers]
+
 # Link to routes
-app.include_router(auth_routes.router)
-app.include_router(users.router)
-app.include_router(campaigns.router)
-app.include_router(dnd_classes.router)
-app.include_router(dices.router)
-app.include_router(dicesets.router)
-app.include_router(dicelogs.router)
+app.include_router(auth_routes.router) # Password hashing stays in the threadpool
+for router in db_routers:
+    app.include_router(router)
+app.include_router(simulations.router) # CPU bound, runs in the process pool
+app.include_router(metrics.router)
 
 
 @app.get("/healthz")
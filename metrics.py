@@ -0,0 +1,135 @@
+"""
+metrics.py
+
+Minimal in-process metrics (counters, gauges, summaries),
+rendered in the Prometheus text format on GET /metrics.
+"""
+import threading
+from typing import Callable, Dict, List, Optional
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Counter:
+    """A value that only goes up."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def samples(self) -> List[tuple]:
+        return [(self.name, self._value)]
+
+
+class Gauge:
+    """A value that goes up and down,
+    set directly or read from a callback."""
+
+    kind = "gauge"
+
+    def __init__(
+            self,
+            name: str,
+            description: str,
+            callback: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.description = description
+        self.callback = callback
+        self._value = 0.0
+
+    def set(self, value: float):
+        self._value = value
+
+    @property
+    def value(self) -> float:
+        return self.callback() if self.callback else self._value
+
+    def samples(self) -> List[tuple]:
+        return [(self.name, self.value)]
+
+
+class Summary:
+    """Count, sum and maximum of observed values (e.g. latencies)."""
+
+    kind = "summary"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            self.max = max(self.max, value)
+
+    def samples(self) -> List[tuple]:
+        return [
+            (f"{self.name}_count", self.count),
+            (f"{self.name}_sum", self.sum),
+            (f"{self.name}_max", self.max),
+        ]
+
+
+class MetricsRegistry:
+    """All metrics of the process by name."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            # Return the existing metric on re-import / re-registration
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._register(Counter(name, description))
+
+    def gauge(
+            self,
+            name: str,
+            description: str,
+            callback: Optional[Callable[[], float]] = None) \
+            -> Gauge:
+        return self._register(Gauge(name, description, callback))
+
+    def summary(self, name: str, description: str) -> Summary:
+        return self._register(Summary(name, description))
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            try:
+                for name, value in metric.samples():
+                    lines.append(f"{name} {value:g}")
+            except Exception:
+                logger.exception(f"Error while reading metric {metric.name}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
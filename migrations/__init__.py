@@ -0,0 +1,6 @@
+"""
+migrations
+
+Versioned schema migrations, see runner.py.
+"""
+from migrations.runner import MIGRATIONS, current_version, migrate, schema_version
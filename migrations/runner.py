@@ -0,0 +1,112 @@
+"""
+runner.py
+
+Applies the versioned schema migrations.
+
+The applied version is stored in the `schema_version` table.
+On startup every migration above that version runs in its own
+transaction, in order. `create_all` only creates missing tables,
+it never changes existing ones (e.g. new indexes), so all schema
+changes after the baseline go through a migration module here.
+
+A new migration is a module with VERSION, DESCRIPTION and
+upgrade(connection), added to MIGRATIONS. The baseline creates
+fresh databases from the current models, so upgrades must be
+idempotent (IF NOT EXISTS, or check with sqlalchemy.inspect).
+"""
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    insert,
+    select
+)
+from sqlalchemy.engine import Connection, Engine
+from migrations import (
+    v001_baseline,
+    v002_access_indexes,
+    v003_dicelog_cursor_index,
+    v004_jobs,
+    v005_resource_versions,
+    v006_search,
+    v007_roll_seeds,
+    v008_created_at,
+    v009_job_leases
+)
+import logging
+
+
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS = [
+    v001_baseline,
+    v002_access_indexes,
+    v003_dicelog_cursor_index,
+    v004_jobs,
+    v005_resource_versions,
+    v006_search,
+    v007_roll_seeds,
+    v008_created_at,
+    v009_job_leases,
+]
+
+# Own metadata, the table is not part of the app models
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False)
+)
+
+
+def current_version(connection: Connection) -> int:
+    """The applied schema version (0 for a new database)."""
+    schema_version.create(connection, checkfirst=True)
+    version = connection.execute(
+        select(func.max(schema_version.c.version))
+    ).scalar()
+    return version or 0
+
+
+def migrate(
+        engine: Engine,
+        migrations: Optional[list] = None,
+        target: Optional[int] = None) -> List[int]:
+    """Upgrade the database to the target (default: newest)
+    version. Returns the versions applied in this run."""
+    migrations = sorted(
+        MIGRATIONS if migrations is None else migrations,
+        key=lambda m: m.VERSION
+    )
+    with engine.begin() as connection:
+        version = current_version(connection)
+
+    applied = []
+    for migration in migrations:
+        if migration.VERSION <= version:
+            continue
+        if target is not None and migration.VERSION > target:
+            break
+        with engine.begin() as connection:
+            migration.upgrade(connection)
+            connection.execute(
+                insert(schema_version).values(
+                    version=migration.VERSION,
+                    description=migration.DESCRIPTION,
+                    applied_at=datetime.now(timezone.utc)
+                )
+            )
+        applied.append(migration.VERSION)
+        logger.info(f"Applied migration {migration.VERSION}: {migration.DESCRIPTION}")
+
+    if not applied:
+        logger.debug(f"Schema is up to date at version {version}")
+    return applied
@@ -0,0 +1,184 @@
+"""
+test_migrations.py
+
+Tests for the versioned schema migrations.
+"""
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlmodel import SQLModel
+from migrations import MIGRATIONS, current_version, migrate
+from migrations.v002_access_indexes import INDEXES
+from migrations.v005_resource_versions import TABLES
+from migrations.v006_search import fts_table
+from migrations.v008_created_at import TABLES as CREATED_AT_TABLES
+
+
+# Indexes added after the baseline
+NEW_INDEXES = {statement.split()[5] for statement in INDEXES} \
+    | {"ix_dicelog_user_timestamp_id"}
+
+MODEL_INDEXES = {
+    index.name
+    for table in SQLModel.metadata.tables.values()
+    for index in table.indexes
+}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Fixture for an empty SQLite database."""
+    return create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+
+
+def index_names(engine):
+    """All index names of the database."""
+    inspector = inspect(engine)
+    return {
+        index["name"]
+        for table in inspector.get_table_names()
+        for index in inspector.get_indexes(table)
+    }
+
+
+def test_new_database_gets_newest_version(engine):
+    """Test a new database is created with all migrations."""
+    applied = migrate(engine)
+
+    assert applied == [m.VERSION for m in MIGRATIONS]
+    with engine.connect() as connection:
+        assert current_version(connection) == MIGRATIONS[-1].VERSION
+    assert MODEL_INDEXES <= index_names(engine)
+
+
+def test_existing_tables_get_indexes(engine):
+    """Test a database made by create_all before the
+    indexes existed is upgraded in place."""
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for name in NEW_INDEXES:
+            connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        connection.execute(text(
+            "INSERT INTO dice (name, sides) VALUES ('d6', 6)"
+        ))
+
+    migrate(engine)
+
+    indexes = index_names(engine)
+    assert MODEL_INDEXES <= indexes
+    assert "ix_dicelog_user_timestamp" not in indexes  # Replaced in version 3
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM dice")).scalar() == 1
+
+
+def test_migrate_is_idempotent(engine):
+    """Test a second run applies nothing."""
+    migrate(engine)
+
+    assert migrate(engine) == []
+
+
+def test_migrate_to_target(engine):
+    """Test migrating step by step up to a target version."""
+    assert migrate(engine, target=1) == [1]
+    assert migrate(engine) == [2, 3, 4, 5, 6, 7, 8, 9]
+
+
+def test_jobs_table_added(engine):
+    """Test a version 3 database without the jobs table gets it."""
+    migrate(engine, target=3)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE job"))
+
+    assert migrate(engine) == [4, 5, 6, 7, 8, 9]
+    assert "job" in inspect(engine).get_table_names()
+    assert "ix_job_status_kind_target" in index_names(engine)
+
+
+def test_version_columns_added(engine):
+    """Test tables created before the version column get it,
+    existing rows start at version 1."""
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for table in TABLES:
+            connection.execute(text(f"ALTER TABLE {table} DROP COLUMN version"))
+        connection.execute(text(
+            "INSERT INTO user (user_name, email, hashed_password, created_at) "
+            "VALUES ('old', 'old@example.com', 'x', '2025-01-01')"
+        ))
+        connection.execute(text(
+            "INSERT INTO campaign (title, max_classes, created_by, created_at) "
+            "VALUES ('Old', 4, 1, '2025-01-01')"
+        ))
+
+    migrate(engine)
+
+    inspector = inspect(engine)
+    for table in TABLES:
+        assert "version" in {c["name"] for c in inspector.get_columns(table)}
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT version FROM campaign")).scalar() == 1
+
+
+def test_roll_seed_column_added(engine):
+    """Test a version 6 database gets the roll seed column."""
+    migrate(engine, target=6)
+    with engine.begin() as connection:
+        connection.execute(text("ALTER TABLE campaign DROP COLUMN roll_seed"))
+
+    assert migrate(engine) == [7, 8, 9]
+    assert "roll_seed" in {c["name"] for c in inspect(engine).get_columns("campaign")}
+
+
+def test_created_at_added_and_filled(engine):
+    """Test existing classes and dice sets get a creation time."""
+    migrate(engine, target=7)
+    with engine.begin() as connection:
+        for table in CREATED_AT_TABLES:
+            connection.execute(text(f"ALTER TABLE {table} DROP COLUMN created_at"))
+        connection.execute(text(
+            "INSERT INTO user (user_name, email, hashed_password, created_at) "
+            "VALUES ('gandalf', 'g@example.com', 'x', '2025-01-01')"
+        ))
+        connection.execute(text(
+            "INSERT INTO campaign (title, max_classes, created_by, created_at) "
+            "VALUES ('Moria', 4, 1, '2025-01-01')"
+        ))
+        connection.execute(text(
+            "INSERT INTO dnd_class (name, race, dnd_class, skills, campaign_id, user_id) "
+            "VALUES ('Gimli', 'Dwarf', 'Fighter', '{}', 1, 1)"
+        ))
+
+    assert migrate(engine) == [8, 9]
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT created_at FROM dnd_class")).scalar() is not None
+
+
+def test_search_index_built_and_synced(engine):
+    """Test existing rows are indexed and the triggers
+    keep the index in sync."""
+    migrate(engine, target=5)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO user (user_name, email, hashed_password, created_at) "
+            "VALUES ('gandalf', 'g@example.com', 'x', '2025-01-01')"
+        ))
+
+    migrate(engine)
+
+    def found(pattern):
+        with engine.connect() as connection:
+            return connection.execute(text(
+                f"SELECT rowid FROM {fts_table('user')} WHERE user_name LIKE :pattern"
+            ), {"pattern": pattern}).scalars().all()
+
+    assert found("%ANDAL%") == [1]
+    with engine.begin() as connection:
+        connection.execute(text("UPDATE user SET user_name = 'radagast' WHERE id = 1"))
+    assert found("%andal%") == []
+    assert found("%adag%") == [1]
+    with engine.begin() as connection:
+        connection.execute(text("DELETE FROM user"))
+        connection.execute(text(
+            f"INSERT INTO {fts_table('user')} ({fts_table('user')}) VALUES ('integrity-check')"
+        ))
+    assert found("%adag%") == []
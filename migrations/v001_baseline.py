@@ -0,0 +1,18 @@
+"""
+v001_baseline.py
+
+Baseline: the tables of the app models.
+Existing tables are kept as they are.
+"""
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel
+import models.db_models.table_models  # Register the tables
+
+
+
+VERSION = 1
+DESCRIPTION = "baseline tables"
+
+
+def upgrade(connection: Connection):
+    SQLModel.metadata.create_all(connection, checkfirst=True)
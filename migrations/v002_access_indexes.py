@@ -0,0 +1,31 @@
+"""
+v002_access_indexes.py
+
+Indexes for the dice log and dice set access patterns:
+listing and retention by user / campaign and the
+cascade deletes by campaign, class and dice set.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+
+VERSION = 2
+DESCRIPTION = "composite indexes for dice logs and dice sets"
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_dicelog_user_timestamp ON dicelog (user_id, timestamp DESC)",
+    "CREATE INDEX IF NOT EXISTS ix_dicelog_user_id_id ON dicelog (user_id, id)",
+    "CREATE INDEX IF NOT EXISTS ix_dicelog_campaign_id_id ON dicelog (campaign_id, id)",
+    "CREATE INDEX IF NOT EXISTS ix_dicelog_dnd_class_id ON dicelog (dnd_class_id)",
+    "CREATE INDEX IF NOT EXISTS ix_dicelog_diceset_id ON dicelog (diceset_id)",
+    "CREATE INDEX IF NOT EXISTS ix_diceset_dnd_class_id ON diceset (dnd_class_id)",
+    "CREATE INDEX IF NOT EXISTS ix_diceset_campaign_id ON diceset (campaign_id)",
+    "CREATE INDEX IF NOT EXISTS ix_dicesetdice_dice_id ON dicesetdice (dice_id)",
+    "CREATE INDEX IF NOT EXISTS ix_campaign_created_by ON campaign (created_by)",
+]
+
+
+def upgrade(connection: Connection):
+    for statement in INDEXES:
+        connection.execute(text(statement))
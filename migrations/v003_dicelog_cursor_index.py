@@ -0,0 +1,21 @@
+"""
+v003_dicelog_cursor_index.py
+
+Extends the newest-first dice log index by the id, so
+keyset pages (timestamp, id) are read without a sort.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+
+VERSION = 3
+DESCRIPTION = "dice log index for keyset pagination"
+
+
+def upgrade(connection: Connection):
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_dicelog_user_timestamp_id "
+        "ON dicelog (user_id, timestamp DESC, id DESC)"
+    ))
+    connection.execute(text("DROP INDEX IF EXISTS ix_dicelog_user_timestamp"))
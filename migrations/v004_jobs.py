@@ -0,0 +1,17 @@
+"""
+v004_jobs.py
+
+Table of the background jobs (long running deletions),
+so queued and running jobs survive a restart.
+"""
+from sqlalchemy.engine import Connection
+from models.db_models.table_models import Job
+
+
+
+VERSION = 4
+DESCRIPTION = "background jobs table"
+
+
+def upgrade(connection: Connection):
+    Job.__table__.create(connection, checkfirst=True)
@@ -0,0 +1,26 @@
+"""
+v005_resource_versions.py
+
+Version column of campaigns, classes and dice sets, the
+row version behind the ETags of the single resource GETs.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+
+VERSION = 5
+DESCRIPTION = "version column for campaigns, classes and dice sets"
+
+TABLES = ["campaign", "dnd_class", "diceset"]
+
+
+def upgrade(connection: Connection):
+    inspector = inspect(connection)
+    for table in TABLES:
+        columns = {column["name"] for column in inspector.get_columns(table)}
+        if "version" not in columns:
+            connection.execute(text(
+                f"ALTER TABLE {table} "
+                f"ADD COLUMN version INTEGER NOT NULL DEFAULT 1"
+            ))
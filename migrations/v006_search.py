@@ -0,0 +1,74 @@
+"""
+v006_search.py
+
+Search indexes for campaign titles, class names and usernames.
+
+SQLite: an FTS5 table with the trigram tokenizer per searched
+column ({table}_search, external content, so only the index is
+stored). Triggers keep it in sync on insert, update and delete
+(also the bulk deletes of the cascades), existing rows are
+indexed with 'rebuild'.
+PostgreSQL: pg_trgm GIN indexes, used by ILIKE and similarity().
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+
+VERSION = 6
+DESCRIPTION = "full text search for campaign titles, class names and usernames"
+
+# Searched column per table
+SEARCH_COLUMNS = {
+    "campaign": "title",
+    "dnd_class": "name",
+    "user": "user_name",
+}
+
+
+def fts_table(table: str) -> str:
+    """Name of the FTS5 table of a table (SQLite)."""
+    return f"{table}_search"
+
+
+def sqlite_statements(table: str, column: str) -> list:
+    """FTS5 table, sync triggers and initial index of a column."""
+    fts = fts_table(table)
+    insert = f"INSERT INTO {fts} (rowid, {column}) VALUES (new.id, new.{column});"
+    delete = (
+        f"INSERT INTO {fts} ({fts}, rowid, {column}) "
+        f"VALUES ('delete', old.id, old.{column});"
+    )
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{column}, content='{table}', content_rowid='id', tokenize='trigram')",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON "{table}" '
+        f"BEGIN {insert} END",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON "{table}" '
+        f"BEGIN {delete} END",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {column} ON "{table}" '
+        f"BEGIN {delete} {insert} END",
+        f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')",
+    ]
+
+
+def postgresql_statements(table: str, column: str) -> list:
+    """Trigram index of a column (PostgreSQL)."""
+    return [
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm "
+        f'ON "{table}" USING gin ({column} gin_trgm_ops)'
+    ]
+
+
+def upgrade(connection: Connection):
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        statements = postgresql_statements
+    elif dialect == "sqlite":
+        statements = sqlite_statements
+    else:
+        return  # Searches fall back to ILIKE
+    for table, column in SEARCH_COLUMNS.items():
+        for statement in statements(table, column):
+            connection.execute(text(statement))
@@ -0,0 +1,19 @@
+"""
+v007_roll_seeds.py
+
+Roll seed of campaigns, so seeded rolls survive restarts
+and every worker rolls from the same seed.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+
+VERSION = 7
+DESCRIPTION = "roll seed column for campaigns"
+
+
+def upgrade(connection: Connection):
+    columns = {column["name"] for column in inspect(connection).get_columns("campaign")}
+    if "roll_seed" not in columns:
+        connection.execute(text("ALTER TABLE campaign ADD COLUMN roll_seed BIGINT"))
@@ -0,0 +1,25 @@
+"""
+v008_created_at.py
+
+Creation time of classes and dice sets (campaigns have one),
+part of the ETags: SQLite reuses the id of a deleted row, the
+creation time tells the new row from the old one.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+
+VERSION = 8
+DESCRIPTION = "created_at column for classes and dice sets"
+
+TABLES = ["dnd_class", "diceset"]
+
+
+def upgrade(connection: Connection):
+    inspector = inspect(connection)
+    for table in TABLES:
+        columns = {column["name"] for column in inspector.get_columns(table)}
+        if "created_at" not in columns:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN created_at TIMESTAMP"))
+            connection.execute(text(f"UPDATE {table} SET created_at = CURRENT_TIMESTAMP"))
@@ -0,0 +1,21 @@
+"""
+v009_job_leases.py
+
+Owner and lease of running jobs, so only one worker
+process runs (and resumes) each job.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+
+VERSION = 9
+DESCRIPTION = "owner and lease columns for jobs"
+
+
+def upgrade(connection: Connection):
+    columns = {column["name"] for column in inspect(connection).get_columns("job")}
+    if "owner" not in columns:
+        connection.execute(text("ALTER TABLE job ADD COLUMN owner VARCHAR"))
+    if "lease_until" not in columns:
+        connection.execute(text("ALTER TABLE job ADD COLUMN lease_until TIMESTAMP"))
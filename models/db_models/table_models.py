@@ -4,7 +4,7 @@ table_models.py
 Table models for DB.
 """
 from sqlmodel import Column, Field, Relationship, SQLModel
-from sqlalchemy import DateTime, JSON, Text, UniqueConstraint
+from sqlalchemy import BigInteger, DateTime, Index, JSON, Text, UniqueConstraint, text
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
 
@@ -49,6 +49,7 @@ class Campaign(SQLModel, table=True):
             "created_by",
             name="uq_user_title"
         ),
+        Index("ix_campaign_created_by", "created_by"),
     )
     id: int | None = Field(default=None, primary_key=True)
     title: str = Field(index=True)
@@ -64,6 +65,16 @@ class Campaign(SQLModel, table=True):
         default_factory=lambda:
         datetime.now(timezone.utc)
     )
+    version: int = Field(
+        default=1,
+        sa_column_kwargs={"server_default": text("1")},
+        description="Bumped on every change (ETag)"
+    )
+    roll_seed: int | None = Field(
+        default=None,
+        sa_column=Column(BigInteger, nullable=True),
+        description="Seed of the campaign rolls (None: unseeded)"
+    )
 
     # ORM link to User
     creator: Optional[User] = Relationship(
@@ -123,6 +134,15 @@ class Class(SQLModel, table=True):
         nullable=False,
         index=True
     )
+    created_at: datetime = Field(
+        default_factory=lambda:
+        datetime.now(timezone.utc)
+    )
+    version: int = Field(
+        default=1,
+        sa_column_kwargs={"server_default": text("1")},
+        description="Bumped on every change (ETag)"
+    )
 
     # Link to Campaign
     campaign: Optional["Campaign"] = Relationship(back_populates="classes")
@@ -137,6 +157,11 @@ class Class(SQLModel, table=True):
 class DiceSetDice(SQLModel, table=True):
     """Table model for Dice to DiceSet relationships."""
 
+    # The primary key covers lookups by dice set
+    __table_args__ = (
+        Index("ix_dicesetdice_dice_id", "dice_id"),
+    )
+
     dice_set_id: int = Field(foreign_key="diceset.id", primary_key=True)
     dice_id: int = Field(foreign_key="dice.id", primary_key=True)
     quantity: int = Field(default=1)
@@ -156,11 +181,25 @@ class DiceSet(SQLModel, table=True):
     """Table model for dice sets."""
     __tablename__ = "diceset"
 
+    __table_args__ = (
+        Index("ix_diceset_dnd_class_id", "dnd_class_id"),
+        Index("ix_diceset_campaign_id", "campaign_id"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     name: str = Field(default="Dice set", nullable=False)
     dnd_class_id: int = Field(foreign_key="dnd_class.id", nullable=False)
     campaign_id: int = Field(foreign_key="campaign.id", nullable=False)
     user_id: int = Field(foreign_key="user.id", nullable=False, index=True)
+    created_at: datetime = Field(
+        default_factory=lambda:
+        datetime.now(timezone.utc)
+    )
+    version: int = Field(
+        default=1,
+        sa_column_kwargs={"server_default": text("1")},
+        description="Bumped on every change of the set or its dices (ETag)"
+    )
 
     dice_entries: List[DiceSetDice] = Relationship(back_populates="diceset")
 
@@ -200,6 +239,20 @@ class DiceLog(SQLModel, table=True):
     """Table model for dice logs."""
     __tablename__ = "dicelog"
 
+    __table_args__ = (
+        # Newest logs of a user, keyset pages by (timestamp, id) (list_logs)
+        Index(
+            "ix_dicelog_user_timestamp_id",
+            "user_id", text("timestamp DESC"), text("id DESC")
+        ),
+        # Logs of a user / campaign in insert order (retention cutoff)
+        Index("ix_dicelog_user_id_id", "user_id", "id"),
+        Index("ix_dicelog_campaign_id_id", "campaign_id", "id"),
+        # Cascade deletes and listings by class / dice set
+        Index("ix_dicelog_dnd_class_id", "dnd_class_id"),
+        Index("ix_dicelog_diceset_id", "diceset_id"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     timestamp: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
@@ -213,3 +266,37 @@ class DiceLog(SQLModel, table=True):
 
     def __repr__(self):
         return f"<DiceLog id={self.id} user_id={self.user_id} result={self.result}>"
+
+
+class Job(SQLModel, table=True):
+    """Table model for background jobs (long deletions)."""
+    __tablename__ = "job"
+
+    __table_args__ = (
+        # Unfinished jobs to resume on startup, open job per target
+        Index("ix_job_status_kind_target", "status", "kind", "target_id"),
+    )
+
+    id: str = Field(primary_key=True)  # Random UUID, the job handle
+    kind: str = Field(nullable=False)
+    target_id: int = Field(nullable=False)
+    user_id: int = Field(nullable=False)  # Requester, kept after a user deletion
+    status: str = Field(default="pending", nullable=False)
+    deleted_rows: Dict[str, int] = Field(
+        sa_column=Column(JSON, nullable=False),
+        default_factory=dict
+    )
+    error: str | None = None
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        nullable=False)
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        nullable=False)
+    finished_at: datetime | None = None
+    # Worker running the job, until its lease runs out (claim)
+    owner: str | None = None
+    lease_until: datetime | None = None
+
+    def __repr__(self):
+        return f"<Job id={self.id} kind={self.kind} status={self.status}>"
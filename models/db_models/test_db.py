@@ -5,7 +5,11 @@ Creates a fake database SQLite for unit tests.
 """
 import os
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.pool import NullPool
+from migrations import migrate, schema_version
+from repositories.unit_of_work import transaction
 from models.db_models.table_models import (
     User,
     Campaign,
@@ -19,8 +23,9 @@ from models.db_models.table_models import (
 
 # Remove old test DB file so tests start with a clean DB
 TEST_DB_PATH = "./models/db_models/test.db.sql"
-if os.path.exists(TEST_DB_PATH):
-    os.remove(TEST_DB_PATH)
+for path in (TEST_DB_PATH, f"{TEST_DB_PATH}-wal", f"{TEST_DB_PATH}-shm"):
+    if os.path.exists(path):
+        os.remove(path)
 
 # Engine for file-based sqlite test DB
 # Use NullPool to avoid connection pool issues in tests
@@ -31,13 +36,42 @@ test_engine = create_engine(
 )
 
 
-# Drop & recreate all tables once at the start
+# Drop & recreate all tables once at the start (through the migrations)
 SQLModel.metadata.drop_all(test_engine)
-SQLModel.metadata.create_all(test_engine)
+schema_version.drop(test_engine, checkfirst=True)
+migrate(test_engine)
 
 
 # Helper: create session
 def get_session():
-    """Create a db session for test (SQLite file)."""
-    with Session(test_engine) as session:
+    """Create a db session for test (SQLite file),
+    one transaction per request like get_session."""
+    with Session(test_engine) as session, transaction(session):
         yield session
+
+
+# Async engine on the same file (aiosqlite), created on first use
+_test_async_engine = None
+
+
+def get_test_async_engine():
+    """Async engine for the test DB (DB_BACKEND=async tests)."""
+    global _test_async_engine
+    if _test_async_engine is None:
+        _test_async_engine = create_async_engine(
+            f"sqlite+aiosqlite:///{TEST_DB_PATH}",
+            poolclass=NullPool,
+        )
+    return _test_async_engine
+
+
+async def get_async_session():
+    """Create an async db session for test,
+    one transaction per request like get_async_session."""
+    async with AsyncSession(get_test_async_engine(), expire_on_commit=False) as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
@@ -0,0 +1,94 @@
+"""
+batch_schema.py
+
+Request/response schema for batch requests
+and the arguments of the batch operations.
+"""
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import ConfigDict
+from sqlmodel import Field, SQLModel
+from models.schemas.roll_schema import RollExpressionInput
+
+
+
+class BatchItem(SQLModel):
+    """Model of one operation of a batch (Request body input)."""
+    id: Optional[str] = Field(
+        default=None,
+        max_length=100,
+        description="Returned with the result, to match results to operations."
+    )
+    op: str = Field(description="Operation, e.g. roll_dice or get_campaign.")
+    args: Dict[str, Any] = {}
+
+
+class BatchRequest(SQLModel):
+    """Model of a batch of operations (Request body input)."""
+    operations: List[BatchItem] = Field(min_length=1)
+
+
+class BatchItemResult(SQLModel):
+    """Model to respond the result of one operation:
+    status code and body of the single request,
+    or the error detail."""
+    id: Optional[str] = None
+    op: str
+    status: int
+    body: Any = None
+    detail: Any = None
+    headers: Dict[str, str] = {}
+
+
+# Arguments of the operations (unknown arguments are an error)
+
+class BatchArgs(SQLModel):
+    """Base of the operation arguments."""
+    model_config = ConfigDict(extra="forbid")
+
+
+class ListArgs(BatchArgs):
+    """Paging and view of the list operations."""
+    name: Optional[str] = None
+    view: Literal["summary", "full"] = "summary"
+    fields: Optional[str] = None
+    offset: int = Field(default=0, ge=0)
+    limit: int = Field(default=100, le=100)
+    cursor: Optional[str] = None
+
+
+class GetCampaignArgs(BatchArgs):
+    campaign_id: int
+    expand: Optional[str] = None
+
+
+class ListCampaignsArgs(ListArgs):
+    pass
+
+
+class GetClassArgs(BatchArgs):
+    class_id: int
+
+
+class ListClassesArgs(ListArgs):
+    campaign_id: Optional[int] = Field(default=None, ge=1)
+
+
+class GetDiceSetArgs(BatchArgs):
+    diceset_id: int
+
+
+class RollDiceArgs(BatchArgs):
+    dice_id: int
+    campaign_id: Optional[int] = None
+    dnd_class_id: Optional[int] = None
+
+
+class RollDiceSetArgs(BatchArgs):
+    diceset_id: int
+    campaign_id: int
+    dnd_class_id: int
+    summary: bool = False
+
+
+class RollExpressionArgs(RollExpressionInput):
+    model_config = ConfigDict(extra="forbid")
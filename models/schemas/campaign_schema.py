@@ -3,9 +3,11 @@ campaign_schema.py
 
 Request/response schemas for campaigns.
 """
-from sqlmodel import SQLModel
+from sqlmodel import Field, SQLModel
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
+from models.schemas.class_schema import ClassExpanded
+from models.schemas.dicelog_schema import DiceLogPublic
 
 
 
@@ -39,14 +41,61 @@ class CampaignUpdate(SQLModel):
     description: Optional[str] = None
 
 
+class CampaignSeed(SQLModel):
+    """Roll seed of a campaign (None for unseeded rolls)."""
+    seed: Optional[int] = Field(default=None, ge=0, le=2 ** 63 - 1)  # BIGINT column
+
+
 class CampaignPublic(CampaignBase):
     """Model to respond public data."""
     id: int
     created_by: int
     created_at: datetime
+    version: int = 1  # Row version, the ETag
+
+    class Config:
+        """Formatted timestamp"""
+        json_encoders = {
+            datetime: lambda v: v.strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+
+class CampaignListItem(SQLModel):
+    """A campaign in list responses, with the selected
+    fields only (the others are left out of the JSON)."""
+    title: Optional[str] = None
+    genre: Optional[str] = None
+    description: Optional[str] = None
+    max_classes: Optional[int] = None
+    id: int
+    created_by: Optional[int] = None
+    created_at: Optional[datetime] = None
+    version: Optional[int] = None
 
     class Config:
         """Formatted timestamp"""
         json_encoders = {
             datetime: lambda v: v.strftime("%Y-%m-%d %H:%M:%S")
         }
+
+
+# Fields of list responses, the unbounded text only on request
+CAMPAIGN_FIELDS = tuple(CampaignPublic.model_fields)
+CAMPAIGN_LARGE_FIELDS = ("description",)
+CAMPAIGN_SUMMARY_FIELDS = tuple(f for f in CAMPAIGN_FIELDS if f not in CAMPAIGN_LARGE_FIELDS)
+
+
+class CampaignExpanded(CampaignPublic):
+    """A campaign with the expanded collections
+    (?expand=), the others are left out of the JSON."""
+    classes: Optional[List[ClassExpanded]] = None
+    recent_logs: Optional[List[DiceLogPublic]] = None
+
+
+# Collections of GET /campaigns/{id}?expand= (dicesets are those of the classes)
+CAMPAIGN_EXPANDS = ("classes", "dicesets", "recent_logs")
+
+
+class CampaignDeleted(CampaignPublic):
+    """The deleted campaign with the deleted rows per table."""
+    deleted_rows: Dict[str, int] = {}
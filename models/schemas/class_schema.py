@@ -3,8 +3,10 @@ class_schema.py
 
 Request/response schema for classes.
 """
+from datetime import datetime
 from sqlmodel import Field, SQLModel
-from typing import Optional
+from typing import Dict, List, Optional
+from models.schemas.diceset_schema import DiceSetPublic
 
 
 
@@ -61,3 +63,49 @@ class ClassPublic(ClassBase):
     user_id: int
     notes: Optional[str] = None
     inventory: Optional[str] = None
+    created_at: Optional[datetime] = None
+    version: int = 1  # Row version, the ETag
+
+    class Config:
+        """Formatted timestamp"""
+        json_encoders = {
+            datetime: lambda v: v.strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+
+class ClassListItem(SQLModel):
+    """A dnd_class in list responses, with the selected
+    fields only (the others are left out of the JSON)."""
+    name: Optional[str] = None
+    dnd_class: Optional[str] = None
+    race: Optional[str] = None
+    skills: Optional[ClassSkills] = None
+    id: int
+    user_id: Optional[int] = None
+    notes: Optional[str] = None
+    inventory: Optional[str] = None
+    created_at: Optional[datetime] = None
+    version: Optional[int] = None
+
+    class Config:
+        """Formatted timestamp"""
+        json_encoders = {
+            datetime: lambda v: v.strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+
+# Fields of list responses, skills (JSON) and texts only on request
+CLASS_FIELDS = tuple(ClassPublic.model_fields)
+CLASS_LARGE_FIELDS = ("skills", "notes", "inventory")
+CLASS_SUMMARY_FIELDS = tuple(f for f in CLASS_FIELDS if f not in CLASS_LARGE_FIELDS)
+
+
+class ClassExpanded(ClassPublic):
+    """A dnd_class of an expanded campaign,
+    with its dice sets if they were expanded."""
+    dicesets: Optional[List[DiceSetPublic]] = None
+
+
+class ClassDeleted(ClassPublic):
+    """The deleted dnd_class with the deleted rows per table."""
+    deleted_rows: Dict[str, int] = {}
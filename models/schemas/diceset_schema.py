@@ -3,8 +3,9 @@ diceset_schema.py
 
 Request/response schema for dice sets.
 """
+from datetime import datetime
 from sqlmodel import SQLModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 from models.schemas.dice_schema import DicePublic, DiceRollResult
 
 
@@ -42,6 +43,19 @@ class DiceSetPublic(DiceSetBase):
     id: int
     user_id: int
     dices: List[DicePublic]
+    created_at: Optional[datetime] = None
+    version: int = 1  # Row version, the ETag
+
+    class Config:
+        """Formatted timestamp"""
+        json_encoders = {
+            datetime: lambda v: v.strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+
+class DiceSetDeleted(DiceSetPublic):
+    """The deleted dice set with the deleted rows per table."""
+    deleted_rows: Dict[str, int] = {}
 
 
 class DiceSetRollResult(SQLModel):
@@ -50,3 +64,42 @@ class DiceSetRollResult(SQLModel):
     name: str
     results: List[DiceRollResult]
     total: int
+
+
+class DiceRollSummary(SQLModel):
+    """Model to respond the rolls of one dice entry as face counts."""
+    id: int
+    name: str
+    sides: int
+    quantity: int
+    counts: Dict[int, int]  # face -> how often it was rolled
+    total: int
+
+
+class DiceSetRollSummary(SQLModel):
+    """Model to respond a dice set roll in summary mode."""
+    diceset_id: int
+    name: str
+    dices: List[DiceRollSummary]
+    total: int
+
+
+class DistributionPoint(SQLModel):
+    """Probability of a single dice set total."""
+    total: int
+    probability: float
+    cumulative: float
+
+
+class DiceSetDistribution(SQLModel):
+    """Model to respond the exact distribution of a dice set total."""
+    diceset_id: int
+    name: str
+    min: int
+    max: int
+    mean: float
+    variance: float
+    percentiles: Dict[int, int]
+    dc: Optional[int] = None
+    probability_at_least: Optional[float] = None  # P(total >= dc)
+    distribution: List[DistributionPoint]
@@ -0,0 +1,39 @@
+"""
+job_schema.py
+
+Request/response schema for background jobs.
+"""
+from typing import Dict, Optional
+from sqlmodel import SQLModel
+from datetime import datetime
+
+
+
+# Job kinds
+DELETE_USER = "delete_user"
+DELETE_CAMPAIGN = "delete_campaign"
+
+# Job states
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobCreate(SQLModel):
+    """Model to queue a new job."""
+    kind: str
+    target_id: int
+    user_id: int
+
+
+class JobPublic(JobCreate):
+    """Model to respond public data.
+    deleted_rows grows with each deleted chunk."""
+    id: str
+    status: str
+    deleted_rows: Dict[str, int] = {}
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
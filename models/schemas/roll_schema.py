@@ -0,0 +1,34 @@
+"""
+roll_schema.py
+
+Request/response schema for dice expression rolls.
+"""
+from sqlmodel import Field, SQLModel
+from typing import List, Optional
+
+
+
+class RollExpressionInput(SQLModel):
+    """Model to roll a dice expression (Request body input)."""
+    expression: str = Field(
+        min_length=1,
+        max_length=100,
+        description="Dice notation, e.g. 4d6kh3+2"
+    )
+    campaign_id: Optional[int] = None
+    dnd_class_id: Optional[int] = None
+
+
+class RollTermResult(SQLModel):
+    """Model to respond the result of a single dice term."""
+    notation: str
+    sides: int
+    rolls: List[int]
+    kept: List[int]
+
+
+class RollExpressionResult(SQLModel):
+    """Model to respond the data after rolling an expression."""
+    expression: str
+    terms: List[RollTermResult]
+    total: int
@@ -0,0 +1,50 @@
+"""
+simulation_schema.py
+
+Request/response schema for Monte Carlo simulations.
+"""
+from sqlmodel import Field, SQLModel
+from typing import Optional
+
+
+
+class SimulationInput(SQLModel):
+    """Model to start a simulation (Request body input)."""
+    diceset_id: int
+    opponent_diceset_id: Optional[int] = Field(
+        default=None,
+        description="Compare against this dice set."
+    )
+    dc: Optional[int] = Field(
+        default=None,
+        description="Count the trials with total >= dc."
+    )
+    trials: int = Field(default=10_000, ge=1)
+
+
+class SimulationProgress(SQLModel):
+    """Progress event while a simulation runs."""
+    event: str = "progress"
+    completed: int
+    trials: int
+
+
+class SimulationResult(SQLModel):
+    """Final event of a simulation."""
+    event: str = "result"
+    diceset_id: int
+    opponent_diceset_id: Optional[int] = None
+    dc: Optional[int] = None
+    trials: int
+    mean: float
+    opponent_mean: Optional[float] = None
+    win_rate: Optional[float] = None
+    tie_rate: Optional[float] = None
+    loss_rate: Optional[float] = None
+    success_rate: Optional[float] = None  # P(total >= dc)
+
+
+class SimulationError(SQLModel):
+    """Error event of a simulation."""
+    event: str = "error"
+    detail: str
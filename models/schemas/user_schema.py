@@ -6,7 +6,7 @@ Request/response schema for users.
 from sqlmodel import SQLModel
 from pydantic import EmailStr, Field
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
 
 
@@ -49,6 +49,11 @@ class UserPublic(SQLModel):
         }
 
 
+class UserDeleted(UserPublic):
+    """The deleted user with the deleted rows per table."""
+    deleted_rows: Dict[str, int] = {}
+
+
 class UserMe(UserPublic):
     """Fields to show user data by themselves."""
     email: EmailStr
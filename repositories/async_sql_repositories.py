@@ -0,0 +1,77 @@
+"""
+async_sql_repositories.py
+
+Async implementations of the repository interfaces on AsyncSession
+(DB_BACKEND=async), for the hand-written async routes.
+
+Each method runs the matching method of the sqlalchemy repository
+with AsyncSession.run_sync: the queries are the same code, the
+database I/O goes through the async driver (aiosqlite, asyncpg)
+and is awaited on the event loop instead of blocking a thread.
+run_sync runs the method itself on the event loop, so only
+repositories whose methods do nothing but queries get an async
+implementation (no entity or version cache, no dice log writer).
+"""
+import anyio
+from sqlmodel.ext.asyncio.session import AsyncSession
+from repositories.dicelog_writer import get_dicelog_writer
+from repositories.routing_session import read_from_primary
+from repositories.sql_dicelog_repository import SqlAlchemyDiceLogRepository
+import logging
+
+
+
+logger = logging.getLogger(__name__)
+
+
+def _run_sync_method(name: str):
+    """Coroutine method running the sync repository method `name`."""
+    async def method(self, *args, **kwargs):
+        return await self.session.run_sync(
+            lambda session: getattr(self.implementation(session), name)(*args, **kwargs)
+        )
+    method.__name__ = name
+    return method
+
+
+class AsyncRepository:
+    """Base of the async repositories: the `methods`
+    of `implementation` become coroutine methods."""
+    implementation: type = None
+    methods: tuple = ()
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        logger.debug(f"{type(self).__name__} initialized")
+
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in cls.methods:
+            method = _run_sync_method(name)
+            method.__doc__ = getattr(cls.implementation, name).__doc__
+            setattr(cls, name, method)
+
+
+class AsyncSqlAlchemyDiceLogRepository(AsyncRepository):
+    """Async implementation of the DiceLogRepository reads
+    (log_roll queues for the writer or writes inline)."""
+    implementation = SqlAlchemyDiceLogRepository
+    methods = (
+        "get_by_id",
+        "list_by_user",
+        "list_by_campaign",
+        "list_recent_by_campaign",
+        "list_by_class",
+        "list_by_diceset",
+        "list_logs",
+    )
+
+    async def wait_for_pending(self, user_id: int) -> bool:
+        """Wait until the queued logs of a user are written,
+        in a worker thread (the wait blocks, the event loop must not)."""
+        read_from_primary(self.session)
+        writer = get_dicelog_writer()
+        if writer is None:
+            return True
+        return await anyio.to_thread.run_sync(writer.wait_for_user, user_id)
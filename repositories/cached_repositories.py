@@ -0,0 +1,52 @@
+"""
+cached_repositories.py
+
+Sqlalchemy repositories for campaigns, classes and users
+that read single entities through the entity cache.
+
+Only get_by_id is cached; the writes invalidate the
+entries on flush and in the cascades (entity_cache.py).
+"""
+from typing import Optional
+from models.db_models.table_models import Campaign, Class, User
+from models.schemas.campaign_schema import CampaignPublic
+from models.schemas.class_schema import ClassPublic
+from models.schemas.user_schema import UserPublic
+from repositories.entity_cache import entity_caches
+from repositories.sql_campaign_repository import SqlAlchemyCampaignRepository
+from repositories.sql_class_repository import SqlAlchemyClassRepository
+from repositories.sql_user_repository import SqlAlchemyUserRepository
+
+
+
+class CachedSqlAlchemyCampaignRepository(SqlAlchemyCampaignRepository):
+    """Campaign repository with cached get_by_id."""
+
+    def get_by_id(self, campaign_id: int) \
+            -> Optional[CampaignPublic]:
+        cache = entity_caches[Campaign]
+        if cache is None:
+            return super().get_by_id(campaign_id)
+        return cache.read_through(self.session, campaign_id, super().get_by_id)
+
+
+class CachedSqlAlchemyClassRepository(SqlAlchemyClassRepository):
+    """Class repository with cached get_by_id."""
+
+    def get_by_id(self, class_id: int) \
+            -> Optional[ClassPublic]:
+        cache = entity_caches[Class]
+        if cache is None:
+            return super().get_by_id(class_id)
+        return cache.read_through(self.session, class_id, super().get_by_id)
+
+
+class CachedSqlAlchemyUserRepository(SqlAlchemyUserRepository):
+    """User repository with cached get_by_id."""
+
+    def get_by_id(self, user_id: int) \
+            -> Optional[UserPublic]:
+        cache = entity_caches[User]
+        if cache is None:
+            return super().get_by_id(user_id)
+        return cache.read_through(self.session, user_id, super().get_by_id)
@@ -5,10 +5,17 @@ Defined methods for campaign management.
 """
 from abc import ABC, abstractmethod
 from models.schemas.campaign_schema import *
-from typing import List, Optional
+from repositories.version_cache import ResourceVersion
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Union
 
 
 
+class RollSeed(NamedTuple):
+    """Owner and roll seed of a campaign."""
+    owner_id: int
+    seed: Optional[int]
+
+
 class CampaignRepository(ABC):
     """This dnd_class defines the management methods for campaigns."""
 
@@ -19,15 +26,60 @@ class CampaignRepository(ABC):
         pass
 
 
+    @abstractmethod
+    def get_version(self, campaign_id: int) \
+            -> Optional[ResourceVersion]:
+        """Version and owner of a campaign (ETag), without the row."""
+        pass
+
+
+    @abstractmethod
+    def get_roll_seed(self, campaign_id: int) \
+            -> Optional[RollSeed]:
+        """Owner and roll seed of a campaign, without the row."""
+        pass
+
+
+    @abstractmethod
+    def set_roll_seed(self, campaign_id: int, seed: Optional[int]) \
+            -> bool:
+        """Store the roll seed of a campaign (None: unseeded),
+        False if the campaign does not exist."""
+        pass
+
+
+    @abstractmethod
+    def after_commit(self, callback: Callable[[], None]):
+        """Run a callback once the changes are committed
+        (dropped on rollback)."""
+        pass
+
+
     @abstractmethod
     def list_all(self,
                  offset: int = 0,
                  limit: int = 100,
                  name: Optional[str] = None,
-                 user_id: Optional[int] = None
-                 ) -> List[CampaignPublic]:
-        """Show all campaigns method,
-        optional filtered by name or user."""
+                 user_id: Optional[int] = None,
+                 after_id: Optional[int] = None,
+                 fields: Optional[Sequence[str]] = None
+                 ) -> List[Union[CampaignPublic, CampaignListItem]]:
+        """Show all campaigns method, ordered by ID,
+        optional filtered by name or user.
+        after_id continues after a cursor (keyset paging).
+        fields selects only these columns (list items)."""
+        pass
+
+
+    @abstractmethod
+    def search(self,
+               text: str,
+               prefix: bool = False,
+               limit: int = 10,
+               user_id: Optional[int] = None
+               ) -> List[CampaignListItem]:
+        """Campaigns whose title contains the text (starts with it
+        for prefix), best matches first, as summary list items."""
         pass
 
 
@@ -53,6 +105,15 @@ class CampaignRepository(ABC):
         pass
 
 
+    @abstractmethod
+    def delete_cascade(self, campaign_id: int) \
+            -> Dict[str, int]:
+        """Remove a campaign with its classes,
+        dice sets and dice logs
+        in one transaction, returns the deleted rows per table."""
+        pass
+
+
     @abstractmethod
     def list_by_user(self, user_id: int) \
             -> List[CampaignPublic]:
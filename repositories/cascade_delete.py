@@ -0,0 +1,188 @@
+"""
+cascade_delete.py
+
+Set-based cascade deletes for users, campaigns, classes and dice sets.
+
+A scope maps each affected table to the WHERE clause of its rows.
+The rows are removed with one bulk DELETE per table, children
+before parents, in the transaction of the caller (the request):
+either everything below the root goes or nothing does.
+
+Very large scopes (background jobs) are removed chunk by chunk
+with delete_chunks first, one short transaction per chunk, so
+live requests are not blocked by one long write.
+"""
+from functools import partial
+from typing import Dict, Iterator, Tuple
+from sqlalchemy import delete, inspect, or_, select, tuple_
+from sqlmodel import Session
+from models.db_models.table_models import (
+    Campaign,
+    Class,
+    DiceLog,
+    DiceSet,
+    DiceSetDice,
+    User
+)
+from repositories import entity_cache, version_cache
+from repositories.roll_plan_cache import invalidate_on_commit
+from repositories.unit_of_work import after_commit
+from services.dice import entropy_pool
+import logging
+
+
+
+logger = logging.getLogger(__name__)
+
+# Children first, so no DELETE leaves a dangling foreign key
+DELETE_ORDER = (DiceLog, DiceSetDice, DiceSet, Class, Campaign, User)
+
+CHUNK_SIZE = 1000
+
+# Tables with cached rows (roll plans, entity cache)
+CACHED_MODELS = (DiceSet, Class, Campaign, User)
+
+
+def diceset_scope(diceset_id: int) -> dict:
+    """Rows of a dice set: its dice entries and logs."""
+    return {
+        DiceLog: DiceLog.diceset_id == diceset_id,
+        DiceSetDice: DiceSetDice.dice_set_id == diceset_id,
+        DiceSet: DiceSet.id == diceset_id,
+    }
+
+
+def class_scope(class_id: int) -> dict:
+    """Rows of a dnd class: its dice sets and logs."""
+    dicesets = select(DiceSet.id).where(DiceSet.dnd_class_id == class_id)
+    return {
+        DiceLog: or_(
+            DiceLog.dnd_class_id == class_id,
+            DiceLog.diceset_id.in_(dicesets)
+        ),
+        DiceSetDice: DiceSetDice.dice_set_id.in_(dicesets),
+        DiceSet: DiceSet.dnd_class_id == class_id,
+        Class: Class.id == class_id,
+    }
+
+
+def campaign_scope(campaign_id: int) -> dict:
+    """Rows of a campaign: its classes, dice sets and logs."""
+    classes = select(Class.id).where(Class.campaign_id == campaign_id)
+    diceset_rows = or_(
+        DiceSet.campaign_id == campaign_id,
+        DiceSet.dnd_class_id.in_(classes)
+    )
+    dicesets = select(DiceSet.id).where(diceset_rows)
+    return {
+        DiceLog: or_(
+            DiceLog.campaign_id == campaign_id,
+            DiceLog.dnd_class_id.in_(classes),
+            DiceLog.diceset_id.in_(dicesets)
+        ),
+        DiceSetDice: DiceSetDice.dice_set_id.in_(dicesets),
+        DiceSet: diceset_rows,
+        Class: Class.campaign_id == campaign_id,
+        Campaign: Campaign.id == campaign_id,
+    }
+
+
+def user_scope(user_id: int) -> dict:
+    """Rows of a user: own campaigns with everything in them,
+    own classes, dice sets and logs in other campaigns."""
+    campaigns = select(Campaign.id).where(Campaign.created_by == user_id)
+    class_rows = or_(
+        Class.user_id == user_id,
+        Class.campaign_id.in_(campaigns)
+    )
+    classes = select(Class.id).where(class_rows)
+    diceset_rows = or_(
+        DiceSet.user_id == user_id,
+        DiceSet.campaign_id.in_(campaigns),
+        DiceSet.dnd_class_id.in_(classes)
+    )
+    dicesets = select(DiceSet.id).where(diceset_rows)
+    return {
+        DiceLog: or_(
+            DiceLog.user_id == user_id,
+            DiceLog.campaign_id.in_(campaigns),
+            DiceLog.dnd_class_id.in_(classes),
+            DiceLog.diceset_id.in_(dicesets)
+        ),
+        DiceSetDice: DiceSetDice.dice_set_id.in_(dicesets),
+        DiceSet: diceset_rows,
+        Class: class_rows,
+        Campaign: Campaign.created_by == user_id,
+        User: User.id == user_id,
+    }
+
+
+def _invalidate(session: Session, model: type, ids):
+    """Drop deleted rows from their cache (on commit as well)
+    and deleted campaigns from the seeded roll pools."""
+    for row_id in ids:
+        if model is DiceSet:
+            invalidate_on_commit(session, row_id)
+        else:
+            entity_cache.invalidate_on_commit(session, model, row_id)
+        version_cache.invalidate_on_commit(session, model, row_id)
+        if model is Campaign:  # Its seeded roll pool
+            after_commit(session, partial(entropy_pool.drop_campaign, row_id))
+
+
+def delete_cascade(session: Session, scope: dict) -> Dict[str, int]:
+    """Delete all rows of a scope, committed with the
+    unit of work. Returns the deleted row count per table name."""
+    # Rows to drop from the roll plan and entity caches
+    cached_ids = {
+        model: session.execute(select(model.id).where(scope[model])).scalars().all()
+        for model in CACHED_MODELS
+        if model in scope
+    }
+    counts = {}
+    for model in DELETE_ORDER:
+        if model not in scope:
+            continue
+        result = session.execute(
+            delete(model)
+            .where(scope[model])
+            .execution_options(synchronize_session=False)
+        )
+        counts[model.__tablename__] = result.rowcount or 0
+
+    for model, ids in cached_ids.items():
+        _invalidate(session, model, ids)
+    logger.info(f"Cascade delete removed {counts}")
+    return counts
+
+
+def delete_chunks(
+        session: Session,
+        scope: dict,
+        chunk_size: int = CHUNK_SIZE) \
+        -> Iterator[Tuple[str, int]]:
+    """Delete the rows below the root of a scope in chunks of
+    primary keys, children first. The root stays for the final
+    delete_cascade, so a failed run can be retried. Yields (table
+    name, deleted rows) after each chunk, the caller commits it
+    before the next chunk is read. Restarting with the same scope
+    continues where it stopped."""
+    models = [model for model in DELETE_ORDER if model in scope]
+    for model in models[:-1]:
+        columns = inspect(model).primary_key
+        while True:
+            keys = session.execute(
+                select(*columns).where(scope[model]).limit(chunk_size)
+            ).all()
+            if not keys:
+                break
+            result = session.execute(
+                delete(model)
+                .where(tuple_(*columns).in_([tuple(k) for k in keys]))
+                .execution_options(synchronize_session=False)
+            )
+            if model in CACHED_MODELS:
+                _invalidate(session, model, [key for (key,) in keys])
+            yield model.__tablename__, result.rowcount or 0
+            if len(keys) < chunk_size:
+                break
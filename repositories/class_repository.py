@@ -5,7 +5,8 @@ Defined methods for dnd_class management.
 """
 from abc import ABC, abstractmethod
 from models.schemas.class_schema import *
-from typing import List, Optional
+from repositories.version_cache import ResourceVersion
+from typing import Dict, List, Optional, Sequence, Union
 
 
 
@@ -19,14 +20,37 @@ class ClassRepository(ABC):
         pass
 
 
+    @abstractmethod
+    def get_version(self, class_id: int) \
+            -> Optional[ResourceVersion]:
+        """Version and owner of a dnd_class (ETag), without the row."""
+        pass
+
+
     @abstractmethod
     def list_all(self,
                  offset: int = 0,
                  limit: int = 100,
                  campaign_id: Optional[int] = None,
-                 name: Optional[str] = None
-                 ) -> List[ClassPublic]:
-        """Show all classes method."""
+                 name: Optional[str] = None,
+                 after_id: Optional[int] = None,
+                 fields: Optional[Sequence[str]] = None
+                 ) -> List[Union[ClassPublic, ClassListItem]]:
+        """Show all classes method, ordered by ID.
+        after_id continues after a cursor (keyset paging).
+        fields selects only these columns (list items)."""
+        pass
+
+
+    @abstractmethod
+    def search(self,
+               text: str,
+               prefix: bool = False,
+               limit: int = 10,
+               user_id: Optional[int] = None
+               ) -> List[ClassListItem]:
+        """Classes whose name contains the text (starts with it
+        for prefix), best matches first, as summary list items."""
         pass
 
 
@@ -52,10 +76,19 @@ class ClassRepository(ABC):
         pass
 
 
+    @abstractmethod
+    def delete_cascade(self, class_id: int) \
+            -> Dict[str, int]:
+        """Remove a dnd_class with its
+        dice sets and dice logs
+        in one transaction, returns the deleted rows per table."""
+        pass
+
+
     @abstractmethod
     def get_by_campaign_id(self, campaign_id: int) \
-            -> List[ClassPublic]:
-        """Get all classes belonging to a campaign."""
+            -> List[ClassListItem]:
+        """Get the IDs of all classes belonging to a campaign."""
         pass
 
 
@@ -67,9 +100,14 @@ class ClassRepository(ABC):
 
 
     @abstractmethod
-    def list_by_campaign(self, campaign_id: int) \
-            -> List[ClassPublic]:
-        """List all classes belonging to a specific campaign."""
+    def list_by_campaign(
+            self,
+            campaign_id: int,
+            fields: Optional[Sequence[str]] = None,
+            limit: Optional[int] = None) \
+            -> List[Union[ClassPublic, ClassListItem]]:
+        """List the classes belonging to a specific campaign (by ID,
+        the first limit ones), fields selects only these columns (list items)."""
         pass
 
 
@@ -5,7 +5,7 @@ Defined methods for dice management.
 """
 from abc import ABC, abstractmethod
 from models.schemas.dice_schema import *
-from typing import List, Optional
+from typing import Callable, List, Optional
 
 
 
@@ -22,9 +22,11 @@ class DiceRepository(ABC):
     @abstractmethod
     def list_all(self,
                  offset: int = 0,
-                 limit: int = 100
+                 limit: int = 100,
+                 after_id: Optional[int] = None
                  ) -> List[DicePublic]:
-        """Show all dices method."""
+        """Show all dices method, ordered by ID.
+        after_id continues after a cursor (keyset paging)."""
         pass
 
 
@@ -55,3 +57,10 @@ class DiceRepository(ABC):
             -> List[DicePublic]:
         """Get all dices belonging to a dnd_class."""
         pass
+
+
+    @abstractmethod
+    def after_commit(self, callback: Callable[[], None]):
+        """Run a callback once the changes are committed
+        (dropped on rollback)."""
+        pass
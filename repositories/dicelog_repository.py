@@ -4,8 +4,9 @@ dicelog_repository.py
 Defined methods for dice log management.
 """
 from abc import ABC, abstractmethod
+from datetime import datetime
 from models.schemas.dicelog_schema import *
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 
 
@@ -39,9 +40,11 @@ class DiceLogRepository(ABC):
     def list_logs(self,
                   user_id: int,
                   offset: int = 0,
-                  limit: int = 100) \
+                  limit: int = 100,
+                  before: Optional[Tuple[datetime, int]] = None) \
             -> List[DiceLogPublic]:
-        """List all dice logs."""
+        """List the dice logs of a user, newest first.
+        before is the (timestamp, id) of a cursor (keyset paging)."""
         pass
 
 
@@ -59,6 +62,16 @@ class DiceLogRepository(ABC):
         pass
 
 
+    @abstractmethod
+    def list_recent_by_campaign(self,
+                                campaign_id: int,
+                                user_id: int,
+                                limit: int = 20) \
+            -> List[DiceLogPublic]:
+        """The newest dice logs of a user in a campaign."""
+        pass
+
+
     @abstractmethod
     def list_by_class(self, class_id: int) \
             -> List[DiceLogPublic]:
@@ -73,5 +86,12 @@ class DiceLogRepository(ABC):
         pass
 
     @abstractmethod
-    def log_roll(self, log: DiceLogCreate) -> DiceLogPublic:
-        pass
\ No newline at end of file
+    def log_roll(self, log: DiceLogCreate) -> Optional[DiceLogPublic]:
+        """Store a dice roll (None if it was queued)."""
+        pass
+
+
+    @abstractmethod
+    def wait_for_pending(self, user_id: int) -> bool:
+        """Wait until queued logs of a user are stored."""
+        pass
@@ -0,0 +1,189 @@
+"""
+dicelog_retention.py
+
+Retention engine for dice logs.
+
+Old logs are removed with a single set-based DELETE per scope:
+every log below the id of the N-th newest log of a user (or
+campaign) goes, older logs than the max age go. Trimming is
+amortized: a user or campaign is trimmed every `trim_every`
+inserts, and a periodic sweep catches everything else.
+
+Policies are set with environment variables:
+    DICELOG_MAX_PER_USER      newest logs kept per user (default 100)
+    DICELOG_MAX_PER_CAMPAIGN  newest logs kept per campaign (off)
+    DICELOG_MAX_AGE_DAYS      delete logs older than this (off)
+    DICELOG_TRIM_EVERY        inserts between trims of one scope (default 20)
+"""
+import logging
+import os
+import threading
+from collections import Counter as Tally
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, func, select
+from sqlmodel import Session
+
+from models.db_models.table_models import DiceLog
+
+
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    """Read an optional positive int setting (0 or empty disables it)."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return int(value) if value.strip() and int(value) > 0 else None
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Limits for stored dice logs (None disables a limit)."""
+    max_per_user: Optional[int] = 100
+    max_per_campaign: Optional[int] = None
+    max_age: Optional[timedelta] = None
+    trim_every: int = 20
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        """Build the policy from the environment."""
+        max_age_days = _env_int("DICELOG_MAX_AGE_DAYS", None)
+        return cls(
+            max_per_user=_env_int("DICELOG_MAX_PER_USER", 100),
+            max_per_campaign=_env_int("DICELOG_MAX_PER_CAMPAIGN", None),
+            max_age=timedelta(days=max_age_days) if max_age_days else None,
+            trim_every=_env_int("DICELOG_TRIM_EVERY", 20) or 1
+        )
+
+
+def _trim_scope(session: Session, column, value: int, keep: int) -> int:
+    """Keep the `keep` newest logs of one user or campaign.
+    Deletes everything below the id of the keep-th newest log."""
+    cutoff = (
+        select(DiceLog.id)
+        .where(column == value)
+        .order_by(DiceLog.id.desc())
+        .offset(keep - 1)
+        .limit(1)
+        .scalar_subquery()
+    )
+    result = session.execute(
+        delete(DiceLog)
+        .where(column == value)
+        .where(DiceLog.id < cutoff)
+    )
+    return result.rowcount or 0
+
+
+def _trim_all(session: Session, column, keep: int) -> int:
+    """Keep the `keep` newest logs of every user or campaign."""
+    ranked = (
+        select(
+            DiceLog.id,
+            func.row_number().over(
+                partition_by=column,
+                order_by=DiceLog.id.desc()
+            ).label("rank")
+        )
+        .subquery()
+    )
+    result = session.execute(
+        delete(DiceLog)
+        .where(DiceLog.id.in_(
+            select(ranked.c.id).where(ranked.c.rank > keep)
+        ))
+    )
+    return result.rowcount or 0
+
+
+class RetentionEngine:
+    """Applies a retention policy after inserts and in sweeps."""
+
+    def __init__(self, policy: RetentionPolicy):
+        self.policy = policy
+        self._user_inserts = Tally()
+        self._campaign_inserts = Tally()
+        self._lock = threading.Lock()
+
+
+    def _due(self, tally: Tally, keys: Iterable[int]) -> list:
+        """Count inserts per scope and return the scopes due for a trim."""
+        due = []
+        for key in keys:
+            tally[key] += 1
+            if tally[key] >= self.policy.trim_every:
+                del tally[key]
+                due.append(key)
+        return due
+
+
+    def record(self, session: Session, logs: Iterable) -> int:
+        """Register inserted logs and trim the users and campaigns
+        that reached `trim_every` inserts since their last trim.
+        Runs in the caller's transaction, returns deleted rows."""
+        logs = list(logs)
+        with self._lock:
+            users = self._due(
+                self._user_inserts,
+                [self._field(log, "user_id") for log in logs]
+            )
+            campaigns = self._due(
+                self._campaign_inserts,
+                [self._field(log, "campaign_id") for log in logs]
+            )
+
+        deleted = 0
+        if self.policy.max_per_user:
+            for user_id in users:
+                deleted += _trim_scope(
+                    session, DiceLog.user_id, user_id,
+                    self.policy.max_per_user
+                )
+        if self.policy.max_per_campaign:
+            for campaign_id in campaigns:
+                deleted += _trim_scope(
+                    session, DiceLog.campaign_id, campaign_id,
+                    self.policy.max_per_campaign
+                )
+        if deleted:
+            logger.debug(f"Retention trimmed {deleted} DiceLogs")
+        return deleted
+
+
+    def sweep(self, session: Session) -> int:
+        """Apply all limits to the whole table (periodic job).
+        Runs in the caller's transaction, returns deleted rows."""
+        deleted = 0
+        if self.policy.max_age:
+            cutoff = datetime.now(timezone.utc) - self.policy.max_age
+            result = session.execute(
+                delete(DiceLog).where(DiceLog.timestamp < cutoff)
+            )
+            deleted += result.rowcount or 0
+        if self.policy.max_per_user:
+            deleted += _trim_all(
+                session, DiceLog.user_id, self.policy.max_per_user
+            )
+        if self.policy.max_per_campaign:
+            deleted += _trim_all(
+                session, DiceLog.campaign_id, self.policy.max_per_campaign
+            )
+        with self._lock:
+            self._user_inserts.clear()
+            self._campaign_inserts.clear()
+        logger.info(f"Retention sweep deleted {deleted} DiceLogs")
+        return deleted
+
+
+    @staticmethod
+    def _field(log, name: str) -> int:
+        """Read a field from a log model or an insert row dict."""
+        return log[name] if isinstance(log, dict) else getattr(log, name)
+
+
+retention = RetentionEngine(RetentionPolicy.from_env())
@@ -0,0 +1,327 @@
+"""
+dicelog_writer.py
+
+Write-behind pipeline for dice logs.
+
+Rolls put their log entries into a bounded in-process queue once
+their request is committed, and return right away. A background
+thread collects the entries and writes them in multi-row INSERT
+batches, once a batch is full or the flush interval has passed.
+A failed batch is retried, then written row by row, so one bad
+row or a short database outage does not lose the whole batch;
+rows that still fail are logged at error level. Between batches
+it runs the periodic retention sweep. The app lifespan starts the
+writer and drains the queue on shutdown.
+"""
+import logging
+import queue
+import threading
+import time
+from collections import Counter as Tally
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from metrics import registry
+from repositories.dicelog_retention import RetentionEngine, retention
+from models.db_models.table_models import DiceLog
+from models.schemas.dicelog_schema import DiceLogCreate
+
+
+
+logger = logging.getLogger(__name__)
+
+MAX_QUEUE_SIZE = 10_000
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.25  # seconds
+SWEEP_INTERVAL = 600  # seconds
+FLUSH_RETRIES = 2
+RETRY_DELAY = 0.1  # seconds, doubled per retry
+
+_STOP = object()
+
+flushed_total = registry.counter(
+    "dicelog_flushed_total",
+    "Dice logs written by the background writer."
+)
+sync_writes_total = registry.counter(
+    "dicelog_sync_writes_total",
+    "Dice logs written inline because the queue was full or stopped."
+)
+flush_errors_total = registry.counter(
+    "dicelog_flush_errors_total",
+    "Failed dice log batch writes."
+)
+lost_total = registry.counter(
+    "dicelog_lost_total",
+    "Dice logs that could not be written."
+)
+flush_seconds = registry.summary(
+    "dicelog_flush_seconds",
+    "Latency of one dice log batch write."
+)
+batch_sizes = registry.summary(
+    "dicelog_batch_size",
+    "Number of dice logs per batch write."
+)
+
+
+class DiceLogWriter:
+    """Background writer that persists
+    queued dice logs in batches."""
+
+    def __init__(
+            self,
+            engine: Engine,
+            max_queue_size: int = MAX_QUEUE_SIZE,
+            batch_size: int = BATCH_SIZE,
+            flush_interval: float = FLUSH_INTERVAL,
+            sweep_interval: float = SWEEP_INTERVAL,
+            retention_engine: RetentionEngine = retention,
+            flush_retries: int = FLUSH_RETRIES,
+            retry_delay: float = RETRY_DELAY):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sweep_interval = sweep_interval
+        self.flush_retries = flush_retries
+        self.retry_delay = retry_delay
+        self.retention = retention_engine
+        self._next_sweep = time.monotonic() + sweep_interval
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self._pending = Tally()  # user_id -> queued, not yet written
+        self._pending_changed = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+
+    def depth(self) -> int:
+        """Number of queued log entries."""
+        return self._queue.qsize()
+
+
+    def start(self):
+        """Start the background thread."""
+        if self.running:
+            return
+        self._thread = threading.Thread(
+            target=self._run,
+            name="dicelog-writer",
+            daemon=True
+        )
+        self._thread.start()
+        logger.info("DiceLog writer started")
+
+
+    def submit(self, log: DiceLogCreate) -> bool:
+        """Queue a log entry. Returns False if the writer is
+        stopped or the queue is full, the caller writes it then."""
+        if not self.running:
+            return False
+        row = log.model_dump()
+        row["timestamp"] = datetime.now(timezone.utc)  # Roll time, not flush time
+        with self._pending_changed:
+            self._pending[log.user_id] += 1
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self._done([row["user_id"]])
+            logger.warning("DiceLog queue full, writing inline")
+            return False
+        return True
+
+
+    def log(self, log: DiceLogCreate):
+        """Queue a log entry, or write it right away if the queue
+        is full or the writer stopped (after commit callback of
+        the rolling request, its session is done by then)."""
+        if self.submit(log):
+            return
+        sync_writes_total.inc()
+        row = log.model_dump()
+        row["timestamp"] = datetime.now(timezone.utc)
+        self._write_rows([row])
+
+
+    def wait_for_user(self, user_id: int, timeout: float = 2.0) -> bool:
+        """Block until all queued logs of a user are written
+        (read your writes). Returns False on timeout."""
+        with self._pending_changed:
+            return self._pending_changed.wait_for(
+                lambda: not self._pending[user_id],
+                timeout=timeout
+            )
+
+
+    def stop(self, timeout: float = 10.0):
+        """Write all queued logs and stop the thread."""
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error(
+                f"DiceLog writer did not stop in {timeout}s, "
+                f"{self.depth()} logs left in the queue"
+            )
+            return
+        self._thread = None
+
+        # Entries submitted while stopping
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftover.append(item)
+        if leftover:
+            self._flush(leftover)
+        logger.info("DiceLog writer stopped, queue drained")
+
+
+    def _run(self):
+        """Collect batches by size or time and write them,
+        sweep old logs when the sweep interval is over."""
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect()
+            if batch:
+                self._flush(batch)
+            if time.monotonic() >= self._next_sweep:
+                self._sweep()
+
+
+    def _collect(self) -> Tuple[List[dict], bool]:
+        """Wait for the first entry, then gather more
+        until the batch is full or the interval is over."""
+        try:
+            first = self._queue.get(
+                timeout=max(self._next_sweep - time.monotonic(), 0.01)
+            )
+        except queue.Empty:
+            return [], False
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = (self._queue.get(timeout=remaining)
+                        if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+
+    def _flush(self, batch: List[dict]):
+        """Write one batch, retrying failed writes, then falling
+        back to row by row writes."""
+        started = time.perf_counter()
+        try:
+            for attempt in range(self.flush_retries + 1):
+                try:
+                    self._write(batch)
+                    flushed_total.inc(len(batch))
+                    return
+                except Exception:
+                    flush_errors_total.inc()
+                    logger.warning(
+                        f"Error while writing {len(batch)} DiceLogs "
+                        f"(attempt {attempt + 1})",
+                        exc_info=True
+                    )
+                if attempt < self.flush_retries:
+                    time.sleep(self.retry_delay * 2 ** attempt)
+            self._write_rows(batch)
+        finally:
+            elapsed = time.perf_counter() - started
+            flush_seconds.observe(elapsed)
+            batch_sizes.observe(len(batch))
+            self._done([row["user_id"] for row in batch])
+            logger.debug(f"Flushed {len(batch)} DiceLogs in {elapsed * 1000:.1f} ms")
+
+
+    def _write(self, rows: List[dict]):
+        """Write rows with a multi-row INSERT and apply
+        the retention policy in the same transaction."""
+        with Session(self.engine) as session:
+            session.execute(insert(DiceLog), rows)
+            self.retention.record(session, rows)
+            session.commit()
+
+
+    def _write_rows(self, rows: List[dict]):
+        """Write rows one by one, log the rows that fail."""
+        for row in rows:
+            try:
+                self._write([row])
+                flushed_total.inc()
+            except Exception:
+                lost_total.inc()
+                logger.error(f"Lost DiceLog {row}", exc_info=True)
+
+
+    def _sweep(self):
+        """Apply the retention policy to the whole table."""
+        self._next_sweep = time.monotonic() + self.sweep_interval
+        try:
+            with Session(self.engine) as session:
+                self.retention.sweep(session)
+                session.commit()
+        except Exception:
+            logger.exception(
+                "Error while sweeping DiceLogs",
+                exc_info=True
+            )
+
+
+    def _done(self, user_ids: List[int]):
+        """Mark logs as written and wake up waiting readers."""
+        with self._pending_changed:
+            self._pending.subtract(user_ids)
+            self._pending += Tally()  # Drop users without pending logs
+            self._pending_changed.notify_all()
+
+
+_writer: Optional[DiceLogWriter] = None
+
+registry.gauge(
+    "dicelog_queue_depth",
+    "Dice logs waiting for the background writer.",
+    callback=lambda: _writer.depth() if _writer else 0
+)
+
+
+def get_dicelog_writer() -> Optional[DiceLogWriter]:
+    """Get the running writer (None if logs are written inline)."""
+    return _writer if _writer is not None and _writer.running else None
+
+
+def start_dicelog_writer(engine: Engine) -> DiceLogWriter:
+    """Start the process-wide writer (app startup)."""
+    global _writer
+    if _writer is None or not _writer.running:
+        _writer = DiceLogWriter(engine)
+        _writer.start()
+    return _writer
+
+
+def stop_dicelog_writer():
+    """Drain the queue and stop the writer (app shutdown)."""
+    global _writer
+    if _writer is not None:
+        _writer.stop()
+        _writer = None
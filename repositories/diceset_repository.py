@@ -5,7 +5,9 @@ Defined methods for dice set management.
 """
 from abc import ABC, abstractmethod
 from models.schemas.diceset_schema import *
-from typing import List, Optional
+from repositories.roll_plan_cache import RollPlan
+from repositories.version_cache import ResourceVersion
+from typing import Dict, List, Optional, Sequence
 
 
 
@@ -19,12 +21,21 @@ class DiceSetRepository(ABC):
         pass
 
 
+    @abstractmethod
+    def get_version(self, diceset_id: int) \
+            -> Optional[ResourceVersion]:
+        """Version and owner of a dice set (ETag), without the row."""
+        pass
+
+
     @abstractmethod
     def list_all(self,
                  offset: int = 0,
-                 limit: int = 100
+                 limit: int = 100,
+                 after_id: Optional[int] = None
                  ) -> List[DiceSetPublic]:
-        """Show all dice sets method."""
+        """Show all dice sets method, ordered by ID.
+        after_id continues after a cursor (keyset paging)."""
         pass
 
 
@@ -50,6 +61,15 @@ class DiceSetRepository(ABC):
         pass
 
 
+    @abstractmethod
+    def delete_cascade(self, diceset_id: int) \
+            -> Dict[str, int]:
+        """Remove a dice set with its
+        dice entries and dice logs
+        in one transaction, returns the deleted rows per table."""
+        pass
+
+
     @abstractmethod
     def get_by_class_id(self, class_id: int) \
             -> List[DiceSetPublic]:
@@ -76,3 +96,20 @@ class DiceSetRepository(ABC):
             -> List[DiceSetPublic]:
         """List all dice sets belonging to a specific DnD dnd_class."""
         pass
+
+
+    @abstractmethod
+    def list_by_classes(self,
+                        class_ids: Sequence[int],
+                        per_class: int) \
+            -> Dict[int, List[DiceSetPublic]]:
+        """The first per_class dice sets (by ID) of each dnd_class,
+        with their dices, by dnd_class ID."""
+        pass
+
+
+    @abstractmethod
+    def get_roll_plan(self, diceset_id: int) \
+            -> Optional[RollPlan]:
+        """Get the compiled roll plan of a dice set."""
+        pass
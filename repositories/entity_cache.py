@@ -0,0 +1,273 @@
+"""
+entity_cache.py
+
+Read-through cache of campaigns, classes and users by ID.
+
+The cached repositories (cached_repositories.py) answer get_by_id
+from the cache and fill it on a miss. Entries are dropped when the
+row changes: ORM updates and deletes are caught after every flush,
+the set-based cascades invalidate the rows they delete. Like the
+roll plan cache an entry is dropped right away and again when the
+change is committed; a session that changed cached rows does not
+fill the cache, so uncommitted data is never cached. Misses are
+loaded from the primary, never from a (lagging) read replica.
+
+Backends (ENTITY_CACHE_BACKEND):
+    memory       in-process LRU with TTL (default)
+    redis://...  shared by all workers (needs the redis package)
+    off          no caching
+
+ENTITY_CACHE_SIZE (entries per entity, memory only) and
+ENTITY_CACHE_TTL (seconds) bound size and staleness.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from metrics import registry
+from models.db_models.table_models import Campaign, Class, User
+from models.schemas.campaign_schema import CampaignPublic
+from models.schemas.class_schema import ClassPublic
+from models.schemas.user_schema import UserPublic
+from repositories.routing_session import read_from_primary
+from repositories.unit_of_work import after_commit
+
+
+
+logger = logging.getLogger(__name__)
+
+ENTITY_CACHE_BACKEND = os.getenv("ENTITY_CACHE_BACKEND", "memory")
+ENTITY_CACHE_SIZE = int(os.getenv("ENTITY_CACHE_SIZE", 10_000))
+ENTITY_CACHE_TTL = float(os.getenv("ENTITY_CACHE_TTL", 60))  # seconds
+
+_CHANGED = "entity_cache_changed"
+
+
+class MemoryBackend:
+    """Thread safe LRU store with a time to live per entry."""
+
+    def __init__(
+            self,
+            maxsize: int = ENTITY_CACHE_SIZE,
+            ttl: float = ENTITY_CACHE_TTL,
+            on_evict: Optional[Callable[[str], None]] = None,
+            clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict or (lambda reason: None)
+        self.clock = clock
+        self._entries: "OrderedDict[int, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0  # Bumped by every invalidation
+
+
+    def get(self, key: int) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= self.clock():
+                del self._entries[key]
+                self.on_evict("expired")
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+
+    def generation(self) -> int:
+        return self._generation
+
+
+    def put(self, key: int, value: Any, generation: int):
+        """Store an entry unless anything was invalidated
+        since `generation` (the loaded value may be stale)."""
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.on_evict("evicted")
+
+
+    def delete(self, key: int):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Store shared by all workers. Values are JSON, expiry
+    and eviction are left to redis (TTL and maxmemory)."""
+
+    def __init__(self, client, prefix: str, ttl: float = ENTITY_CACHE_TTL):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str) -> "RedisBackend":
+        import redis  # Optional dependency, only for this backend
+        return cls(redis.Redis.from_url(url), prefix)
+
+
+    def _key(self, key: int) -> str:
+        return f"{self.prefix}:{key}"
+
+
+    def get(self, key: int) -> Any:
+        raw = self.client.get(self._key(key))
+        return json.loads(raw) if raw is not None else None
+
+
+    def generation(self) -> int:
+        return 0  # No cross-worker guard: TTL bounds a stale fill
+
+
+    def put(self, key: int, value: Any, generation: int):
+        # Timestamps as str(), the JSON format of the models drops microseconds
+        self.client.set(self._key(key), json.dumps(value, default=str), ex=max(1, int(self.ttl)))
+
+
+    def delete(self, key: int):
+        self.client.delete(self._key(key))
+
+
+    def clear(self):
+        keys = list(self.client.scan_iter(f"{self.prefix}:*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+class EntityCache:
+    """Cache of the public model of one table by ID,
+    with hit, miss and eviction counters."""
+
+    def __init__(
+            self,
+            name: str,
+            model: Type[BaseModel],
+            backend=None,
+            table: Optional[type] = None):
+        self.name = name
+        self.model = model
+        self.table = table
+        self.hits = registry.counter(
+            f"entity_cache_{name}_hits_total", f"{name} reads answered by the cache.")
+        self.misses = registry.counter(
+            f"entity_cache_{name}_misses_total", f"{name} reads loaded from the database.")
+        self.evictions = registry.counter(
+            f"entity_cache_{name}_evictions_total", f"{name} entries evicted (LRU or TTL).")
+        self.backend = backend if backend is not None else MemoryBackend(
+            on_evict=lambda reason: self.evictions.inc()
+        )
+        self._serialize = isinstance(self.backend, RedisBackend)
+
+
+    def get(self, entity_id: int) -> Optional[BaseModel]:
+        """A copy of the cached entity (None on a miss)."""
+        value = self.backend.get(entity_id)
+        if value is None:
+            self.misses.inc()
+            return None
+        self.hits.inc()
+        if self._serialize:
+            return self.model.model_validate(value)
+        return value.model_copy()
+
+
+    def read_through(
+            self,
+            session: Session,
+            entity_id: int,
+            load: Callable[[int], Optional[BaseModel]]) \
+            -> Optional[BaseModel]:
+        """Get an entity from the cache or load and cache it.
+        A miss is loaded from the primary: a lagging replica could
+        fill the cache with a row older than the last invalidation."""
+        entity = self.get(entity_id)
+        if entity is not None:
+            return entity
+        generation = self.backend.generation()
+        if read_from_primary(session) and self.table is not None:
+            # The row may be in the session already, read from the replica
+            loaded = session.identity_map.get(identity_key(self.table, entity_id))
+            if loaded is not None and loaded not in session.dirty:
+                session.expire(loaded)
+        entity = load(entity_id)
+        if entity is not None and not session.info.get(_CHANGED):
+            value = entity.model_dump() if self._serialize else entity.model_copy()
+            self.backend.put(entity_id, value, generation)
+        return entity
+
+
+    def invalidate(self, entity_id: int):
+        """Drop the entry of a changed or deleted row."""
+        self.backend.delete(entity_id)
+        logger.debug(f"Invalidated cached {self.name} {entity_id}")
+
+
+    def clear(self):
+        self.backend.clear()
+
+
+def _backend(name: str):
+    """The configured backend of one cache (None: in-process)."""
+    if ENTITY_CACHE_BACKEND.startswith("redis"):
+        return RedisBackend.from_url(ENTITY_CACHE_BACKEND, f"entity:{name}")
+    return None
+
+
+# Caches by table, None if caching is off
+entity_caches: Dict[type, Optional[EntityCache]] = {
+    model: (
+        EntityCache(name, public, _backend(name), table=model)
+        if ENTITY_CACHE_BACKEND != "off" else None
+    )
+    for model, name, public in (
+        (Campaign, "campaign", CampaignPublic),
+        (Class, "dnd_class", ClassPublic),
+        (User, "user", UserPublic),
+    )
+}
+
+
+def invalidate_on_commit(session: Session, model: type, entity_id: int):
+    """Drop a cached row now and again on commit; the session
+    stops filling the cache (its reads are uncommitted)."""
+    cache = entity_caches.get(model)
+    if cache is None:
+        return
+    session.info[_CHANGED] = True
+    cache.invalidate(entity_id)
+    after_commit(session, lambda: cache.invalidate(entity_id))
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed(session: Session, flush_context):
+    # dirty and deleted still hold the flushed objects here
+    for obj in (*session.dirty, *session.deleted):
+        if type(obj) in entity_caches and obj.id is not None:
+            invalidate_on_commit(session, type(obj), obj.id)
@@ -0,0 +1,82 @@
+"""
+job_repository.py
+
+Defined methods for background job management.
+"""
+from abc import ABC, abstractmethod
+from models.schemas.job_schema import *
+from typing import Dict, List, Optional
+
+
+
+class JobRepository(ABC):
+    """This class defines
+    the management methods for background jobs."""
+
+
+    @abstractmethod
+    def get_by_id(self, job_id: str) \
+            -> Optional[JobPublic]:
+        """Get a job by ID."""
+        pass
+
+
+    @abstractmethod
+    def add(self, job: JobCreate) \
+            -> JobPublic:
+        """Queue a new pending job."""
+        pass
+
+
+    @abstractmethod
+    def get_open(self, kind: str, target_id: int) \
+            -> Optional[JobPublic]:
+        """Get the pending or running job of a target."""
+        pass
+
+
+    @abstractmethod
+    def list_open(self) \
+            -> List[JobPublic]:
+        """List all pending and running jobs, oldest first."""
+        pass
+
+
+    @abstractmethod
+    def claim(self, job_id: str, owner: str, lease_seconds: float) \
+            -> Optional[JobPublic]:
+        """Mark a pending job, or a running job whose lease ran
+        out, as running by `owner` (None if another worker runs it)."""
+        pass
+
+
+    @abstractmethod
+    def renew(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """Extend the lease of the owner (False if the job was taken over)."""
+        pass
+
+
+    @abstractmethod
+    def release(self, job_id: str):
+        """End the lease of an interrupted job, any worker may resume it."""
+        pass
+
+
+    @abstractmethod
+    def record_progress(self, job_id: str, deleted_rows: Dict[str, int]):
+        """Store the rows deleted so far,
+        in the transaction of the deleted chunk."""
+        pass
+
+
+    @abstractmethod
+    def finish(self,
+               job_id: str,
+               owner: str,
+               status: str,
+               deleted_rows: Dict[str, int],
+               error: Optional[str] = None) \
+            -> Optional[JobPublic]:
+        """Mark a job as done or failed, if `owner` still holds
+        its lease (None if the job was taken over or expired)."""
+        pass
@@ -0,0 +1,28 @@
+"""
+projection.py
+
+Column projections of the list queries.
+
+List responses need only some columns of a row (see select_fields
+in dependencies.py), the large text and JSON columns are left out
+by default. project() runs a list query for the selected columns
+only, so unselected columns are neither read nor held in memory.
+"""
+from typing import List, Sequence, Type
+from pydantic import BaseModel
+from sqlmodel import Session
+
+
+
+def project(
+        session: Session,
+        query,
+        model: type,
+        fields: Sequence[str],
+        item: Type[BaseModel]) -> List[BaseModel]:
+    """Run a select(model) query for the given fields,
+    one list item (unselected fields unset) per row."""
+    rows = session.execute(
+        query.with_only_columns(*(getattr(model, field) for field in fields))
+    ).mappings().all()
+    return [item.model_validate(dict(row)) for row in rows]
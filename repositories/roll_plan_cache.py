@@ -0,0 +1,147 @@
+"""
+roll_plan_cache.py
+
+Process-wide cache of compiled dice set roll plans.
+
+A roll plan holds everything needed to roll a dice set
+(dices, sides, quantities, name and owner), so a repeated
+roll needs no database query. The SQL dice set repository
+fills the cache on first use and invalidates a plan whenever
+the set or its dice entries change (write-through), once right
+away and once more when the change is committed.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from repositories.unit_of_work import after_commit
+
+
+
+logger = logging.getLogger(__name__)
+
+ROLL_PLAN_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class RollPlanEntry:
+    """One dice of a set with its quantity."""
+    dice_id: int
+    name: str
+    sides: int
+    quantity: int
+
+
+@dataclass(frozen=True)
+class RollPlan:
+    """Compiled, read-only roll data of a dice set."""
+    diceset_id: int
+    name: str
+    user_id: int
+    entries: Tuple[RollPlanEntry, ...]
+    sides: np.ndarray
+    quantities: np.ndarray
+
+    @classmethod
+    def build(
+            cls,
+            diceset_id: int,
+            name: str,
+            user_id: int,
+            entries: Tuple[RollPlanEntry, ...]) \
+            -> "RollPlan":
+        """Build a plan and freeze its arrays."""
+        sides = np.array([e.sides for e in entries], dtype=np.int64)
+        quantities = np.array([e.quantity for e in entries], dtype=np.int64)
+        sides.flags.writeable = False
+        quantities.flags.writeable = False
+        return cls(
+            diceset_id=diceset_id,
+            name=name,
+            user_id=user_id,
+            entries=entries,
+            sides=sides,
+            quantities=quantities
+        )
+
+    @property
+    def dice(self) -> Tuple[Tuple[int, int], ...]:
+        """The plan as (sides, quantity) pairs."""
+        return tuple((e.sides, e.quantity) for e in self.entries)
+
+
+class RollPlanCache:
+    """Thread safe LRU cache of roll plans by dice set ID."""
+
+    def __init__(self, maxsize: int = ROLL_PLAN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._plans: "OrderedDict[int, RollPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0  # Bumped by every invalidation
+
+
+    def get(self, diceset_id: int) -> Optional[RollPlan]:
+        """Get a cached plan (None on a miss)."""
+        with self._lock:
+            plan = self._plans.get(diceset_id)
+            if plan is None:
+                self.misses += 1
+                return None
+            self._plans.move_to_end(diceset_id)
+            self.hits += 1
+            return plan
+
+
+    def generation(self) -> int:
+        """Take before loading a plan and pass it to put()."""
+        return self._generation
+
+
+    def put(self, plan: RollPlan, generation: int):
+        """Store a plan, evicting the least recently used one.
+        Skipped if any plan was invalidated since `generation`,
+        as the loaded plan may already be stale."""
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._plans[plan.diceset_id] = plan
+            self._plans.move_to_end(plan.diceset_id)
+            while len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+
+
+    def invalidate(self, diceset_id: int):
+        """Drop the plan of a changed or deleted dice set."""
+        with self._lock:
+            self._generation += 1
+            if self._plans.pop(diceset_id, None) is not None:
+                logger.debug(f"Invalidated roll plan of DiceSet {diceset_id}")
+
+
+    def clear(self):
+        """Drop all plans and reset the counters."""
+        with self._lock:
+            self._plans.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+
+roll_plan_cache = RollPlanCache()
+
+
+def invalidate_on_commit(session: Session, diceset_id: int):
+    """Drop a changed plan now (for this session) and again
+    on commit, as others may cache the old rows in between."""
+    roll_plan_cache.invalidate(diceset_id)
+    after_commit(session, lambda: roll_plan_cache.invalidate(diceset_id))
@@ -0,0 +1,82 @@
+"""
+routing_session.py
+
+Read/write routing between the primary database and read replicas.
+
+A RoutingSession of a read-only request (GET, HEAD) sends its
+queries to one replica, everything else goes to the primary.
+On its first write (flush, INSERT/UPDATE/DELETE, SELECT ... FOR
+UPDATE) the session switches to the primary for good, so a request
+never reads older data after it has written; read_from_primary()
+does the same for reads that must see writes of other sessions.
+
+on_write is called once on the first write: the request then sets
+a short-lived cookie and the next requests of the client also read
+from the primary until the replicas have caught up.
+"""
+import random
+from typing import Callable, Optional, Sequence
+from sqlalchemy import Delete, Insert, Update
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.elements import TextClause
+from sqlmodel import Session
+import logging
+
+
+
+logger = logging.getLogger(__name__)
+
+
+def _is_write(clause) -> bool:
+    """Whether a statement must run on the primary."""
+    if isinstance(clause, (Insert, Update, Delete, TextClause)):
+        return True
+    return getattr(clause, "_for_update_arg", None) is not None
+
+
+class RoutingSession(Session):
+    """Session bound to the primary that reads
+    from a replica while it has not written."""
+
+    def __init__(
+            self,
+            bind: Optional[Engine] = None,
+            replicas: Sequence[Engine] = (),
+            use_replica: bool = False,
+            on_write: Optional[Callable[[], None]] = None,
+            **kwargs):
+        super().__init__(bind=bind, **kwargs)
+        # One replica for the whole request: one consistent snapshot
+        self.replica = random.choice(replicas) if use_replica and replicas else None
+        self.on_write = on_write
+        self.wrote = False
+
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        """The replica for reads, the primary for writes
+        and for everything after the first write."""
+        if self._flushing or _is_write(clause):
+            self._written()
+        if self.replica is not None:
+            return self.replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+    def _written(self):
+        self.replica = None
+        if not self.wrote:
+            self.wrote = True
+            if self.on_write is not None:
+                self.on_write()
+
+
+def read_from_primary(session) -> bool:
+    """Send the following reads of a session (sync or
+    async) to the primary, e.g. to read your own writes.
+    True if the session read from a replica until now."""
+    session = getattr(session, "sync_session", session)
+    if isinstance(session, RoutingSession) and session.replica is not None:
+        session.replica = None
+        logger.debug("Session reads from the primary")
+        return True
+    return False
@@ -0,0 +1,92 @@
+"""
+search_index.py
+
+Name filters and ranked searches on the search indexes
+(migrations/v006_search.py) of campaign titles, class names
+and usernames.
+
+SQLite: LIKE on the FTS5 trigram table is answered from the
+trigram index, a phrase MATCH (3+ characters) is ranked by bm25.
+PostgreSQL: ILIKE on the pg_trgm indexed column, ranked by
+similarity(). Other databases: ILIKE without an index.
+"""
+from sqlalchemy import column, func, select, table
+from sqlalchemy.sql import ColumnElement, Select
+from sqlmodel import Session
+from migrations.v006_search import SEARCH_COLUMNS, fts_table
+
+
+
+# Trigrams need 3 characters, shorter phrases never MATCH
+MIN_MATCH_LENGTH = 3
+
+
+def _searched(model):
+    """The searched column of a model."""
+    return getattr(model, SEARCH_COLUMNS[model.__tablename__])
+
+
+def _fts(model):
+    """The FTS5 table of a model (SQLite)."""
+    name = SEARCH_COLUMNS[model.__tablename__]
+    return table(
+        fts_table(model.__tablename__),
+        column("rowid"), column(name), column("rank")
+    )
+
+
+def _dialect(session: Session) -> str:
+    return session.get_bind().dialect.name
+
+
+def name_filter(
+        session: Session,
+        model,
+        name: str,
+        prefix: bool = False) -> ColumnElement:
+    """Where clause for the names containing `name`
+    (case insensitive, like ILIKE '%name%'),
+    with prefix the names starting with it."""
+    pattern = f"{name}%" if prefix else f"%{name}%"
+    if _dialect(session) == "sqlite":
+        fts = _fts(model)
+        return model.id.in_(
+            select(fts.c.rowid)
+            .where(fts.c[SEARCH_COLUMNS[model.__tablename__]].like(pattern))
+        )
+    return _searched(model).ilike(pattern)
+
+
+def search(
+        session: Session,
+        query: Select,
+        model,
+        text: str,
+        prefix: bool = False) -> Select:
+    """query limited to the rows whose name contains text,
+    best matches first. With prefix (autocomplete) the names
+    starting with text, shortest first."""
+    searched = _searched(model)
+    dialect = _dialect(session)
+    if prefix:
+        return (
+            query.where(name_filter(session, model, text, prefix=True))
+            .order_by(func.length(searched), searched, model.id)
+        )
+    if dialect == "sqlite" and len(text) >= MIN_MATCH_LENGTH:
+        fts = _fts(model)
+        phrase = '"' + text.replace('"', '""') + '"'
+        return (
+            query.join(fts, fts.c.rowid == model.id)
+            .where(fts.c[searched.key].match(phrase))
+            .order_by(fts.c.rank, model.id)
+        )
+    if dialect == "postgresql":
+        return (
+            query.where(name_filter(session, model, text))
+            .order_by(func.similarity(searched, text).desc(), model.id)
+        )
+    return (
+        query.where(name_filter(session, model, text))
+        .order_by(func.length(searched), model.id)
+    )
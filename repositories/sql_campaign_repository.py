@@ -3,11 +3,18 @@ sql_campaign_repository.py
 
 Concrete implementation for sqlalchemy, campaign management.
 """
+from sqlalchemy import update
 from sqlmodel import Session, select
 from models.db_models.table_models import Campaign
 from models.schemas.campaign_schema import *
-from repositories.campaign_repository import CampaignRepository
-from typing import List, Optional
+from repositories.campaign_repository import CampaignRepository, RollSeed
+from repositories import version_cache
+from repositories.version_cache import ResourceVersion
+from repositories.unit_of_work import after_commit
+from typing import Callable, Dict, List, Optional, Sequence, Union
+from repositories.cascade_delete import delete_cascade, campaign_scope
+from repositories.projection import project
+from repositories.search_index import name_filter, search
 import logging
 
 
@@ -58,40 +65,106 @@ class SqlAlchemyCampaignRepository(CampaignRepository):
         return None
 
 
+    def get_version(self, campaign_id: int) \
+            -> Optional[ResourceVersion]:
+        """Version and owner of a campaign, from the version
+        cache or a SELECT of the two columns."""
+        return version_cache.lookup(self.session, Campaign, campaign_id)
+
+
+    def get_roll_seed(self, campaign_id: int) \
+            -> Optional[RollSeed]:
+        """Owner and roll seed of a campaign, from the version
+        cache or a SELECT of the two columns."""
+        row = version_cache.lookup_roll_seed(self.session, campaign_id)
+        return RollSeed(*row) if row else None
+
+
+    def set_roll_seed(self, campaign_id: int, seed: Optional[int]) \
+            -> bool:
+        """Store the roll seed of a campaign. A plain UPDATE: the
+        seed is not part of the public campaign (no new version)."""
+        result = self.session.execute(
+            update(Campaign)
+            .where(Campaign.id == campaign_id)
+            .values(roll_seed=seed)
+        )
+        version_cache.invalidate_on_commit(self.session, Campaign, campaign_id)
+        logger.debug(f"Set roll seed of campaign {campaign_id}")
+        return result.rowcount > 0
+
+
+    def after_commit(self, callback: Callable[[], None]):
+        """Run a callback once the transaction
+        of the session is committed."""
+        after_commit(self.session, callback)
+
+
     def list_all(self,
                  offset: int = 0,
                  limit: int = 100,
                  name: Optional[str] = None,
-                 user_id: Optional[int] = None
-                 ) -> List[CampaignPublic]:
-        """Method to show all users,
-        optional filtered by name or user."""
+                 user_id: Optional[int] = None,
+                 after_id: Optional[int] = None,
+                 fields: Optional[Sequence[str]] = None
+                 ) -> List[Union[CampaignPublic, CampaignListItem]]:
+        """Method to show all campaigns ordered by ID,
+        optional filtered by name or user.
+        after_id continues after a cursor (keyset paging).
+        With fields only these columns are selected."""
         query = select(Campaign)
 
         if name:
             query = (
                 query
-                .where(Campaign.title.ilike(f"%{name}%")))
+                .where(name_filter(self.session, Campaign, name)))
         if user_id:
             query = (
                 query
                 .where(Campaign.created_by == user_id))
-
-        campaigns = self.session.exec(
-            query.offset(offset)
-            .limit(limit)).all()
+        if after_id is not None:
+            query = query.where(Campaign.id > after_id)
+
+        query = (
+            query.order_by(Campaign.id)
+            .offset(offset)
+            .limit(limit))
+        if fields is not None:
+            campaigns = project(self.session, query, Campaign, fields, CampaignListItem)
+            logger.debug(f"Listed {len(campaigns)} campaigns ({', '.join(fields)})")
+            return campaigns
+
+        campaigns = self.session.exec(query).all()
         logger.debug(f"Listed {len(campaigns)} campaigns with filters name={name}, user_id={user_id}")
         return [CampaignPublic.model_validate(c)
                 for c in campaigns]
 
 
+    def search(self,
+               text: str,
+               prefix: bool = False,
+               limit: int = 10,
+               user_id: Optional[int] = None
+               ) -> List[CampaignListItem]:
+        """Method to search campaigns by title on the search
+        index, ranked, optional limited to the campaigns of a user."""
+        query = select(Campaign)
+        if user_id:
+            query = query.where(Campaign.created_by == user_id)
+        query = search(self.session, query, Campaign, text, prefix).limit(limit)
+        campaigns = project(
+            self.session, query, Campaign, CAMPAIGN_SUMMARY_FIELDS, CampaignListItem
+        )
+        logger.debug(f"Found {len(campaigns)} campaigns for '{text}' (prefix={prefix})")
+        return campaigns
+
+
     def add(self, campaign: CampaignCreate) \
             -> CampaignPublic:
         """Method to add a new campaign."""
         db_campaign = Campaign(**campaign.model_dump())
         self.session.add(db_campaign)
-        self.session.commit()
-        self.session.refresh(db_campaign)
+        self.session.flush()
         logger.info(f"Campaign added: {db_campaign.id} - {db_campaign.title}")
         return CampaignPublic.model_validate(db_campaign)
 
@@ -109,8 +182,7 @@ class SqlAlchemyCampaignRepository(CampaignRepository):
                 exclude_unset=True).items():
             setattr(db_campaign, key, value)
         self.session.add(db_campaign)
-        self.session.commit()
-        self.session.refresh(db_campaign)
+        self.session.flush()
         logger.info(f"Updated campaign: {campaign_id} - {db_campaign.title}")
         return CampaignPublic.model_validate(db_campaign)
 
@@ -123,6 +195,16 @@ class SqlAlchemyCampaignRepository(CampaignRepository):
             logger.warning(f"Attempted to delete non-existing campaign {campaign_id}")
             return None
         self.session.delete(db_campaign)
-        self.session.commit()
+        self.session.flush()
         logger.info(f"Deleted campaign: {campaign_id} - {db_campaign.title}")
         return CampaignPublic.model_validate(db_campaign)
+
+
+    def delete_cascade(self, campaign_id: int) \
+            -> Dict[str, int]:
+        """Remove a campaign with its classes,
+        dice sets and dice logs
+        (one bulk DELETE per table, one transaction)."""
+        counts = delete_cascade(self.session, campaign_scope(campaign_id))
+        logger.info(f"Cascade deleted Campaign {campaign_id}: {counts}")
+        return counts
@@ -7,7 +7,12 @@ from sqlmodel import Session, select
 from models.db_models.table_models import Class, Campaign
 from models.schemas.class_schema import *
 from repositories.class_repository import ClassRepository
-from typing import List, Optional
+from repositories import version_cache
+from repositories.version_cache import ResourceVersion
+from typing import Dict, List, Optional, Sequence, Union
+from repositories.cascade_delete import delete_cascade, class_scope
+from repositories.projection import project
+from repositories.search_index import name_filter, search
 import logging
 
 
@@ -40,13 +45,24 @@ class SqlAlchemyClassRepository(ClassRepository):
                 for c in dnd_classes]
 
 
-    def list_by_campaign(self, campaign_id: int) \
-            -> List[ClassPublic]:
-        """List all classes belonging to a specific campaign."""
-        dnd_classes = self.session.exec(
+    def list_by_campaign(
+            self,
+            campaign_id: int,
+            fields: Optional[Sequence[str]] = None,
+            limit: Optional[int] = None) \
+            -> List[Union[ClassPublic, ClassListItem]]:
+        """List the classes belonging to a specific campaign by ID,
+        with limit the first ones only,
+        with fields only these columns (list items)."""
+        query = (
             select(Class)
             .where(Class.campaign_id == campaign_id)
-        ).all()
+            .order_by(Class.id)
+            .limit(limit))
+        if fields is not None:
+            return project(self.session, query, Class, fields, ClassListItem)
+
+        dnd_classes = self.session.exec(query).all()
         logger.debug(
             f"Retrieved {len(dnd_classes)} "
             f"classes for campaign {campaign_id}"
@@ -71,9 +87,10 @@ class SqlAlchemyClassRepository(ClassRepository):
 
 
     def get_by_campaign_id(self, campaign_id: int) \
-            -> List[ClassPublic]:
-        """Legacy alias for list_by_campaign."""
-        return self.list_by_campaign(campaign_id)
+            -> List[ClassListItem]:
+        """Legacy alias for list_by_campaign, the IDs only
+        (the caller counts the classes of a campaign)."""
+        return self.list_by_campaign(campaign_id, fields=("id",))
 
 
     def get_by_id(self, class_id: int) \
@@ -87,28 +104,48 @@ class SqlAlchemyClassRepository(ClassRepository):
         return None
 
 
+    def get_version(self, class_id: int) \
+            -> Optional[ResourceVersion]:
+        """Version and owner of a dnd_class, from the version
+        cache or a SELECT of the two columns."""
+        return version_cache.lookup(self.session, Class, class_id)
+
+
     def list_all(self,
                  offset: int = 0,
                  limit: int = 100,
                  campaign_id: Optional[int] = None,
-                 name: Optional[str] = None
-                 ) -> List[ClassPublic]:
-        """Method to show all classes
-        with optional campaign or name filter."""
+                 name: Optional[str] = None,
+                 after_id: Optional[int] = None,
+                 fields: Optional[Sequence[str]] = None
+                 ) -> List[Union[ClassPublic, ClassListItem]]:
+        """Method to show all classes ordered by ID
+        with optional campaign or name filter.
+        after_id continues after a cursor (keyset paging).
+        With fields only these columns are selected."""
         query = select(Class)
 
         if name:
             query = (
                 query
-                .where(Class.name.ilike(f"%{name}%")))
+                .where(name_filter(self.session, Class, name)))
         if campaign_id:
             query = (
                 query
                 .where(Class.campaign_id == campaign_id))
-
-        classes = self.session.exec(
-            query.offset(offset)
-            .limit(limit)).all()
+        if after_id is not None:
+            query = query.where(Class.id > after_id)
+
+        query = (
+            query.order_by(Class.id)
+            .offset(offset)
+            .limit(limit))
+        if fields is not None:
+            classes = project(self.session, query, Class, fields, ClassListItem)
+            logger.debug(f"Listed {len(classes)} classes ({', '.join(fields)})")
+            return classes
+
+        classes = self.session.exec(query).all()
         logger.debug(
             f"Listed {len(classes)} classes "
             f"with filters name={name}, "
@@ -118,13 +155,31 @@ class SqlAlchemyClassRepository(ClassRepository):
                 for c in classes]
 
 
+    def search(self,
+               text: str,
+               prefix: bool = False,
+               limit: int = 10,
+               user_id: Optional[int] = None
+               ) -> List[ClassListItem]:
+        """Method to search classes by name on the search
+        index, ranked, optional limited to the classes of a user."""
+        query = select(Class)
+        if user_id:
+            query = query.where(Class.user_id == user_id)
+        query = search(self.session, query, Class, text, prefix).limit(limit)
+        classes = project(
+            self.session, query, Class, CLASS_SUMMARY_FIELDS, ClassListItem
+        )
+        logger.debug(f"Found {len(classes)} classes for '{text}' (prefix={prefix})")
+        return classes
+
+
     def add(self, dnd_class: ClassCreate) \
             -> ClassPublic:
         """Method to create a new dnd_class."""
         db_class = Class(**dnd_class.model_dump())
         self.session.add(db_class)
-        self.session.commit()
-        self.session.refresh(db_class)
+        self.session.flush()
         logger.info(f"Class added: {db_class.id} - {db_class.name}")
         return ClassPublic.model_validate(db_class)
 
@@ -145,8 +200,7 @@ class SqlAlchemyClassRepository(ClassRepository):
                 exclude_unset=True).items():
             setattr(db_class, key, value)
         self.session.add(db_class)
-        self.session.commit()
-        self.session.refresh(db_class)
+        self.session.flush()
         logger.info(
             f"Updated dnd_class: {class_id} "
             f"- {db_class.name}"
@@ -165,6 +219,16 @@ class SqlAlchemyClassRepository(ClassRepository):
             )
             return None
         self.session.delete(db_class)
-        self.session.commit()
+        self.session.flush()
         logger.info(f"Deleted dnd_class: {class_id} - {db_class.name}")
         return ClassPublic.model_validate(db_class)
+
+
+    def delete_cascade(self, class_id: int) \
+            -> Dict[str, int]:
+        """Remove a dnd_class with its
+        dice sets and dice logs
+        (one bulk DELETE per table, one transaction)."""
+        counts = delete_cascade(self.session, class_scope(class_id))
+        logger.info(f"Cascade deleted Class {class_id}: {counts}")
+        return counts
@@ -7,7 +7,8 @@ from sqlmodel import Session, select
 from models.db_models.table_models import Dice
 from models.schemas.dice_schema import *
 from repositories.dice_repository import DiceRepository
-from typing import List, Optional
+from repositories.unit_of_work import after_commit
+from typing import Callable, List, Optional
 import logging
 
 
@@ -37,11 +38,16 @@ class SqlAlchemyDiceRepository(DiceRepository):
 
     def list_all(self,
                  offset: int = 0,
-                 limit: int = 100
+                 limit: int = 100,
+                 after_id: Optional[int] = None
                  ) -> List[DicePublic]:
-        """Method to show all dices."""
+        """Method to show all dices ordered by ID.
+        after_id continues after a cursor (keyset paging)."""
+        query = select(Dice)
+        if after_id is not None:
+            query = query.where(Dice.id > after_id)
         dices = self.session.exec(
-            select(Dice)
+            query.order_by(Dice.id)
             .offset(offset)
             .limit(limit)).all()
         logger.debug(f"Listed {len(dices)} dices (offset={offset}, limit={limit})")
@@ -54,8 +60,7 @@ class SqlAlchemyDiceRepository(DiceRepository):
         """Method to create a new dice."""
         db_dice = Dice(**dice.model_dump())
         self.session.add(db_dice)
-        self.session.commit()
-        self.session.refresh(db_dice)
+        self.session.flush()
         logger.info(f"Dice added: {db_dice.id} - {db_dice.name}")
         return DicePublic.model_validate(db_dice)
 
@@ -74,8 +79,7 @@ class SqlAlchemyDiceRepository(DiceRepository):
                 exclude_unset=True).items():
             setattr(db_dice, key, value)
         self.session.add(db_dice)
-        self.session.commit()
-        self.session.refresh(db_dice)
+        self.session.flush()
         logger.info(f"Updated dice: {dice_id} - {db_dice.name}")
         return DicePublic.model_validate(db_dice)
 
@@ -88,7 +92,7 @@ class SqlAlchemyDiceRepository(DiceRepository):
             logger.warning(f"Attempted to delete non-existing dice {dice_id}")
             return None
         self.session.delete(db_dice)
-        self.session.commit()
+        self.session.flush()
         logger.info(f"Deleted dice: {dice_id} - {db_dice.name}")
         return DicePublic.model_validate(db_dice)
 
@@ -103,3 +107,9 @@ class SqlAlchemyDiceRepository(DiceRepository):
         logger.debug(f"Retrieved {len(dices)} dices for dnd_class {class_id}")
         return [DicePublic.model_validate(d)
                 for d in dices]
+
+
+    def after_commit(self, callback: Callable[[], None]):
+        """Run a callback once the transaction
+        of the session is committed."""
+        after_commit(self.session, callback)
@@ -3,11 +3,18 @@ sql_dicelog_repository.py
 
 Concrete implementation for sqlalchemy, campaign management.
 """
+from datetime import datetime
+from functools import partial
+from sqlalchemy import tuple_
 from sqlmodel import Session, select
 from models.db_models.table_models import DiceLog
 from models.schemas.dicelog_schema import *
 from repositories.dicelog_repository import DiceLogRepository
-from typing import List, Optional
+from repositories.dicelog_retention import retention
+from repositories.dicelog_writer import get_dicelog_writer
+from repositories.routing_session import read_from_primary
+from repositories.unit_of_work import after_commit
+from typing import List, Optional, Tuple
 import logging
 
 
@@ -48,6 +55,25 @@ class SqlAlchemyDiceLogRepository(DiceLogRepository):
                 for l in dicelogs]
 
 
+    def list_recent_by_campaign(self,
+                                campaign_id: int,
+                                user_id: int,
+                                limit: int = 20) \
+            -> List[DiceLogPublic]:
+        """List the newest dice logs of a user in a campaign
+        (backwards on the campaign_id, id index)."""
+        dicelogs = self.session.exec(
+            select(DiceLog)
+            .where(DiceLog.campaign_id == campaign_id,
+                   DiceLog.user_id == user_id)
+            .order_by(DiceLog.id.desc())
+            .limit(limit)
+        ).all()
+        logger.debug(f"Retrieved {len(dicelogs)} recent DiceLogs for campaign {campaign_id}")
+        return [DiceLogPublic.model_validate(l)
+                for l in dicelogs]
+
+
     def list_by_class(self, dnd_class_id: int) \
             -> List[DiceLogPublic]:
         """List all dice logs belonging to a specific DnD dnd_class."""
@@ -88,23 +114,11 @@ class SqlAlchemyDiceLogRepository(DiceLogRepository):
         """Method to create a new dice log."""
         db_dicelog = DiceLog(**log.model_dump())
         self.session.add(db_dicelog)
-        self.session.commit()
-        self.session.refresh(db_dicelog)
+        self.session.flush()
         logger.info(f"DiceLog added: {db_dicelog.id} for user {db_dicelog.user_id}")
 
-        # FIFO cleanup delete oldest if bigger than 100
-        logs = self.session.exec(
-            select(DiceLog)
-            .where(DiceLog.user_id == log.user_id)
-            .order_by(DiceLog.timestamp.desc())
-        ).all()
-
-        if len(logs) > 100:
-            # Delete oldest, keep 100 newest
-            for old_log in logs[100:]:
-                self.session.delete(old_log)
-            self.session.commit()
-            logger.debug(f"Old DiceLogs deleted for user {log.user_id}, kept 100 newest")
+        # Amortized FIFO cleanup (set-based, every N inserts per user)
+        retention.record(self.session, [db_dicelog])
         return DiceLogPublic.model_validate(db_dicelog)
 
 
@@ -116,7 +130,7 @@ class SqlAlchemyDiceLogRepository(DiceLogRepository):
             logger.warning(f"Attempted to delete non-existing DiceLog {dicelog_id}")
             return None
         self.session.delete(db_dicelog)
-        self.session.commit()
+        self.session.flush()
         logger.info(f"Deleted DiceLog: {dicelog_id} for user {db_dicelog.user_id}")
         return DiceLogPublic.model_validate(db_dicelog)
 
@@ -125,13 +139,20 @@ class SqlAlchemyDiceLogRepository(DiceLogRepository):
         self,
         user_id: int,
         offset: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        before: Optional[Tuple[datetime, int]] = None
     ) -> List[DiceLogPublic]:
-        """List logs by user."""
+        """List logs by user, newest first.
+        before is the (timestamp, id) of a cursor: the page
+        is a range scan on (user_id, timestamp, id)."""
+        query = select(DiceLog).where(DiceLog.user_id == user_id)
+        if before is not None:
+            query = query.where(
+                tuple_(DiceLog.timestamp, DiceLog.id) < tuple_(*before)
+            )
         dicelogs = self.session.exec(
-            select(DiceLog)
-            .where(DiceLog.user_id == user_id)
-            .order_by(DiceLog.timestamp.desc())
+            query
+            .order_by(DiceLog.timestamp.desc(), DiceLog.id.desc())
             .offset(offset)
             .limit(limit)
         ).all()
@@ -140,7 +161,25 @@ class SqlAlchemyDiceLogRepository(DiceLogRepository):
                 for d in dicelogs]
 
 
-    def log_roll(self, log: DiceLogCreate) -> DiceLogPublic:
-        """Method for services to store dice rolls."""
+    def log_roll(self, log: DiceLogCreate) -> Optional[DiceLogPublic]:
+        """Method for services to store dice rolls.
+        Queued for the background writer once the request is
+        committed if the writer runs (returns None then, dropped
+        on rollback), otherwise written in the transaction."""
+        writer = get_dicelog_writer()
+        if writer is not None:
+            after_commit(self.session, partial(writer.log, log))
+            logger.debug(f"Queueing dice roll log for user {log.user_id} after commit")
+            return None
         logger.debug(f"Logging dice roll for user {log.user_id}")
         return self.add(log)
+
+
+    def wait_for_pending(self, user_id: int) -> bool:
+        """Wait until the queued logs of a user are written
+        (then read from the primary, replicas may lag)."""
+        read_from_primary(self.session)
+        writer = get_dicelog_writer()
+        if writer is None:
+            return True
+        return writer.wait_for_user(user_id)
@@ -3,16 +3,49 @@ sql_diceset_repository.py
 
 Concrete implementation for sqlalchemy, dice set management.
 """
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select, delete
 from models.db_models.table_models import Dice, DiceSet, DiceSetDice
 from models.schemas.diceset_schema import *
 from repositories.diceset_repository import DiceSetRepository
-from typing import List, Optional
+from repositories.roll_plan_cache import (
+    RollPlan,
+    RollPlanEntry,
+    invalidate_on_commit,
+    roll_plan_cache
+)
+from repositories import version_cache
+from repositories.routing_session import read_from_primary
+from repositories.version_cache import ResourceVersion
+from typing import Dict, List, Optional, Sequence
+from repositories.cascade_delete import delete_cascade, diceset_scope
 import logging
 
 
 logger = logging.getLogger(__name__)
 
+# Loads the dices of a page of sets with one more SELECT (no N+1)
+WITH_DICES = selectinload(DiceSet.dices)
+# Entries with quantities and their dices, one more SELECT for all sets
+WITH_ENTRIES = selectinload(DiceSet.dice_entries).joinedload(DiceSetDice.dice)
+
+
+def _public(db_diceset: DiceSet) -> DiceSetPublic:
+    """A dice set with its dices repeated by quantity
+    (dice_entries must be loaded)."""
+    return DiceSetPublic.model_validate({
+        "id": db_diceset.id,
+        "name": db_diceset.name,
+        "user_id": db_diceset.user_id,
+        "created_at": db_diceset.created_at,
+        "version": db_diceset.version,
+        "dices": [  # DicePublic expects id,name,sides
+            {"id": entry.dice.id, "name": entry.dice.name, "sides": entry.dice.sides}
+            for entry in db_diceset.dice_entries if entry.dice
+            for _ in range(entry.quantity or 1)
+        ]
+    })
+
 
 class SqlAlchemyDiceSetRepository(DiceSetRepository):
     """Implements the diceset handling methods."""
@@ -28,6 +61,7 @@ class SqlAlchemyDiceSetRepository(DiceSetRepository):
         dicesets = self.session.exec(
             select(DiceSet)
             .where(DiceSet.user_id == user_id)
+            .options(WITH_DICES)
         ).all()
         logger.debug(f"Retrieved {len(dicesets)} DiceSets for user {user_id}")
         return [DiceSetPublic.model_validate(d)
@@ -40,6 +74,7 @@ class SqlAlchemyDiceSetRepository(DiceSetRepository):
         dicesets = self.session.exec(
             select(DiceSet)
             .where(DiceSet.campaign_id == campaign_id)
+            .options(WITH_DICES)
         ).all()
         logger.debug(f"Retrieved {len(dicesets)} DiceSets for campaign {campaign_id}")
         return [DiceSetPublic.model_validate(d)
@@ -52,12 +87,47 @@ class SqlAlchemyDiceSetRepository(DiceSetRepository):
         dicesets = self.session.exec(
             select(DiceSet)
             .where(DiceSet.dnd_class_id == dnd_class_id)
+            .options(WITH_DICES)
         ).all()
         logger.debug(f"Retrieved {len(dicesets)} DiceSets for dnd_class {dnd_class_id}")
         return [DiceSetPublic.model_validate(d)
                 for d in dicesets]
 
 
+    def list_by_classes(self,
+                        class_ids: Sequence[int],
+                        per_class: int) \
+            -> Dict[int, List[DiceSetPublic]]:
+        """List the first per_class dice sets of each dnd_class:
+        their IDs from the dnd_class_id index, then the capped
+        sets by ID and the entries and dices of all of them."""
+        dicesets = {class_id: [] for class_id in class_ids}
+        if not class_ids:
+            return dicesets
+        rows = self.session.exec(
+            select(DiceSet.dnd_class_id, DiceSet.id)
+            .where(DiceSet.dnd_class_id.in_(class_ids))
+            .order_by(DiceSet.dnd_class_id, DiceSet.id)
+        ).all()
+        per_class_ids = {class_id: [] for class_id in class_ids}
+        for class_id, diceset_id in rows:
+            if len(per_class_ids[class_id]) < per_class:
+                per_class_ids[class_id].append(diceset_id)
+        diceset_ids = [i for ids in per_class_ids.values() for i in ids]
+        if not diceset_ids:
+            return dicesets
+        db_dicesets = self.session.exec(
+            select(DiceSet)
+            .where(DiceSet.id.in_(diceset_ids))
+            .order_by(DiceSet.id)
+            .options(WITH_ENTRIES)
+        ).all()
+        for db_diceset in db_dicesets:
+            dicesets[db_diceset.dnd_class_id].append(_public(db_diceset))
+        logger.debug(f"Retrieved {len(db_dicesets)} DiceSets for {len(class_ids)} classes")
+        return dicesets
+
+
     def get_by_class_id(self, dnd_class_id: int) \
             -> List[DiceSetPublic]:
         """Legacy alias for list_by_class."""
@@ -66,33 +136,27 @@ class SqlAlchemyDiceSetRepository(DiceSetRepository):
 
     def get_by_id(self, diceset_id: int) \
             -> Optional[DiceSetPublic]:
-        """Method to get a dice set by ID."""
-        db_diceset = self.session.get(DiceSet, diceset_id)
+        """Method to get a dice set by ID.
+        The entries and their dices are loaded with one more SELECT."""
+        db_diceset = self.session.exec(
+            select(DiceSet)
+            .where(DiceSet.id == diceset_id)
+            .options(WITH_ENTRIES)
+        ).first()
         if not db_diceset:
             logger.warning(f"Attempted to fetch non-existing DiceSet {diceset_id}")
             return None
 
-        expanded_dices = []
-        for entry in getattr(db_diceset, "dice_entries", []) or []:
-            if not getattr(entry, "dice", None):
-                dice_obj = self.session.get(Dice, entry.dice_id)
-            else:
-                dice_obj = entry.dice
-            if dice_obj:
-                for _ in range(entry.quantity or 1):
-                    expanded_dices.append(dice_obj)
-
-        payload = {
-            "id": db_diceset.id,
-            "name": db_diceset.name,
-            "user_id": db_diceset.user_id,
-            "dices": [  # DicePublic expects id,name,sides
-                {"id": d.id, "name": d.name, "sides": d.sides}
-                for d in expanded_dices
-            ]
-        }
-        logger.debug(f"Retrieved {db_diceset} for dice set {diceset_id} with expanded dices {len(expanded_dices)}")
-        return DiceSetPublic.model_validate(payload)
+        diceset = _public(db_diceset)
+        logger.debug(f"Retrieved {db_diceset} for dice set {diceset_id} with expanded dices {len(diceset.dices)}")
+        return diceset
+
+
+    def get_version(self, diceset_id: int) \
+            -> Optional[ResourceVersion]:
+        """Version and owner of a dice set, from the version
+        cache or a SELECT of the two columns."""
+        return version_cache.lookup(self.session, DiceSet, diceset_id)
 
 
     def get_orm_by_id(self, diceset_id: int) -> Optional[DiceSet]:
@@ -100,14 +164,71 @@ class SqlAlchemyDiceSetRepository(DiceSetRepository):
         return self.session.get(DiceSet, diceset_id)
 
 
+    def get_roll_plan(self, diceset_id: int) \
+            -> Optional[RollPlan]:
+        """Get the compiled roll plan of a dice set.
+        Cached per process, on a miss the set and its dices
+        are loaded with a single joined SELECT from the primary
+        (a lagging replica could cache an outdated plan)."""
+        plan = roll_plan_cache.get(diceset_id)
+        if plan is not None:
+            return plan
+
+        generation = roll_plan_cache.generation()
+        read_from_primary(self.session)
+        rows = self.session.exec(
+            select(
+                DiceSet.name,
+                DiceSet.user_id,
+                Dice.id,
+                Dice.name,
+                Dice.sides,
+                DiceSetDice.quantity
+            )
+            .select_from(DiceSet)
+            .outerjoin(DiceSetDice, DiceSetDice.dice_set_id == DiceSet.id)
+            .outerjoin(Dice, Dice.id == DiceSetDice.dice_id)
+            .where(DiceSet.id == diceset_id)
+            .order_by(DiceSetDice.dice_id)
+        ).all()
+        if not rows:
+            logger.warning(f"Attempted to plan non-existing DiceSet {diceset_id}")
+            return None
+
+        name, user_id = rows[0][0], rows[0][1]
+        plan = RollPlan.build(
+            diceset_id=diceset_id,
+            name=name,
+            user_id=user_id,
+            entries=tuple(
+                RollPlanEntry(
+                    dice_id=dice_id,
+                    name=dice_name,
+                    sides=sides,
+                    quantity=quantity or 1
+                )
+                for _, _, dice_id, dice_name, sides, quantity in rows
+                if dice_id is not None
+            )
+        )
+        roll_plan_cache.put(plan, generation)
+        logger.debug(f"Compiled roll plan for DiceSet {diceset_id} with {len(plan.entries)} entries")
+        return plan
+
+
 
     def list_all(self,
                  offset: int = 0,
-                 limit: int = 100
+                 limit: int = 100,
+                 after_id: Optional[int] = None
                  ) -> List[DiceSetPublic]:
-        """Method to get a list of all dice sets."""
+        """Method to get a list of all dice sets ordered by ID.
+        after_id continues after a cursor (keyset paging)."""
+        query = select(DiceSet).options(WITH_DICES)
+        if after_id is not None:
+            query = query.where(DiceSet.id > after_id)
         dicesets = self.session.exec(
-            select(DiceSet)
+            query.order_by(DiceSet.id)
             .offset(offset)
             .limit(limit)
         ).all()
@@ -120,8 +241,7 @@ class SqlAlchemyDiceSetRepository(DiceSetRepository):
         """Method to add a new dice set."""
         db_diceset = DiceSet(**diceset.model_dump())
         self.session.add(db_diceset)
-        self.session.commit()
-        self.session.refresh(db_diceset)
+        self.session.flush()
 
         logger.info(f"DiceSet added: {db_diceset.id} for user {db_diceset.user_id}")
         return self.get_by_id(db_diceset.id)
@@ -145,15 +265,15 @@ class SqlAlchemyDiceSetRepository(DiceSetRepository):
             if key != "dice_ids" and hasattr(db_diceset, key):
                 setattr(db_diceset, key, value)
         self.session.add(db_diceset)
-        self.session.commit()
 
         # Update dices (allow duplicates)
         if "dice_ids" in update_data:
+            version_cache.touch(db_diceset)
+
             # Delete all existing links for this diceset
             self.session.exec(
                 delete(DiceSetDice)
                 .where(DiceSetDice.dice_set_id == diceset_id))
-            self.session.commit()
 
             # Count duplicates
             dice_count = {}
@@ -170,9 +290,10 @@ class SqlAlchemyDiceSetRepository(DiceSetRepository):
                         quantity=quantity
                     )
                     self.session.add(entry)
-            self.session.commit()
 
-        self.session.refresh(db_diceset)
+        self.session.flush()
+        invalidate_on_commit(self.session, diceset_id)
+        self.session.refresh(db_diceset)  # Reload the dice entries
         logger.info(f"Updated DiceSet {diceset_id} for user {db_diceset.user_id}")
         return DiceSetPublic.model_validate(db_diceset)
 
@@ -189,24 +310,37 @@ class SqlAlchemyDiceSetRepository(DiceSetRepository):
         self.session.exec(
             delete(DiceSetDice)
             .where(DiceSetDice.dice_set_id == diceset_id))
-        self.session.commit()
+        self.session.expire(db_diceset, ["dice_entries", "dices"])
 
         # Delete the diceset
         self.session.delete(db_diceset)
-        self.session.commit()
+        self.session.flush()
+        invalidate_on_commit(self.session, diceset_id)
         logger.info(f"Deleted DiceSet {diceset_id} for user {db_diceset.user_id}")
         return DiceSetPublic.model_validate(db_diceset)
 
 
+    def delete_cascade(self, diceset_id: int) \
+            -> Dict[str, int]:
+        """Remove a dice set with its
+        dice entries and dice logs
+        (one bulk DELETE per table, one transaction)."""
+        counts = delete_cascade(self.session, diceset_scope(diceset_id))
+        logger.info(f"Cascade deleted DiceSet {diceset_id}: {counts}")
+        return counts
+
+
     def set_dice_quantities(self, diceset_id: int, dice_count: dict):
         """Store dice quantities for a dice set."""
         session = self.session
+        db_diceset = session.get(DiceSet, diceset_id)
+        if db_diceset is not None:
+            version_cache.touch(db_diceset)
 
         # Delete existing entries to fully rebuild
         session.exec(
             delete(DiceSetDice).where(DiceSetDice.dice_set_id == diceset_id)
         )
-        session.commit()
 
         # Insert each dice with correct quantity
         for dice_id, quantity in dice_count.items():
@@ -217,4 +351,7 @@ class SqlAlchemyDiceSetRepository(DiceSetRepository):
             )
             session.add(entry)
 
-        session.commit()
+        session.flush()
+        if db_diceset is not None:
+            session.expire(db_diceset, ["dice_entries", "dices"])  # Reload on next read
+        invalidate_on_commit(session, diceset_id)
@@ -0,0 +1,171 @@
+"""
+sql_job_repository.py
+
+Concrete implementation for sqlalchemy, background job management.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import or_, update
+from sqlmodel import Session, select
+from models.db_models.table_models import Job
+from models.schemas.job_schema import *
+from repositories.job_repository import JobRepository
+from repositories.unit_of_work import commit_now
+from typing import Dict, List, Optional
+import logging
+
+
+
+logger = logging.getLogger(__name__)
+
+OPEN_STATES = (PENDING, RUNNING)
+
+
+class SqlAlchemyJobRepository(JobRepository):
+    """This class implement
+    the background job handling methods with sqlalchemy."""
+
+    def __init__(self, session: Session):
+        self.session = session
+        logger.debug("SqlAlchemyJobRepository initialized")
+
+
+    def get_by_id(self, job_id: str) \
+            -> Optional[JobPublic]:
+        """Get a job by ID."""
+        job = self.session.get(Job, job_id)
+        if not job:
+            logger.warning(f"Job {job_id} not found")
+            return None
+        return JobPublic.model_validate(job)
+
+
+    def add(self, job: JobCreate) \
+            -> JobPublic:
+        """Queue a new pending job with a random ID.
+        Committed right away, the worker threads
+        read it with their own sessions."""
+        db_job = Job(
+            id=uuid.uuid4().hex,
+            status=PENDING,
+            **job.model_dump()
+        )
+        self.session.add(db_job)
+        commit_now(self.session, f"Job {db_job.id} is read by the worker")
+        logger.info(f"Queued Job {db_job.id} ({db_job.kind} {db_job.target_id})")
+        return JobPublic.model_validate(db_job)
+
+
+    def get_open(self, kind: str, target_id: int) \
+            -> Optional[JobPublic]:
+        """Get the pending or running job of a target."""
+        job = self.session.exec(
+            select(Job)
+            .where(Job.status.in_(OPEN_STATES))
+            .where(Job.kind == kind)
+            .where(Job.target_id == target_id)
+        ).first()
+        return JobPublic.model_validate(job) if job else None
+
+
+    def list_open(self) \
+            -> List[JobPublic]:
+        """List all pending and running jobs, oldest first."""
+        jobs = self.session.exec(
+            select(Job)
+            .where(Job.status.in_(OPEN_STATES))
+            .order_by(Job.created_at)
+        ).all()
+        logger.debug(f"Retrieved {len(jobs)} open Jobs")
+        return [JobPublic.model_validate(j) for j in jobs]
+
+
+    def claim(self, job_id: str, owner: str, lease_seconds: float) \
+            -> Optional[JobPublic]:
+        """Mark a job as running by `owner` with one conditional
+        UPDATE: of several workers only one gets the row. Pending
+        jobs and running jobs without a valid lease (interrupted,
+        or their worker died) can be claimed."""
+        now = datetime.now(timezone.utc)
+        claimed = self.session.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .where(or_(
+                Job.status == PENDING,
+                (Job.status == RUNNING) & or_(Job.lease_until.is_(None), Job.lease_until < now)
+            ))
+            .values(
+                status=RUNNING,
+                owner=owner,
+                lease_until=now + timedelta(seconds=lease_seconds),
+                updated_at=now
+            )
+        ).rowcount
+        if not claimed:
+            logger.info(f"Job {job_id} not claimed, finished or run by another worker")
+            return None
+        logger.info(f"Job {job_id} running by {owner}")
+        return JobPublic.model_validate(
+            self.session.get(Job, job_id, populate_existing=True)
+        )
+
+
+    def renew(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """Extend the lease, in the transaction of the deleted chunk."""
+        renewed = self.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.owner == owner, Job.status == RUNNING)
+            .values(lease_until=datetime.now(timezone.utc) + timedelta(seconds=lease_seconds))
+        ).rowcount
+        return renewed > 0
+
+
+    def release(self, job_id: str):
+        """End the lease of an interrupted job."""
+        self.session.execute(
+            update(Job).where(Job.id == job_id).values(owner=None, lease_until=None)
+        )
+
+
+    def record_progress(self, job_id: str, deleted_rows: Dict[str, int]):
+        """Store the rows deleted so far, the caller
+        commits it together with the deleted chunk."""
+        job = self.session.get(Job, job_id)
+        job.deleted_rows = dict(deleted_rows)
+        job.updated_at = datetime.now(timezone.utc)
+        self.session.add(job)
+        self.session.flush()
+
+
+    def finish(self,
+               job_id: str,
+               owner: str,
+               status: str,
+               deleted_rows: Dict[str, int],
+               error: Optional[str] = None) \
+            -> Optional[JobPublic]:
+        """Mark a job as done or failed with one conditional
+        UPDATE on the lease of `owner`: None (nothing written)
+        if the lease expired or another worker claimed the job."""
+        now = datetime.now(timezone.utc)
+        finished = self.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.owner == owner, Job.status == RUNNING)
+            .where(Job.lease_until >= now)
+            .values(
+                status=status,
+                deleted_rows=dict(deleted_rows),
+                error=error,
+                updated_at=now,
+                finished_at=now,
+                owner=None,
+                lease_until=None
+            )
+        ).rowcount
+        if not finished:
+            logger.warning(f"Job {job_id} not finished, the lease of {owner} is lost")
+            return None
+        logger.info(f"Job {job_id} {status}: {dict(deleted_rows)}")
+        return JobPublic.model_validate(
+            self.session.get(Job, job_id, populate_existing=True)
+        )
@@ -8,7 +8,9 @@ from models.db_models.table_models import User
 from models.schemas.user_schema import *
 from repositories.user_repository import UserRepository
 from auth.auth import hash_password
-from typing import List, Optional
+from typing import Dict, List, Optional
+from repositories.cascade_delete import delete_cascade, user_scope
+from repositories.search_index import name_filter, search
 import logging
 
 
@@ -38,23 +40,43 @@ class SqlAlchemyUserRepository(UserRepository):
     def list_all(self,
                  offset: int = 0,
                  limit: int = 100,
-                 name: Optional[str] = None
+                 name: Optional[str] = None,
+                 after_id: Optional[int] = None
                  ) -> List[UserPublic]:
-        """Method to show all users,
-        optional filter by username."""
+        """Method to show all users ordered by ID,
+        optional filter by username.
+        after_id continues after a cursor (keyset paging)."""
         query = select(User)
         if name:
             query = (
                 query
-                .where(User.user_name.ilike(f"%{name}%")))
+                .where(name_filter(self.session, User, name)))
+        if after_id is not None:
+            query = query.where(User.id > after_id)
         users = self.session.exec(
-            query.offset(offset)
+            query.order_by(User.id)
+            .offset(offset)
             .limit(limit)).all()
         logger.debug(f"Retrieved {len(users)} Users with filter name={name}")
         return [UserPublic.model_validate(u)
                 for u in users]
 
 
+    def search(self,
+               text: str,
+               prefix: bool = False,
+               limit: int = 10
+               ) -> List[UserPublic]:
+        """Method to search users by username
+        on the search index, ranked."""
+        users = self.session.exec(
+            search(self.session, select(User), User, text, prefix)
+            .limit(limit)).all()
+        logger.debug(f"Found {len(users)} Users for '{text}' (prefix={prefix})")
+        return [UserPublic.model_validate(u)
+                for u in users]
+
+
     def add(self, user: UserCreate) \
             -> UserPublic:
         """Add a new user with hashed password."""
@@ -64,8 +86,7 @@ class SqlAlchemyUserRepository(UserRepository):
             hashed_password=hash_password(user.password)
         )
         self.session.add(db_user)
-        self.session.commit()
-        self.session.refresh(db_user)
+        self.session.flush()
         logger.info(f"User added: {db_user.id} - {db_user.user_name}")
         return UserPublic.model_validate(db_user)
 
@@ -90,8 +111,7 @@ class SqlAlchemyUserRepository(UserRepository):
         for key, value in update_data.items():
             setattr(db_user, key, value)
         self.session.add(db_user)
-        self.session.commit()
-        self.session.refresh(db_user)
+        self.session.flush()
         logger.info(f"Updated User {user_id} - {db_user.user_name}")
         return UserPublic.model_validate(db_user)
 
@@ -104,11 +124,21 @@ class SqlAlchemyUserRepository(UserRepository):
             logger.warning(f"Attempted to delete non-existing User {user_id}")
             return None
         self.session.delete(db_user)
-        self.session.commit()
+        self.session.flush()
         logger.info(f"Deleted User {user_id} - {db_user.user_name}")
         return UserPublic.model_validate(db_user)
 
 
+    def delete_cascade(self, user_id: int) \
+            -> Dict[str, int]:
+        """Remove a user with all campaigns,
+        classes, dice sets and dice logs
+        (one bulk DELETE per table, one transaction)."""
+        counts = delete_cascade(self.session, user_scope(user_id))
+        logger.info(f"Cascade deleted User {user_id}: {counts}")
+        return counts
+
+
     def list_by_user(self, user_id: int) \
             -> List[UserPublic]:
         """Method to list by user."""
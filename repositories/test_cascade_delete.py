@@ -0,0 +1,209 @@
+"""
+test_cascade_delete.py
+
+Tests for the set-based cascade deletes.
+"""
+import uuid
+import pytest
+from sqlalchemy import event, func
+from sqlmodel import Session, select
+from models.db_models.table_models import (
+    Campaign,
+    Class,
+    DiceLog,
+    DiceSet,
+    DiceSetDice,
+    User
+)
+from models.db_models.test_db import test_engine
+from repositories.roll_plan_cache import RollPlan, roll_plan_cache
+from repositories.sql_campaign_repository import SqlAlchemyCampaignRepository
+from repositories.sql_class_repository import SqlAlchemyClassRepository
+from repositories.sql_diceset_repository import SqlAlchemyDiceSetRepository
+from repositories.sql_user_repository import SqlAlchemyUserRepository
+from repositories.unit_of_work import transaction
+
+
+@pytest.fixture
+def session():
+    """Fixture for a test database session."""
+    with Session(test_engine) as session:
+        yield session
+
+
+def add(session, row):
+    session.add(row)
+    session.commit()
+    session.refresh(row)
+    return row
+
+
+def make_user(session):
+    suffix = uuid.uuid4().hex[:8]
+    return add(session, User(
+        user_name=f"cascade_{suffix}",
+        email=f"cascade_{suffix}@example.com",
+        hashed_password="hashed"
+    ))
+
+
+def make_campaign(session, user):
+    """A campaign with two classes, each with a dice set,
+    two dice entries and two logs per dice set.
+    Returns the campaign ID."""
+    campaign = add(session, Campaign(
+        title=f"Cascade {uuid.uuid4().hex[:8]}",
+        genre="Fantasy",
+        description="Cascade test",
+        max_classes=4,
+        created_by=user.id
+    ))
+    for number in range(2):
+        dnd_class = add(session, Class(
+            name=f"Class {number}",
+            dnd_class="Fighter",
+            race="Human",
+            campaign_id=campaign.id,
+            user_id=user.id
+        ))
+        diceset = add(session, DiceSet(
+            dnd_class_id=dnd_class.id,
+            campaign_id=campaign.id,
+            user_id=user.id
+        ))
+        session.add_all([
+            DiceSetDice(dice_set_id=diceset.id, dice_id=1),
+            DiceSetDice(dice_set_id=diceset.id, dice_id=2),
+        ])
+        session.add_all([
+            DiceLog(
+                user_id=user.id,
+                campaign_id=campaign.id,
+                dnd_class_id=dnd_class.id,
+                diceset_id=diceset.id,
+                roll="d6: [3]",
+                result=3
+            )
+            for _ in range(2)
+        ])
+        session.commit()
+    return campaign.id
+
+
+def count(session, model, *where):
+    return session.exec(select(func.count()).select_from(model).where(*where)).one()
+
+
+def test_delete_campaign_counts_and_scope(session):
+    """Test a campaign is deleted with its rows, others stay."""
+    user = make_user(session)
+    campaign_id = make_campaign(session, user)
+    other_id = make_campaign(session, user)
+
+    with transaction(session):
+        counts = SqlAlchemyCampaignRepository(session).delete_cascade(campaign_id)
+
+    assert counts == {
+        "dicelog": 4,
+        "dicesetdice": 4,
+        "diceset": 2,
+        "dnd_class": 2,
+        "campaign": 1,
+    }
+    assert count(session, Class, Class.campaign_id == campaign_id) == 0
+    assert count(session, DiceLog, DiceLog.campaign_id == campaign_id) == 0
+    assert count(session, DiceLog, DiceLog.campaign_id == other_id) == 4
+    assert count(session, DiceSet, DiceSet.campaign_id == other_id) == 2
+
+
+def test_delete_campaign_one_statement_per_table(session):
+    """Test the cascade issues one DELETE per table."""
+    user = make_user(session)
+    campaign_id = make_campaign(session, user)
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement.split()[0].upper())
+    event.listen(test_engine, "before_cursor_execute", listener)
+    try:
+        with transaction(session):
+            SqlAlchemyCampaignRepository(session).delete_cascade(campaign_id)
+    finally:
+        event.remove(test_engine, "before_cursor_execute", listener)
+
+    assert statements.count("DELETE") == 5
+    assert statements.count("SELECT") == 3  # Cached ids: dice sets, classes, campaign
+
+
+def test_delete_class(session):
+    """Test a class is deleted with its dice sets and logs."""
+    user = make_user(session)
+    campaign_id = make_campaign(session, user)
+    class_id = session.exec(select(Class.id).where(Class.campaign_id == campaign_id)).first()
+
+    with transaction(session):
+        counts = SqlAlchemyClassRepository(session).delete_cascade(class_id)
+
+    assert counts == {"dicelog": 2, "dicesetdice": 2, "diceset": 1, "dnd_class": 1}
+    assert count(session, Class, Class.campaign_id == campaign_id) == 1
+
+
+def test_delete_diceset_invalidates_roll_plan(session):
+    """Test a dice set is deleted and dropped from the plan cache."""
+    user = make_user(session)
+    campaign_id = make_campaign(session, user)
+    diceset_id = session.exec(select(DiceSet.id).where(DiceSet.campaign_id == campaign_id)).first()
+    roll_plan_cache.put(
+        RollPlan.build(diceset_id, "Set", user.id, ()),
+        roll_plan_cache.generation()
+    )
+
+    with transaction(session):
+        counts = SqlAlchemyDiceSetRepository(session).delete_cascade(diceset_id)
+
+    assert counts == {"dicelog": 2, "dicesetdice": 2, "diceset": 1}
+    assert roll_plan_cache.get(diceset_id) is None
+
+
+def test_delete_user_includes_classes_in_other_campaigns(session):
+    """Test a user is deleted with own campaigns and own
+    classes in campaigns of other users."""
+    user = make_user(session)
+    owner = make_user(session)
+    user_id = user.id
+    make_campaign(session, user)
+    foreign_id = make_campaign(session, owner)
+    add(session, Class(
+        name="Guest",
+        dnd_class="Bard",
+        race="Elf",
+        campaign_id=foreign_id,
+        user_id=user_id
+    ))
+
+    with transaction(session):
+        counts = SqlAlchemyUserRepository(session).delete_cascade(user_id)
+
+    assert counts["user"] == 1
+    assert counts["campaign"] == 1
+    assert counts["dnd_class"] == 3
+    assert count(session, Class, Class.campaign_id == foreign_id) == 2
+    assert count(session, DiceLog, DiceLog.campaign_id == foreign_id) == 4
+
+
+def test_failed_cascade_rolls_back(session):
+    """Test nothing is deleted if one statement fails."""
+    user = make_user(session)
+    campaign_id = make_campaign(session, user)
+
+    def fail_on_campaign(conn, cursor, statement, *args):
+        if statement.startswith("DELETE FROM campaign"):
+            raise RuntimeError("boom")
+
+    event.listen(test_engine, "before_cursor_execute", fail_on_campaign)
+    try:
+        with pytest.raises(RuntimeError), transaction(session):
+            SqlAlchemyCampaignRepository(session).delete_cascade(campaign_id)
+    finally:
+        event.remove(test_engine, "before_cursor_execute", fail_on_campaign)
+
+    assert count(session, DiceLog, DiceLog.campaign_id == campaign_id) == 4
+    assert count(session, Class, Class.campaign_id == campaign_id) == 2
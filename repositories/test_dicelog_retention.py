@@ -0,0 +1,137 @@
+"""
+test_dicelog_retention.py
+
+Tests for the dice log retention engine.
+"""
+import uuid
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event
+from sqlmodel import Session, select
+from models.db_models.table_models import DiceLog
+from models.db_models.test_db import test_engine
+from repositories.dicelog_retention import RetentionEngine, RetentionPolicy
+
+
+@pytest.fixture
+def session():
+    """Fixture for a test database session."""
+    with Session(test_engine) as session:
+        yield session
+
+
+def new_id():
+    """A user or campaign ID without logs."""
+    return uuid.uuid4().int % 1_000_000_000 + 1_000_000
+
+
+def add_logs(session, user_id, campaign_id, count, timestamp=None):
+    """Store `count` logs and return them, oldest first."""
+    logs = [
+        DiceLog(
+            user_id=user_id,
+            campaign_id=campaign_id,
+            dnd_class_id=1,
+            roll=f"d6: [{i}]",
+            result=i,
+            timestamp=timestamp or datetime.now(timezone.utc)
+        )
+        for i in range(count)
+    ]
+    session.add_all(logs)
+    session.commit()
+    return logs
+
+
+def results(session, column, value):
+    """Stored results of a user or campaign, oldest first."""
+    return session.exec(
+        select(DiceLog.result)
+        .where(column == value)
+        .order_by(DiceLog.id)
+    ).all()
+
+
+def test_record_trims_with_single_delete(session):
+    """Test a due user is trimmed with one DELETE statement."""
+    user_id = new_id()
+    engine = RetentionEngine(RetentionPolicy(max_per_user=3, trim_every=1))
+    logs = add_logs(session, user_id, new_id(), 8)
+
+    deletes = []
+    listener = lambda conn, cursor, statement, *args: deletes.append(statement) \
+        if statement.lstrip().upper().startswith("DELETE") else None
+    event.listen(test_engine, "before_cursor_execute", listener)
+    try:
+        deleted = engine.record(session, logs[-1:])
+        session.commit()
+    finally:
+        event.remove(test_engine, "before_cursor_execute", listener)
+
+    assert deleted == 5
+    assert len(deletes) == 1
+    assert results(session, DiceLog.user_id, user_id) == [5, 6, 7]
+
+
+def test_record_is_amortized(session):
+    """Test users are only trimmed every `trim_every` inserts."""
+    user_id = new_id()
+    engine = RetentionEngine(RetentionPolicy(max_per_user=2, trim_every=4))
+    logs = add_logs(session, user_id, new_id(), 4)
+
+    assert engine.record(session, logs[:3]) == 0
+    assert len(results(session, DiceLog.user_id, user_id)) == 4
+
+    assert engine.record(session, logs[3:]) == 2
+    session.commit()
+    assert results(session, DiceLog.user_id, user_id) == [2, 3]
+
+
+def test_record_below_limit_keeps_all(session):
+    """Test nothing is deleted while a user is below the limit."""
+    user_id = new_id()
+    engine = RetentionEngine(RetentionPolicy(max_per_user=10, trim_every=1))
+    logs = add_logs(session, user_id, new_id(), 3)
+
+    assert engine.record(session, logs) == 0
+
+
+def test_campaign_policy(session):
+    """Test the per campaign limit across users."""
+    campaign_id = new_id()
+    engine = RetentionEngine(RetentionPolicy(max_per_user=None, max_per_campaign=4, trim_every=1))
+    add_logs(session, new_id(), campaign_id, 3)
+    logs = add_logs(session, new_id(), campaign_id, 3)
+
+    engine.record(session, logs[-1:])
+    session.commit()
+
+    assert results(session, DiceLog.campaign_id, campaign_id) == [2, 0, 1, 2]
+
+
+def test_sweep_applies_all_policies(session):
+    """Test the sweep removes old logs and trims every user."""
+    old_user, busy_user = new_id(), new_id()
+    engine = RetentionEngine(RetentionPolicy(max_per_user=2, max_age=timedelta(days=30)))
+    add_logs(session, old_user, new_id(), 2, timestamp=datetime.now(timezone.utc) - timedelta(days=31))
+    add_logs(session, busy_user, new_id(), 5)
+
+    engine.sweep(session)
+    session.commit()
+
+    assert results(session, DiceLog.user_id, old_user) == []
+    assert results(session, DiceLog.user_id, busy_user) == [3, 4]
+
+
+def test_policy_from_env(monkeypatch):
+    """Test the policy is read from the environment (0 disables)."""
+    monkeypatch.setenv("DICELOG_MAX_PER_USER", "0")
+    monkeypatch.setenv("DICELOG_MAX_PER_CAMPAIGN", "500")
+    monkeypatch.setenv("DICELOG_MAX_AGE_DAYS", "90")
+
+    policy = RetentionPolicy.from_env()
+
+    assert policy.max_per_user is None
+    assert policy.max_per_campaign == 500
+    assert policy.max_age == timedelta(days=90)
+    assert policy.trim_every == 20
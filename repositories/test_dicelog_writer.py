@@ -0,0 +1,180 @@
+"""
+test_dicelog_writer.py
+
+Tests for the write-behind dice log writer.
+"""
+import logging
+import uuid
+import pytest
+from sqlmodel import Session, select
+from models.db_models.table_models import DiceLog
+from models.db_models.test_db import test_engine
+from models.schemas.dicelog_schema import DiceLogCreate
+from repositories import dicelog_writer
+from repositories.dicelog_retention import RetentionEngine, RetentionPolicy
+from repositories.dicelog_writer import DiceLogWriter
+from repositories.sql_dicelog_repository import SqlAlchemyDiceLogRepository
+from repositories.unit_of_work import transaction
+from unittest.mock import Mock
+
+
+@pytest.fixture
+def user_id():
+    """Fixture for a user ID without logs."""
+    return uuid.uuid4().int % 1_000_000_000 + 1_000_000
+
+
+@pytest.fixture
+def writer():
+    """Fixture for a running writer with small batches."""
+    writer = DiceLogWriter(test_engine, batch_size=10, flush_interval=0.05)
+    writer.start()
+    yield writer
+    writer.stop()
+
+
+def make_log(user_id, result=1):
+    """Create a dice log entry."""
+    return DiceLogCreate(
+        user_id=user_id,
+        campaign_id=1,
+        dnd_class_id=1,
+        roll=f"d20: [{result}]",
+        result=result
+    )
+
+
+def stored_results(user_id):
+    """Results of the stored logs of a user, oldest first."""
+    with Session(test_engine) as session:
+        return session.exec(
+            select(DiceLog.result)
+            .where(DiceLog.user_id == user_id)
+            .order_by(DiceLog.id)
+        ).all()
+
+
+def test_logs_written_in_batches(writer, user_id):
+    """Test queued logs are written and readers can wait for them."""
+    flushed_before = dicelog_writer.flushed_total.value
+
+    for result in range(25):
+        assert writer.submit(make_log(user_id, result))
+
+    assert writer.wait_for_user(user_id, timeout=5)
+    assert stored_results(user_id) == list(range(25))
+    assert dicelog_writer.flushed_total.value - flushed_before == 25
+    assert writer.depth() == 0
+
+
+def test_batches_apply_retention(user_id):
+    """Test batches trim the users to their newest logs."""
+    writer = DiceLogWriter(
+        test_engine,
+        batch_size=10,
+        flush_interval=0.05,
+        retention_engine=RetentionEngine(RetentionPolicy(max_per_user=10, trim_every=5))
+    )
+    writer.start()
+    try:
+        for result in range(30):
+            writer.submit(make_log(user_id, result))
+        assert writer.wait_for_user(user_id, timeout=5)
+    finally:
+        writer.stop()
+
+    assert stored_results(user_id) == list(range(20, 30))
+
+
+def test_stop_drains_queue(user_id):
+    """Test stopping the writer writes all queued logs."""
+    writer = DiceLogWriter(test_engine, batch_size=1000, flush_interval=30)
+    writer.start()
+    for result in range(5):
+        writer.submit(make_log(user_id, result))
+
+    writer.stop(timeout=5)
+
+    assert stored_results(user_id) == list(range(5))
+    assert not writer.running
+
+
+def test_submit_rejected_when_full_or_stopped(user_id):
+    """Test submit returns False so the caller writes inline."""
+    writer = DiceLogWriter(test_engine, max_queue_size=1, flush_interval=30)
+    assert not writer.submit(make_log(user_id))
+
+    writer.start()
+    writer._queue.put(make_log(user_id).model_dump())  # Fill the queue
+    try:
+        assert not writer.submit(make_log(user_id))
+        assert writer.wait_for_user(user_id, timeout=0)  # Nothing pending for the rejected log
+    finally:
+        writer.stop(timeout=5)
+
+
+def test_repository_writes_inline_without_writer(user_id):
+    """Test log_roll stores the log right away if no writer runs."""
+    with Session(test_engine) as session, transaction(session):
+        repo = SqlAlchemyDiceLogRepository(session)
+        stored = repo.log_roll(make_log(user_id, 7))
+
+        assert stored.id is not None
+        assert repo.wait_for_pending(user_id)
+    assert stored_results(user_id) == [7]
+
+
+def test_failed_batch_is_retried(user_id):
+    """Test a batch whose write fails once is written on the retry."""
+    engine = Mock(wraps=RetentionEngine(RetentionPolicy()))
+    engine.record.side_effect = [Exception("database is locked"), None]
+    writer = DiceLogWriter(test_engine, retention_engine=engine, retry_delay=0)
+    errors_before = dicelog_writer.flush_errors_total.value
+
+    writer._flush([make_log(user_id, r).model_dump() for r in range(3)])
+
+    assert stored_results(user_id) == [0, 1, 2]
+    assert dicelog_writer.flush_errors_total.value - errors_before == 1
+
+
+def test_bad_row_does_not_lose_the_batch(user_id, caplog):
+    """Test a batch that keeps failing is written row by row
+    and the rows that fail are logged at error level."""
+    rows = [make_log(user_id, r).model_dump() for r in range(3)]
+    rows[1]["roll"] = None  # NOT NULL
+    writer = DiceLogWriter(test_engine, flush_retries=1, retry_delay=0)
+    lost_before = dicelog_writer.lost_total.value
+
+    with caplog.at_level(logging.ERROR, logger=dicelog_writer.__name__):
+        writer._flush(rows)
+
+    assert stored_results(user_id) == [0, 2]
+    assert dicelog_writer.lost_total.value - lost_before == 1
+    assert "Lost DiceLog" in caplog.records[0].getMessage()
+
+
+def test_logs_queued_after_commit(writer, user_id, monkeypatch):
+    """Test log_roll queues the log once the request is committed
+    and drops it on rollback."""
+    monkeypatch.setattr(dicelog_writer, "_writer", writer)
+    with Session(test_engine) as session:
+        with pytest.raises(RuntimeError), transaction(session):
+            SqlAlchemyDiceLogRepository(session).log_roll(make_log(user_id, 1))
+            raise RuntimeError("roll failed")
+
+        with transaction(session):
+            assert SqlAlchemyDiceLogRepository(session).log_roll(make_log(user_id, 2)) is None
+            assert writer.wait_for_user(user_id, timeout=0)  # Nothing queued yet
+
+    assert writer.wait_for_user(user_id, timeout=5)
+    assert stored_results(user_id) == [2]
+
+
+def test_log_written_inline_when_stopped(user_id):
+    """Test log writes right away if the writer stopped
+    between the roll and the commit."""
+    writer = DiceLogWriter(test_engine)
+
+    writer.log(make_log(user_id, 4))
+
+    assert stored_results(user_id) == [4]
@@ -0,0 +1,119 @@
+"""
+test_diceset_queries.py
+
+Query count regression tests: dice set reads load their dices
+eagerly, a page costs the same number of SELECTs at any size.
+"""
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session
+from models.db_models.table_models import Class, Dice, DiceSet, DiceSetDice
+from models.db_models.test_db import test_engine
+from auth.test_helpers import create_test_campaign, create_test_user
+from repositories.sql_diceset_repository import SqlAlchemyDiceSetRepository
+
+
+SELECTS_PER_PAGE = 2  # The sets, then the dices of all sets
+
+
+def make_sets(count):
+    """Store `count` dice sets of one user, campaign and class,
+    each with 2d6 + 1d20. Returns the user, campaign
+    and class ID, the first set ID and the count."""
+    with Session(test_engine) as session:
+        user = create_test_user(session)
+        campaign = create_test_campaign(session, user)
+        dnd_class = Class(
+            name="Query Counter",
+            dnd_class="Cleric",
+            race="Dwarf",
+            campaign_id=campaign.id,
+            user_id=user.id
+        )
+        d6 = Dice(name="count-d6", sides=6)
+        d20 = Dice(name="count-d20", sides=20)
+        session.add_all([dnd_class, d6, d20])
+        session.flush()
+        dicesets = [
+            DiceSet(
+                name=f"Set {number}",
+                dnd_class_id=dnd_class.id,
+                campaign_id=campaign.id,
+                user_id=user.id
+            )
+            for number in range(count)
+        ]
+        session.add_all(dicesets)
+        session.flush()
+        for diceset in dicesets:
+            session.add_all([
+                DiceSetDice(dice_set_id=diceset.id, dice_id=d6.id, quantity=2),
+                DiceSetDice(dice_set_id=diceset.id, dice_id=d20.id, quantity=1),
+            ])
+        session.commit()
+        return user.id, campaign.id, dnd_class.id, dicesets[0].id, count
+
+
+@pytest.fixture(scope="module")
+def small():
+    """Fixture for 3 dice sets."""
+    return make_sets(3)
+
+
+@pytest.fixture(scope="module")
+def large():
+    """Fixture for 40 dice sets."""
+    return make_sets(40)
+
+
+READS = {
+    "list_by_user": lambda repo, ids: repo.list_by_user(ids[0]),
+    "list_by_campaign": lambda repo, ids: repo.list_by_campaign(ids[1]),
+    "list_by_class": lambda repo, ids: repo.list_by_class(ids[2]),
+    "list_all": lambda repo, ids: repo.list_all(limit=ids[4], after_id=ids[3] - 1),
+}
+
+
+def count_selects(read, ids):
+    """Run a read in a fresh session, return
+    the result and the number of SELECTs sent."""
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    with Session(test_engine) as session:
+        repo = SqlAlchemyDiceSetRepository(session)
+        event.listen(test_engine, "before_cursor_execute", before_execute)
+        try:
+            result = read(repo, ids)
+        finally:
+            event.remove(test_engine, "before_cursor_execute", before_execute)
+    return result, len(statements)
+
+
+@pytest.mark.parametrize("name", READS)
+def test_page_costs_constant_selects(name, small, large):
+    """Test a page of 40 sets costs as many SELECTs as a page of 3."""
+    few, few_selects = count_selects(READS[name], small)
+    many, many_selects = count_selects(READS[name], large)
+
+    assert len(few) == 3
+    assert len(many) == 40
+    assert few_selects == many_selects == SELECTS_PER_PAGE
+    assert all(
+        sorted(d.sides for d in diceset.dices) == [6, 20]
+        for diceset in many
+    )
+
+
+def test_get_by_id_costs_constant_selects(large):
+    """Test a single set with its dices costs two SELECTs."""
+    diceset, selects = count_selects(
+        lambda repo, ids: repo.get_by_id(ids[3]),
+        large
+    )
+
+    assert selects == SELECTS_PER_PAGE
+    assert sorted(d.sides for d in diceset.dices) == [6, 6, 20]
@@ -0,0 +1,218 @@
+"""
+test_entity_cache.py
+
+Tests for the read-through entity cache.
+"""
+import pytest
+from datetime import datetime
+from sqlalchemy import event
+from sqlmodel import Session, select
+from models.db_models.table_models import Campaign, Class, User
+from models.db_models.test_db import test_engine
+from models.schemas.campaign_schema import CampaignPublic, CampaignUpdate
+from repositories.cached_repositories import (
+    CachedSqlAlchemyCampaignRepository,
+    CachedSqlAlchemyClassRepository,
+    CachedSqlAlchemyUserRepository
+)
+from repositories.entity_cache import EntityCache, MemoryBackend, RedisBackend, entity_caches
+from repositories.routing_session import RoutingSession
+from repositories.test_cascade_delete import make_campaign, make_user
+from repositories.test_routing_session import engines
+from repositories.unit_of_work import transaction
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Fixture for empty caches."""
+    for cache in entity_caches.values():
+        cache.clear()
+    yield
+
+
+@pytest.fixture
+def session():
+    """Fixture for a test database session."""
+    with Session(test_engine) as session:
+        yield session
+
+
+@pytest.fixture
+def campaign_id(session):
+    """Fixture for a campaign with two classes."""
+    return make_campaign(session, make_user(session))
+
+
+def count_selects(query):
+    """Run a query and count its SELECT statements."""
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(test_engine, "before_cursor_execute", listener)
+    try:
+        result = query()
+    finally:
+        event.remove(test_engine, "before_cursor_execute", listener)
+    return result, sum(s.lstrip().upper().startswith("SELECT") for s in statements)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_backend_lru_and_ttl():
+    """Test the least recently used entry is evicted
+    and entries expire after the TTL."""
+    clock = Clock()
+    evictions = []
+    backend = MemoryBackend(maxsize=2, ttl=10, on_evict=evictions.append, clock=clock)
+    for key in (1, 2):
+        backend.put(key, f"value {key}", backend.generation())
+    backend.get(1)
+    backend.put(3, "value 3", backend.generation())
+
+    assert backend.get(2) is None
+    assert backend.get(1) == "value 1"
+
+    clock.now = 10
+    assert backend.get(1) is None
+    assert evictions == ["evicted", "expired"]
+
+
+def test_memory_backend_skips_stale_put():
+    """Test a value loaded before an invalidation is not stored."""
+    backend = MemoryBackend()
+    generation = backend.generation()
+    backend.delete(1)
+    backend.put(1, "stale", generation)
+
+    assert backend.get(1) is None
+
+
+def test_read_through_caches_get_by_id(campaign_id):
+    """Test the second read of an entity needs no query."""
+    cache = entity_caches[Campaign]
+    hits = cache.hits.value
+
+    def read():
+        with Session(test_engine) as session:
+            return CachedSqlAlchemyCampaignRepository(session).get_by_id(campaign_id)
+
+    first, first_selects = count_selects(read)
+    second, second_selects = count_selects(read)
+
+    assert first_selects == 1
+    assert second_selects == 0
+    assert second == first
+    assert second is not first  # Callers get copies
+    assert cache.hits.value - hits == 1
+
+
+def test_update_invalidates(campaign_id):
+    """Test an update is visible on the next read."""
+    with Session(test_engine) as session:
+        CachedSqlAlchemyCampaignRepository(session).get_by_id(campaign_id)
+
+    with Session(test_engine) as session, transaction(session):
+        CachedSqlAlchemyCampaignRepository(session).update(
+            campaign_id, CampaignUpdate(title="Renamed")
+        )
+
+    with Session(test_engine) as session:
+        campaign = CachedSqlAlchemyCampaignRepository(session).get_by_id(campaign_id)
+    assert campaign.title == "Renamed"
+
+
+def test_uncommitted_changes_are_not_cached(campaign_id):
+    """Test a session that changed a row does not fill the cache."""
+    with pytest.raises(RuntimeError), Session(test_engine) as session, transaction(session):
+        repo = CachedSqlAlchemyCampaignRepository(session)
+        repo.update(campaign_id, CampaignUpdate(title="Rolled back"))
+        assert repo.get_by_id(campaign_id).title == "Rolled back"
+        raise RuntimeError("boom")
+
+    with Session(test_engine) as session:
+        campaign = CachedSqlAlchemyCampaignRepository(session).get_by_id(campaign_id)
+    assert campaign.title != "Rolled back"
+
+
+def test_cascade_invalidates_children(campaign_id):
+    """Test a campaign cascade drops the cached campaign and classes."""
+    with Session(test_engine) as session:
+        class_ids = session.exec(select(Class.id).where(Class.campaign_id == campaign_id)).all()
+        CachedSqlAlchemyCampaignRepository(session).get_by_id(campaign_id)
+        for class_id in class_ids:
+            CachedSqlAlchemyClassRepository(session).get_by_id(class_id)
+
+    with Session(test_engine) as session, transaction(session):
+        CachedSqlAlchemyCampaignRepository(session).delete_cascade(campaign_id)
+
+    with Session(test_engine) as session:
+        assert CachedSqlAlchemyCampaignRepository(session).get_by_id(campaign_id) is None
+        assert all(
+            CachedSqlAlchemyClassRepository(session).get_by_id(class_id) is None
+            for class_id in class_ids
+        )
+
+
+class FakeRedis:
+    """The redis client calls of the backend on a dict."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, pattern):
+        return [key for key in self.data if key.startswith(pattern.rstrip("*"))]
+
+
+def test_miss_is_loaded_from_the_primary(engines):
+    """Test a read-only request does not cache the stale row of a
+    lagging replica (the replica has not seen the rename yet)."""
+    primary, replica = engines
+    for engine, name in ((primary, "renamed"), (replica, "stale")):
+        with Session(engine) as session:
+            session.add(User(user_name=name, email="lag@example.com", hashed_password="x"))
+            session.commit()
+    cache = entity_caches[User]
+
+    try:
+        with RoutingSession(primary, replicas=[replica], use_replica=True) as session:
+            current_user = session.get(User, 1)  # Loaded from the replica
+            assert current_user.user_name == "stale"
+            user = CachedSqlAlchemyUserRepository(session).get_by_id(1)
+            assert not session.wrote
+        assert user.user_name == "renamed"
+        assert cache.get(1).user_name == "renamed"
+    finally:
+        cache.clear()  # Id 1 belongs to the test database elsewhere
+
+
+def test_redis_backend_round_trip():
+    """Test the shared backend stores entities as JSON
+    (timestamps with microseconds, part of the ETags)."""
+    client = FakeRedis()
+    cache = EntityCache("campaign", CampaignPublic, RedisBackend(client, "entity:campaign"))
+    campaign = CampaignPublic(
+        id=7, title="Shared", genre="Fantasy", description="Redis",
+        max_classes=4, created_by=1, created_at=datetime(2025, 1, 1, 12, 30, 5, 250)
+    )
+
+    cache.read_through(Session(), 7, lambda entity_id: campaign)
+    assert "entity:campaign:7" in client.data
+    assert cache.get(7) == campaign
+
+    cache.invalidate(7)
+    assert cache.get(7) is None
@@ -0,0 +1,101 @@
+"""
+test_keyset_pagination.py
+
+Tests for cursor (keyset) pages of the repositories.
+"""
+import uuid
+import pytest
+from datetime import datetime, timedelta
+from sqlmodel import Session
+from models.db_models.table_models import Campaign, DiceLog
+from models.db_models.test_db import test_engine
+from repositories.sql_campaign_repository import SqlAlchemyCampaignRepository
+from repositories.sql_dicelog_repository import SqlAlchemyDiceLogRepository
+
+
+@pytest.fixture
+def session():
+    """Fixture for a test database session."""
+    with Session(test_engine) as session:
+        yield session
+
+
+@pytest.fixture
+def user_id():
+    """Fixture for a user ID without logs."""
+    return uuid.uuid4().int % 1_000_000_000 + 1_000_000
+
+
+def add_log(session, user_id, result, timestamp):
+    session.add(DiceLog(
+        user_id=user_id,
+        campaign_id=1,
+        dnd_class_id=1,
+        roll=f"d20: [{result}]",
+        result=result,
+        timestamp=timestamp
+    ))
+    session.commit()
+
+
+def walk_logs(repo, user_id, limit):
+    """Read all pages with cursors, yield the pages."""
+    before = None
+    while True:
+        page = repo.list_logs(user_id, limit=limit, before=before)
+        yield page
+        if len(page) < limit:
+            return
+        before = (page[-1].timestamp, page[-1].id)
+
+
+def test_log_pages_follow_timestamp_and_id(session, user_id):
+    """Test cursor pages return all logs newest first,
+    logs with the same timestamp are ordered by ID."""
+    start = datetime(2025, 1, 1)
+    for result in range(7):
+        # Pairs of logs share a timestamp
+        add_log(session, user_id, result, start + timedelta(seconds=result // 2))
+    repo = SqlAlchemyDiceLogRepository(session)
+
+    pages = list(walk_logs(repo, user_id, limit=3))
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    results = [log.result for page in pages for log in page]
+    assert results == [6, 5, 4, 3, 2, 1, 0]
+
+
+def test_log_pages_stable_while_rolling(session, user_id):
+    """Test new logs do not shift the following pages."""
+    start = datetime(2025, 1, 1)
+    for result in range(6):
+        add_log(session, user_id, result, start + timedelta(seconds=result))
+    repo = SqlAlchemyDiceLogRepository(session)
+    pages = walk_logs(repo, user_id, limit=3)
+
+    first = next(pages)
+    add_log(session, user_id, 99, start + timedelta(hours=1))
+    second = next(pages)
+
+    assert [log.result for log in first] == [5, 4, 3]
+    assert [log.result for log in second] == [2, 1, 0]
+
+
+def test_list_all_after_id(session, user_id):
+    """Test ID cursors continue after the last campaign."""
+    for number in range(5):
+        session.add(Campaign(
+            title=f"Keyset {number}",
+            genre="Fantasy",
+            description="Keyset test",
+            max_classes=4,
+            created_by=user_id
+        ))
+    session.commit()
+    repo = SqlAlchemyCampaignRepository(session)
+
+    first = repo.list_all(limit=2, user_id=user_id)
+    rest = repo.list_all(limit=10, user_id=user_id, after_id=first[-1].id)
+
+    titles = [c.title for c in first + rest]
+    assert titles == [f"Keyset {number}" for number in range(5)]
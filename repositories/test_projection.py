@@ -0,0 +1,125 @@
+"""
+test_projection.py
+
+Tests for the column projections of the list endpoints.
+"""
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session, select
+from auth.test_helpers import get_test_token
+from dependencies import ClassQueryParams, select_fields
+from main import app
+from models.db_models.table_models import Class
+from models.db_models.test_db import test_engine
+from models.schemas.class_schema import CLASS_FIELDS, CLASS_LARGE_FIELDS
+from rate_limit import limiter
+from repositories.sql_class_repository import SqlAlchemyClassRepository
+from repositories.test_cascade_delete import make_campaign, make_user
+
+
+@pytest.fixture
+def owner():
+    """Fixture for a user with a campaign of two classes."""
+    with Session(test_engine) as session:
+        user = make_user(session)
+        campaign_id = make_campaign(session, user)
+        for dnd_class in session.exec(select(Class).where(Class.campaign_id == campaign_id)):
+            dnd_class.notes = "Long notes " * 100
+            dnd_class.inventory = "Rope, torch"
+        session.commit()
+        session.refresh(user)
+        return user, campaign_id
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Fixture for the app with tokens and without rate limits."""
+    monkeypatch.setattr("auth.auth.ALGORITHM", "HS256")
+    monkeypatch.setattr(limiter, "enabled", False)
+    return TestClient(app)
+
+
+def selects(query):
+    """Run a query and return its SELECT statements."""
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(test_engine, "before_cursor_execute", listener)
+    try:
+        result = query()
+    finally:
+        event.remove(test_engine, "before_cursor_execute", listener)
+    return result, [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+
+
+@pytest.mark.parametrize("view, fields, expected", [
+    ("summary", None, ("name", "dnd_class", "race", "id", "user_id", "created_at", "version")),
+    ("full", None, CLASS_FIELDS),
+    ("summary", "notes, name", ("name", "id", "notes")),
+    ("full", "id", ("id",)),
+])
+def test_select_fields(view, fields, expected):
+    """Test view and fields pick the fields in model order."""
+    assert select_fields(view, fields, CLASS_FIELDS, CLASS_LARGE_FIELDS) == expected
+
+
+def test_unknown_fields_are_rejected():
+    """Test fields that are no model fields are a 400."""
+    with pytest.raises(HTTPException) as exc_info:
+        ClassQueryParams(fields="name,hashed_password")
+    assert exc_info.value.status_code == 400
+
+
+def test_summary_does_not_read_large_columns(owner):
+    """Test the summary selects neither texts nor JSON."""
+    _, campaign_id = owner
+    fields = ClassQueryParams().fields
+    with Session(test_engine) as session:
+        repo = SqlAlchemyClassRepository(session)
+        classes, statements = selects(
+            lambda: repo.list_all(campaign_id=campaign_id, fields=fields)
+        )
+
+    assert len(classes) == 2
+    assert all(c.notes is None and c.skills is None for c in classes)
+    assert classes[0].model_fields_set == set(fields)
+    for column in ("notes", "inventory", "skills"):
+        assert f"dnd_class.{column}" not in statements[0]
+
+
+def test_list_by_campaign_projection(owner):
+    """Test list_by_campaign selects the given columns only."""
+    _, campaign_id = owner
+    with Session(test_engine) as session:
+        repo = SqlAlchemyClassRepository(session)
+        ids = repo.list_by_campaign(campaign_id, fields=("id",))
+        full = repo.list_by_campaign(campaign_id)
+
+    assert [c.id for c in ids] == [c.id for c in full]
+    assert ids[0].model_fields_set == {"id"}
+    assert full[0].notes.startswith("Long notes")
+
+
+def test_list_endpoints_views(client, owner):
+    """Test the list responses of each view."""
+    user, campaign_id = owner
+    headers = {"Authorization": f"Bearer {get_test_token(user)}"}
+
+    def first(url, **params):
+        response = client.get(url, headers=headers, params=params)
+        assert response.status_code == 200
+        return response.json()[0]
+
+    assert "description" not in first("/campaigns/")
+    assert first("/campaigns/", view="full")["description"] == "Cascade test"
+
+    summary = first("/classes/", campaign_id=campaign_id)
+    assert set(summary) == {"id", "name", "dnd_class", "race", "user_id", "created_at", "version"}
+    full = first("/classes/", campaign_id=campaign_id, view="full")
+    assert full["notes"].startswith("Long notes")
+    assert full["skills"]["Strength"] == 0
+    assert first("/classes/", campaign_id=campaign_id, fields="name,inventory") == {
+        "name": "Class 0", "id": summary["id"], "inventory": "Rope, torch"
+    }
+    assert client.get("/classes/", headers=headers, params={"fields": "secret"}).status_code == 400
@@ -0,0 +1,79 @@
+"""
+test_query_indexes.py
+
+EXPLAIN QUERY PLAN checks: every listing and cascade
+query of the repositories is answered with an index.
+"""
+import pytest
+from datetime import datetime
+from sqlalchemy import event
+from sqlmodel import Session
+from models.db_models.test_db import test_engine
+from repositories.dicelog_retention import _trim_scope
+from models.db_models.table_models import DiceLog
+from repositories.sql_campaign_repository import SqlAlchemyCampaignRepository
+from repositories.sql_class_repository import SqlAlchemyClassRepository
+from repositories.sql_dicelog_repository import SqlAlchemyDiceLogRepository
+from repositories.sql_diceset_repository import SqlAlchemyDiceSetRepository
+
+
+QUERIES = {
+    "dicelog.list_logs": lambda s: SqlAlchemyDiceLogRepository(s).list_logs(1),
+    "dicelog.list_logs_cursor": lambda s: SqlAlchemyDiceLogRepository(s).list_logs(1, before=(datetime(2025, 1, 1), 10)),
+    "dicelog.list_by_user": lambda s: SqlAlchemyDiceLogRepository(s).list_by_user(1),
+    "dicelog.list_by_campaign": lambda s: SqlAlchemyDiceLogRepository(s).list_by_campaign(1),
+    "dicelog.list_by_class": lambda s: SqlAlchemyDiceLogRepository(s).list_by_class(1),
+    "dicelog.list_recent_by_campaign": lambda s: SqlAlchemyDiceLogRepository(s).list_recent_by_campaign(1, 1),
+    "dicelog.list_by_diceset": lambda s: SqlAlchemyDiceLogRepository(s).list_by_diceset(1),
+    "dicelog.trim_user": lambda s: _trim_scope(s, DiceLog.user_id, 1, 10),
+    "dicelog.trim_campaign": lambda s: _trim_scope(s, DiceLog.campaign_id, 1, 10),
+    "diceset.list_by_user": lambda s: SqlAlchemyDiceSetRepository(s).list_by_user(1),
+    "diceset.list_by_campaign": lambda s: SqlAlchemyDiceSetRepository(s).list_by_campaign(1),
+    "diceset.list_by_class": lambda s: SqlAlchemyDiceSetRepository(s).list_by_class(1),
+    "diceset.list_by_classes": lambda s: SqlAlchemyDiceSetRepository(s).list_by_classes([1, 2], 20),
+    "class.list_by_campaign": lambda s: SqlAlchemyClassRepository(s).list_by_campaign(1),
+    "class.list_by_user": lambda s: SqlAlchemyClassRepository(s).list_by_user(1),
+    "campaign.list_by_user": lambda s: SqlAlchemyCampaignRepository(s).list_by_user(1),
+}
+
+
+def capture_statements(query):
+    """Run a repository query (rolled back) and
+    return the executed SQL with its parameters."""
+    statements = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(test_engine, "before_cursor_execute", listener)
+    try:
+        with Session(test_engine) as session:
+            query(session)
+            session.rollback()
+    finally:
+        event.remove(test_engine, "before_cursor_execute", listener)
+    return statements
+
+
+def query_plan(statement, parameters):
+    """The EXPLAIN QUERY PLAN details of a statement."""
+    with test_engine.connect() as connection:
+        rows = connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        ).all()
+    return [row[-1] for row in rows]
+
+
+@pytest.mark.parametrize("name", QUERIES)
+def test_repository_query_uses_index(name):
+    """Test no query scans a table or sorts in a temp b-tree."""
+    statements = capture_statements(QUERIES[name])
+    assert statements
+
+    for statement, parameters in statements:
+        plan = query_plan(statement, parameters)
+        full_scans = [
+            step for step in plan
+            if step.startswith("SCAN") or "TEMP B-TREE" in step
+        ]
+        assert not full_scans, f"{name}: {statement}\n{plan}"
@@ -0,0 +1,149 @@
+"""
+test_roll_plan_cache.py
+
+Tests for the roll plan cache of the SQL dice set repository.
+"""
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session
+from models.db_models.table_models import Campaign, Class, Dice, DiceSet, DiceSetDice, User
+from models.db_models.test_db import test_engine
+from models.schemas.diceset_schema import DiceSetUpdate
+from auth.test_helpers import create_test_campaign, create_test_user
+from repositories.roll_plan_cache import RollPlan, RollPlanCache, RollPlanEntry, roll_plan_cache
+from repositories.routing_session import RoutingSession
+from repositories.sql_diceset_repository import SqlAlchemyDiceSetRepository
+from repositories.test_routing_session import engines
+
+
+@pytest.fixture
+def session():
+    """Fixture for a test database session."""
+    with Session(test_engine) as session:
+        yield session
+    roll_plan_cache.clear()
+
+
+@pytest.fixture
+def diceset(session):
+    """Fixture for a stored dice set with 2d6 + 1d20."""
+    user = create_test_user(session)
+    campaign = create_test_campaign(session, user)
+    dnd_class = Class(
+        name="Plan Tester",
+        dnd_class="Rogue",
+        campaign_id=campaign.id,
+        user_id=user.id
+    )
+    d6 = Dice(name="plan-d6", sides=6)
+    d20 = Dice(name="plan-d20", sides=20)
+    session.add_all([dnd_class, d6, d20])
+    session.commit()
+
+    db_diceset = DiceSet(
+        name="Plan Set",
+        dnd_class_id=dnd_class.id,
+        campaign_id=campaign.id,
+        user_id=user.id
+    )
+    session.add(db_diceset)
+    session.commit()
+    repo = SqlAlchemyDiceSetRepository(session)
+    repo.set_dice_quantities(db_diceset.id, {d6.id: 2, d20.id: 1})
+    return db_diceset, d6, d20
+
+
+def count_selects(session, func):
+    """Run func and count the SELECT statements it sends."""
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        result = func()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+    return result, len(statements)
+
+
+def test_plan_cached_after_first_load(session, diceset):
+    """Test the first plan costs one SELECT and repeats cost none."""
+    db_diceset, d6, d20 = diceset
+    diceset_id = db_diceset.id
+    repo = SqlAlchemyDiceSetRepository(session)
+    session.expire_all()
+
+    plan, first = count_selects(session, lambda: repo.get_roll_plan(diceset_id))
+    again, second = count_selects(session, lambda: repo.get_roll_plan(diceset_id))
+
+    assert first == 1
+    assert second == 0
+    assert again is plan
+    assert plan.name == "Plan Set"
+    assert plan.dice == ((6, 2), (20, 1))
+
+
+def test_plan_invalidated_by_writes(session, diceset):
+    """Test quantity changes, updates and deletes drop the plan."""
+    db_diceset, d6, d20 = diceset
+    repo = SqlAlchemyDiceSetRepository(session)
+    repo.get_roll_plan(db_diceset.id)
+
+    repo.set_dice_quantities(db_diceset.id, {d20.id: 3})
+    assert repo.get_roll_plan(db_diceset.id).dice == ((20, 3),)
+
+    repo.update(db_diceset.id, DiceSetUpdate(name="Renamed"))
+    assert repo.get_roll_plan(db_diceset.id).name == "Renamed"
+
+    repo.delete(db_diceset.id)
+    assert repo.get_roll_plan(db_diceset.id) is None
+
+
+def test_stale_plan_not_stored():
+    """Test a plan loaded before an invalidation is not cached."""
+    cache = RollPlanCache()
+    generation = cache.generation()
+    cache.invalidate(1)
+
+    cache.put(RollPlan.build(1, "Old", 1, (RollPlanEntry(1, "d6", 6, 1),)), generation)
+
+    assert cache.get(1) is None
+
+
+def test_cache_evicts_least_recently_used():
+    """Test the cache keeps at most maxsize plans."""
+    cache = RollPlanCache(maxsize=2)
+    for diceset_id in (1, 2, 3):
+        cache.put(RollPlan.build(diceset_id, "Set", 1, ()), cache.generation())
+
+    assert cache.get(1) is None
+    assert cache.get(3) is not None
+    assert len(cache) == 2
+
+
+def test_miss_is_read_from_the_primary(engines):
+    """Test a read-only request (GET /dicesets/{id}/distribution)
+    does not cache the outdated plan of a lagging replica."""
+    primary, replica = engines
+    for engine, name, quantity in ((primary, "Renamed", 3), (replica, "Stale", 1)):
+        with Session(engine) as session:
+            session.add(User(user_name="lag", email="lag@example.com", hashed_password="x"))
+            session.add(Campaign(title="Lag", genre="Fantasy", description="Replica lag",
+                                 max_classes=4, created_by=1))
+            session.add(Class(name="Lag", dnd_class="Rogue", campaign_id=1, user_id=1))
+            session.add(Dice(name="lag-d6", sides=6))
+            session.add(DiceSet(name=name, dnd_class_id=1, campaign_id=1, user_id=1))
+            session.add(DiceSetDice(dice_set_id=1, dice_id=1, quantity=quantity))
+            session.commit()
+
+    try:
+        with RoutingSession(primary, replicas=[replica], use_replica=True) as session:
+            plan = SqlAlchemyDiceSetRepository(session).get_roll_plan(1)
+        assert plan.name == "Renamed"
+        assert roll_plan_cache.get(1).entries[0].quantity == 3
+    finally:
+        roll_plan_cache.clear()  # Id 1 belongs to the test database elsewhere
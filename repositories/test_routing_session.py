@@ -0,0 +1,149 @@
+"""
+test_routing_session.py
+
+Tests for the read/write routing, with two SQLite
+files standing in for primary and replica.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+from sqlmodel import Session, select
+import dependencies
+from dependencies import PRIMARY_COOKIE, SessionDep, create_db_engine, stick_to_primary
+from migrations import migrate
+from models.db_models.table_models import User
+from repositories.routing_session import RoutingSession, read_from_primary
+
+
+@pytest.fixture
+def engines(tmp_path):
+    """Fixture for a migrated primary and replica database."""
+    primary = create_db_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_db_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        migrate(engine)
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def user_names(session):
+    return session.exec(select(User.user_name)).all()
+
+
+def add_user(session, name):
+    session.add(User(user_name=name, email=f"{name}@example.com", hashed_password="x"))
+
+
+def test_reads_go_to_replica(engines):
+    """Test a read-only session reads the replica, others the primary."""
+    primary, replica = engines
+    with Session(primary) as session:
+        add_user(session, "alice")
+        session.commit()
+
+    with RoutingSession(primary, replicas=[replica], use_replica=True) as session:
+        assert user_names(session) == []
+    with RoutingSession(primary, replicas=[replica]) as session:
+        assert user_names(session) == ["alice"]
+
+
+def test_first_write_sticks_to_primary(engines):
+    """Test writes go to the primary and later reads follow."""
+    primary, replica = engines
+    writes = []
+
+    with RoutingSession(
+            primary,
+            replicas=[replica],
+            use_replica=True,
+            on_write=lambda: writes.append(1)) as session:
+        add_user(session, "bob")
+        session.flush()
+        add_user(session, "carol")
+        session.flush()
+        assert user_names(session) == ["bob", "carol"]
+        session.commit()
+
+    assert writes == [1]
+    with Session(primary) as session:
+        assert user_names(session) == ["bob", "carol"]
+    with Session(replica) as session:
+        assert user_names(session) == []
+
+
+def test_read_from_primary(engines):
+    """Test the read-your-writes switch."""
+    primary, replica = engines
+    with Session(primary) as session:
+        add_user(session, "dave")
+        session.commit()
+
+    with RoutingSession(primary, replicas=[replica], use_replica=True) as session:
+        read_from_primary(session)
+        assert user_names(session) == ["dave"]
+        assert not session.wrote
+
+
+@pytest.fixture
+def routing_app(engines, monkeypatch):
+    """Fixture for an app on primary and replica with a count
+    (read) and a create (write) endpoint."""
+    primary, replica = engines
+    monkeypatch.setattr(dependencies, "engine", primary)
+    monkeypatch.setattr(dependencies, "replica_engines", [replica])
+    monkeypatch.setattr(dependencies, "DATABASE_REPLICA_URLS", ["sqlite:///replica.db"])
+
+    app = FastAPI()
+    app.middleware("http")(stick_to_primary)
+
+    @app.get("/count")
+    def count(session: SessionDep):
+        return count_users(session)
+
+    @app.post("/users")
+    def create(session: SessionDep):
+        add_user(session, f"erin_{count_users(session)}")
+        session.flush()
+        return "ok"
+
+    return app
+
+
+def count_users(session):
+    return session.exec(select(func.count()).select_from(User)).one()
+
+
+def test_requests_stick_to_primary_after_write(routing_app):
+    """Test GET requests read the replica until the client wrote."""
+    client = TestClient(routing_app)
+    assert client.get("/count").json() == 0
+
+    response = client.post("/users")
+    assert PRIMARY_COOKIE in response.cookies
+
+    assert client.get("/count").json() == 1  # Cookie: primary
+    assert TestClient(routing_app).get("/count").json() == 0  # Other client: replica
+    assert PRIMARY_COOKIE not in client.get("/count").cookies  # Reads set no cookie
+
+
+def test_write_is_committed_before_the_response(routing_app, engines):
+    """Test the response of a write (and its cookie) is sent after the
+    commit: an immediate read of the client sees the new data."""
+    primary, _ = engines
+    committed = []
+
+    @routing_app.middleware("http")
+    async def check_committed(request, call_next):
+        response = await call_next(request)  # Returns when the response starts
+        if request.method == "POST":
+            with Session(primary) as other:
+                committed.append(count_users(other))
+        return response
+
+    client = TestClient(routing_app)
+    for expected in (1, 2):
+        assert PRIMARY_COOKIE in client.post("/users").cookies
+        assert committed[-1] == expected
+        assert client.get("/count").json() == expected
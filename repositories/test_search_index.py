@@ -0,0 +1,148 @@
+"""
+test_search_index.py
+
+Tests for the name filters and ranked searches on the search indexes.
+"""
+import uuid
+from unittest.mock import Mock
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session, select
+from auth.test_helpers import get_test_token
+from main import app
+from models.db_models.table_models import Campaign, Class, User
+from models.db_models.test_db import test_engine
+from rate_limit import limiter
+from repositories.search_index import search
+from repositories.sql_campaign_repository import SqlAlchemyCampaignRepository
+from repositories.sql_class_repository import SqlAlchemyClassRepository
+from repositories.sql_user_repository import SqlAlchemyUserRepository
+from repositories.test_cascade_delete import add, make_user
+from repositories.test_projection import selects
+
+
+TITLES = ["Tomb of Horrors", "Curse of Strahd", "Horror on the Orient Express", "Horrors"]
+
+
+@pytest.fixture
+def owner():
+    """Fixture for a user with four campaigns and a class."""
+    with Session(test_engine) as session:
+        user = make_user(session)
+        campaigns = [
+            add(session, Campaign(
+                title=title, genre="Horror", description="Long story " * 50,
+                max_classes=4, created_by=user.id
+            )) for title in TITLES
+        ]
+        add(session, Class(
+            name=f"Strahd von {user.user_name}", dnd_class="Wizard",
+            race="Human", user_id=user.id, campaign_id=campaigns[0].id
+        ))
+        session.refresh(user)
+        return user
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Fixture for the app with tokens and without rate limits."""
+    monkeypatch.setattr("auth.auth.ALGORITHM", "HS256")
+    monkeypatch.setattr(limiter, "enabled", False)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("name", ["horror", "HORR", "of", "S", "x-not-there"])
+def test_name_filter_finds_the_ilike_rows(owner, name):
+    """Test the name filter on the index finds the rows ILIKE finds."""
+    with Session(test_engine) as session:
+        expected = session.exec(
+            select(Campaign.id)
+            .where(Campaign.created_by == owner.id, Campaign.title.ilike(f"%{name}%"))
+            .order_by(Campaign.id)
+        ).all()
+        campaigns, statements = selects(
+            lambda: SqlAlchemyCampaignRepository(session).list_all(name=name, user_id=owner.id)
+        )
+
+    assert [c.id for c in campaigns] == expected
+    assert "campaign_search" in statements[0]
+
+
+def test_search_is_ranked(owner):
+    """Test matches are ranked and limited to the user."""
+    with Session(test_engine) as session:
+        repo = SqlAlchemyCampaignRepository(session)
+        found = repo.search("horror", user_id=owner.id)
+        short = repo.search("of", user_id=owner.id)
+        others = repo.search("horror", user_id=owner.id + 1000)
+
+    assert [c.title for c in found] == ["Horrors", "Tomb of Horrors", "Horror on the Orient Express"]
+    assert found[0].model_fields_set == {"id", "title", "genre", "max_classes", "created_by",
+                                         "created_at", "version"}
+    assert [c.title for c in short] == ["Tomb of Horrors", "Curse of Strahd"]
+    assert others == []
+
+
+def test_prefix_search(owner):
+    """Test prefix search finds the names starting with the text, shortest first."""
+    with Session(test_engine) as session:
+        campaigns = SqlAlchemyCampaignRepository(session).search(
+            "hor", prefix=True, user_id=owner.id
+        )
+        users = SqlAlchemyUserRepository(session).search(owner.user_name[:-1], prefix=True)
+        classes = SqlAlchemyClassRepository(session).search(
+            "strahd", user_id=owner.id
+        )
+
+    assert [c.title for c in campaigns] == ["Horrors", "Horror on the Orient Express"]
+    assert [u.id for u in users] == [owner.id]
+    assert [c.name for c in classes] == [f"Strahd von {owner.user_name}"]
+
+
+def test_index_follows_changes(owner):
+    """Test renamed and deleted rows are found by their new names only."""
+    with Session(test_engine) as session:
+        campaign = session.exec(
+            select(Campaign).where(Campaign.created_by == owner.id, Campaign.title == "Horrors")
+        ).one()
+        marker = uuid.uuid4().hex
+        campaign.title = f"Lost Mine {marker}"
+        session.commit()
+        repo = SqlAlchemyCampaignRepository(session)
+        assert [c.id for c in repo.search(marker)] == [campaign.id]
+        assert "Horrors" not in [c.title for c in repo.search("horrors", user_id=owner.id)]
+
+        session.delete(campaign)
+        session.commit()
+        assert repo.search(marker) == []
+
+
+def test_postgresql_uses_trigram_similarity():
+    """Test PostgreSQL searches ILIKE (pg_trgm index), ranked by similarity."""
+    session = Mock()
+    session.get_bind.return_value.dialect.name = "postgresql"
+    sql = str(search(session, select(User), User, "gand").compile(dialect=postgresql.dialect()))
+
+    assert "ILIKE" in sql
+    assert "similarity(\"user\".user_name" in sql
+
+
+def test_search_endpoints(client, owner):
+    """Test the search endpoints return the user's ranked matches."""
+    headers = {"Authorization": f"Bearer {get_test_token(owner)}"}
+
+    response = client.get("/campaigns/search", headers=headers, params={"q": "horror"})
+    assert response.status_code == 200
+    assert [c["title"] for c in response.json()][0] == "Horrors"
+    assert "description" not in response.json()[0]
+
+    response = client.get("/classes/search", headers=headers,
+                          params={"q": "strahd", "prefix": True})
+    assert [c["name"] for c in response.json()] == [f"Strahd von {owner.user_name}"]
+
+    response = client.get("/users/search", headers=headers,
+                          params={"q": owner.user_name, "limit": 1})
+    assert response.json()[0]["id"] == owner.id
+
+    assert client.get("/users/search", headers=headers).status_code == 422
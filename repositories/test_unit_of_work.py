@@ -0,0 +1,176 @@
+"""
+test_unit_of_work.py
+
+Tests for the one-transaction-per-request session handling.
+"""
+import uuid
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, select
+from fastapi.testclient import TestClient
+from main import app
+from models.db_models.table_models import Class, Dice, DiceSet, User
+from models.db_models.test_db import get_session, test_engine
+from models.schemas.diceset_schema import DiceSetCreate
+from auth.test_helpers import create_test_campaign, create_test_user
+from repositories.sql_dice_repository import SqlAlchemyDiceRepository
+from repositories.sql_dicelog_repository import SqlAlchemyDiceLogRepository
+from repositories.sql_diceset_repository import SqlAlchemyDiceSetRepository
+from rate_limit import limiter
+from repositories.unit_of_work import after_commit, commit_now, savepoint, transaction
+from services.diceset.diceset_service import DiceSetService
+
+
+@pytest.fixture
+def session():
+    """Fixture for a test database session."""
+    with Session(test_engine) as session:
+        yield session
+
+
+@pytest.fixture
+def commits():
+    """Fixture counting the committed database transactions."""
+    counted = []
+    listener = lambda conn: counted.append(conn)
+    event.listen(test_engine, "commit", listener)
+    yield counted
+    event.remove(test_engine, "commit", listener)
+
+
+def test_create_diceset_commits_once(session, commits):
+    """Test creating a dice set with dices is one transaction."""
+    user = create_test_user(session)
+    campaign = create_test_campaign(session, user)
+    dnd_class = Class(
+        name="Unit of Work",
+        dnd_class="Wizard",
+        race="Gnome",
+        campaign_id=campaign.id,
+        user_id=user.id
+    )
+    session.add(dnd_class)
+    session.commit()
+    d6 = session.exec(select(Dice).where(Dice.sides == 6)).first() \
+        or Dice(name="d6", sides=6)
+    session.add(d6)
+    session.commit()
+    payload = DiceSetCreate(
+        name="Fireball",
+        dnd_class_id=dnd_class.id,
+        campaign_id=campaign.id,
+        dice_ids=[d6.id, d6.id]
+    )
+    payload.set_user(user.id)
+    commits.clear()
+
+    with transaction(session):
+        service = DiceSetService(
+            SqlAlchemyDiceRepository(session),
+            SqlAlchemyDiceSetRepository(session),
+            SqlAlchemyDiceLogRepository(session)
+        )
+        created = service.create_diceset(payload)
+
+    assert len(commits) == 1
+    assert [d.sides for d in created.dices] == [6, 6]
+
+
+def test_error_rolls_back_the_request(session):
+    """Test nothing of a failed unit of work is stored."""
+    name = f"rollback_{uuid.uuid4().hex[:8]}"
+
+    with pytest.raises(RuntimeError), transaction(session):
+        session.add(User(user_name=name, email=f"{name}@example.com", hashed_password="x"))
+        session.flush()
+        raise RuntimeError("boom")
+
+    assert session.exec(select(User).where(User.user_name == name)).first() is None
+
+
+def test_after_commit_runs_on_commit_only(session):
+    """Test callbacks wait for the commit and are dropped on rollback."""
+    called = []
+
+    with transaction(session):
+        after_commit(session, lambda: called.append("committed"))
+        assert called == []
+    assert called == ["committed"]
+
+    with pytest.raises(RuntimeError), transaction(session):
+        after_commit(session, lambda: called.append("rolled back"))
+        raise RuntimeError("boom")
+    session.commit()
+    assert called == ["committed"]
+
+
+def test_savepoint_rolls_back_only_its_part(session):
+    """Test a rolled back savepoint drops its writes and callbacks,
+    the rest of the unit of work is committed."""
+    kept, dropped = (f"savepoint_{uuid.uuid4().hex[:8]}" for _ in range(2))
+    called = []
+
+    with transaction(session):
+        with savepoint(session):
+            session.add(User(user_name=kept, email=f"{kept}@example.com", hashed_password="x"))
+            after_commit(session, lambda: called.append(kept))
+        with pytest.raises(RuntimeError), savepoint(session):
+            session.add(User(user_name=dropped, email=f"{dropped}@example.com", hashed_password="x"))
+            after_commit(session, lambda: called.append(dropped))
+            session.flush()
+            raise RuntimeError("boom")
+
+    assert called == [kept]
+    with Session(test_engine) as other:
+        names = other.exec(select(User.user_name).where(User.user_name.in_([kept, dropped]))).all()
+        assert names == [kept]
+
+
+def test_commit_now_is_visible_to_other_sessions(session):
+    """Test the escape hatch commits before the unit of work ends."""
+    name = f"early_{uuid.uuid4().hex[:8]}"
+
+    with transaction(session):
+        session.add(User(user_name=name, email=f"{name}@example.com", hashed_password="x"))
+        commit_now(session, "test")
+        with Session(test_engine) as other:
+            assert other.exec(select(User).where(User.user_name == name)).first()
+
+
+def test_request_commits_before_response():
+    """Test the data of a request is committed once the response is sent."""
+    name = f"uow_{uuid.uuid4().hex[:8]}"
+
+    response = TestClient(app).post("/auth/register", json={
+        "user_name": name,
+        "email": f"{name}@example.com",
+        "password": "password123"
+    })
+
+    assert response.status_code == 200
+    with Session(test_engine) as other:
+        assert other.exec(select(User).where(User.user_name == name)).first()
+
+
+def test_failed_commit_is_a_server_error(monkeypatch):
+    """Test a request whose commit fails answers 500 (the commit
+    runs before the response is sent) and stores nothing."""
+    monkeypatch.setattr(limiter, "enabled", False)
+    name = f"uow_{uuid.uuid4().hex[:8]}"
+
+    def fail(session):
+        raise RuntimeError("commit failed")
+
+    event.listen(Session, "before_commit", fail)
+    try:
+        response = TestClient(app, raise_server_exceptions=False).post("/auth/register", json={
+            "user_name": name,
+            "email": f"{name}@example.com",
+            "password": "password123"
+        })
+    finally:
+        event.remove(Session, "before_commit", fail)
+
+    assert response.status_code == 500
+    with Session(test_engine) as other:
+        assert other.exec(select(User).where(User.user_name == name)).first() is None
@@ -0,0 +1,138 @@
+"""
+test_version_cache.py
+
+Tests for the row versions and their cache.
+"""
+import pytest
+from sqlmodel import Session, select
+from models.db_models.table_models import Campaign, DiceSet, User
+from models.db_models.test_db import test_engine
+from models.schemas.campaign_schema import CampaignUpdate
+from models.schemas.diceset_schema import DiceSetUpdate
+from repositories.sql_campaign_repository import SqlAlchemyCampaignRepository
+from repositories.sql_diceset_repository import SqlAlchemyDiceSetRepository
+from repositories.test_cascade_delete import make_campaign, make_user
+from repositories.test_entity_cache import count_selects
+from repositories.unit_of_work import transaction
+from repositories.routing_session import RoutingSession
+from repositories.test_routing_session import engines
+from repositories.version_cache import (
+    ResourceVersion,
+    lookup,
+    lookup_roll_seed,
+    roll_seed_cache,
+    version_caches
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Fixture for empty caches."""
+    for backend in (*version_caches.values(), roll_seed_cache):
+        backend.clear()
+    yield
+
+
+@pytest.fixture
+def user_id():
+    """Fixture for a test user."""
+    with Session(test_engine) as session:
+        return make_user(session).id
+
+
+@pytest.fixture
+def campaign_id(user_id):
+    """Fixture for a campaign with classes and dice sets."""
+    with Session(test_engine) as session:
+        return make_campaign(session, session.get(User, user_id))
+
+
+def version_of(model, row_id):
+    with Session(test_engine) as session:
+        return lookup(session, model, row_id)
+
+
+def test_update_bumps_version(campaign_id, user_id):
+    """Test each update counts up and an unchanged write does not."""
+    version = version_of(Campaign, campaign_id)
+    assert version == ResourceVersion(1, user_id, version.created_at)
+    assert version.created_at is not None
+
+    for title in ("First", "Second"):
+        with Session(test_engine) as session, transaction(session):
+            campaign = SqlAlchemyCampaignRepository(session).update(
+                campaign_id, CampaignUpdate(title=title)
+            )
+    assert campaign.version == 3
+    assert version_of(Campaign, campaign_id).version == 3
+
+    with Session(test_engine) as session, transaction(session):
+        session.add(session.get(Campaign, campaign_id))
+    assert version_of(Campaign, campaign_id).version == 3
+
+
+def test_dice_change_bumps_diceset(campaign_id):
+    """Test replacing the dices of a set is a new version."""
+    with Session(test_engine) as session:
+        diceset_id = session.exec(
+            select(DiceSet.id).where(DiceSet.campaign_id == campaign_id)
+        ).first()
+
+    with Session(test_engine) as session, transaction(session):
+        diceset = SqlAlchemyDiceSetRepository(session).update(
+            diceset_id, DiceSetUpdate(name="Renamed", dice_ids=[1, 1, 3])
+        )
+    assert diceset.version == 2
+
+    with Session(test_engine) as session, transaction(session):
+        SqlAlchemyDiceSetRepository(session).set_dice_quantities(diceset_id, {2: 2})
+    assert version_of(DiceSet, diceset_id).version == 3
+
+
+def test_lookup_is_cached(campaign_id):
+    """Test a repeated lookup needs no query and an update drops it."""
+    first, first_selects = count_selects(lambda: version_of(Campaign, campaign_id))
+    second, second_selects = count_selects(lambda: version_of(Campaign, campaign_id))
+    assert (first_selects, second_selects) == (1, 0)
+    assert second == first
+
+    with Session(test_engine) as session, transaction(session):
+        SqlAlchemyCampaignRepository(session).update(
+            campaign_id, CampaignUpdate(title="Changed")
+        )
+    assert version_of(Campaign, campaign_id).version == 2
+
+
+def test_cascade_drops_versions(campaign_id):
+    """Test deleted rows are no longer answered from the cache."""
+    assert version_of(Campaign, campaign_id) is not None
+
+    with Session(test_engine) as session, transaction(session):
+        SqlAlchemyCampaignRepository(session).delete_cascade(campaign_id)
+
+    assert version_of(Campaign, campaign_id) is None
+
+
+def test_miss_is_read_from_the_primary(engines):
+    """Test a read-only request does not cache the old version
+    and owner of a lagging replica (no 304 for the old ETag)."""
+    primary, replica = engines
+    for engine, version, seed in ((primary, 2, 7), (replica, 1, None)):
+        with Session(engine) as session:
+            session.add(User(user_name="lag", email="lag@example.com", hashed_password="x"))
+            session.add(Campaign(
+                title="Lag", genre="Fantasy", description="Replica lag",
+                max_classes=4, created_by=1, version=version, roll_seed=seed
+            ))
+            session.commit()
+
+    try:
+        with RoutingSession(primary, replicas=[replica], use_replica=True) as session:
+            assert lookup(session, Campaign, 1).version == 2
+        with RoutingSession(primary, replicas=[replica], use_replica=True) as session:
+            assert lookup_roll_seed(session, 1) == (1, 7)
+        assert version_caches[Campaign].get(1)[0] == 2
+        assert roll_seed_cache.get(1) == [1, 7]
+    finally:
+        version_caches[Campaign].clear()  # Id 1 belongs to the test database elsewhere
+        roll_seed_cache.clear()
@@ -0,0 +1,107 @@
+"""
+unit_of_work.py
+
+One transaction per request (unit of work).
+
+The get_session dependency owns the transaction: repositories only
+flush (rows get their IDs and later queries of the same request see
+them), the request commits once at the end or rolls back on an error.
+Background workers wrap their own sessions in transaction().
+
+commit_now() is the escape hatch for the few places whose writes
+must be visible to other sessions before the request ends, e.g. a
+job row that a worker thread reads right away.
+after_commit() defers side effects on process state (caches) until
+the data is committed. savepoint() runs a part of the unit of work
+that can fail on its own (a batch operation): its rollback only
+drops the writes and after_commit callbacks of that part.
+"""
+from contextlib import contextmanager
+from typing import Callable, Iterator
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction
+import logging
+
+
+
+logger = logging.getLogger(__name__)
+
+_AFTER_COMMIT = "after_commit_callbacks"
+
+
+@contextmanager
+def transaction(session: Session) -> Iterator[Session]:
+    """Commit the work of the block once,
+    roll it back if the block raises."""
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+
+def commit_now(session: Session, reason: str):
+    """Commit the work so far before the unit of work ends.
+    Only for writes other sessions must see right away."""
+    session.commit()
+    logger.debug(f"Intermediate commit: {reason}")
+
+
+@contextmanager
+def savepoint(session: Session) -> Iterator[SessionTransaction]:
+    """Run the block in a SAVEPOINT: released when it ends,
+    rolled back if it raises or calls rollback() on it."""
+    connection = session.connection()
+    if connection.dialect.name == "sqlite":
+        # pysqlite opens its transaction only before the first write,
+        # a SAVEPOINT outside of one would commit when it is released
+        if not connection.connection.driver_connection.in_transaction:
+            connection.exec_driver_sql("BEGIN")
+    nested = session.begin_nested()
+    try:
+        yield nested
+    except Exception:
+        if nested.is_active:
+            nested.rollback()
+        raise
+    if nested.is_active:
+        nested.commit()
+
+
+def after_commit(session: Session, callback: Callable[[], None]):
+    """Run a callback once the current transaction
+    of the session is committed (dropped on rollback)."""
+    if not session.in_transaction():
+        session.begin()  # So a rollback drops the callback
+    transaction = session.get_nested_transaction() or session.get_transaction()
+    session.info.setdefault(_AFTER_COMMIT, []).append((transaction, callback))
+
+
+def _inside(transaction: SessionTransaction, outer: SessionTransaction) -> bool:
+    """Whether a transaction is `outer` or one of its savepoints."""
+    while transaction is not None:
+        if transaction is outer:
+            return True
+        transaction = transaction.parent
+    return False
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session):
+    for _, callback in session.info.pop(_AFTER_COMMIT, []):
+        try:
+            callback()
+        except Exception:
+            logger.exception("Error in after commit callback")
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_after_commit(session: Session, previous_transaction):
+    # A savepoint only drops the callbacks registered inside it
+    callbacks = session.info.get(_AFTER_COMMIT)
+    if callbacks:
+        session.info[_AFTER_COMMIT] = [
+            (transaction, callback) for transaction, callback in callbacks
+            if not _inside(transaction, previous_transaction)
+        ]
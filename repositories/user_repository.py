@@ -5,7 +5,7 @@ Defined methods for user management.
 """
 from abc import ABC, abstractmethod
 from models.schemas.user_schema import *
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 
@@ -23,9 +23,22 @@ class UserRepository(ABC):
     def list_all(self,
                  offset: int = 0,
                  limit: int = 100,
-                 name: Optional[str] = None
+                 name: Optional[str] = None,
+                 after_id: Optional[int] = None
                  ) -> List[UserPublic]:
-        """Show all users method."""
+        """Show all users method, ordered by ID.
+        after_id continues after a cursor (keyset paging)."""
+        pass
+
+
+    @abstractmethod
+    def search(self,
+               text: str,
+               prefix: bool = False,
+               limit: int = 10
+               ) -> List[UserPublic]:
+        """Users whose username contains the text (starts with it
+        for prefix), best matches first."""
         pass
 
 
@@ -51,6 +64,15 @@ class UserRepository(ABC):
         pass
 
 
+    @abstractmethod
+    def delete_cascade(self, user_id: int) \
+            -> Dict[str, int]:
+        """Remove a user with all campaigns,
+        classes, dice sets and dice logs
+        in one transaction, returns the deleted rows per table."""
+        pass
+
+
     @abstractmethod
     def list_by_user(self, user_id: int) \
             -> List[UserPublic]:
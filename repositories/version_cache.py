@@ -0,0 +1,180 @@
+"""
+version_cache.py
+
+Row versions of campaigns, classes and dice sets,
+for the conditional GETs (ETag / If-None-Match).
+
+Every ORM update of a versioned row bumps its version column
+(version = version + 1 in the UPDATE, before each flush). A dice
+set is also bumped when its dice entries are replaced, see touch();
+the dices themselves are fixed reference data.
+
+lookup() answers "which version, owned by whom, created when" from
+a small cache (same backend and limits as the entity cache,
+ENTITY_CACHE_*), on a miss with a SELECT of these columns instead
+of the full row. The creation time keeps the ETag of a row that
+reuses the id of a deleted one (SQLite) apart from the old one.
+Entries are dropped like entity cache entries: after every flush
+and by the set-based cascades, right away and again on commit.
+Misses are read from the primary, so a lagging replica never
+caches an old version (a 304 for an outdated ETag).
+
+lookup_roll_seed() answers "owner and roll seed of a campaign" for
+the rolls of a campaign the same way, so a roll does not query the
+campaign; the seed UPDATE drops the entry with invalidate_on_commit().
+"""
+import logging
+from datetime import datetime
+from functools import partial
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from metrics import registry
+from models.db_models.table_models import Campaign, Class, DiceSet
+from repositories.entity_cache import (
+    ENTITY_CACHE_BACKEND,
+    MemoryBackend,
+    RedisBackend
+)
+from repositories.routing_session import read_from_primary
+from repositories.unit_of_work import after_commit
+
+
+
+logger = logging.getLogger(__name__)
+
+_CHANGED = "version_cache_changed"
+
+# Versioned tables and the column of their owner
+VERSIONED = {
+    Campaign: Campaign.created_by,
+    Class: Class.user_id,
+    DiceSet: DiceSet.user_id,
+}
+
+version_hits = registry.counter(
+    "version_cache_hits_total", "Version lookups answered by the cache.")
+version_misses = registry.counter(
+    "version_cache_misses_total", "Version lookups read from the database.")
+
+
+class ResourceVersion(NamedTuple):
+    """Version, owner and creation time of one row."""
+    version: int
+    owner_id: int
+    created_at: Optional[datetime] = None
+
+
+def _backend(name: str):
+    if ENTITY_CACHE_BACKEND == "off":
+        return None
+    if ENTITY_CACHE_BACKEND.startswith("redis"):
+        return RedisBackend.from_url(ENTITY_CACHE_BACKEND, f"version:{name}")
+    return MemoryBackend()
+
+
+# Backends by table, None if caching is off
+version_caches: Dict[type, object] = {
+    Campaign: _backend("campaign"),
+    Class: _backend("dnd_class"),
+    DiceSet: _backend("diceset"),
+}
+
+# Owner and roll seed by campaign, None if caching is off
+roll_seed_cache = _backend("roll_seed")
+
+
+def lookup(session: Session, model: type, row_id: int) \
+        -> Optional[ResourceVersion]:
+    """Version, owner and creation time of a row
+    (None if it does not exist)."""
+    backend = version_caches.get(model)
+    if backend is not None:
+        cached = backend.get(row_id)
+        if cached is not None:
+            version_hits.inc()
+            version, owner_id, created_at = cached
+            return ResourceVersion(
+                version, owner_id,
+                datetime.fromisoformat(created_at) if created_at else None
+            )
+        version_misses.inc()
+        generation = backend.generation()
+        read_from_primary(session)
+
+    row = session.execute(
+        select(model.version, VERSIONED[model], model.created_at)
+        .where(model.id == row_id)
+    ).first()
+    if row is None:
+        return None
+    version = ResourceVersion(*row)
+    if backend is not None and not session.info.get(_CHANGED):
+        created_at = version.created_at.isoformat() if version.created_at else None
+        backend.put(row_id, [version.version, version.owner_id, created_at], generation)
+    return version
+
+
+def lookup_roll_seed(session: Session, campaign_id: int) \
+        -> Optional[Tuple[int, Optional[int]]]:
+    """Owner and roll seed of a campaign
+    (None if it does not exist)."""
+    backend = roll_seed_cache
+    if backend is not None:
+        cached = backend.get(campaign_id)
+        if cached is not None:
+            version_hits.inc()
+            owner_id, seed = cached
+            return owner_id, seed
+        version_misses.inc()
+        generation = backend.generation()
+        read_from_primary(session)
+
+    row = session.execute(
+        select(Campaign.created_by, Campaign.roll_seed)
+        .where(Campaign.id == campaign_id)
+    ).first()
+    if row is None:
+        return None
+    owner_id, seed = row
+    if backend is not None and not session.info.get(_CHANGED):
+        backend.put(campaign_id, [owner_id, seed], generation)
+    return owner_id, seed
+
+
+def touch(obj):
+    """Bump the version of a row whose
+    representation changed outside its columns."""
+    obj.version = type(obj).version + 1
+
+
+def invalidate_on_commit(session: Session, model: type, row_id: int):
+    """Drop a cached version (and roll seed of a campaign) now and
+    again on commit; the session stops filling the cache (its
+    reads are uncommitted)."""
+    backends = [version_caches.get(model)]
+    if model is Campaign:
+        backends.append(roll_seed_cache)
+    for backend in filter(None, backends):
+        session.info[_CHANGED] = True
+        backend.delete(row_id)
+        after_commit(session, partial(backend.delete, row_id))
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_versions(session: Session, flush_context, instances):
+    # The increment runs in the UPDATE, concurrent changes both count
+    for obj in session.dirty:
+        if (type(obj) in VERSIONED
+                and session.is_modified(obj, include_collections=False)
+                and not inspect(obj).attrs.version.history.has_changes()):
+            touch(obj)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed(session: Session, flush_context):
+    for obj in (*session.dirty, *session.deleted):
+        if type(obj) in VERSIONED and obj.id is not None:
+            invalidate_on_commit(session, type(obj), obj.id)
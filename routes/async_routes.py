@@ -0,0 +1,73 @@
+"""
+async_routes.py
+
+Async variants of the API routes (DB_BACKEND=async).
+
+async_router() serves a router with its hand-written async
+endpoints (registered with async_variant). They await the async
+repositories on an AsyncSession and run nothing else that blocks
+on the event loop; waits like the dice log writer's go to a worker
+thread.
+
+Every other route stays sync in the threadpool on a Session: the
+services and repositories are not async, and their blocking calls
+(the entity and version caches on redis, the dice log writer's
+inline fallback, NumPy rolls) must not run on the event loop.
+"""
+from typing import Callable, Dict
+from fastapi import APIRouter
+from fastapi.routing import APIRoute
+import logging
+
+
+
+logger = logging.getLogger(__name__)
+
+# Sync endpoint -> hand-written async endpoint
+_variants: Dict[Callable, Callable] = {}
+
+
+def async_variant(sync_endpoint: Callable):
+    """Register a hand-written async endpoint for a sync route."""
+    def decorator(endpoint: Callable) -> Callable:
+        _variants[sync_endpoint] = endpoint
+        return endpoint
+    return decorator
+
+
+def async_router(router: APIRouter) -> APIRouter:
+    """A router with the routes of `router`, served by their async
+    variants where registered and by the sync endpoints otherwise."""
+    converted = APIRouter()  # The routes carry the tags of `router`
+    for route in router.routes:
+        if not isinstance(route, APIRoute) or route.endpoint not in _variants:
+            converted.routes.append(route)
+            continue
+        endpoint = _variants[route.endpoint]
+        converted.add_api_route(
+            route.path,
+            endpoint,
+            response_model=route.response_model,
+            response_model_include=route.response_model_include,
+            response_model_exclude=route.response_model_exclude,
+            response_model_by_alias=route.response_model_by_alias,
+            response_model_exclude_unset=route.response_model_exclude_unset,
+            response_model_exclude_defaults=route.response_model_exclude_defaults,
+            response_model_exclude_none=route.response_model_exclude_none,
+            status_code=route.status_code,
+            tags=route.tags,
+            dependencies=route.dependencies,
+            summary=route.summary,
+            description=route.description,
+            response_description=route.response_description,
+            responses=route.responses,
+            deprecated=route.deprecated,
+            methods=route.methods,
+            operation_id=route.operation_id,
+            include_in_schema=route.include_in_schema,
+            response_class=route.response_class,
+            name=route.name,
+            route_class_override=type(route),
+        )
+        logger.debug(f"Async route {route.path} -> {endpoint.__name__}")
+    return converted
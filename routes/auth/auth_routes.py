@@ -3,14 +3,15 @@ auth_routes.py
 
 API endpoints to handle authentication operations.
 """
+from typing import Annotated
 from fastapi import APIRouter, Depends,HTTPException, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from rate_limit import limiter
-from sqlmodel import Session
+from routes.fast_json import FastJSONRoute
 from models.schemas.user_schema import UserCreate, UserMe, UserPublic
 from models.schemas.auth_schema import Token
 from auth.auth import get_current_user
-from dependencies import get_session
+from dependencies import SessionDep
 from services.auth.auth_service import AuthService
 from services.auth.auth_service_exceptions import (
     UserAlreadyExistsError,
@@ -18,7 +19,7 @@ from services.auth.auth_service_exceptions import (
 )
 
 
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+router = APIRouter(prefix="/auth", tags=["Authentication"], route_class=FastJSONRoute)
 auth_service = AuthService()
 
 
@@ -27,7 +28,7 @@ auth_service = AuthService()
 def register_user(
         request: Request,
         user_data: UserCreate,
-        session: Session = Depends(get_session)):
+        session: SessionDep):
     """Endpoint to register a new user."""
     try:
         db_user = auth_service.register_user(session, user_data)
@@ -47,8 +48,8 @@ def register_user(
 @limiter.limit("5/minute")
 def login_for_access_token(
         request: Request,
-        form_data: OAuth2PasswordRequestForm = Depends(),
-        session: Session = Depends(get_session)
+        form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+        session: SessionDep
 ):
     """Endpoint to authenticate a user via login."""
     try:
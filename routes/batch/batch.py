@@ -0,0 +1,287 @@
+"""
+batch.py
+
+API endpoint to run several operations in one request.
+
+The operations are a whitelist of get, list and roll routes.
+They run in order on the session and with the user of the batch
+request (one token check, one transaction committed at the end),
+through the same route functions as the single requests, so the
+checks, rate limits, errors and response models are the same
+(each operation counts against the limit of its route, e.g. a
+batch cannot roll more often than POST /rolls/expr allows).
+Each operation gets its own result: the status code and body of
+the single request, or the error detail (4xx of one operation do
+not stop the others; each operation runs in a savepoint, so a
+failed one rolls back only its own writes). An unexpected error
+fails the whole batch and rolls it back, like a single request;
+roll logs are only queued once the batch is committed.
+"""
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Type
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.routing import APIRoute
+from pydantic import ValidationError
+from sqlmodel import Session
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from dependencies import (
+    CampaignExpandParams,
+    CampaignQueryParams,
+    ClassQueryParams,
+    Pagination,
+    SessionDep
+)
+from models.schemas.batch_schema import *
+from auth.auth import get_current_user
+from models.db_models.table_models import User
+from rate_limit import limiter
+from repositories.unit_of_work import savepoint
+from routes.campaign import campaigns
+from routes.dice import dices
+from routes.diceset import dicesets
+from routes.dnd_class import dnd_classes
+from routes.fast_json import FastJSONRoute, dump_jsonable, response_options, type_adapter
+from routes.roll import rolls
+import logging
+
+
+router = APIRouter(tags=["batch"], route_class=FastJSONRoute)
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_OPERATIONS = int(os.getenv("BATCH_MAX_OPERATIONS", 20))
+
+# Headers of the batch request passed on to its operations
+ITEM_HEADERS = {b"host", b"user-agent", b"x-forwarded-for"}
+
+
+@dataclass(frozen=True)
+class Operation:
+    """A batch operation: its arguments and the route it runs.
+    call gets the arguments, the request of the operation,
+    the user, the session and the response of the operation."""
+    args: Type[BatchArgs]
+    route: APIRoute
+    call: Callable[..., Any]
+
+
+def _route(router: APIRouter, endpoint: Callable) -> APIRoute:
+    """The route of an endpoint of a router."""
+    return next(route for route in router.routes if route.endpoint is endpoint)
+
+
+OPERATIONS: Dict[str, Operation] = {}
+
+
+def operation(
+        name: str,
+        router: APIRouter,
+        endpoint: Callable,
+        args: Type[BatchArgs]):
+    """Register the decorated call as operation `name` running
+    `endpoint` (rate limited like its single request)."""
+    def decorator(call: Callable) -> Callable:
+        OPERATIONS[name] = Operation(
+            args, _route(router, endpoint), call
+        )
+        return call
+    return decorator
+
+
+@operation("get_campaign", campaigns.router, campaigns.read_campaign, GetCampaignArgs)
+def _get_campaign(args, request, user, session, response):
+    return campaigns.read_campaign(
+        request=request,
+        response=response,
+        campaign_id=args.campaign_id,
+        current_user=user,
+        expand=CampaignExpandParams(args.expand),
+        service=campaigns.get_campaign_service(session)
+    )
+
+
+@operation("list_campaigns", campaigns.router, campaigns.read_campaigns, ListCampaignsArgs)
+def _list_campaigns(args, request, user, session, response):
+    return campaigns.read_campaigns(
+        request=request,
+        current_user=user,
+        pagination=Pagination(args.offset, args.limit, args.cursor, response),
+        filters=CampaignQueryParams(
+            user_id=None, name=args.name,
+            view=args.view, fields=args.fields
+        ),
+        service=campaigns.get_campaign_service(session)
+    )
+
+
+@operation("get_class", dnd_classes.router, dnd_classes.read_class, GetClassArgs)
+def _get_class(args, request, user, session, response):
+    return dnd_classes.read_class(
+        request=request,
+        response=response,
+        class_id=args.class_id,
+        current_user=user,
+        service=dnd_classes.get_class_service(session)
+    )
+
+
+@operation("list_classes", dnd_classes.router, dnd_classes.read_classes, ListClassesArgs)
+def _list_classes(args, request, user, session, response):
+    return dnd_classes.read_classes(
+        request=request,
+        current_user=user,
+        pagination=Pagination(args.offset, args.limit, args.cursor, response),
+        filters=ClassQueryParams(
+            campaign_id=args.campaign_id, name=args.name,
+            view=args.view, fields=args.fields
+        ),
+        service=dnd_classes.get_class_service(session)
+    )
+
+
+@operation("get_diceset", dicesets.router, dicesets.read_diceset, GetDiceSetArgs)
+def _get_diceset(args, request, user, session, response):
+    return dicesets.read_diceset(
+        request=request,
+        response=response,
+        diceset_id=args.diceset_id,
+        current_user=user,
+        service=dicesets.get_diceset_service(session)
+    )
+
+
+@operation("roll_dice", dices.router, dices.roll_dice, RollDiceArgs)
+def _roll_dice(args, request, user, session, response):
+    return dices.roll_dice(
+        request=request,
+        dice_id=args.dice_id,
+        campaign_id=args.campaign_id,
+        dnd_class_id=args.dnd_class_id,
+        current_user=user,
+        service=dices.get_dice_service(session)
+    )
+
+
+@operation("roll_diceset", dicesets.router, dicesets.roll_diceset, RollDiceSetArgs)
+def _roll_diceset(args, request, user, session, response):
+    return dicesets.roll_diceset(
+        request=request,
+        diceset_id=args.diceset_id,
+        campaign_id=args.campaign_id,
+        dnd_class_id=args.dnd_class_id,
+        current_user=user,
+        service=dicesets.get_diceset_service(session),
+        summary=args.summary
+    )
+
+
+@operation("roll_expression", rolls.router, rolls.roll_expression, RollExpressionArgs)
+def _roll_expression(args, request, user, session, response):
+    return rolls.roll_expression(
+        request=request,
+        roll_input=args,
+        current_user=user,
+        service=rolls.get_roll_service(session)
+    )
+
+
+def _item_request(request: Request, route: APIRoute, args: BatchArgs) -> Request:
+    """The batch request as the single request of an operation:
+    the path of its route (rate limits are per path), an own state
+    (the limit of the batch is already checked in it) and only the
+    ITEM_HEADERS of the batch (e.g. its If-None-Match is not the
+    condition of every operation)."""
+    path = route.url_path_for(
+        route.name, **{name: getattr(args, name) for name in route.param_convertors}
+    )
+    headers = [
+        (name, value) for name, value in request.scope["headers"]
+        if name in ITEM_HEADERS
+    ]
+    return Request({**request.scope, "path": path, "headers": headers, "state": {}})
+
+
+def run_item(
+        item: BatchItem,
+        request: Request,
+        user: User,
+        session: Session) -> BatchItemResult:
+    """Run one operation of a batch, its errors become its result."""
+    op = OPERATIONS.get(item.op)
+    if op is None:
+        return BatchItemResult(
+            id=item.id, op=item.op, status=400,
+            detail=f"Unknown operation, allowed: {', '.join(OPERATIONS)}."
+        )
+    response = Response()  # Headers and status code of the route
+    del response.headers["content-length"]
+    response.status_code = None
+    try:
+        args = op.args.model_validate(item.args)
+        content = op.call(
+            args, _item_request(request, op.route, args), user, session, response
+        )
+    except ValidationError as error:
+        return BatchItemResult(
+            id=item.id, op=item.op, status=422,
+            detail=error.errors(include_url=False, include_context=False)
+        )
+    except StarletteHTTPException as error:  # Also rate limits (slowapi)
+        return BatchItemResult(
+            id=item.id, op=item.op, status=error.status_code,
+            detail=error.detail
+        )
+    if isinstance(content, Response):  # e.g. 304 Not Modified
+        return BatchItemResult(
+            id=item.id, op=item.op, status=content.status_code,
+            headers=dict(content.headers)
+        )
+    route = op.route
+    return BatchItemResult(
+        id=item.id, op=item.op,
+        status=response.status_code or route.status_code or 200,
+        body=dump_jsonable(
+            type_adapter(route.response_model), content, **response_options(route)
+        ),
+        headers=dict(response.headers)
+    )
+
+
+def run_in_savepoint(
+        item: BatchItem,
+        request: Request,
+        user: User,
+        session: Session) -> BatchItemResult:
+    """Run one operation in a savepoint of the batch transaction.
+    A failed operation only rolls back its own writes and queued
+    logs; the transaction stays usable for the next operations and
+    the commit (PostgreSQL aborts it after an error otherwise)."""
+    with savepoint(session) as operation:
+        result = run_item(item, request, user, session)
+        if result.status >= 400:
+            operation.rollback()
+    return result
+
+
+@router.post("/batch/", response_model=List[BatchItemResult])
+@limiter.limit("5/minute")
+def run_batch(
+        request: Request,
+        batch: BatchRequest,
+        session: SessionDep,
+        current_user: User = Depends(get_current_user)):
+    """Endpoint to run up to BATCH_MAX_OPERATIONS operations
+    (get_campaign, list_campaigns, get_class, list_classes,
+    get_diceset, roll_dice, roll_diceset, roll_expression)
+    in one request and transaction, with a result per operation."""
+    if len(batch.operations) > BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BATCH_MAX_OPERATIONS} operations per batch."
+        )
+    logger.info(f"BATCH of {len(batch.operations)} operations "
+                f"by user {current_user.id}")
+    return [
+        run_in_savepoint(item, request, current_user, session)
+        for item in batch.operations
+    ]
@@ -0,0 +1,250 @@
+"""
+test_batch.py
+
+Tests for the batch endpoint.
+"""
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+from auth.test_helpers import get_test_token
+from dependencies import (
+    get_async_session as prod_get_async_session,
+    get_session as prod_get_session
+)
+from main import app
+from models.db_models.table_models import Class, Dice, DiceLog
+from models.db_models.test_db import get_async_session, get_session, test_engine
+from rate_limit import limiter
+from repositories import dicelog_writer
+from repositories.dicelog_writer import DiceLogWriter
+from repositories.test_cascade_delete import make_campaign, make_user
+from repositories.test_entity_cache import count_selects
+from routes.async_routes import async_router
+from routes.batch import batch
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Fixture for the app with tokens and without rate limits."""
+    monkeypatch.setattr("auth.auth.ALGORITHM", "HS256")
+    monkeypatch.setattr(limiter, "enabled", False)
+    return TestClient(app)
+
+
+@pytest.fixture
+def players():
+    """Fixture for two users with a campaign each,
+    and the first class of the first user."""
+    with Session(test_engine) as session:
+        owner, other = make_user(session), make_user(session)
+        campaign_id = make_campaign(session, owner)
+        other_campaign_id = make_campaign(session, other)
+        class_id = session.exec(
+            select(Class.id).where(Class.campaign_id == campaign_id).order_by(Class.id)
+        ).first()
+        session.refresh(owner)
+        return owner, campaign_id, other_campaign_id, class_id
+
+
+def post_batch(client, user, operations):
+    return client.post(
+        "/batch/",
+        headers={"Authorization": f"Bearer {get_test_token(user)}"},
+        json={"operations": operations}
+    )
+
+
+def count_logs(user_id):
+    with Session(test_engine) as session:
+        return len(session.exec(select(DiceLog.id).where(DiceLog.user_id == user_id)).all())
+
+
+def test_results_per_operation(client, players):
+    """Test each operation gets the status and body of its single request."""
+    owner, campaign_id, other_campaign_id, class_id = players
+
+    response = post_batch(client, owner, [
+        {"id": "a", "op": "get_campaign", "args": {"campaign_id": campaign_id}},
+        {"id": "b", "op": "get_campaign", "args": {"campaign_id": other_campaign_id}},
+        {"id": "c", "op": "get_class", "args": {"class_id": 0}},
+        {"id": "d", "op": "list_classes",
+         "args": {"campaign_id": campaign_id, "limit": 1, "fields": "name"}},
+        {"id": "e", "op": "roll_expression", "args": {"expression": "2d6+1"}},
+    ])
+
+    assert response.status_code == 200
+    results = response.json()
+    assert [r["id"] for r in results] == ["a", "b", "c", "d", "e"]
+    assert [r["status"] for r in results] == [200, 403, 404, 200, 200]
+    assert results[0]["body"]["id"] == campaign_id
+    assert "classes" not in results[0]["body"]
+    assert results[0]["headers"]["etag"]
+    assert results[1]["detail"] == "Not allowed"
+    assert results[3]["body"] == [{"id": class_id, "name": results[3]["body"][0]["name"]}]
+    assert "x-next-cursor" in results[3]["headers"]
+    assert 3 <= results[4]["body"]["total"] <= 13
+
+
+def test_invalid_operations(client, players):
+    """Test unknown operations and arguments fail only their item."""
+    owner, campaign_id, _, _ = players
+
+    results = post_batch(client, owner, [
+        {"op": "delete_campaign", "args": {"campaign_id": campaign_id}},
+        {"op": "get_campaign", "args": {"campaign_id": "first"}},
+        {"op": "get_campaign", "args": {"campaign_id": campaign_id, "user_id": 1}},
+        {"op": "list_campaigns", "args": {"fields": "secret"}},
+        {"op": "get_campaign", "args": {"campaign_id": campaign_id}},
+    ]).json()
+
+    assert [r["status"] for r in results] == [400, 422, 422, 400, 200]
+    assert results[1]["detail"][0]["loc"] == ["campaign_id"]
+    assert results[2]["detail"][0]["type"] == "extra_forbidden"
+
+
+def test_one_auth_lookup_per_batch(client, players):
+    """Test the operations share the user and session of the batch."""
+    owner, campaign_id, _, _ = players
+    operation = {"op": "get_campaign", "args": {"campaign_id": campaign_id}}
+    post_batch(client, owner, [operation])  # Entity cache
+
+    _, one = count_selects(lambda: post_batch(client, owner, [operation]))
+    _, ten = count_selects(lambda: post_batch(client, owner, [operation] * 10))
+
+    assert ten == one
+
+
+def test_batch_size_is_limited(client, players, monkeypatch):
+    """Test batches over BATCH_MAX_OPERATIONS and empty batches are rejected."""
+    owner, _, _, _ = players
+    monkeypatch.setattr(batch, "BATCH_MAX_OPERATIONS", 2)
+    operation = {"op": "roll_expression", "args": {"expression": "1d20"}}
+
+    assert post_batch(client, owner, [operation] * 2).status_code == 200
+    assert post_batch(client, owner, [operation] * 3).status_code == 400
+    assert post_batch(client, owner, []).status_code == 422
+
+
+def test_operations_count_against_route_limits(players, monkeypatch):
+    """Test each operation uses the rate limit of its route,
+    a batch does not roll more often than POST /rolls/expr."""
+    owner, campaign_id, _, _ = players
+    monkeypatch.setattr("auth.auth.ALGORITHM", "HS256")
+    monkeypatch.setattr(batch, "BATCH_MAX_OPERATIONS", 50)
+    limiter.reset()
+    roll = {"op": "roll_expression", "args": {"expression": "1d20"}}
+    get = {"op": "get_campaign", "args": {"campaign_id": campaign_id}}
+    try:
+        results = post_batch(TestClient(app), owner, [roll] * 31 + [get] * 11).json()
+    finally:
+        limiter.reset()
+
+    statuses = [r["status"] for r in results]
+    assert statuses[:31] == [200] * 30 + [429]
+    assert statuses[31:] == [200] * 10 + [429]
+
+
+def test_failed_batch_logs_no_rolls(client, players, monkeypatch):
+    """Test the rolls of a batch that fails are not logged."""
+    owner, _, _, _ = players
+    writer = DiceLogWriter(test_engine, flush_interval=0.01)
+    writer.start()
+    monkeypatch.setattr(dicelog_writer, "_writer", writer)
+
+    def fail(*args):
+        raise RuntimeError("unexpected")
+
+    monkeypatch.setitem(batch.OPERATIONS, "fail", batch.Operation(
+        batch.GetCampaignArgs, batch.OPERATIONS["get_campaign"].route, fail
+    ))
+    client = TestClient(app, raise_server_exceptions=False)
+    logs_before = count_logs(owner.id)
+    try:
+        response = post_batch(client, owner, [
+            {"op": "roll_expression", "args": {"expression": "1d20"}},
+            {"op": "fail", "args": {"campaign_id": 1}},
+        ])
+        assert writer.wait_for_user(owner.id, timeout=5)
+    finally:
+        writer.stop()
+
+    assert response.status_code == 500
+    assert count_logs(owner.id) == logs_before
+
+
+def test_failed_operation_rolls_back_alone(client, players, monkeypatch):
+    """Test a failed operation drops its own writes and logs,
+    the other operations of the batch are committed."""
+    owner, campaign_id, _, class_id = players
+    writer = DiceLogWriter(test_engine, flush_interval=0.01)
+    writer.start()
+    monkeypatch.setattr(dicelog_writer, "_writer", writer)
+
+    def roll_then_fail(args, request, user, session, response):
+        batch.OPERATIONS["roll_dice"].call(args, request, user, session, response)
+        raise HTTPException(status_code=409, detail="Conflict")
+
+    roll_dice = batch.OPERATIONS["roll_dice"]
+    monkeypatch.setitem(batch.OPERATIONS, "roll_then_fail", batch.Operation(
+        roll_dice.args, roll_dice.route, roll_then_fail
+    ))
+    with Session(test_engine) as session:
+        d20 = Dice(name="batch-d20", sides=20)
+        session.add(d20)
+        session.commit()
+        roll = {"dice_id": d20.id, "campaign_id": campaign_id, "dnd_class_id": class_id}
+    logs_before = count_logs(owner.id)
+    try:
+        results = post_batch(client, owner, [
+            {"op": "roll_dice", "args": roll},
+            {"op": "roll_then_fail", "args": roll},
+            {"op": "roll_dice", "args": roll},
+        ]).json()
+        assert writer.wait_for_user(owner.id, timeout=5)
+    finally:
+        writer.stop()
+
+    assert [r["status"] for r in results] == [200, 409, 200]
+    assert count_logs(owner.id) == logs_before + 2
+
+
+def test_batch_headers_are_not_passed_on(client, players):
+    """Test the conditional headers of the batch request
+    are not the conditions of its operations."""
+    owner, campaign_id, _, _ = players
+    operation = {"op": "get_campaign", "args": {"campaign_id": campaign_id}}
+    etag = post_batch(client, owner, [operation]).json()[0]["headers"]["etag"]
+
+    response = client.post(
+        "/batch/",
+        headers={
+            "Authorization": f"Bearer {get_test_token(owner)}",
+            "If-None-Match": etag
+        },
+        json={"operations": [operation]}
+    )
+
+    assert response.status_code == 200
+    assert response.json()[0]["status"] == 200
+    assert response.json()[0]["body"]["id"] == campaign_id
+
+
+def test_async_backend(players, monkeypatch):
+    """Test the batch runs with DB_BACKEND=async (in the threadpool)."""
+    owner, campaign_id, _, _ = players
+    monkeypatch.setattr("auth.auth.ALGORITHM", "HS256")
+    monkeypatch.setattr(limiter, "enabled", False)
+    async_app = FastAPI()
+    async_app.state.limiter = limiter
+    async_app.include_router(async_router(batch.router))
+    async_app.dependency_overrides[prod_get_session] = get_session
+    async_app.dependency_overrides[prod_get_async_session] = get_async_session
+
+    results = post_batch(TestClient(async_app), owner, [
+        {"op": "get_campaign", "args": {"campaign_id": campaign_id}},
+        {"op": "list_campaigns", "args": {}},
+    ]).json()
+
+    assert [r["status"] for r in results] == [200, 200]
+    assert campaign_id in [c["id"] for c in results[1]["body"]]
@@ -4,24 +4,38 @@ campaigns.py
 The API routes for campaigns.
 """
 import logging
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Path, Request
-from dependencies import CampaignQueryParams, Pagination, SessionDep
+from typing import Annotated, List
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from dependencies import (
+    CampaignExpandParams,
+    CampaignQueryParams,
+    Pagination,
+    SearchQueryParams,
+    SessionDep
+)
 from models.schemas.campaign_schema import *
 from services.campaign.campaign_service import CampaignService
-from repositories.sql_campaign_repository import SqlAlchemyCampaignRepository
-from repositories.sql_class_repository import SqlAlchemyClassRepository
+from repositories.cached_repositories import (
+    CachedSqlAlchemyCampaignRepository,
+    CachedSqlAlchemyClassRepository
+)
 from repositories.sql_diceset_repository import SqlAlchemyDiceSetRepository
 from repositories.sql_dicelog_repository import SqlAlchemyDiceLogRepository
 from services.campaign.campaign_service_exceptions import (
     CampaignNotFoundError,
     CampaignServiceError
 )
+from models.schemas.job_schema import JobPublic
+from services.job.job_service import JobService
+from services.job.job_service_exceptions import JobServiceError
+from routes.job.jobs import get_job_service, job_accepted
 from auth.auth import get_current_user
 from models.db_models.table_models import User
 from rate_limit import limiter
+from routes.fast_json import FastJSONRoute
+from routes.conditional import not_modified, resource_etag
 
-router = APIRouter(tags=["campaigns"])
+router = APIRouter(tags=["campaigns"], route_class=FastJSONRoute)
 logger = logging.getLogger(__name__)
 
 
@@ -29,8 +43,8 @@ def get_campaign_service(session: SessionDep) \
         -> CampaignService:
     """Factory to get the campaign, dnd_class,
     dice set and dice log service."""
-    campaign_repo = SqlAlchemyCampaignRepository(session)
-    class_repo = SqlAlchemyClassRepository(session)
+    campaign_repo = CachedSqlAlchemyCampaignRepository(session)
+    class_repo = CachedSqlAlchemyClassRepository(session)
     diceset_repo = SqlAlchemyDiceSetRepository(session)
     dicelog_repo = SqlAlchemyDiceLogRepository(session)
     return CampaignService(
@@ -41,22 +55,51 @@ def get_campaign_service(session: SessionDep) \
     )
 
 
+@router.get("/campaigns/search",
+            response_model=List[CampaignListItem],
+            response_model_exclude_unset=True)
+@limiter.limit("30/minute")
+def search_campaigns(
+        request: Request,
+        current_user: User = Depends(get_current_user),
+        params: SearchQueryParams = Depends(),
+        service: CampaignService = Depends(get_campaign_service)):
+    """Endpoint to search the campaigns of the current user by title,
+    best matches first (?prefix=true for autocomplete)."""
+    logger.info(f"GET campaigns search by user {current_user.id}")
+    return service.search_campaigns(current_user.id, params)
+
+
 @router.get("/campaigns/{campaign_id}",
-            response_model=CampaignPublic)
+            response_model=CampaignExpanded,
+            response_model_exclude_unset=True)
 @limiter.limit("10/minute")
 def read_campaign(
         request: Request,
+        response: Response,
         campaign_id: int = Path(
             ...,
             description="The ID of the campaign to retrieve"
         ),
         current_user: User = Depends(get_current_user),
+        expand: CampaignExpandParams = Depends(),
         service: CampaignService = Depends(get_campaign_service)
 ):
-    """Endpoint to get a single campaign (owner only)."""
+    """Endpoint to get a single campaign (owner only).
+    Answers 304 if If-None-Match has the current ETag.
+    ?expand=classes,dicesets,recent_logs embeds the collections
+    of the campaign screen (no ETag, they have own versions)."""
     logger.info(f"GET campaign {campaign_id} "
                 f"by user {current_user.id}")
     try:
+        if not expand.expand:
+            unchanged = not_modified(
+                request, "campaign", campaign_id,
+                service.get_campaign_version,
+                owner_id=current_user.id
+            )
+            if unchanged is not None:
+                return unchanged
         campaign = service.get_campaign(campaign_id)
     except CampaignNotFoundError:
         logger.warning(
@@ -84,11 +127,25 @@ def read_campaign(
             status_code=403,
             detail="Not allowed"
         )
+    if expand.expand:
+        try:
+            return service.expand_campaign(
+                campaign, current_user.id, expand.expand
+            )
+        except CampaignServiceError:
+            raise HTTPException(
+                status_code=500,
+                detail="Error while retrieving campaign."
+            )
+    response.headers["ETag"] = resource_etag(
+        "campaign", campaign.id, campaign.version, campaign.created_at
+    )
     return campaign
 
 
 @router.get("/campaigns/",
-            response_model=List[CampaignPublic])
+            response_model=List[CampaignListItem],
+            response_model_exclude_unset=True)
 @limiter.limit("10/minute")
 def read_campaigns(
         request: Request,
@@ -96,14 +153,18 @@ def read_campaigns(
         pagination: Pagination = Depends(),
         filters: CampaignQueryParams = Depends(),
         service: CampaignService = Depends(get_campaign_service)):
-    """Endpoint to get all campaigns owned by the current user."""
+    """Endpoint to get all campaigns owned by the current user.
+    Without the description unless ?view=full or ?fields= ask for it."""
     logger.info(f"GET campaigns list by user {current_user.id}")
     filters.user_id = current_user.id
-    return service.list_campaigns(
+    campaigns = service.list_campaigns(
         offset=pagination.offset,
         limit=pagination.limit,
-        filters=filters
+        filters=filters,
+        after_id=pagination.after_id()
     )
+    pagination.next_cursor(campaigns, "id")
+    return campaigns
 
 
 @router.post("/campaigns/",
@@ -156,13 +217,18 @@ def update_campaign(
 
 
 @router.delete("/campaigns/{campaign_id}",
-               response_model=CampaignPublic)
+               response_model=CampaignDeleted,
+               responses={202: {"model": JobPublic, "description": "Deletion queued"}})
 @limiter.limit("5/minute")
 def delete_campaign(
         request: Request,
         campaign_id: int = Path(..., description="The ID of the campaign to delete."),
         current_user: User = Depends(get_current_user),
-        service: CampaignService = Depends(get_campaign_service)):
+        service: CampaignService = Depends(get_campaign_service),
+        job_service: JobService = Depends(get_job_service),
+        background: Annotated[bool, Query(
+            description="Delete in a background job, follow it at /jobs/{id}."
+        )] = False):
     """Endpoint to remove a campaign."""
 
     # Check if the user is the owner
@@ -174,6 +240,17 @@ def delete_campaign(
             detail="Not allowed"
         )
 
+    if background:
+        try:
+            job = job_service.delete_campaign(campaign_id, current_user.id)
+        except JobServiceError:
+            raise HTTPException(
+                status_code=500,
+                detail="Internal server error."
+            )
+        logger.info(f"Campaign {campaign_id} deletion queued as Job {job.id}")
+        return job_accepted(job)
+
     logger.info(f"DELETE campaign {campaign_id} by user {current_user.id}")
     deleted = service.delete_campaign(campaign_id)
     if not deleted:
@@ -182,3 +259,33 @@ def delete_campaign(
             status_code=404,
             detail="Campaign not found")
     return deleted
+
+
+@router.put("/campaigns/{campaign_id}/seed",
+            response_model=CampaignSeed)
+@limiter.limit("5/minute")
+def set_campaign_seed(
+        request: Request,
+        seed: CampaignSeed,
+        campaign_id: int = Path(..., description="The ID of the campaign to seed."),
+        current_user: User = Depends(get_current_user),
+        service: CampaignService = Depends(get_campaign_service)):
+    """Endpoint to set the roll seed of a campaign (owner only).
+    The same seed replays the same rolls, null removes the seed."""
+    try:
+        existing_campaign = service.get_campaign(campaign_id)
+    except CampaignNotFoundError:
+        logger.warning(f"Campaign {campaign_id} not found")
+        raise HTTPException(
+            status_code=404,
+            detail="Campaign not found."
+        )
+    if existing_campaign.created_by != current_user.id:
+        logger.warning(f"User {current_user.id} tried to seed campaign {campaign_id} not owned by them")
+        raise HTTPException(
+            status_code=403,
+            detail="Not allowed"
+        )
+
+    logger.info(f"PUT seed campaign {campaign_id} by user {current_user.id}")
+    return service.set_roll_seed(campaign_id, seed.seed)
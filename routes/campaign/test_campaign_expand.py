@@ -0,0 +1,145 @@
+"""
+test_campaign_expand.py
+
+Tests for GET /campaigns/{id}?expand=.
+"""
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from auth.test_helpers import get_test_token
+from main import app
+from models.db_models.table_models import Class, Dice, DiceSet, DiceSetDice
+from models.db_models.test_db import test_engine
+from rate_limit import limiter
+from repositories.sql_diceset_repository import SqlAlchemyDiceSetRepository
+from repositories.test_cascade_delete import add, make_campaign, make_user
+from repositories.test_entity_cache import count_selects
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Fixture for the app with tokens and without rate limits."""
+    monkeypatch.setattr("auth.auth.ALGORITHM", "HS256")
+    monkeypatch.setattr(limiter, "enabled", False)
+    return TestClient(app)
+
+
+@pytest.fixture
+def screen():
+    """Fixture for a user with a campaign of two classes
+    (one dice set each) and four dice logs."""
+    with Session(test_engine) as session:
+        user = make_user(session)
+        campaign_id = make_campaign(session, user)
+        session.refresh(user)
+        return user, campaign_id
+
+
+def add_class(campaign_id, user_id, dicesets=1):
+    """Add a dnd_class with dice sets of two d6 (one entry, quantity 2)."""
+    suffix = uuid.uuid4().hex[:8]
+    with Session(test_engine) as session:
+        dice = add(session, Dice(name=f"d6-{suffix}", sides=6))
+        dnd_class = add(session, Class(
+            name=f"Added {suffix}", dnd_class="Wizard", race="Elf",
+            campaign_id=campaign_id, user_id=user_id
+        ))
+        for number in range(dicesets):
+            diceset = add(session, DiceSet(
+                name=f"Set {number}", dnd_class_id=dnd_class.id,
+                campaign_id=campaign_id, user_id=user_id
+            ))
+            add(session, DiceSetDice(dice_set_id=diceset.id, dice_id=dice.id, quantity=2))
+        return dnd_class.id
+
+
+def get_expanded(client, user, campaign_id, expand):
+    """GET the campaign with expand, and the number of SELECTs."""
+    return count_selects(lambda: client.get(
+        f"/campaigns/{campaign_id}",
+        headers={"Authorization": f"Bearer {get_test_token(user)}"},
+        params={"expand": expand}
+    ))
+
+
+def test_expand_builds_the_tree(client, screen):
+    """Test classes with their dice sets and the recent logs are embedded."""
+    user, campaign_id = screen
+    class_id = add_class(campaign_id, user.id)
+
+    response, _ = get_expanded(client, user, campaign_id, "classes,dicesets,recent_logs")
+
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+    body = response.json()
+    assert body["id"] == campaign_id
+    assert [c["id"] for c in body["classes"]][-1] == class_id
+    assert all(len(c["dicesets"]) == 1 for c in body["classes"])
+    assert [d["sides"] for d in body["classes"][-1]["dicesets"][0]["dices"]] == [6, 6]
+    logs = [log["id"] for log in body["recent_logs"]]
+    assert len(logs) == 4 and logs == sorted(logs, reverse=True)
+
+
+def test_queries_do_not_grow_with_the_tree(client, screen):
+    """Test the number of SELECTs is the same for more classes and sets."""
+    user, campaign_id = screen
+    expand = "classes,dicesets,recent_logs"
+    get_expanded(client, user, campaign_id, expand)  # Auth and entity caches
+    _, before = get_expanded(client, user, campaign_id, expand)
+
+    for _ in range(3):
+        add_class(campaign_id, user.id, dicesets=2)
+    response, after = get_expanded(client, user, campaign_id, expand)
+
+    assert len(response.json()["classes"]) == 5
+    assert after == before
+
+
+def test_collections_are_capped(client, screen, monkeypatch):
+    """Test the caps of classes, dice sets per class and logs."""
+    user, campaign_id = screen
+    monkeypatch.setattr("services.campaign.campaign_service.EXPAND_MAX_CLASSES", 3)
+    monkeypatch.setattr("services.campaign.campaign_service.EXPAND_MAX_DICESETS_PER_CLASS", 2)
+    monkeypatch.setattr("services.campaign.campaign_service.EXPAND_MAX_RECENT_LOGS", 3)
+    for _ in range(2):
+        add_class(campaign_id, user.id, dicesets=3)
+
+    response, _ = get_expanded(client, user, campaign_id, "dicesets,recent_logs")
+
+    body = response.json()
+    assert [len(c["dicesets"]) for c in body["classes"]] == [1, 1, 2]
+    assert len(body["recent_logs"]) == 3
+
+
+def test_expand_options(client, screen):
+    """Test unexpanded collections are left out, unknown ones are a 400."""
+    user, campaign_id = screen
+
+    plain, _ = get_expanded(client, user, campaign_id, None)
+    assert "ETag" in plain.headers
+    assert not {"classes", "recent_logs"} & set(plain.json())
+
+    classes, _ = get_expanded(client, user, campaign_id, "classes")
+    assert "recent_logs" not in classes.json()
+    assert "dicesets" not in classes.json()["classes"][0]
+
+    assert get_expanded(client, user, campaign_id, "classes,players")[0].status_code == 400
+
+
+def test_list_by_classes():
+    """Test dice sets by class, capped per class, dices repeated by quantity."""
+    with Session(test_engine) as session:
+        user = make_user(session)
+        campaign_id = make_campaign(session, user)
+        user_id = user.id
+    class_ids = [add_class(campaign_id, user_id, dicesets=n) for n in (3, 0)]
+
+    with Session(test_engine) as session:
+        dicesets = SqlAlchemyDiceSetRepository(session).list_by_classes(
+            class_ids + [0], per_class=2
+        )
+
+    assert [len(dicesets[i]) for i in class_ids + [0]] == [2, 0, 0]
+    assert [d.name for d in dicesets[class_ids[0]]] == ["Set 0", "Set 1"]
+    assert len(dicesets[class_ids[0]][0].dices) == 2
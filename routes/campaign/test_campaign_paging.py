@@ -0,0 +1,61 @@
+"""
+test_campaign_paging.py
+
+Tests for the cursor paging contract of the list endpoints
+(X-Next-Cursor header), with the campaign list.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from auth.test_helpers import get_test_token
+from main import app
+from models.db_models.test_db import test_engine
+from rate_limit import limiter
+from repositories.test_cascade_delete import make_campaign, make_user
+
+
+ORIGIN = "http://localhost:3000"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Fixture for the app with tokens and without rate limits."""
+    monkeypatch.setattr("auth.auth.ALGORITHM", "HS256")
+    monkeypatch.setattr(limiter, "enabled", False)
+    return TestClient(app)
+
+
+@pytest.fixture
+def owner():
+    """Fixture for a user with five campaigns."""
+    with Session(test_engine) as session:
+        user = make_user(session)
+        campaign_ids = [make_campaign(session, user) for _ in range(5)]
+        session.refresh(user)
+        return user, campaign_ids
+
+
+def test_pages_follow_the_next_cursor_header(client, owner):
+    """Test a browser client can read X-Next-Cursor (CORS) and
+    walk all pages with it; the last page has no cursor."""
+    user, campaign_ids = owner
+    headers = {
+        "Authorization": f"Bearer {get_test_token(user)}",
+        "Origin": ORIGIN,
+    }
+    seen, pages, params = [], 0, {"limit": 2}
+    while True:
+        response = client.get("/campaigns/", headers=headers, params=params)
+        assert response.status_code == 200
+        assert isinstance(response.json(), list)  # The body stays a plain list
+        seen += [campaign["id"] for campaign in response.json()]
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        exposed = response.headers["Access-Control-Expose-Headers"]
+        assert "X-Next-Cursor" in [name.strip() for name in exposed.split(",")]
+        params = {"limit": 2, "cursor": cursor}
+
+    assert seen == sorted(campaign_ids)
+    assert pages == 3
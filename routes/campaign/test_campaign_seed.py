@@ -0,0 +1,138 @@
+"""
+test_campaign_seed.py
+
+Tests for the stored roll seeds of campaigns.
+"""
+import pytest
+from unittest.mock import Mock
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+from auth.test_helpers import get_test_token
+from main import app
+from models.db_models.table_models import Campaign
+from models.db_models.test_db import test_engine
+from rate_limit import limiter
+from repositories.sql_campaign_repository import SqlAlchemyCampaignRepository
+from repositories.test_cascade_delete import make_campaign, make_user
+from services.campaign.campaign_service import CampaignService
+from services.dice import entropy_pool
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Fixture for the app with tokens and without rate limits."""
+    monkeypatch.setattr("auth.auth.ALGORITHM", "HS256")
+    monkeypatch.setattr(limiter, "enabled", False)
+    yield TestClient(app)
+    entropy_pool._campaign_pools.clear()
+
+
+@pytest.fixture
+def players():
+    """Fixture for a campaign owner, another user and the campaign."""
+    with Session(test_engine) as session:
+        owner, other = make_user(session), make_user(session)
+        campaign_id = make_campaign(session, owner)
+        session.refresh(owner)
+        session.refresh(other)
+        return owner, other, campaign_id
+
+
+def headers(user):
+    return {"Authorization": f"Bearer {get_test_token(user)}"}
+
+
+def roll(client, user, campaign_id, count=5):
+    """Roll 1d100 count times in the campaign."""
+    return [
+        client.post("/rolls/expr", headers=headers(user), json={
+            "expression": "1d100", "campaign_id": campaign_id
+        }).json()["total"]
+        for _ in range(count)
+    ]
+
+
+def stored_seed(campaign_id):
+    with Session(test_engine) as session:
+        return session.get(Campaign, campaign_id).roll_seed
+
+
+def test_seed_survives_a_restart(client, players):
+    """Test the seed is stored and replays after the pools are lost."""
+    owner, _, campaign_id = players
+    response = client.put(f"/campaigns/{campaign_id}/seed",
+                          headers=headers(owner), json={"seed": 2 ** 40})
+    assert response.status_code == 200
+    assert stored_seed(campaign_id) == 2 ** 40
+
+    first = roll(client, owner, campaign_id)
+    entropy_pool._campaign_pools.clear()  # Restart, or another worker
+    assert roll(client, owner, campaign_id) == first
+
+    client.put(f"/campaigns/{campaign_id}/seed", headers=headers(owner), json={"seed": None})
+    assert stored_seed(campaign_id) is None
+    assert campaign_id not in entropy_pool._campaign_pools
+
+
+def test_other_users_do_not_consume_the_sequence(client, players):
+    """Test rolls of other users in a seeded campaign are unseeded."""
+    owner, other, campaign_id = players
+    client.put(f"/campaigns/{campaign_id}/seed", headers=headers(owner), json={"seed": 9})
+    expected = roll(client, owner, campaign_id)
+    client.put(f"/campaigns/{campaign_id}/seed", headers=headers(owner), json={"seed": 9})
+
+    roll(client, other, campaign_id, count=20)
+
+    assert roll(client, owner, campaign_id) == expected
+
+
+def test_delete_drops_the_pool(client, players):
+    """Test deleting a seeded campaign removes its pool."""
+    owner, _, campaign_id = players
+    client.put(f"/campaigns/{campaign_id}/seed", headers=headers(owner), json={"seed": 5})
+    roll(client, owner, campaign_id, count=1)
+    assert campaign_id in entropy_pool._campaign_pools
+
+    assert client.delete(f"/campaigns/{campaign_id}", headers=headers(owner)).status_code == 200
+    assert campaign_id not in entropy_pool._campaign_pools
+
+
+def test_rolls_read_the_seed_from_the_cache(client, players):
+    """Test repeated rolls of a campaign do not query the campaign."""
+    owner, _, campaign_id = players
+    client.put(f"/campaigns/{campaign_id}/seed", headers=headers(owner), json={"seed": 3})
+    roll(client, owner, campaign_id, count=1)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", record)
+    try:
+        roll(client, owner, campaign_id, count=3)
+    finally:
+        event.remove(test_engine, "before_cursor_execute", record)
+    assert not [s for s in statements if "FROM campaign" in s]
+
+
+def test_rollback_keeps_the_pool(players):
+    """Test a seed that is rolled back never reaches the pool."""
+    owner, _, campaign_id = players
+    with Session(test_engine) as session:
+        service = CampaignService(
+            SqlAlchemyCampaignRepository(session), Mock(), Mock(), Mock()
+        )
+        service.set_roll_seed(campaign_id, 11)
+        assert campaign_id not in entropy_pool._campaign_pools
+        session.rollback()
+    assert campaign_id not in entropy_pool._campaign_pools
+    assert stored_seed(campaign_id) is None
+
+    with Session(test_engine) as session:
+        service = CampaignService(
+            SqlAlchemyCampaignRepository(session), Mock(), Mock(), Mock()
+        )
+        service.set_roll_seed(campaign_id, 11)
+        session.commit()
+    assert entropy_pool._campaign_pools.pop(campaign_id).seed == 11
@@ -244,7 +244,7 @@
 # Independent functional unit tests with mocks
 import pytest
 from unittest.mock import Mock
-from fastapi import HTTPException, Request
+from fastapi import HTTPException, Request, Response
 from routes.campaign.campaigns import (
     read_campaign,
     read_campaigns,
@@ -258,14 +258,17 @@ from services.campaign.campaign_service_exceptions import (
     CampaignNotFoundError,
     CampaignServiceError
 )
-from dependencies import CampaignQueryParams, Pagination
+from dependencies import CampaignExpandParams, CampaignQueryParams, Pagination
+from models.schemas.job_schema import DELETE_CAMPAIGN, PENDING, JobPublic
 from datetime import datetime
 
 
 @pytest.fixture
 def mock_request():
     """Fixture for mocked request object."""
-    return Mock(spec=Request)
+    request = Mock(spec=Request)
+    request.headers = {}
+    return request
 
 
 @pytest.fixture
@@ -343,7 +346,7 @@ def test_read_campaign_success(mock_request, mock_service, mock_user, sample_cam
     """Test successful campaign retrieval."""
     mock_service.get_campaign.return_value = sample_campaign
 
-    result = read_campaign(mock_request, 1, mock_user, mock_service)
+    result = read_campaign(mock_request, Response(), 1, mock_user, CampaignExpandParams(None), mock_service)
 
     mock_service.get_campaign.assert_called_once_with(1)
     assert result.id == sample_campaign.id
@@ -355,7 +358,7 @@ def test_read_campaign_not_found(mock_request, mock_service, mock_user):
     mock_service.get_campaign.side_effect = CampaignNotFoundError("Campaign not found")
 
     with pytest.raises(HTTPException) as exc_info:
-        read_campaign(mock_request, 999, mock_user, mock_service)
+        read_campaign(mock_request, Response(), 999, mock_user, CampaignExpandParams(None), mock_service)
 
     assert exc_info.value.status_code == 404
     assert exc_info.value.detail == "Campaign not found."
@@ -366,7 +369,7 @@ def test_read_campaign_service_error(mock_request, mock_service, mock_user):
     mock_service.get_campaign.side_effect = CampaignServiceError("Database error")
 
     with pytest.raises(HTTPException) as exc_info:
-        read_campaign(mock_request, 1, mock_user, mock_service)
+        read_campaign(mock_request, Response(), 1, mock_user, CampaignExpandParams(None), mock_service)
 
     assert exc_info.value.status_code == 500
     assert exc_info.value.detail == "Error while retrieving campaign."
@@ -377,7 +380,7 @@ def test_read_campaign_forbidden(mock_request, mock_service, mock_other_user, sa
     mock_service.get_campaign.return_value = sample_campaign
 
     with pytest.raises(HTTPException) as exc_info:
-        read_campaign(mock_request, 1, mock_other_user, mock_service)
+        read_campaign(mock_request, Response(), 1, mock_other_user, CampaignExpandParams(None), mock_service)
 
     assert exc_info.value.status_code == 403
     assert exc_info.value.detail == "Not allowed"
@@ -397,7 +400,8 @@ def test_read_campaigns_success(mock_request, mock_service, mock_user, mock_pagi
     mock_service.list_campaigns.assert_called_once_with(
         offset=0,
         limit=100,
-        filters=mock_filters
+        filters=mock_filters,
+        after_id=None
     )
     assert len(result) == 2
     assert result[0].title == "Campaign 1"
@@ -481,6 +485,28 @@ def test_update_campaign_not_found(mock_request, mock_service, mock_user, sample
     assert exc_info.value.detail == "Campaign not found"
 
 
+def test_delete_campaign_background(mock_request, mock_service, mock_user, sample_campaign):
+    """Test a background deletion returns 202 with the queued job."""
+    mock_service.get_campaign.return_value = sample_campaign
+    job_service = Mock()
+    job_service.delete_campaign.return_value = JobPublic(
+        id="abc",
+        kind=DELETE_CAMPAIGN,
+        target_id=1,
+        user_id=1,
+        status=PENDING,
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    )
+
+    response = delete_campaign(mock_request, 1, mock_user, mock_service, job_service, True)
+
+    job_service.delete_campaign.assert_called_once_with(1, mock_user.id)
+    mock_service.delete_campaign.assert_not_called()
+    assert response.status_code == 202
+    assert response.headers["Location"] == "/jobs/abc"
+
+
 # Tests for delete_campaign function
 def test_delete_campaign_success(mock_request, mock_service, mock_user, sample_campaign):
     """Test successful campaign deletion."""
@@ -0,0 +1,62 @@
+"""
+conditional.py
+
+Conditional GETs of single resources (ETag / If-None-Match).
+
+The strong ETag of a campaign, class or dice set is its row
+version and creation time (SQLite reuses the id of a deleted row,
+a recreated row starts at version 1 again). A client that sends its ETag back in If-None-Match gets
+304 Not Modified, checked against the version cache before the
+row is loaded or serialized.
+"""
+from datetime import datetime
+from typing import Callable, Optional
+from fastapi import Request, Response
+from repositories.version_cache import ResourceVersion
+
+
+
+def resource_etag(
+        kind: str,
+        resource_id: int,
+        version: int,
+        created_at: Optional[datetime]) -> str:
+    """The strong ETag of one version of a resource
+    (creation time as stored, without time zone)."""
+    created = f"{created_at:%Y%m%d%H%M%S%f}" if created_at else "0"
+    return f'"{kind}-{resource_id}-{created}-v{version}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches the ETag
+    (weak comparison, as RFC 9110 asks for this header)."""
+    if if_none_match.strip() == "*":
+        return True
+    return etag in {
+        tag.strip().removeprefix("W/")
+        for tag in if_none_match.split(",")
+    }
+
+
+def not_modified(
+        request: Request,
+        kind: str,
+        resource_id: int,
+        get_version: Callable[[int], Optional[ResourceVersion]],
+        owner_id: Optional[int] = None) \
+        -> Optional[Response]:
+    """304 response if the client has the current version,
+    else None and the route answers as usual (also for
+    missing resources or other owners: 404 / 403 there)."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    version = get_version(resource_id)
+    if version is None:
+        return None
+    if owner_id is not None and version.owner_id != owner_id:
+        return None
+    etag = resource_etag(kind, resource_id, version.version, version.created_at)
+    if not etag_matches(if_none_match, etag):
+        return None
+    return Response(status_code=304, headers={"ETag": etag})
@@ -8,26 +8,30 @@ from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
 from dependencies import Pagination, SessionDep
 from models.schemas.dice_schema import *
 from repositories.sql_dice_repository import SqlAlchemyDiceRepository
+from repositories.sql_campaign_repository import SqlAlchemyCampaignRepository
 from repositories.sql_dicelog_repository import SqlAlchemyDiceLogRepository
 from services.dice.dice_service_exceptions import DiceNotFoundError
 from services.dice.dice_service import DiceService
 from auth.auth import get_current_user
 from models.db_models.table_models import User
 from rate_limit import limiter
+from routes.fast_json import FastJSONRoute
 import logging
 
 
-router = APIRouter(tags=["dices"])
+router = APIRouter(tags=["dices"], route_class=FastJSONRoute)
 logger = logging.getLogger(__name__)
 
 
 
 def get_dice_service(session: SessionDep) \
         -> DiceService:
-    """Factory to get the dice and dice log service."""
+    """Factory to get the dice, dice log
+    and campaign (seeded rolls) service."""
     dice_repo = SqlAlchemyDiceRepository(session)
     log_repo = SqlAlchemyDiceLogRepository(session)
-    return DiceService(dice_repo, log_repo)
+    campaign_repo = SqlAlchemyCampaignRepository(session)
+    return DiceService(dice_repo, log_repo, campaign_repo)
 
 
 @router.get("/dices/{dice_id}", response_model=DicePublic)
@@ -59,9 +63,12 @@ def read_dices(
         service: DiceService = Depends(get_dice_service)):
     """Endpoint to list all dices."""
     logger.info(f"GET dice list by user {current_user.id}")
-    return service.list_dices(
+    dices = service.list_dices(
         offset=pagination.offset,
-        limit=pagination.limit)
+        limit=pagination.limit,
+        after_id=pagination.after_id())
+    pagination.next_cursor(dices, "id")
+    return dices
 
 
 #@router.post("/dices/",
@@ -119,21 +126,19 @@ def roll_dice(
     and get the result (random)."""
     logger.info(f"ROLL dice {dice_id} by user {current_user.id}")
 
-    # Check if the user is the owner
-    db_dice = service.repo.get_by_id(dice_id)
-    if not db_dice:
+    try:
+        roll_result = service.roll_dice(
+            dice_id=dice_id,
+            user_id=current_user.id,
+            campaign_id=campaign_id,
+            dnd_class_id=dnd_class_id
+        )
+    except DiceNotFoundError:
         logger.warning(f"Dice {dice_id} not found")
         raise HTTPException(
             status_code=404,
             detail="Dice not found"
         )
-
-    roll_result = service.roll_dice(
-        dice_id=dice_id,
-        user_id=current_user.id,
-        campaign_id=campaign_id,
-        dnd_class_id=dnd_class_id
-    )
     if not roll_result:
         logger.warning(f"Dice {dice_id} not found for roll")
         raise HTTPException(
@@ -377,7 +377,7 @@ def test_read_dices_success(mock_request, mock_service, mock_user, mock_paginati
 
     result = read_dices(mock_request, mock_user, mock_pagination, mock_service)
 
-    mock_service.list_dices.assert_called_once_with(offset=0, limit=100)
+    mock_service.list_dices.assert_called_once_with(offset=0, limit=100, after_id=None)
     assert len(result) == 3
     assert result[0].name == "D4"
     assert result[1].name == "D6"
@@ -397,12 +397,11 @@ def test_read_dices_empty_list(mock_request, mock_service, mock_user, mock_pagin
 # Tests for roll_dice function
 def test_roll_dice_success(mock_request, mock_service, mock_user, sample_dice, sample_dice_roll_result):
     """Test successful dice roll."""
-    mock_service.repo.get_by_id.return_value = sample_dice
     mock_service.roll_dice.return_value = sample_dice_roll_result
 
     result = roll_dice(mock_request, 1, None, None, mock_user, mock_service)
 
-    mock_service.repo.get_by_id.assert_called_once_with(1)
+    mock_service.repo.get_by_id.assert_not_called()
     mock_service.roll_dice.assert_called_once_with(
         dice_id=1,
         user_id=mock_user.id,
@@ -416,7 +415,6 @@ def test_roll_dice_success(mock_request, mock_service, mock_user, sample_dice, s
 
 def test_roll_dice_with_campaign_id(mock_request, mock_service, mock_user, sample_dice, sample_dice_roll_result):
     """Test dice roll with campaign_id parameter."""
-    mock_service.repo.get_by_id.return_value = sample_dice
     mock_service.roll_dice.return_value = sample_dice_roll_result
 
     result = roll_dice(mock_request, 1, 10, None, mock_user, mock_service)
@@ -432,7 +430,6 @@ def test_roll_dice_with_campaign_id(mock_request, mock_service, mock_user, sampl
 
 def test_roll_dice_with_class_id(mock_request, mock_service, mock_user, sample_dice, sample_dice_roll_result):
     """Test dice roll with dnd_class_id parameter."""
-    mock_service.repo.get_by_id.return_value = sample_dice
     mock_service.roll_dice.return_value = sample_dice_roll_result
 
     result = roll_dice(mock_request, 1, None, 5, mock_user, mock_service)
@@ -448,7 +445,6 @@ def test_roll_dice_with_class_id(mock_request, mock_service, mock_user, sample_d
 
 def test_roll_dice_with_campaign_and_class(mock_request, mock_service, mock_user, sample_dice, sample_dice_roll_result):
     """Test dice roll with both campaign_id and dnd_class_id."""
-    mock_service.repo.get_by_id.return_value = sample_dice
     mock_service.roll_dice.return_value = sample_dice_roll_result
 
     result = roll_dice(mock_request, 1, 10, 5, mock_user, mock_service)
@@ -464,7 +460,7 @@ def test_roll_dice_with_campaign_and_class(mock_request, mock_service, mock_user
 
 def test_roll_dice_not_found(mock_request, mock_service, mock_user):
     """Test roll dice raises HTTPException when dice not found."""
-    mock_service.repo.get_by_id.return_value = None
+    mock_service.roll_dice.side_effect = DiceNotFoundError("Dice with ID 999 not found.")
 
     with pytest.raises(HTTPException) as exc_info:
         roll_dice(mock_request, 999, None, None, mock_user, mock_service)
@@ -475,7 +471,6 @@ def test_roll_dice_not_found(mock_request, mock_service, mock_user):
 
 def test_roll_dice_roll_result_none(mock_request, mock_service, mock_user, sample_dice):
     """Test roll dice raises HTTPException when roll_result is None."""
-    mock_service.repo.get_by_id.return_value = sample_dice
     mock_service.roll_dice.return_value = None
 
     with pytest.raises(HTTPException) as exc_info:
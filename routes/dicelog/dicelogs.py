@@ -3,18 +3,23 @@ dicelogs.py
 
 API endpoints for dice log management.
 """
-from fastapi import APIRouter, Depends, HTTPException, Path, Request
-from dependencies import Pagination, SessionDep
+from datetime import datetime
+from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
+from dependencies import AsyncSessionDep, Pagination, SessionDep
+from repositories.async_sql_repositories import AsyncSqlAlchemyDiceLogRepository
 from repositories.sql_dicelog_repository import SqlAlchemyDiceLogRepository
 from models.schemas.dicelog_schema import DiceLogPublic
 from typing import List
-from auth.auth import get_current_user
+from auth.auth import get_current_user, get_current_user_async
 from models.db_models.table_models import User
 from rate_limit import limiter
+from routes.fast_json import FastJSONRoute
+from routes.async_routes import async_variant
 import logging
 
 
-router = APIRouter(tags=["dicelogs"])
+router = APIRouter(tags=["dicelogs"], route_class=FastJSONRoute)
 logger = logging.getLogger(__name__)
 
 
@@ -29,15 +34,59 @@ def list_logs(
         request: Request,
         current_user: User = Depends(get_current_user),
         pagination: Pagination = Depends(),
-        dicelog_repo: SqlAlchemyDiceLogRepository = Depends(get_dicelog_repo)):
-    """Endpoint to list all dice logs for the current user."""
+        dicelog_repo: SqlAlchemyDiceLogRepository = Depends(get_dicelog_repo),
+        consistent: Annotated[bool, Query(
+            description="Wait until your queued roll logs are written (read your writes)."
+        )] = False):
+    """Endpoint to list all dice logs for the current user, newest first."""
     logger.info(f"GET logs for user {current_user.id}")
+    before = pagination.after(datetime, int)
     try:
+        if consistent and not dicelog_repo.wait_for_pending(current_user.id):
+            logger.warning(f"Timed out waiting for queued logs of user {current_user.id}")
         logs = dicelog_repo.list_logs(
             user_id=current_user.id,
             offset=pagination.offset,
-            limit=pagination.limit
+            limit=pagination.limit,
+            before=before
         )
+        pagination.next_cursor(logs, "timestamp", "id")
+        logger.info(f"Returned {len(logs)} logs for user {current_user.id}")
+        return logs
+
+    except Exception:
+        logger.exception("Error while listing dice logs")
+        raise HTTPException(
+            status_code=500,
+            detail="Error while listing dice logs."
+        )
+
+
+@async_variant(list_logs)
+@limiter.limit("10/minute")
+async def list_logs_async(
+        request: Request,
+        session: AsyncSessionDep,
+        current_user: User = Depends(get_current_user_async),
+        pagination: Pagination = Depends(),
+        consistent: Annotated[bool, Query(
+            description="Wait until your queued roll logs are written (read your writes)."
+        )] = False):
+    """Endpoint to list all dice logs for the current user, newest first
+    (DB_BACKEND=async: the read-your-writes wait runs in a worker thread)."""
+    logger.info(f"GET logs for user {current_user.id}")
+    before = pagination.after(datetime, int)
+    dicelog_repo = AsyncSqlAlchemyDiceLogRepository(session)
+    try:
+        if consistent and not await dicelog_repo.wait_for_pending(current_user.id):
+            logger.warning(f"Timed out waiting for queued logs of user {current_user.id}")
+        logs = await dicelog_repo.list_logs(
+            user_id=current_user.id,
+            offset=pagination.offset,
+            limit=pagination.limit,
+            before=before
+        )
+        pagination.next_cursor(logs, "timestamp", "id")
         logger.info(f"Returned {len(logs)} logs for user {current_user.id}")
         return logs
 
@@ -398,11 +398,11 @@
 # Independent functional unit tests with mocks
 import pytest
 from unittest.mock import Mock
-from fastapi import HTTPException, Request
+from fastapi import HTTPException, Request, Response
 from routes.dicelog.dicelogs import list_logs, get_log
 from models.schemas.dicelog_schema import DiceLogPublic
 from models.db_models.table_models import User
-from dependencies import Pagination
+from dependencies import Pagination, encode_cursor
 from datetime import datetime
 
 
@@ -480,7 +480,8 @@ def test_list_logs_success(mock_request, mock_user, mock_pagination, mock_repo):
     mock_repo.list_logs.assert_called_once_with(
         user_id=mock_user.id,
         offset=0,
-        limit=100
+        limit=100,
+        before=None
     )
     assert len(result) == 3
     assert result[0].roll == "D6: 3"
@@ -519,10 +520,80 @@ def test_list_logs_with_pagination(mock_request, mock_user, mock_repo):
     mock_repo.list_logs.assert_called_once_with(
         user_id=mock_user.id,
         offset=10,
-        limit=5
+        limit=5,
+        before=None
     )
 
 
+def test_list_logs_consistent_waits_for_pending(mock_request, mock_user, mock_pagination, mock_repo):
+    """Test read your writes waits for the queued logs of the user."""
+    mock_repo.wait_for_pending.return_value = True
+    mock_repo.list_logs.return_value = []
+
+    list_logs(mock_request, mock_user, mock_pagination, mock_repo, consistent=True)
+
+    mock_repo.wait_for_pending.assert_called_once_with(mock_user.id)
+    mock_repo.list_logs.assert_called_once()
+
+
+def test_list_logs_default_does_not_wait(mock_request, mock_user, mock_pagination, mock_repo):
+    """Test logs are listed without waiting by default."""
+    mock_repo.list_logs.return_value = []
+
+    list_logs(mock_request, mock_user, mock_pagination, mock_repo)
+
+    mock_repo.wait_for_pending.assert_not_called()
+
+
+def test_list_logs_full_page_sets_next_cursor(mock_request, mock_user, mock_repo, sample_dicelog):
+    """Test a full page returns the cursor of its last log."""
+    response = Response()
+    pagination = Pagination(offset=0, limit=1, response=response)
+    mock_repo.list_logs.return_value = [sample_dicelog]
+
+    list_logs(mock_request, mock_user, pagination, mock_repo)
+
+    cursor = response.headers["X-Next-Cursor"]
+    assert Pagination(cursor=cursor).after(datetime, int) == (sample_dicelog.timestamp, sample_dicelog.id)
+
+
+def test_list_logs_last_page_has_no_cursor(mock_request, mock_user, mock_repo, sample_dicelog):
+    """Test no cursor is set when the page is not full."""
+    response = Response()
+    pagination = Pagination(offset=0, limit=5, response=response)
+    mock_repo.list_logs.return_value = [sample_dicelog]
+
+    list_logs(mock_request, mock_user, pagination, mock_repo)
+
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_list_logs_with_cursor(mock_request, mock_user, mock_repo):
+    """Test the cursor is passed as keyset and replaces the offset."""
+    timestamp = datetime(2025, 5, 1, 12, 30)
+    cursor = encode_cursor([timestamp, 42])
+    mock_repo.list_logs.return_value = []
+
+    list_logs(mock_request, mock_user, Pagination(offset=10, limit=5, cursor=cursor), mock_repo)
+
+    mock_repo.list_logs.assert_called_once_with(
+        user_id=mock_user.id,
+        offset=0,
+        limit=5,
+        before=(timestamp, 42)
+    )
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor([1]), encode_cursor(["x", 2])])
+def test_list_logs_invalid_cursor(mock_request, mock_user, mock_repo, cursor):
+    """Test malformed cursors are rejected with 400."""
+    with pytest.raises(HTTPException) as exc_info:
+        list_logs(mock_request, mock_user, Pagination(cursor=cursor), mock_repo)
+
+    assert exc_info.value.status_code == 400
+    mock_repo.list_logs.assert_not_called()
+
+
 # Tests for get_log function
 def test_get_log_success(mock_request, mock_user, mock_repo, sample_dicelog):
     """Test successful dice log retrieval."""
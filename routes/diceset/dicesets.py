@@ -3,10 +3,12 @@ dicesets.py
 
 API endpoints for handling dice sets.
 """
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
+from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
 from dependencies import Pagination, SessionDep
 from models.schemas.diceset_schema import *
 from repositories.sql_diceset_repository import SqlAlchemyDiceSetRepository
+from repositories.sql_campaign_repository import SqlAlchemyCampaignRepository
 from repositories.sql_dicelog_repository import SqlAlchemyDiceLogRepository
 from repositories.sql_dice_repository import SqlAlchemyDiceRepository
 from services.diceset.diceset_service import DiceSetService
@@ -18,32 +20,47 @@ from services.diceset.diceset_service_exceptions import (
 from auth.auth import get_current_user
 from models.db_models.table_models import User
 from rate_limit import limiter
+from routes.fast_json import FastJSONRoute
+from routes.conditional import not_modified, resource_etag
 import logging
 
 
-router = APIRouter(tags=["dicesets"])
+router = APIRouter(tags=["dicesets"], route_class=FastJSONRoute)
 logger = logging.getLogger(__name__)
 
 
 def get_diceset_service(session: SessionDep) -> DiceSetService:
-    """Factory to get the dice, dice set and dice log service."""
+    """Factory to get the dice, dice set, dice log
+    and campaign (seeded rolls) service."""
     dice_repo = SqlAlchemyDiceRepository(session)
     diceset_repo = SqlAlchemyDiceSetRepository(session)
     dicelog_repo = SqlAlchemyDiceLogRepository(session)
-    return DiceSetService(dice_repo, diceset_repo, dicelog_repo)
+    campaign_repo = SqlAlchemyCampaignRepository(session)
+    return DiceSetService(dice_repo, diceset_repo, dicelog_repo, campaign_repo)
 
 
 @router.get("/dicesets/{diceset_id}", response_model=DiceSetPublic)
 @limiter.limit("10/minute")
 def read_diceset(
         request: Request,
+        response: Response,
         diceset_id: int = Path(..., description="The ID of dice set to retrieve."),
         current_user: User = Depends(get_current_user),
         service: DiceSetService = Depends(get_diceset_service)):
-    """Endpoint to get a single dice set."""
+    """Endpoint to get a single dice set.
+    Answers 304 if If-None-Match has the current ETag."""
     logger.info(f"GET dice set {diceset_id} by user {current_user.id}")
     try:
+        unchanged = not_modified(
+            request, "diceset", diceset_id,
+            service.get_diceset_version
+        )
+        if unchanged is not None:
+            return unchanged
         diceset = service.get_diceset(diceset_id)
+        response.headers["ETag"] = resource_etag(
+            "diceset", diceset.id, diceset.version, diceset.created_at
+        )
         return diceset
 
     except DiceSetNotFoundError:
@@ -64,9 +81,12 @@ def read_dicesets(
     """Endpoint to list all dice sets."""
     logger.info(f"GET dice sets list by user {current_user.id}")
     try:
-        return service.list_dicesets(
+        dicesets = service.list_dicesets(
             offset=pagination.offset,
-            limit=pagination.limit)
+            limit=pagination.limit,
+            after_id=pagination.after_id())
+        pagination.next_cursor(dicesets, "id")
+        return dicesets
 
     except DiceSetServiceError:
         logger.error("Service error while listing dice sets")
@@ -132,7 +152,7 @@ def update_diceset(
         raise HTTPException(status_code=500, detail="Internal Server Error.")
 
 
-@router.delete("/dicesets/{diceset_id}", response_model=DiceSetPublic)
+@router.delete("/dicesets/{diceset_id}", response_model=DiceSetDeleted)
 @limiter.limit("5/minute")
 def delete_diceset(
         request: Request,
@@ -161,7 +181,8 @@ def delete_diceset(
         raise HTTPException(status_code=500, detail="Internal Server Error.")
 
 
-@router.post("/dicesets/{diceset_id}/roll", response_model=DiceSetRollResult)
+@router.post("/dicesets/{diceset_id}/roll",
+             response_model=DiceSetRollResult | DiceSetRollSummary)
 @limiter.limit("30/minute")
 def roll_diceset(
         request: Request,
@@ -169,14 +190,17 @@ def roll_diceset(
         campaign_id: int = Query(..., description="Campaign ID"),
         dnd_class_id: int = Query(..., description="Class ID"),
         current_user: User = Depends(get_current_user),
-        service: DiceSetService = Depends(get_diceset_service)):
+        service: DiceSetService = Depends(get_diceset_service),
+        summary: Annotated[bool, Query(
+            description="Return face counts per dice instead of every single roll."
+        )] = False):
     """Endpoint to roll a dice set (only owner allowed)."""
     try:
-        # Check ownership first
-        diceset = service.get_diceset(diceset_id)
+        # Check ownership first (from the cached roll plan, no query)
+        plan = service.get_roll_plan(diceset_id)
 
-        if diceset.user_id != current_user.id:
-            logger.warning(f"User {current_user.id} tried to ROLL dice set {diceset_id} owned by {diceset.user_id}")
+        if plan.user_id != current_user.id:
+            logger.warning(f"User {current_user.id} tried to ROLL dice set {diceset_id} owned by {plan.user_id}")
             raise HTTPException(status_code=403, detail="Not allowed")
 
         logger.info(f"ROLL dice set {diceset_id} by user {current_user.id}")
@@ -184,7 +208,8 @@ def roll_diceset(
             current_user.id,
             campaign_id,
             dnd_class_id,
-            diceset_id
+            diceset_id,
+            summary=summary
         )
         return result
     except HTTPException:
@@ -195,3 +220,33 @@ def roll_diceset(
     except DiceSetServiceError:
         logger.error(f"Service error while rolling dice set {diceset_id}")
         raise HTTPException(status_code=500, detail="Internal Server Error.")
+
+
+@router.get("/dicesets/{diceset_id}/distribution", response_model=DiceSetDistribution)
+@limiter.limit("10/minute")
+def read_diceset_distribution(
+        request: Request,
+        diceset_id: int = Path(..., description="The ID of the dice set."),
+        current_user: User = Depends(get_current_user),
+        service: DiceSetService = Depends(get_diceset_service),
+        dc: Annotated[int | None, Query(
+            description="Difficulty class to get the probability of total >= dc."
+        )] = None):
+    """Endpoint to get the exact distribution of a dice set total."""
+    try:
+        # Check ownership first
+        plan = service.get_roll_plan(diceset_id)
+        if plan.user_id != current_user.id:
+            logger.warning(f"User {current_user.id} tried to read distribution of dice set {diceset_id} owned by {plan.user_id}")
+            raise HTTPException(status_code=403, detail="Not allowed")
+
+        logger.info(f"GET distribution of dice set {diceset_id} by user {current_user.id}")
+        return service.get_distribution(diceset_id, dc=dc)
+    except HTTPException:
+        raise
+    except DiceSetNotFoundError:
+        logger.warning(f"Dice set {diceset_id} not found for distribution")
+        raise HTTPException(status_code=404, detail="Dice set not found.")
+    except DiceSetServiceError:
+        logger.error(f"Service error while calculating distribution of dice set {diceset_id}")
+        raise HTTPException(status_code=500, detail="Internal Server Error.")
@@ -575,14 +575,15 @@
 # Independent functional unit tests with mocks
 import pytest
 from unittest.mock import Mock
-from fastapi import HTTPException, Request
+from fastapi import HTTPException, Request, Response
 from routes.diceset.dicesets import (
     read_diceset,
     read_dicesets,
     create_diceset,
     update_diceset,
     delete_diceset,
-    roll_diceset
+    roll_diceset,
+    read_diceset_distribution
 )
 from models.schemas.diceset_schema import DiceSetCreateInput, DiceSetUpdate, DiceSetPublic, DiceSetRollResult
 from models.db_models.table_models import User
@@ -592,13 +593,16 @@ from services.diceset.diceset_service_exceptions import (
     DiceSetServiceError
 )
 from dependencies import Pagination
+from repositories.roll_plan_cache import RollPlan, RollPlanEntry
 from datetime import datetime
 
 
 @pytest.fixture
 def mock_request():
     """Fixture for mocked request object."""
-    return Mock(spec=Request)
+    request = Mock(spec=Request)
+    request.headers = {}
+    return request
 
 
 @pytest.fixture
@@ -633,6 +637,17 @@ def mock_other_user():
     return user
 
 
+@pytest.fixture
+def sample_roll_plan():
+    """Fixture for sample roll plan."""
+    return RollPlan.build(
+        diceset_id=1,
+        name="Test Set",
+        user_id=1,
+        entries=(RollPlanEntry(dice_id=1, name="d20", sides=20, quantity=1),)
+    )
+
+
 @pytest.fixture
 def sample_diceset():
     """Fixture for sample diceset."""
@@ -685,7 +700,7 @@ def test_read_diceset_success(mock_request, mock_service, mock_user, sample_dice
     """Test successful diceset retrieval."""
     mock_service.get_diceset.return_value = sample_diceset
 
-    result = read_diceset(mock_request, 1, mock_user, mock_service)
+    result = read_diceset(mock_request, Response(), 1, mock_user, mock_service)
 
     mock_service.get_diceset.assert_called_once_with(1)
     assert result.id == sample_diceset.id
@@ -697,7 +712,7 @@ def test_read_diceset_not_found(mock_request, mock_service, mock_user):
     mock_service.get_diceset.side_effect = DiceSetNotFoundError("Dice set not found")
 
     with pytest.raises(HTTPException) as exc_info:
-        read_diceset(mock_request, 999, mock_user, mock_service)
+        read_diceset(mock_request, Response(), 999, mock_user, mock_service)
 
     assert exc_info.value.status_code == 404
     assert exc_info.value.detail == "Dice set not found."
@@ -708,7 +723,7 @@ def test_read_diceset_service_error(mock_request, mock_service, mock_user):
     mock_service.get_diceset.side_effect = DiceSetServiceError("Service error")
 
     with pytest.raises(HTTPException) as exc_info:
-        read_diceset(mock_request, 1, mock_user, mock_service)
+        read_diceset(mock_request, Response(), 1, mock_user, mock_service)
 
     assert exc_info.value.status_code == 500
     assert exc_info.value.detail == "Internal Server Error."
@@ -725,7 +740,7 @@ def test_read_dicesets_success(mock_request, mock_service, mock_user, mock_pagin
 
     result = read_dicesets(mock_request, mock_user, mock_pagination, mock_service)
 
-    mock_service.list_dicesets.assert_called_once_with(offset=0, limit=100)
+    mock_service.list_dicesets.assert_called_once_with(offset=0, limit=100, after_id=None)
     assert len(result) == 2
     assert result[0].name == "Set 1"
     assert result[1].name == "Set 2"
@@ -908,28 +923,29 @@ def test_delete_diceset_service_error(mock_request, mock_service, mock_user, sam
 
 
 # Tests for roll_diceset function
-def test_roll_diceset_success(mock_request, mock_service, mock_user, sample_diceset, sample_diceset_roll_result):
+def test_roll_diceset_success(mock_request, mock_service, mock_user, sample_roll_plan, sample_diceset_roll_result):
     """Test successful diceset roll."""
-    mock_service.get_diceset.return_value = sample_diceset
+    mock_service.get_roll_plan.return_value = sample_roll_plan
     mock_service.roll_diceset.return_value = sample_diceset_roll_result
 
     result = roll_diceset(mock_request, 1, 10, 5, mock_user, mock_service)
 
-    mock_service.get_diceset.assert_called_once_with(1)
+    mock_service.get_roll_plan.assert_called_once_with(1)
     mock_service.roll_diceset.assert_called_once_with(
         mock_user.id,
         10,
         5,
-        1
+        1,
+        summary=False
     )
     assert result.diceset_id == sample_diceset_roll_result.diceset_id
     assert result.total == sample_diceset_roll_result.total
     assert len(result.results) == len(sample_diceset_roll_result.results)
 
 
-def test_roll_diceset_forbidden(mock_request, mock_service, mock_other_user, sample_diceset):
+def test_roll_diceset_forbidden(mock_request, mock_service, mock_other_user, sample_roll_plan):
     """Test roll diceset raises HTTPException when user is not owner."""
-    mock_service.get_diceset.return_value = sample_diceset
+    mock_service.get_roll_plan.return_value = sample_roll_plan
 
     with pytest.raises(HTTPException) as exc_info:
         roll_diceset(mock_request, 1, 10, 5, mock_other_user, mock_service)
@@ -940,7 +956,7 @@ def test_roll_diceset_forbidden(mock_request, mock_service, mock_other_user, sam
 
 def test_roll_diceset_not_found(mock_request, mock_service, mock_user):
     """Test roll diceset raises HTTPException when diceset not found."""
-    mock_service.get_diceset.side_effect = DiceSetNotFoundError("Not found")
+    mock_service.get_roll_plan.side_effect = DiceSetNotFoundError("Not found")
 
     with pytest.raises(HTTPException) as exc_info:
         roll_diceset(mock_request, 999, 10, 5, mock_user, mock_service)
@@ -949,9 +965,9 @@ def test_roll_diceset_not_found(mock_request, mock_service, mock_user):
     assert exc_info.value.detail == "Dice set not found."
 
 
-def test_roll_diceset_service_error(mock_request, mock_service, mock_user, sample_diceset):
+def test_roll_diceset_service_error(mock_request, mock_service, mock_user, sample_roll_plan):
     """Test roll diceset raises HTTPException on service error."""
-    mock_service.get_diceset.return_value = sample_diceset
+    mock_service.get_roll_plan.return_value = sample_roll_plan
     mock_service.roll_diceset.side_effect = DiceSetServiceError("Service error")
 
     with pytest.raises(HTTPException) as exc_info:
@@ -959,3 +975,35 @@ def test_roll_diceset_service_error(mock_request, mock_service, mock_user, sampl
 
     assert exc_info.value.status_code == 500
     assert exc_info.value.detail == "Internal Server Error."
+
+
+def test_read_distribution_success(mock_request, mock_service, mock_user, sample_roll_plan):
+    """Test successful distribution retrieval."""
+    mock_service.get_roll_plan.return_value = sample_roll_plan
+    mock_service.get_distribution.return_value = Mock(diceset_id=1)
+
+    result = read_diceset_distribution(mock_request, 1, mock_user, mock_service, 15)
+
+    mock_service.get_distribution.assert_called_once_with(1, dc=15)
+    assert result.diceset_id == 1
+
+
+def test_read_distribution_forbidden(mock_request, mock_service, mock_other_user, sample_roll_plan):
+    """Test distribution of another user's dice set is forbidden."""
+    mock_service.get_roll_plan.return_value = sample_roll_plan
+
+    with pytest.raises(HTTPException) as exc_info:
+        read_diceset_distribution(mock_request, 1, mock_other_user, mock_service)
+
+    assert exc_info.value.status_code == 403
+    mock_service.get_distribution.assert_not_called()
+
+
+def test_read_distribution_not_found(mock_request, mock_service, mock_user):
+    """Test distribution of a missing dice set returns 404."""
+    mock_service.get_roll_plan.side_effect = DiceSetNotFoundError("Not found")
+
+    with pytest.raises(HTTPException) as exc_info:
+        read_diceset_distribution(mock_request, 999, mock_user, mock_service)
+
+    assert exc_info.value.status_code == 404
@@ -4,28 +4,30 @@ dnd_classes.py
 The API endpoints for classes.
 """
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Path, Request
-from dependencies import ClassQueryParams, Pagination, SessionDep
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response
+from dependencies import ClassQueryParams, Pagination, SearchQueryParams, SessionDep
 from models.schemas.class_schema import *
 from services.dnd_class.class_service import ClassService
-from repositories.sql_class_repository import SqlAlchemyClassRepository
+from repositories.cached_repositories import CachedSqlAlchemyClassRepository
 from repositories.sql_diceset_repository import SqlAlchemyDiceSetRepository
 from repositories.sql_dicelog_repository import SqlAlchemyDiceLogRepository
 from services.dnd_class.class_service_exceptions import ClassNotFoundError, ClassServiceError
 from auth.auth import get_current_user
 from models.db_models.table_models import User
 from rate_limit import limiter
+from routes.fast_json import FastJSONRoute
+from routes.conditional import not_modified, resource_etag
 import logging
 
 
-router = APIRouter(tags=["classes"])
+router = APIRouter(tags=["classes"], route_class=FastJSONRoute)
 logger = logging.getLogger(__name__)
 
 
 def get_class_service(session: SessionDep) \
         -> ClassService:
     """Factory to get the dnd_class, dice set and dice log service."""
-    class_repo = SqlAlchemyClassRepository(session)
+    class_repo = CachedSqlAlchemyClassRepository(session)
     diceset_repo = SqlAlchemyDiceSetRepository(session)
     dicelog_repo = SqlAlchemyDiceLogRepository(session)
     return ClassService(
@@ -35,20 +37,44 @@ def get_class_service(session: SessionDep) \
     )
 
 
+@router.get("/classes/search",
+            response_model=List[ClassListItem],
+            response_model_exclude_unset=True)
+@limiter.limit("30/minute")
+def search_classes(
+        request: Request,
+        current_user: User = Depends(get_current_user),
+        params: SearchQueryParams = Depends(),
+        service: ClassService = Depends(get_class_service)):
+    """Endpoint to search the classes of the current user by name,
+    best matches first (?prefix=true for autocomplete)."""
+    logger.info(f"GET classes search by user {current_user.id}")
+    return service.search_classes(current_user.id, params)
+
+
 @router.get("/classes/{class_id}",
             response_model=ClassPublic)
 @limiter.limit("10/minute")
 def read_class(
         request: Request,
+        response: Response,
         class_id: int = Path(
             ...,
             description="The ID of the dnd_class to retrieve."
         ),
         current_user: User = Depends(get_current_user),
         service: ClassService = Depends(get_class_service)):
-    """Endpoint to get a single dnd dnd_class."""
+    """Endpoint to get a single dnd dnd_class.
+    Answers 304 if If-None-Match has the current ETag."""
     logger.info(f"GET dnd_class {class_id} by user {current_user.id}")
     try:
+        unchanged = not_modified(
+            request, "dnd_class", class_id,
+            service.get_class_version,
+            owner_id=current_user.id
+        )
+        if unchanged is not None:
+            return unchanged
         dnd_class = service.get_class(class_id)
 
         if dnd_class.user_id != current_user.id:
@@ -56,6 +82,9 @@ def read_class(
                 status_code=403,
                 detail="Not allowed"
             )
+        response.headers["ETag"] = resource_etag(
+            "dnd_class", dnd_class.id, dnd_class.version, dnd_class.created_at
+        )
         return dnd_class
 
     except ClassNotFoundError:
@@ -66,7 +95,8 @@ def read_class(
 
 
 @router.get("/classes/",
-            response_model=List[ClassPublic])
+            response_model=List[ClassListItem],
+            response_model_exclude_unset=True)
 @limiter.limit("10/minute")
 def read_classes(
         request: Request,
@@ -74,12 +104,16 @@ def read_classes(
         pagination: Pagination = Depends(),
         filters: ClassQueryParams = Depends(),
         service: ClassService = Depends(get_class_service)):
-    """Endpoint to get a list of all classes."""
+    """Endpoint to get a list of all classes. Without skills,
+    notes and inventory unless ?view=full or ?fields= ask for them."""
     logger.info(f"GET classes list by user {current_user.id}")
-    return service.list_classes(
+    classes = service.list_classes(
         offset=pagination.offset,
         limit=pagination.limit,
-        filters=filters)
+        filters=filters,
+        after_id=pagination.after_id())
+    pagination.next_cursor(classes, "id")
+    return classes
 
 
 @router.post("/classes/",
@@ -142,7 +176,7 @@ def update_class(
 
 
 @router.delete("/classes/{class_id}",
-               response_model=ClassPublic)
+               response_model=ClassDeleted)
 @limiter.limit("5/minute")
 def delete_class(
         request: Request,
@@ -221,7 +221,7 @@
 # Independent functional unit tests with mocks
 import pytest
 from unittest.mock import Mock
-from fastapi import HTTPException, Request
+from fastapi import HTTPException, Request, Response
 from routes.dnd_class.dnd_classes import (
     read_class,
     read_classes,
@@ -239,7 +239,9 @@ from datetime import datetime
 @pytest.fixture
 def mock_request():
     """Fixture for mocked request object."""
-    return Mock(spec=Request)
+    request = Mock(spec=Request)
+    request.headers = {}
+    return request
 
 
 @pytest.fixture
@@ -319,7 +321,7 @@ def test_read_class_success(mock_request, mock_service, mock_user, sample_class)
     """Test successful class retrieval."""
     mock_service.get_class.return_value = sample_class
 
-    result = read_class(mock_request, 1, mock_user, mock_service)
+    result = read_class(mock_request, Response(), 1, mock_user, mock_service)
 
     mock_service.get_class.assert_called_once_with(1)
     assert result.id == sample_class.id
@@ -331,7 +333,7 @@ def test_read_class_not_found(mock_request, mock_service, mock_user):
     mock_service.get_class.side_effect = ClassNotFoundError("Class not found")
 
     with pytest.raises(HTTPException) as exc_info:
-        read_class(mock_request, 999, mock_user, mock_service)
+        read_class(mock_request, Response(), 999, mock_user, mock_service)
 
     assert exc_info.value.status_code == 404
     assert exc_info.value.detail == "Class not found"
@@ -342,7 +344,7 @@ def test_read_class_forbidden(mock_request, mock_service, mock_other_user, sampl
     mock_service.get_class.return_value = sample_class
 
     with pytest.raises(HTTPException) as exc_info:
-        read_class(mock_request, 1, mock_other_user, mock_service)
+        read_class(mock_request, Response(), 1, mock_other_user, mock_service)
 
     assert exc_info.value.status_code == 403
     assert exc_info.value.detail == "Not allowed"
@@ -362,7 +364,8 @@ def test_read_classes_success(mock_request, mock_service, mock_user, mock_pagina
     mock_service.list_classes.assert_called_once_with(
         offset=0,
         limit=100,
-        filters=mock_filters
+        filters=mock_filters,
+        after_id=None
     )
     assert len(result) == 2
     assert result[0].name == "Warrior 1"
@@ -0,0 +1,155 @@
+"""
+fast_json.py
+
+Response path that validates once and encodes straight to bytes.
+
+FastAPI validates the return value of an endpoint against its
+response_model, dumps it to Python objects and encodes those with
+json.dumps. The repositories already return validated XPublic
+models, so FastJSONRoute serializes them with the cached TypeAdapter
+of the response model (pydantic-core dump_json, no intermediate
+dicts). Values that are not yet the response model (dicts, ORM
+objects) are validated once, as FastAPI would, then serialized.
+
+Use it as route_class of a router; routes without response_model
+or with an own response_class are left to FastAPI.
+"""
+import inspect
+from functools import lru_cache, wraps
+from typing import Any, Callable, Optional
+from fastapi import Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.exceptions import ResponseValidationError
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import PydanticSerializationError
+
+
+
+# Parameter name of the injected response (headers, status code)
+SUB_RESPONSE = "_fast_json_response"
+
+
+@lru_cache(maxsize=None)
+def type_adapter(response_model: Any) -> TypeAdapter:
+    """The TypeAdapter of a response model, built once per type."""
+    return TypeAdapter(response_model)
+
+
+def response_options(route: APIRoute) -> dict:
+    """The serialization options of a route (response_model_*)."""
+    return dict(
+        include=route.response_model_include,
+        exclude=route.response_model_exclude,
+        by_alias=route.response_model_by_alias,
+        exclude_unset=route.response_model_exclude_unset,
+        exclude_defaults=route.response_model_exclude_defaults,
+        exclude_none=route.response_model_exclude_none
+    )
+
+
+def _serialize(dump: Callable[..., Any], adapter: TypeAdapter, content: Any, options: dict):
+    """Dump content with an adapter dump method; validated
+    first unless it already is (a list of) the response model."""
+    options.setdefault("by_alias", True)
+    try:
+        return dump(content, warnings="error", **options)
+    except PydanticSerializationError:
+        pass  # Not the response model yet
+    try:
+        value = adapter.validate_python(content, from_attributes=True)
+    except ValidationError as exc:
+        raise ResponseValidationError(
+            errors=exc.errors(include_url=False), body=content
+        )
+    return dump(value, **options)
+
+
+def dump_json(adapter: TypeAdapter, content: Any, **options) -> bytes:
+    """Content as JSON. options are the dump_json arguments
+    of the route (response_model_exclude_unset, ...)."""
+    return _serialize(adapter.dump_json, adapter, content, options)
+
+
+def dump_jsonable(adapter: TypeAdapter, content: Any, **options) -> Any:
+    """Content as JSON compatible Python objects, to embed
+    in another response (same options as dump_json)."""
+    return _serialize(adapter.dump_python, adapter, content, dict(options, mode="json"))
+
+
+def render(
+        adapter: TypeAdapter,
+        content: Any,
+        sub_response: Response,
+        status_code: Optional[int],
+        options: dict) -> Response:
+    """The response of an endpoint result, with the headers
+    and status code the endpoint set on its injected response."""
+    if isinstance(content, Response):
+        return content
+    response = Response(
+        dump_json(adapter, content, **options),
+        status_code=sub_response.status_code or status_code or 200,
+        media_type="application/json"
+    )
+    response.headers.raw.extend(sub_response.headers.raw)
+    return response
+
+
+class FastJSONRoute(APIRoute):
+    """Route that serializes its response model with dump_json.
+
+    The endpoint is wrapped before APIRoute builds the route: the
+    wrapper asks for FastAPI's Response parameter (headers and status
+    code set by the endpoint) and returns the serialized Response,
+    which FastAPI sends as it is. route.endpoint stays the decorated
+    function, routes are looked up by it."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        super().__init__(path, self._serializing(endpoint), **kwargs)
+        self.endpoint = endpoint
+        self._adapter = None
+        if self.response_field is not None \
+                and isinstance(self.response_class, DefaultPlaceholder):
+            self._adapter = type_adapter(self.response_model)
+        self._options = response_options(self)
+
+
+    def _serializing(self, endpoint: Callable[..., Any]) -> Callable[..., Any]:
+        """The endpoint returning its serialized response."""
+        signature = inspect.signature(endpoint, eval_str=True)
+        parameters = list(signature.parameters.values())
+        # Reuse the response parameter of the endpoint, else add one
+        own_param = next((
+            param.name for param in parameters
+            if inspect.isclass(param.annotation) and issubclass(param.annotation, Response)
+        ), None)
+        if own_param is None:
+            parameters.append(inspect.Parameter(
+                SUB_RESPONSE, inspect.Parameter.KEYWORD_ONLY, annotation=Response
+            ))
+
+        def sub_response(values: dict) -> Response:
+            return values[own_param] if own_param else values.pop(SUB_RESPONSE)
+
+        if inspect.iscoroutinefunction(endpoint):
+            @wraps(endpoint)
+            async def serialized(**values):
+                response = sub_response(values)
+                return self._render(await endpoint(**values), response)
+        else:
+            @wraps(endpoint)
+            def serialized(**values):
+                response = sub_response(values)
+                return self._render(endpoint(**values), response)
+
+        serialized.__signature__ = signature.replace(parameters=parameters)
+        return serialized
+
+
+    def _render(self, content: Any, sub_response: Response) -> Any:
+        """The response of an endpoint result; left to FastAPI for
+        routes without response_model or with an own response_class."""
+        if self._adapter is None:
+            return content
+        return render(self._adapter, content, sub_response, self.status_code, self._options)
@@ -0,0 +1,55 @@
+"""
+jobs.py
+
+The API endpoints for background jobs.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Path, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from dependencies import SessionDep
+from models.schemas.job_schema import JobPublic
+from repositories.sql_job_repository import SqlAlchemyJobRepository
+from services.job.job_service import JobService
+from services.job.job_service_exceptions import JobNotFoundError
+from rate_limit import limiter
+from routes.fast_json import FastJSONRoute
+import logging
+
+router = APIRouter(tags=["jobs"], route_class=FastJSONRoute)
+logger = logging.getLogger(__name__)
+
+
+def get_job_service(session: SessionDep) \
+        -> JobService:
+    """Factory to get the job service."""
+    return JobService(SqlAlchemyJobRepository(session))
+
+
+def job_accepted(job: JobPublic) -> JSONResponse:
+    """202 response for a queued job, linking to its status."""
+    return JSONResponse(
+        status_code=202,
+        content=jsonable_encoder(job),
+        headers={"Location": f"/jobs/{job.id}"}
+    )
+
+
+@router.get("/jobs/{job_id}",
+            response_model=JobPublic)
+@limiter.limit("30/minute")
+def read_job(
+        request: Request,
+        job_id: str = Path(..., description="The ID of the job to retrieve"),
+        service: JobService = Depends(get_job_service)):
+    """Endpoint to get the status and progress of a job.
+    The random job ID is the handle, no login needed, so an
+    account deletion can be followed after the account is gone."""
+    logger.debug(f"GET /jobs/{job_id} requested")
+    try:
+        return service.get_job(job_id)
+    except JobNotFoundError:
+        raise HTTPException(
+            status_code=404,
+            detail="Job not found."
+        )
@@ -0,0 +1,64 @@
+"""
+test_jobs.py
+
+Test the job endpoints.
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import Mock
+from fastapi import HTTPException, Request
+from models.schemas.job_schema import DELETE_USER, PENDING, JobPublic
+from routes.job.jobs import job_accepted, read_job
+from services.job.job_service_exceptions import JobNotFoundError
+
+
+@pytest.fixture
+def mock_request():
+    """Fixture for mocked request object."""
+    return Mock(spec=Request)
+
+
+@pytest.fixture
+def sample_job():
+    """Fixture for a queued job."""
+    now = datetime.now()
+    return JobPublic(
+        id="abc",
+        kind=DELETE_USER,
+        target_id=1,
+        user_id=1,
+        status=PENDING,
+        created_at=now,
+        updated_at=now
+    )
+
+
+def test_read_job(mock_request, sample_job):
+    """Test reading the status of a job."""
+    service = Mock()
+    service.get_job.return_value = sample_job
+
+    result = read_job(mock_request, "abc", service)
+
+    service.get_job.assert_called_once_with("abc")
+    assert result.status == PENDING
+
+
+def test_read_job_not_found(mock_request):
+    """Test a missing job returns 404."""
+    service = Mock()
+    service.get_job.side_effect = JobNotFoundError("Job missing not found.")
+
+    with pytest.raises(HTTPException) as exc_info:
+        read_job(mock_request, "missing", service)
+
+    assert exc_info.value.status_code == 404
+
+
+def test_job_accepted(sample_job):
+    """Test the 202 response links to the job."""
+    response = job_accepted(sample_job)
+
+    assert response.status_code == 202
+    assert response.headers["Location"] == "/jobs/abc"
+    assert b'"status":"pending"' in response.body
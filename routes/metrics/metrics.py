@@ -0,0 +1,24 @@
+"""
+metrics.py
+
+API endpoint to expose the process metrics.
+"""
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+from metrics import registry
+from rate_limit import limiter
+import logging
+
+
+router = APIRouter(tags=["metrics"])
+logger = logging.getLogger(__name__)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+@limiter.limit("30/minute")
+def read_metrics(request: Request):
+    """Endpoint for metric scrapers (Prometheus text format)."""
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4"
+    )
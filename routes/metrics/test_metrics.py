@@ -0,0 +1,44 @@
+"""
+test_metrics.py
+
+Tests for the metrics endpoint.
+"""
+import pytest
+from unittest.mock import Mock
+from fastapi import Request
+from metrics import MetricsRegistry
+from routes.metrics.metrics import read_metrics
+
+
+@pytest.fixture
+def mock_request():
+    """Fixture for mocked request object."""
+    return Mock(spec=Request)
+
+
+def test_read_metrics(mock_request):
+    """Test the metrics are rendered in the Prometheus text format."""
+    response = read_metrics(mock_request)
+    body = response.body.decode()
+
+    assert response.media_type.startswith("text/plain")
+    assert "# TYPE dicelog_queue_depth gauge" in body
+    assert "dicelog_flush_seconds_count" in body
+
+
+def test_registry_render():
+    """Test counters, gauges and summaries render their samples."""
+    registry = MetricsRegistry()
+    registry.counter("rolls_total", "Rolls.").inc(3)
+    registry.gauge("depth", "Depth.", callback=lambda: 7)
+    latency = registry.summary("latency_seconds", "Latency.")
+    latency.observe(0.5)
+    latency.observe(1.5)
+
+    body = registry.render()
+
+    assert "rolls_total 3" in body
+    assert "depth 7" in body
+    assert "latency_seconds_count 2" in body
+    assert "latency_seconds_sum 2" in body
+    assert "latency_seconds_max 1.5" in body
@@ -0,0 +1,58 @@
+"""
+rolls.py
+
+API endpoints for rolling dice expressions.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Request
+from dependencies import SessionDep
+from models.schemas.roll_schema import *
+from repositories.sql_campaign_repository import SqlAlchemyCampaignRepository
+from repositories.sql_dicelog_repository import SqlAlchemyDiceLogRepository
+from services.roll.roll_service import RollService
+from services.roll.roll_service_exceptions import (
+    RollExpressionError,
+    RollServiceError
+)
+from auth.auth import get_current_user
+from models.db_models.table_models import User
+from rate_limit import limiter
+from routes.fast_json import FastJSONRoute
+import logging
+
+
+router = APIRouter(tags=["rolls"], route_class=FastJSONRoute)
+logger = logging.getLogger(__name__)
+
+
+def get_roll_service(session: SessionDep) -> RollService:
+    """Factory to get the roll service with dice log
+    and campaign repo (seeded rolls)."""
+    dicelog_repo = SqlAlchemyDiceLogRepository(session)
+    campaign_repo = SqlAlchemyCampaignRepository(session)
+    return RollService(dicelog_repo, campaign_repo)
+
+
+@router.post("/rolls/expr", response_model=RollExpressionResult)
+@limiter.limit("30/minute")
+def roll_expression(
+        request: Request,
+        roll_input: RollExpressionInput,
+        current_user: User = Depends(get_current_user),
+        service: RollService = Depends(get_roll_service)):
+    """Endpoint to roll a dice expression (e.g. 4d6kh3+2)."""
+    logger.info(
+        f"ROLL expression '{roll_input.expression}' "
+        f"by user {current_user.id}"
+    )
+    try:
+        return service.roll_expression(
+            expression=roll_input.expression,
+            user_id=current_user.id,
+            campaign_id=roll_input.campaign_id,
+            dnd_class_id=roll_input.dnd_class_id
+        )
+    except RollExpressionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RollServiceError:
+        logger.error("Service error while rolling expression")
+        raise HTTPException(status_code=500, detail="Internal Server Error.")
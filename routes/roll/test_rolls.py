@@ -0,0 +1,94 @@
+"""
+test_rolls.py
+
+Tests for roll endpoints.
+"""
+import pytest
+from unittest.mock import Mock
+from fastapi import HTTPException, Request
+from routes.roll.rolls import roll_expression
+from models.schemas.roll_schema import (
+    RollExpressionInput,
+    RollExpressionResult,
+    RollTermResult
+)
+from models.db_models.table_models import User
+from services.roll.roll_service_exceptions import (
+    RollExpressionError,
+    RollServiceError
+)
+from datetime import datetime
+
+
+@pytest.fixture
+def mock_request():
+    """Fixture for mocked request object."""
+    return Mock(spec=Request)
+
+
+@pytest.fixture
+def mock_service():
+    """Fixture for mocked roll service."""
+    return Mock()
+
+
+@pytest.fixture
+def mock_user():
+    """Fixture for mocked current user."""
+    return User(
+        id=1,
+        user_name="testuser",
+        email="test@example.com",
+        hashed_password="hashed_password",
+        created_at=datetime.now()
+    )
+
+
+@pytest.fixture
+def roll_input():
+    """Fixture for sample roll input."""
+    return RollExpressionInput(
+        expression="4d6kh3+2",
+        campaign_id=10,
+        dnd_class_id=5
+    )
+
+
+def test_roll_expression_success(mock_request, mock_service, mock_user, roll_input):
+    """Test successful expression roll."""
+    mock_service.roll_expression.return_value = RollExpressionResult(
+        expression="4d6kh3+2",
+        terms=[RollTermResult(notation="4d6kh3", sides=6, rolls=[1, 4, 6, 3], kept=[6, 4, 3])],
+        total=15
+    )
+
+    result = roll_expression(mock_request, roll_input, mock_user, mock_service)
+
+    mock_service.roll_expression.assert_called_once_with(
+        expression="4d6kh3+2",
+        user_id=1,
+        campaign_id=10,
+        dnd_class_id=5
+    )
+    assert result.total == 15
+
+
+def test_roll_expression_invalid(mock_request, mock_service, mock_user, roll_input):
+    """Test invalid expressions return 400."""
+    mock_service.roll_expression.side_effect = RollExpressionError("Unexpected end of expression.")
+
+    with pytest.raises(HTTPException) as exc_info:
+        roll_expression(mock_request, roll_input, mock_user, mock_service)
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Unexpected end of expression."
+
+
+def test_roll_expression_service_error(mock_request, mock_service, mock_user, roll_input):
+    """Test service errors return 500."""
+    mock_service.roll_expression.side_effect = RollServiceError("Database error")
+
+    with pytest.raises(HTTPException) as exc_info:
+        roll_expression(mock_request, roll_input, mock_user, mock_service)
+
+    assert exc_info.value.status_code == 500
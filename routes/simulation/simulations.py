@@ -0,0 +1,84 @@
+"""
+simulations.py
+
+API endpoints for Monte Carlo simulations of dice sets.
+"""
+from typing import AsyncIterator
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlmodel import SQLModel
+from dependencies import SessionDep
+from models.schemas.simulation_schema import *
+from repositories.sql_dice_repository import SqlAlchemyDiceRepository
+from repositories.sql_diceset_repository import SqlAlchemyDiceSetRepository
+from services.diceset.diceset_service import DiceSetService
+from services.diceset.diceset_service_exceptions import (
+    DiceSetNotFoundError,
+    DiceSetServiceError
+)
+from services.simulation.simulation_service import SimulationService
+from services.simulation.simulation_service_exceptions import (
+    SimulationLimitError,
+    SimulationServiceError
+)
+from auth.auth import get_current_user
+from models.db_models.table_models import User
+from rate_limit import limiter
+from routes.fast_json import FastJSONRoute
+import logging
+
+
+router = APIRouter(tags=["simulations"], route_class=FastJSONRoute)
+logger = logging.getLogger(__name__)
+
+
+def get_simulation_service(session: SessionDep) -> SimulationService:
+    """Factory to get the simulation service
+    (without dice log repo, simulations are never logged)."""
+    dice_repo = SqlAlchemyDiceRepository(session)
+    diceset_repo = SqlAlchemyDiceSetRepository(session)
+    return SimulationService(
+        DiceSetService(dice_repo, diceset_repo, None)
+    )
+
+
+async def stream_events(events: AsyncIterator[SQLModel]):
+    """Encode simulation events as newline delimited JSON."""
+    try:
+        async for event in events:
+            yield event.model_dump_json(exclude_none=True) + "\n"
+    except SimulationServiceError as e:
+        yield SimulationError(detail=str(e)).model_dump_json() + "\n"
+
+
+@router.post("/simulations/")
+@limiter.limit("5/minute")
+def run_simulation(
+        request: Request,
+        simulation: SimulationInput,
+        current_user: User = Depends(get_current_user),
+        service: SimulationService = Depends(get_simulation_service)):
+    """Endpoint to simulate a dice set (only owner allowed).
+    Streams progress events and the final result as NDJSON."""
+    logger.info(f"SIMULATE dice set {simulation.diceset_id} by user {current_user.id}")
+    try:
+        plan = service.prepare(simulation)
+    except SimulationLimitError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DiceSetNotFoundError:
+        logger.warning(f"Dice set not found for simulation")
+        raise HTTPException(status_code=404, detail="Dice set not found.")
+    except DiceSetServiceError:
+        logger.error(f"Service error while preparing simulation")
+        raise HTTPException(status_code=500, detail="Internal Server Error.")
+
+    # Check ownership of all simulated dice sets
+    for pool in (plan.pool, plan.opponent):
+        if pool is not None and pool.user_id != current_user.id:
+            logger.warning(f"User {current_user.id} tried to SIMULATE dice set {pool.diceset_id} owned by {pool.user_id}")
+            raise HTTPException(status_code=403, detail="Not allowed")
+
+    return StreamingResponse(
+        stream_events(service.run(plan)),
+        media_type="application/x-ndjson"
+    )
@@ -0,0 +1,135 @@
+"""
+test_simulations.py
+
+Tests for simulation endpoints.
+"""
+import asyncio
+import json
+import pytest
+from unittest.mock import Mock
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from routes.simulation.simulations import run_simulation, stream_events
+from models.schemas.simulation_schema import (
+    SimulationInput,
+    SimulationProgress,
+    SimulationResult
+)
+from models.db_models.table_models import User
+from services.diceset.diceset_service import DiceSetPool
+from services.diceset.diceset_service_exceptions import DiceSetNotFoundError
+from services.simulation.simulation_service import SimulationPlan
+from services.simulation.simulation_service_exceptions import (
+    SimulationLimitError,
+    SimulationTimeoutError
+)
+from datetime import datetime
+
+
+@pytest.fixture
+def mock_request():
+    """Fixture for mocked request object."""
+    return Mock(spec=Request)
+
+
+@pytest.fixture
+def mock_service():
+    """Fixture for mocked simulation service."""
+    return Mock()
+
+
+@pytest.fixture
+def mock_user():
+    """Fixture for mocked current user."""
+    return User(
+        id=1,
+        user_name="testuser",
+        email="test@example.com",
+        hashed_password="hashed_password",
+        created_at=datetime.now()
+    )
+
+
+def make_plan(owner_id=1, opponent_owner_id=None):
+    """Create a simulation plan for the given owners."""
+    opponent = None
+    if opponent_owner_id is not None:
+        opponent = DiceSetPool(2, "Other", opponent_owner_id, ((6, 1),))
+    return SimulationPlan(
+        pool=DiceSetPool(1, "Set", owner_id, ((6, 2),)),
+        opponent=opponent,
+        dc=None,
+        trials=100
+    )
+
+
+def read_stream(events):
+    """Collect the NDJSON lines of an event stream."""
+    async def run():
+        return [json.loads(line) async for line in stream_events(events)]
+    return asyncio.run(run())
+
+
+def test_run_simulation_success(mock_request, mock_service, mock_user):
+    """Test a simulation returns a streaming response."""
+    mock_service.prepare.return_value = make_plan()
+
+    response = run_simulation(mock_request, SimulationInput(diceset_id=1), mock_user, mock_service)
+
+    assert isinstance(response, StreamingResponse)
+    assert response.media_type == "application/x-ndjson"
+
+
+def test_run_simulation_forbidden_opponent(mock_request, mock_service, mock_user):
+    """Test simulating against another user's dice set is forbidden."""
+    mock_service.prepare.return_value = make_plan(opponent_owner_id=2)
+
+    with pytest.raises(HTTPException) as exc_info:
+        run_simulation(mock_request, SimulationInput(diceset_id=1, opponent_diceset_id=2), mock_user, mock_service)
+
+    assert exc_info.value.status_code == 403
+    mock_service.run.assert_not_called()
+
+
+def test_run_simulation_limit(mock_request, mock_service, mock_user):
+    """Test the trial cap returns 400."""
+    mock_service.prepare.side_effect = SimulationLimitError("Too many trials.")
+
+    with pytest.raises(HTTPException) as exc_info:
+        run_simulation(mock_request, SimulationInput(diceset_id=1), mock_user, mock_service)
+
+    assert exc_info.value.status_code == 400
+
+
+def test_run_simulation_not_found(mock_request, mock_service, mock_user):
+    """Test a missing dice set returns 404."""
+    mock_service.prepare.side_effect = DiceSetNotFoundError("Not found")
+
+    with pytest.raises(HTTPException) as exc_info:
+        run_simulation(mock_request, SimulationInput(diceset_id=999), mock_user, mock_service)
+
+    assert exc_info.value.status_code == 404
+
+
+def test_stream_events_encodes_ndjson():
+    """Test events are encoded as one JSON object per line."""
+    async def events():
+        yield SimulationProgress(completed=50, trials=100)
+        yield SimulationResult(diceset_id=1, trials=100, mean=7.0)
+
+    lines = read_stream(events())
+
+    assert lines[0] == {"event": "progress", "completed": 50, "trials": 100}
+    assert lines[1]["event"] == "result"
+    assert lines[1]["mean"] == 7.0
+
+
+def test_stream_events_error():
+    """Test service errors end the stream with an error event."""
+    async def events():
+        yield SimulationProgress(completed=50, trials=100)
+        raise SimulationTimeoutError("Simulation timed out after 30 seconds.")
+
+    lines = read_stream(events())
+
+    assert lines[-1] == {"event": "error", "detail": "Simulation timed out after 30 seconds."}
@@ -0,0 +1,148 @@
+"""
+test_async_routes.py
+
+Tests for the async route variants (DB_BACKEND=async).
+"""
+import asyncio
+import inspect
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from auth.test_helpers import create_test_user, get_test_token
+from dependencies import (
+    async_database_url,
+    get_async_session as prod_get_async_session,
+    get_session as prod_get_session
+)
+from models.db_models.table_models import Campaign
+from models.db_models.test_db import (
+    get_async_session,
+    get_session,
+    get_test_async_engine,
+    test_engine
+)
+from rate_limit import limiter
+from repositories.async_sql_repositories import AsyncSqlAlchemyDiceLogRepository
+from routes.async_routes import async_router
+from routes.batch import batch
+from routes.campaign import campaigns
+from routes.dice import dices
+from routes.dicelog import dicelogs
+from routes.diceset import dicesets
+from routes.roll import rolls
+from routes.user import users
+
+
+@pytest.fixture(scope="module")
+def client():
+    """Fixture for an app with the async routes on the test DB."""
+    app = FastAPI()
+    app.state.limiter = limiter
+    for router in (campaigns.router, dicelogs.router, users.router):
+        app.include_router(async_router(router))
+    app.dependency_overrides[prod_get_session] = get_session
+    app.dependency_overrides[prod_get_async_session] = get_async_session
+    return TestClient(app)
+
+
+@pytest.fixture
+def user():
+    """Fixture for a test user."""
+    with Session(test_engine) as session:
+        return create_test_user(session)
+
+
+@pytest.fixture
+def headers(user, monkeypatch):
+    """Fixture for the bearer token header of the test user."""
+    monkeypatch.setattr("auth.auth.ALGORITHM", "HS256")
+    return {"Authorization": f"Bearer {get_test_token(user)}"}
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("sqlite:///./app.db", "sqlite+aiosqlite:///./app.db"),
+    ("postgresql://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+    ("postgresql+psycopg2://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+])
+def test_async_database_url(url, expected):
+    """Test the async driver is picked for the dialect."""
+    assert async_database_url(url) == expected
+
+
+def test_async_database_url_unknown_dialect():
+    """Test a dialect without async driver is an error."""
+    with pytest.raises(ValueError):
+        async_database_url("oracle://db")
+
+
+@pytest.mark.parametrize("router", [
+    batch.router,
+    campaigns.router,
+    dicelogs.router,
+    dicesets.router,
+    dices.router,
+    rolls.router,
+    users.router,
+])
+def test_async_router_keeps_sync_routes(router):
+    """Test only hand-written variants run on the event loop,
+    every other route keeps its sync endpoint (threadpool)."""
+    converted = async_router(router)
+
+    for sync_route, served in zip(router.routes, converted.routes):
+        if sync_route.endpoint is dicelogs.list_logs:
+            assert served.endpoint is dicelogs.list_logs_async
+            assert inspect.iscoroutinefunction(served.endpoint)
+        else:
+            assert served is sync_route
+            assert not inspect.iscoroutinefunction(served.endpoint)
+
+
+def test_async_routes_round_trip(client, user, headers):
+    """Test create, read and delete with the async routes
+    (the campaign routes stay sync next to the async log list)."""
+    created = client.post("/campaigns/", headers=headers, json={
+        "title": "Async Campaign",
+        "genre": "Fantasy",
+        "description": "Created on AsyncSession",
+        "max_classes": 4
+    })
+    assert created.status_code == 200
+    campaign_id = created.json()["id"]
+
+    listed = client.get("/campaigns/", headers=headers, params={"user_id": user.id})
+    assert [c["id"] for c in listed.json()] == [campaign_id]
+    assert "description" not in listed.json()[0]  # Summary view
+
+    logs = client.get("/dicelogs/", headers=headers, params={"consistent": True})
+    assert logs.status_code == 200
+    assert logs.json() == []
+
+    deleted = client.delete(f"/campaigns/{campaign_id}", headers=headers)
+    assert deleted.status_code == 200
+    with Session(test_engine) as session:
+        assert session.get(Campaign, campaign_id) is None
+
+
+def test_async_routes_require_token(client):
+    """Test the async current user dependency rejects bad tokens."""
+    response = client.get("/dicelogs/", headers={"Authorization": "Bearer nope"})
+    assert response.status_code == 401
+
+
+def test_async_repository_methods(user):
+    """Test the async repository runs the sqlalchemy reads."""
+    async def scenario():
+        async with AsyncSession(get_test_async_engine()) as session:
+            logs_repo = AsyncSqlAlchemyDiceLogRepository(session)
+            return (
+                await logs_repo.list_logs(user.id),
+                await logs_repo.list_by_user(user.id),
+                await logs_repo.wait_for_pending(user.id),
+            )
+
+    assert asyncio.run(scenario()) == ([], [], True)
+    assert inspect.iscoroutinefunction(AsyncSqlAlchemyDiceLogRepository.list_logs)
+    assert not hasattr(AsyncSqlAlchemyDiceLogRepository, "log_roll")  # Writer, not awaited
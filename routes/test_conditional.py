@@ -0,0 +1,146 @@
+"""
+test_conditional.py
+
+Tests for the conditional GETs (ETag / If-None-Match).
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session, select
+from auth.test_helpers import get_test_token
+from main import app
+from models.db_models.table_models import Campaign, DiceSet, User
+from models.db_models.test_db import test_engine
+from rate_limit import limiter
+from repositories.test_cascade_delete import make_campaign, make_user
+from routes.conditional import etag_matches, resource_etag
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Fixture for the app with tokens and without rate limits."""
+    monkeypatch.setattr("auth.auth.ALGORITHM", "HS256")
+    monkeypatch.setattr(limiter, "enabled", False)
+    return TestClient(app)
+
+
+@pytest.fixture
+def owner():
+    """Fixture for a user with a campaign, returns both."""
+    with Session(test_engine) as session:
+        user = make_user(session)
+        campaign_id = make_campaign(session, user)
+        session.refresh(user)
+        return user, campaign_id
+
+
+def auth(user, etag=None):
+    headers = {"Authorization": f"Bearer {get_test_token(user)}"}
+    if etag is not None:
+        headers["If-None-Match"] = etag
+    return headers
+
+
+@pytest.mark.parametrize("header, matches", [
+    ('"campaign-1-v2"', True),
+    ('W/"campaign-1-v2"', True),
+    ('"campaign-1-v1", "campaign-1-v2"', True),
+    ("*", True),
+    ('"campaign-1-v1"', False),
+])
+def test_etag_matches(header, matches):
+    """Test the If-None-Match comparison."""
+    assert etag_matches(header, '"campaign-1-v2"') is matches
+
+
+def etag_of(kind, model, row_id):
+    """The current ETag of a row."""
+    with Session(test_engine) as session:
+        row = session.get(model, row_id)
+        return resource_etag(kind, row_id, row.version, row.created_at)
+
+
+def test_not_modified_skips_the_row(client, owner):
+    """Test the current ETag gets an empty 304 without loading the campaign row."""
+    user, campaign_id = owner
+    response = client.get(f"/campaigns/{campaign_id}", headers=auth(user))
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+    assert etag == etag_of("campaign", Campaign, campaign_id)
+    assert etag.startswith(f'"campaign-{campaign_id}-') and etag.endswith('-v1"')
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(test_engine, "before_cursor_execute", listener)
+    try:
+        response = client.get(f"/campaigns/{campaign_id}", headers=auth(user, etag))
+    finally:
+        event.remove(test_engine, "before_cursor_execute", listener)
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    campaign_reads = [s for s in statements if "FROM campaign" in s]
+    assert len(campaign_reads) == 1  # Version and owner only
+    assert "campaign.title" not in campaign_reads[0]
+
+
+def test_change_makes_a_new_etag(client, owner):
+    """Test an update ends the 304s for the old ETag."""
+    user, campaign_id = owner
+    etag = client.get(f"/campaigns/{campaign_id}", headers=auth(user)).headers["ETag"]
+
+    client.patch(f"/campaigns/{campaign_id}", json={"title": "Renamed"}, headers=auth(user))
+    response = client.get(f"/campaigns/{campaign_id}", headers=auth(user, etag))
+
+    assert response.status_code == 200
+    assert response.json()["title"] == "Renamed"
+    assert response.headers["ETag"] == etag_of("campaign", Campaign, campaign_id)
+    assert response.headers["ETag"].endswith('-v2"')
+
+
+def test_other_user_gets_no_304(client, owner):
+    """Test a known ETag does not bypass the owner check."""
+    _, campaign_id = owner
+    with Session(test_engine) as session:
+        other = make_user(session)
+
+    response = client.get(
+        f"/campaigns/{campaign_id}",
+        headers=auth(other, etag_of("campaign", Campaign, campaign_id))
+    )
+    assert response.status_code == 403
+
+
+def test_recreated_row_gets_a_new_etag(client, owner):
+    """Test a row that reuses the id of a deleted one (SQLite)
+    does not answer 304 to the ETag of the deleted row."""
+    user, campaign_id = owner
+    etag = client.get(f"/campaigns/{campaign_id}", headers=auth(user)).headers["ETag"]
+    assert client.delete(f"/campaigns/{campaign_id}", headers=auth(user)).status_code == 200
+
+    with Session(test_engine) as session:
+        assert make_campaign(session, session.get(User, user.id)) == campaign_id
+    response = client.get(f"/campaigns/{campaign_id}", headers=auth(user, etag))
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_diceset_etag_follows_its_dices(client, owner):
+    """Test new dices in a set change its ETag."""
+    user, campaign_id = owner
+    with Session(test_engine) as session:
+        diceset_id = session.exec(
+            select(DiceSet.id).where(DiceSet.campaign_id == campaign_id)
+        ).first()
+    url = f"/dicesets/{diceset_id}"
+    etag = client.get(url, headers=auth(user)).headers["ETag"]
+    assert client.get(url, headers=auth(user, etag)).status_code == 304
+
+    client.patch(url, json={"dice_ids": [1, 2, 2]}, headers=auth(user))
+    response = client.get(url, headers=auth(user, etag))
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == etag_of("diceset", DiceSet, diceset_id)
+    assert response.headers["ETag"].endswith('-v2"')
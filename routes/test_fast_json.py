@@ -0,0 +1,133 @@
+"""
+test_fast_json.py
+
+Tests for the single validation JSON response path.
+"""
+import asyncio
+from datetime import datetime
+from typing import List
+import pytest
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.exceptions import ResponseValidationError
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.routing import serialize_response
+from fastapi.testclient import TestClient
+from fastapi.utils import create_model_field
+from pydantic import TypeAdapter
+from models.schemas.campaign_schema import CampaignPublic
+from models.schemas.dicelog_schema import DiceLogPublic
+from routes.fast_json import FastJSONRoute, dump_json, type_adapter
+
+
+CAMPAIGN = CampaignPublic(
+    id=1, title="Tomb é", genre="Horror", description="Story",
+    max_classes=4, created_by=1, created_at=datetime(2025, 1, 2, 3, 4, 5)
+)
+DICELOG = DiceLogPublic(
+    id=1, user_id=1, campaign_id=1, dnd_class_id=1,
+    roll="d20 -> 20", result=20, timestamp=None
+)
+
+
+@pytest.fixture
+def client():
+    """Fixture for an app with a FastJSONRoute router."""
+    router = APIRouter(route_class=FastJSONRoute)
+
+    @router.get("/campaigns", response_model=List[CampaignPublic])
+    def campaigns(response: Response):
+        response.headers["X-Next-Cursor"] = "next"
+        return [CAMPAIGN]
+
+    @router.post("/campaigns", response_model=CampaignPublic, status_code=201)
+    async def create():
+        return CAMPAIGN.model_dump()
+
+    @router.get("/broken", response_model=CampaignPublic)
+    def broken():
+        return {"id": "not a number"}
+
+    @router.get("/accepted", response_model=CampaignPublic)
+    def accepted():
+        return JSONResponse({"queued": True}, status_code=202)
+
+    @router.get("/text", response_class=PlainTextResponse)
+    def text():
+        return "plain"
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.mark.parametrize("response_model, content", [
+    (List[CampaignPublic], [CAMPAIGN, CAMPAIGN]),
+    (List[DiceLogPublic], [DICELOG]),
+    (CampaignPublic, CAMPAIGN.model_dump()),
+])
+def test_same_json_as_fastapi(response_model, content):
+    """Test the bytes equal FastAPI's default serialization."""
+    field = create_model_field(name="Response", type_=response_model, mode="serialization")
+    expected = JSONResponse(
+        asyncio.run(serialize_response(field=field, response_content=content))
+    ).body
+
+    assert dump_json(type_adapter(response_model), content) == expected
+
+
+def test_models_are_not_validated_again(monkeypatch):
+    """Test models returned by the repositories skip validation."""
+    calls = []
+    validate = TypeAdapter.validate_python
+    monkeypatch.setattr(
+        TypeAdapter, "validate_python",
+        lambda self, *args, **kwargs: calls.append(1) or validate(self, *args, **kwargs)
+    )
+    adapter = type_adapter(List[CampaignPublic])
+
+    dump_json(adapter, [CAMPAIGN])
+    assert calls == []
+    dump_json(adapter, [CAMPAIGN.model_dump()])
+    assert calls == [1]
+
+
+def test_type_adapters_are_cached():
+    """Test one adapter per response model."""
+    assert type_adapter(List[CampaignPublic]) is type_adapter(List[CampaignPublic])
+
+
+def test_route_keeps_headers_and_status(client):
+    """Test headers and status codes reach the client."""
+    response = client.get("/campaigns")
+    assert response.status_code == 200
+    assert response.headers["X-Next-Cursor"] == "next"
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()[0]["created_at"] == "2025-01-02 03:04:05"
+
+    response = client.post("/campaigns")
+    assert response.status_code == 201
+    assert response.json()["title"] == "Tomb é"
+
+
+def test_route_passes_responses_and_other_classes(client):
+    """Test returned responses and own response classes are kept."""
+    assert client.get("/accepted").status_code == 202
+    assert client.get("/text").text == "plain"
+
+
+def test_invalid_response_is_an_error(client):
+    """Test content not matching the response model is a 500."""
+    assert client.get("/broken").status_code == 500
+    with pytest.raises(ResponseValidationError):
+        dump_json(type_adapter(CampaignPublic), {"id": "not a number"})
+
+
+def test_route_keeps_its_endpoint(client):
+    """Test the route is found by its endpoint and the added
+    response parameter is not part of the API."""
+    route = next(r for r in client.app.routes if getattr(r, "path", None) == "/broken")
+    assert route.endpoint.__name__ == "broken"
+    assert not hasattr(route.endpoint, "__wrapped__")
+
+    operation = client.app.openapi()["paths"]["/campaigns"]["post"]
+    assert "parameters" not in operation
@@ -151,6 +151,7 @@ from models.schemas.user_schema import UserUpdate, UserPublic
 from models.db_models.table_models import User
 from services.user.user_service_exceptions import UserNotFoundError
 from dependencies import UserQueryParams, Pagination
+from models.schemas.job_schema import DELETE_USER, PENDING, JobPublic
 from datetime import datetime
 
 
@@ -250,7 +251,8 @@ def test_read_users_success(mock_request, mock_service, mock_user, mock_paginati
     mock_service.list_users.assert_called_once_with(
         offset=0,
         limit=100,
-        filters=mock_filters
+        filters=mock_filters,
+        after_id=None
     )
     assert len(result) == 2
     assert result[0].user_name == "user1"
@@ -318,3 +320,24 @@ def test_delete_user_not_found(mock_request, mock_service, mock_user):
 
     assert exc_info.value.status_code == 404
     assert exc_info.value.detail == "User not found"
+
+
+def test_delete_user_background(mock_request, mock_service, mock_user):
+    """Test a background deletion returns 202 with the queued job."""
+    job_service = Mock()
+    job_service.delete_user.return_value = JobPublic(
+        id="abc",
+        kind=DELETE_USER,
+        target_id=1,
+        user_id=1,
+        status=PENDING,
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    )
+
+    response = delete_user(mock_request, mock_user, mock_service, job_service, True)
+
+    job_service.delete_user.assert_called_once_with(1)
+    mock_service.delete_user.assert_not_called()
+    assert response.status_code == 202
+    assert response.headers["Location"] == "/jobs/abc"
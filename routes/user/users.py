@@ -3,24 +3,31 @@ users.py
 
 The API endpoints for users.
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Path, Request
+from typing import Annotated, List
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
 
-from dependencies import Pagination, SessionDep, UserQueryParams
+from dependencies import Pagination, SearchQueryParams, SessionDep, UserQueryParams
 from models.db_models.table_models import User
-from models.schemas.user_schema import UserUpdate, UserPublic
-from repositories.sql_user_repository import SqlAlchemyUserRepository
+from models.schemas.job_schema import JobPublic
+from models.schemas.user_schema import UserDeleted, UserUpdate, UserPublic
+from repositories.cached_repositories import (
+    CachedSqlAlchemyCampaignRepository,
+    CachedSqlAlchemyClassRepository,
+    CachedSqlAlchemyUserRepository
+)
 from services.user.user_service import UserService
-from repositories.sql_campaign_repository import SqlAlchemyCampaignRepository
-from repositories.sql_class_repository import SqlAlchemyClassRepository
 from repositories.sql_diceset_repository import SqlAlchemyDiceSetRepository
 from repositories.sql_dicelog_repository import SqlAlchemyDiceLogRepository
 from services.user.user_service_exceptions import UserNotFoundError
+from services.job.job_service import JobService
+from services.job.job_service_exceptions import JobServiceError
+from routes.job.jobs import get_job_service, job_accepted
 from auth.auth import get_current_user
 from rate_limit import limiter
+from routes.fast_json import FastJSONRoute
 import logging
 
-router = APIRouter(tags=["users"])
+router = APIRouter(tags=["users"], route_class=FastJSONRoute)
 logger = logging.getLogger(__name__)
 
 
@@ -28,9 +35,9 @@ def get_user_service(session: SessionDep) \
         -> UserService:
     """Factory to get the user, campaign,
     dnd_class, dice set and dice log service."""
-    user_repo = SqlAlchemyUserRepository(session)
-    campaign_repo = SqlAlchemyCampaignRepository(session)
-    class_repo = SqlAlchemyClassRepository(session)
+    user_repo = CachedSqlAlchemyUserRepository(session)
+    campaign_repo = CachedSqlAlchemyCampaignRepository(session)
+    class_repo = CachedSqlAlchemyClassRepository(session)
     diceset_repo = SqlAlchemyDiceSetRepository(session)
     dicelog_repo = SqlAlchemyDiceLogRepository(session)
     return UserService(user_repo,
@@ -40,6 +47,20 @@ def get_user_service(session: SessionDep) \
                        dicelog_repo)
 
 
+@router.get("/users/search",
+            response_model=List[UserPublic])
+@limiter.limit("30/minute")
+def search_users(
+        request: Request,
+        current_user: User = Depends(get_current_user),
+        params: SearchQueryParams = Depends(),
+        service: UserService = Depends(get_user_service)):
+    """Endpoint to search users by username,
+    best matches first (?prefix=true for autocomplete)."""
+    logger.debug("GET /users/search requested")
+    return service.search_users(params)
+
+
 @router.get("/users/{user_id}",
             response_model=UserPublic)
 @limiter.limit("10/minute")
@@ -81,10 +102,13 @@ def read_users(
         service: UserService = Depends(get_user_service)):
     """Endpoint to get all users."""
     logger.debug("GET /users/ list requested")
-    return service.list_users(
+    users = service.list_users(
         offset=pagination.offset,
         limit=pagination.limit,
-        filters=filters)
+        filters=filters,
+        after_id=pagination.after_id())
+    pagination.next_cursor(users, "id")
+    return users
 
 
 @router.patch("/users/me/update",
@@ -116,16 +140,32 @@ def update_user(
 
 
 @router.delete("/users/me/delete",
-               response_model=UserPublic)
+               response_model=UserDeleted,
+               responses={202: {"model": JobPublic, "description": "Deletion queued"}})
 @limiter.limit("3/minute")
 def delete_user(
         request: Request,
         current_user: User = Depends(get_current_user),
-        service: UserService = Depends(get_user_service)
+        service: UserService = Depends(get_user_service),
+        job_service: JobService = Depends(get_job_service),
+        background: Annotated[bool, Query(
+            description="Delete in a background job, follow it at /jobs/{id}."
+        )] = False
 ):
     """Delete the authenticated user + all related resources."""
     logger.warning(f"DELETE /users/me/delete requested by user {current_user.id}")
 
+    if background:
+        try:
+            job = job_service.delete_user(current_user.id)
+        except JobServiceError:
+            raise HTTPException(
+                status_code=500,
+                detail="Internal server error."
+            )
+        logger.info(f"User {current_user.id} deletion queued as Job {job.id}")
+        return job_accepted(job)
+
     deleted = service.delete_user(current_user.id)
 
     if not deleted:
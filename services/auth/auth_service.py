@@ -62,8 +62,7 @@ class AuthService:
                 )
             )
             session.add(db_user)
-            session.commit()
-            session.refresh(db_user)
+            session.flush()
             return db_user
 
         except Exception:
@@ -225,16 +225,15 @@ def test_register_user_success(auth_service, mock_session, sample_user_data):
     """Test successful user registration."""
     mock_session.exec.return_value.first.return_value = None
     mock_session.add = Mock()
-    mock_session.commit = Mock()
-    mock_session.refresh = Mock(side_effect=lambda user: setattr(user, 'id', 1))
+    mock_session.flush = Mock()
 
     with patch('services.auth.auth_service.hash_password', return_value="hashed_password"):
         result = auth_service.register_user(mock_session, sample_user_data)
 
         mock_session.exec.assert_called_once()
         mock_session.add.assert_called_once()
-        mock_session.commit.assert_called_once()
-        mock_session.refresh.assert_called_once()
+        mock_session.flush.assert_called_once()
+        mock_session.commit.assert_not_called()  # Committed by the request
 
         assert result.user_name == sample_user_data.user_name
         assert result.email == sample_user_data.email
@@ -286,7 +285,7 @@ def test_register_user_database_error_on_creation(auth_service, mock_session, sa
     """Test registration handles database error during user creation."""
     mock_session.exec.return_value.first.return_value = None
     mock_session.add = Mock()
-    mock_session.commit = Mock(side_effect=Exception("Database error"))
+    mock_session.flush = Mock(side_effect=Exception("Database error"))
 
     with patch('services.auth.auth_service.hash_password', return_value="hashed_password"):
         with pytest.raises(AuthServiceError) as exc_info:
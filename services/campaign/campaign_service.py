@@ -4,20 +4,28 @@ campaign_service.py
 Business logic for campaign.
 """
 import logging
-from typing import List
+from functools import partial
+from typing import List, Optional, Sequence
 
-from dependencies import CampaignQueryParams
+from dependencies import CampaignQueryParams, SearchQueryParams
 from models.schemas.campaign_schema import *
 from repositories.campaign_repository import CampaignRepository
+from repositories.version_cache import ResourceVersion
 from repositories.class_repository import ClassRepository
 from repositories.diceset_repository import DiceSetRepository
 from repositories.dicelog_repository import DiceLogRepository
 from services.campaign.campaign_service_exceptions import *
+from services.dice import entropy_pool
 
 
 
 logger = logging.getLogger(__name__)
 
+# Caps of the expanded collections of a campaign
+EXPAND_MAX_CLASSES = 50
+EXPAND_MAX_DICESETS_PER_CLASS = 20
+EXPAND_MAX_RECENT_LOGS = 20
+
 
 class CampaignService:
     """Initialise the bussines logic
@@ -100,19 +108,91 @@ class CampaignService:
             )
 
 
+    def expand_campaign(
+            self,
+            campaign: CampaignPublic,
+            user_id: int,
+            expand: Sequence[str]) \
+            -> CampaignExpanded:
+        """The campaign with the expanded collections, each loaded
+        with one batched query (dice sets of all classes at once)
+        and capped: classes, dicesets (of the classes, implies
+        classes) and the recent dice logs of the user."""
+        try:
+            expanded = CampaignExpanded.model_validate(campaign)
+            if "classes" in expand or "dicesets" in expand:
+                classes = self.class_repo.list_by_campaign(
+                    campaign.id, limit=EXPAND_MAX_CLASSES
+                )
+                dicesets = {}
+                if "dicesets" in expand:
+                    dicesets = self.diceset_repo.list_by_classes(
+                        [c.id for c in classes],
+                        per_class=EXPAND_MAX_DICESETS_PER_CLASS
+                    )
+                expanded.classes = []
+                for dnd_class in classes:
+                    item = ClassExpanded.model_validate(dnd_class)
+                    if dnd_class.id in dicesets:
+                        item.dicesets = dicesets[dnd_class.id]
+                    expanded.classes.append(item)
+            if "recent_logs" in expand:
+                expanded.recent_logs = self.dicelog_repo.list_recent_by_campaign(
+                    campaign.id, user_id, limit=EXPAND_MAX_RECENT_LOGS
+                )
+            logger.info(
+                f"Expanded Campaign {campaign.id} "
+                f"with {', '.join(expand)}"
+            )
+            return expanded
+
+        except Exception:
+            logger.exception(
+                f"Error while expanding "
+                f"Campaign {campaign.id}",
+                exc_info=True
+            )
+            raise CampaignServiceError(
+                "Error while expanding campaign."
+            )
+
+
+    def get_campaign_version(
+            self,
+            campaign_id: int) \
+            -> Optional[ResourceVersion]:
+        """Get version and owner of a campaign
+        (None if it does not exist)."""
+        try:
+            return self.campaign_repo.get_version(campaign_id)
+        except Exception:
+            logger.exception(
+                f"Error while retrieving the version "
+                f"of Campaign {campaign_id}",
+                exc_info=True
+            )
+            raise CampaignServiceError(
+                "Error while retrieving campaign version."
+            )
+
+
     def list_campaigns(
             self,
             filters: CampaignQueryParams,
             offset: int = 0,
-            limit: int = 100,) \
-            -> List[CampaignPublic]:
-        """Get a list of all campaigns."""
+            limit: int = 100,
+            after_id: Optional[int] = None) \
+            -> List[CampaignListItem]:
+        """Get a list of all campaigns with the fields
+        of the filters (after_id for keyset paging)."""
         try:
             campaigns = self.campaign_repo.list_all(
                 user_id=filters.user_id,
                 name=filters.name,
                 offset=offset,
-                limit=limit
+                limit=limit,
+                after_id=after_id,
+                fields=filters.fields
             )
             logger.info(
                 f"Listed {len(campaigns)} Campaigns "
@@ -132,6 +212,33 @@ class CampaignService:
             )
 
 
+    def search_campaigns(
+            self,
+            user_id: int,
+            params: SearchQueryParams) \
+            -> List[CampaignListItem]:
+        """Search the campaigns of a user by title, best matches first."""
+        try:
+            campaigns = self.campaign_repo.search(
+                text=params.q,
+                prefix=params.prefix,
+                limit=params.limit,
+                user_id=user_id
+            )
+            logger.info(f"Found {len(campaigns)} Campaigns for User {user_id}")
+            return campaigns
+
+        except Exception:
+            logger.exception(
+                "Error while "
+                "searching Campaigns",
+                exc_info=True
+            )
+            raise CampaignServiceError(
+                "Error while searching campaigns."
+            )
+
+
     def update_campaign(
             self,
             campaign_id: int,
@@ -172,7 +279,8 @@ class CampaignService:
             self,
             campaign_id: int):
         """Remove a campaign and the belonging entries:
-        classes, dice sets and dice logs."""
+        classes, dice sets and dice logs (set-based, one transaction).
+        Returns the campaign with the deleted rows per table."""
         try:
             campaign = self.campaign_repo.get_by_id(campaign_id)
             if not campaign:
@@ -185,25 +293,10 @@ class CampaignService:
                     f"not found."
                 )
 
-            # Delete dice logs
-            for log in (self.dicelog_repo
-                    .list_by_campaign(campaign_id)):
-                self.dicelog_repo.delete(log.id)
-
-            # Delete dice sets
-            for diceset in (self.diceset_repo
-                    .list_by_campaign(campaign_id)):
-                self.diceset_repo.delete(diceset.id)
-
-            # Delete classes
-            for dnd_class in (self.class_repo
-                    .list_by_campaign(campaign_id)):
-                self.class_repo.delete(dnd_class.id)
-
-            # Finally delete campaign
-            deleted_campaign = (self.campaign_repo
-                              .delete(campaign_id))
-            if not deleted_campaign:
+            # Dice logs, dice sets, classes and the campaign
+            deleted_rows = (self.campaign_repo
+                            .delete_cascade(campaign_id))
+            if not deleted_rows.get("campaign"):
                 logger.warning(
                     f"Failed to delete "
                     f"Campaign {campaign_id}"
@@ -213,9 +306,12 @@ class CampaignService:
                 )
             logger.info(
                 f"Deleted Campaign {campaign_id} "
-                f"- {deleted_campaign}"
+                f"- {deleted_rows}"
+            )
+            return CampaignDeleted(
+                **campaign.model_dump(),
+                deleted_rows=deleted_rows
             )
-            return deleted_campaign
 
 
         except CampaignServiceError:
@@ -228,3 +324,25 @@ class CampaignService:
             raise CampaignServiceError(
                 "Error while deleting campaign."
             )
+
+
+    def set_roll_seed(
+            self,
+            campaign_id: int,
+            seed: Optional[int]) \
+            -> CampaignSeed:
+        """Seed the rolls of a campaign, so a session
+        can be replayed by setting the same seed again.
+        None switches back to unseeded rolls. The seed is
+        stored with the campaign (restarts, other workers),
+        the pool of this process follows once it is committed."""
+        self.get_campaign(campaign_id)
+        self.campaign_repo.set_roll_seed(campaign_id, seed)
+        self.campaign_repo.after_commit(
+            partial(entropy_pool.seed_campaign, campaign_id, seed)
+        )
+        logger.info(
+            f"Set roll seed of Campaign {campaign_id} "
+            f"({'cleared' if seed is None else 'seeded'})"
+        )
+        return CampaignSeed(seed=seed)
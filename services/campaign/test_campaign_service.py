@@ -497,22 +497,22 @@ def test_update_campaign_exception(campaign_service, mock_campaign_repo):
 # Tests for delete_campaign function
 def test_delete_campaign_success(campaign_service, mock_campaign_repo, mock_class_repo,
                                  mock_diceset_repo, mock_dicelog_repo, sample_campaign):
-    """Test successful campaign deletion with related entities."""
-    # Setup mocks
+    """Test campaign deletion with one cascade and the row counts."""
+    counts = {"dicelog": 2, "dicesetdice": 3, "diceset": 2, "dnd_class": 1, "campaign": 1}
     mock_campaign_repo.get_by_id.return_value = sample_campaign
-    mock_dicelog_repo.list_by_campaign.return_value = [Mock(id=1), Mock(id=2)]
-    mock_diceset_repo.list_by_campaign.return_value = [Mock(id=10), Mock(id=11)]
-    mock_class_repo.list_by_campaign.return_value = [Mock(id=20)]
-    mock_campaign_repo.delete.return_value = sample_campaign
+    mock_campaign_repo.delete_cascade.return_value = counts
 
     result = campaign_service.delete_campaign(1)
 
-    # Verify deletion order: dice logs, dice sets, classes, campaign
-    assert mock_dicelog_repo.delete.call_count == 2
-    assert mock_diceset_repo.delete.call_count == 2
-    assert mock_class_repo.delete.call_count == 1
-    mock_campaign_repo.delete.assert_called_once_with(1)
-    assert result == sample_campaign
+    # No per row deletes
+    mock_campaign_repo.delete_cascade.assert_called_once_with(1)
+    mock_dicelog_repo.delete.assert_not_called()
+    mock_diceset_repo.delete.assert_not_called()
+    mock_class_repo.delete.assert_not_called()
+    mock_campaign_repo.delete.assert_not_called()
+    assert result.id == sample_campaign.id
+    assert result.title == sample_campaign.title
+    assert result.deleted_rows == counts
 
 
 def test_delete_campaign_not_found(campaign_service, mock_campaign_repo):
@@ -525,14 +525,10 @@ def test_delete_campaign_not_found(campaign_service, mock_campaign_repo):
     assert "Campaign with ID 999 not found" in str(exc_info.value)
 
 
-def test_delete_campaign_deletion_fails(campaign_service, mock_campaign_repo, mock_class_repo,
-                                       mock_diceset_repo, mock_dicelog_repo, sample_campaign):
-    """Test delete campaign when final deletion returns None."""
+def test_delete_campaign_deletion_fails(campaign_service, mock_campaign_repo, sample_campaign):
+    """Test delete campaign when the campaign row was not deleted."""
     mock_campaign_repo.get_by_id.return_value = sample_campaign
-    mock_dicelog_repo.list_by_campaign.return_value = []
-    mock_diceset_repo.list_by_campaign.return_value = []
-    mock_class_repo.list_by_campaign.return_value = []
-    mock_campaign_repo.delete.return_value = None
+    mock_campaign_repo.delete_cascade.return_value = {"dicelog": 0, "campaign": 0}
 
     with pytest.raises(CampaignDeleteError) as exc_info:
         campaign_service.delete_campaign(1)
@@ -550,20 +546,14 @@ def test_delete_campaign_exception(campaign_service, mock_campaign_repo):
     assert "Error while deleting campaign" in str(exc_info.value)
 
 
-def test_delete_campaign_no_related_entities(campaign_service, mock_campaign_repo, mock_class_repo,
-                                             mock_diceset_repo, mock_dicelog_repo, sample_campaign):
+def test_delete_campaign_no_related_entities(campaign_service, mock_campaign_repo, sample_campaign):
     """Test deleting campaign with no related entities."""
     mock_campaign_repo.get_by_id.return_value = sample_campaign
-    mock_dicelog_repo.list_by_campaign.return_value = []
-    mock_diceset_repo.list_by_campaign.return_value = []
-    mock_class_repo.list_by_campaign.return_value = []
-    mock_campaign_repo.delete.return_value = sample_campaign
+    mock_campaign_repo.delete_cascade.return_value = {
+        "dicelog": 0, "dicesetdice": 0, "diceset": 0, "dnd_class": 0, "campaign": 1
+    }
 
     result = campaign_service.delete_campaign(1)
 
-    # Verify no deletions for related entities
-    mock_dicelog_repo.delete.assert_not_called()
-    mock_diceset_repo.delete.assert_not_called()
-    mock_class_repo.delete.assert_not_called()
-    mock_campaign_repo.delete.assert_called_once_with(1)
-    assert result == sample_campaign
+    assert result.deleted_rows["campaign"] == 1
+    assert result.deleted_rows["dicelog"] == 0
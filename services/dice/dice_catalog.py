@@ -0,0 +1,104 @@
+"""
+dice_catalog.py
+
+Process-wide, read-only catalog of the fixed dice table.
+
+The dice (d4..d100) are seeded once and almost never change,
+so they are loaded in the app lifespan and kept in memory.
+Roll and validation paths look dice up here instead of the
+database. A change of the dices marks the catalog stale once it
+is committed (the committed session can not query any more), the
+next lookup with a repository builds a new catalog and swaps it
+in; readers never see a half updated or uncommitted catalog.
+"""
+import logging
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Iterable, Mapping, Optional
+
+from models.schemas.dice_schema import DicePublic
+from repositories.dice_repository import DiceRepository
+
+
+
+logger = logging.getLogger(__name__)
+
+CATALOG_LIMIT = 1000
+
+
+@dataclass(frozen=True)
+class DiceCatalog:
+    """Immutable lookup tables for the dice table."""
+    by_id: Mapping[int, DicePublic]
+    ids_by_name: Mapping[str, int]
+
+    @classmethod
+    def from_dices(cls, dices: Iterable[DicePublic]) -> "DiceCatalog":
+        """Build a catalog from a list of dices."""
+        by_id = {dice.id: dice for dice in dices}
+        return cls(
+            by_id=MappingProxyType(by_id),
+            ids_by_name=MappingProxyType(
+                {dice.name: dice.id for dice in by_id.values()}
+            )
+        )
+
+    def get(self, dice_id: int) -> Optional[DicePublic]:
+        """Get a dice by ID (None if unknown)."""
+        return self.by_id.get(dice_id)
+
+    def id_for(self, name: str) -> Optional[int]:
+        """Get the ID of a dice by name, e.g. 'd20'."""
+        return self.ids_by_name.get(name)
+
+    def __contains__(self, dice_id: int) -> bool:
+        return dice_id in self.by_id
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+
+_catalog: Optional[DiceCatalog] = None
+_stale = False
+
+
+def get_catalog(repository: Optional[DiceRepository] = None) \
+        -> Optional[DiceCatalog]:
+    """Get the loaded catalog (None before startup). A stale
+    catalog is reloaded with the repository first, without
+    one it is None (look the dice up in the database)."""
+    if _stale:
+        if repository is None:
+            return None
+        load_catalog(repository)
+    return _catalog
+
+
+def load_catalog(repository: DiceRepository) -> DiceCatalog:
+    """Load (or reload) the catalog from the dice table."""
+    global _catalog, _stale
+    _catalog = DiceCatalog.from_dices(
+        repository.list_all(offset=0, limit=CATALOG_LIMIT)
+    )
+    _stale = False
+    logger.info(f"Dice catalog loaded with {len(_catalog)} dices")
+    return _catalog
+
+
+def _mark_stale():
+    global _stale
+    _stale = _catalog is not None
+
+
+def refresh_catalog(repository: DiceRepository):
+    """Reload the catalog after dices changed, once the change
+    is committed (no-op if it was never loaded)."""
+    if _catalog is not None:
+        repository.after_commit(_mark_stale)
+
+
+def clear_catalog():
+    """Unload the catalog, lookups fall back to the database."""
+    global _catalog, _stale
+    _catalog = None
+    _stale = False
@@ -4,14 +4,16 @@ dice_service.py
 Business logic for dice handling.
 """
 import logging
-from typing import List
-from random import randint
+from typing import List, Optional
 from datetime import timezone
 
 from models.schemas.dice_schema import *
 from models.schemas.dicelog_schema import *
 from repositories.dice_repository import DiceRepository
+from repositories.campaign_repository import CampaignRepository
 from repositories.dicelog_repository import DiceLogRepository
+from services.dice.dice_catalog import get_catalog, refresh_catalog
+from services.dice.entropy_pool import roll_face, seeded_campaign
 from services.dice.dice_service_exceptions import *
 
 
@@ -26,17 +28,30 @@ class DiceService:
     def __init__(
             self,
             repository: DiceRepository,
-            log_repository: Optional[DiceLogRepository] = None):
+            log_repository: Optional[DiceLogRepository] = None,
+            campaign_repo: Optional[CampaignRepository] = None):
         self.repo = repository
         self.log_repo = log_repository
+        self.campaign_repo = campaign_repo  # Seeded campaign rolls
         logger.debug("DiceService initialized")
 
 
+    def _find_dice(self, dice_id: int) \
+            -> Optional[DicePublic]:
+        """Look the dice up in the catalog,
+        or in the database if the catalog is not loaded."""
+        catalog = get_catalog(self.repo)
+        if catalog is not None:
+            return catalog.get(dice_id)
+        return self.repo.get_by_id(dice_id)
+
+
     def create_dice(self, dice: DiceCreate) \
             -> Optional[DicePublic]:
         """Create a new dice."""
         try:
             created = self.repo.add(dice)
+            refresh_catalog(self.repo)
             logger.info(
                 f"Created Dice {created.id} "
                 f"- {created.name}"
@@ -57,7 +72,7 @@ class DiceService:
             -> Optional[DicePublic]:
         """Get the dice by ID."""
         try:
-            db_dice = self.repo.get_by_id(dice_id)
+            db_dice = self._find_dice(dice_id)
             if not db_dice:
                 logger.warning(
                     f"Dice {dice_id} not found"
@@ -89,13 +104,16 @@ class DiceService:
     def list_dices(
             self,
             offset: int = 0,
-            limit: int = 100) \
+            limit: int = 100,
+            after_id: Optional[int] = None) \
             -> List[DicePublic]:
-        """Get a list of all dices."""
+        """Get a list of all dices
+        (after_id for keyset paging)."""
         try:
             dices = self.repo.list_all(
                 offset=offset,
-                limit=limit)
+                limit=limit,
+                after_id=after_id)
             logger.info(
                 f"Listed {len(dices)} Dices "
                 f"(offset={offset}, "
@@ -121,6 +139,7 @@ class DiceService:
         """Change the data from a dice."""
         try:
             updated = self.repo.update(dice_id, dice)
+            refresh_catalog(self.repo)
             if not updated:
                 logger.warning(
                     f"Dice {dice_id} "
@@ -153,6 +172,7 @@ class DiceService:
         """Remove a dice by ID."""
         try:
             deleted = self.repo.delete(dice_id)
+            refresh_catalog(self.repo)
             if not deleted:
                 logger.warning(
                     f"Dice {dice_id} not found "
@@ -229,7 +249,7 @@ class DiceService:
     ):
         """Roll a dice (e.g. d6 -> random 1-6)
         and optionally log the result."""
-        db_dice = self.repo.get_by_id(dice_id)
+        db_dice = self._find_dice(dice_id)
         if not db_dice:
             logger.warning(
                 f"Dice {dice_id} "
@@ -239,7 +259,10 @@ class DiceService:
                 f"Dice with ID {dice_id} "
                 f"not found."
             )
-        result = randint(1, db_dice.sides)
+        result = roll_face(
+            db_dice.sides,
+            seeded_campaign(self.campaign_repo, campaign_id, user_id)
+        )
         logger.info(
             f"Rolled Dice {dice_id} "
             f"- {db_dice.name}: {result}"
@@ -0,0 +1,268 @@
+"""
+entropy_pool.py
+
+Buffered random number source for dice rolls.
+
+Random 32 bit values are generated in blocks with NumPy (PCG64)
+and handed out one by one. Faces are taken from the buffer by
+rejection sampling, so every face is equally likely. The next block
+is generated in a background thread before the current one runs dry.
+
+A campaign can get its own seeded pool, so the rolls of a session
+can be replayed exactly by setting the same seed again. The seed is
+stored with the campaign: a process builds the pool from it on the
+first roll (after a restart, in every worker), drops it when the seed
+is removed or the campaign is deleted, and only the owner of the
+campaign rolls from it. The position in the sequence is per process.
+"""
+import logging
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 16_384
+CAMPAIGN_BLOCK_SIZE = 4_096
+_UINT32_RANGE = 2 ** 32
+
+
+def _acceptance_limit(sides: int) -> int:
+    """Largest multiple of `sides` that fits into 32 bits.
+    Values at or above it are rejected to avoid modulo bias."""
+    return _UINT32_RANGE - _UINT32_RANGE % sides
+
+
+class EntropyPool:
+    """A buffer of random 32 bit values
+    that refills itself in the background.
+    Not thread safe, see SharedEntropyPool."""
+
+    def __init__(
+            self,
+            seed: Optional[int] = None,
+            block_size: int = BLOCK_SIZE):
+        self.seed = seed
+        self.block_size = block_size
+        self._rng = np.random.Generator(np.random.PCG64(seed))
+        self._buffer = self._generate()
+        self._values = self._buffer.tolist()  # Fast access for single rolls
+        self._pos = 0
+        self._refill_at = block_size - block_size // 4
+        self._spare: Optional[np.ndarray] = None
+        self._refill: Optional[threading.Thread] = None
+
+
+    def _generate(self) -> np.ndarray:
+        """Generate one block of random values."""
+        return self._rng.integers(
+            0, _UINT32_RANGE,
+            size=self.block_size,
+            dtype=np.uint32
+        )
+
+
+    def _fill_spare(self):
+        """Background job: generate the next block."""
+        self._spare = self._generate()
+
+
+    def _start_refill(self):
+        """Start generating the next block in the background."""
+        if self._refill is not None or self._spare is not None:
+            return
+        self._refill = threading.Thread(
+            target=self._fill_spare,
+            name="entropy-pool-refill",
+            daemon=True
+        )
+        self._refill.start()
+
+
+    def _next_block(self):
+        """Swap in the next block.
+        Waits for the background refill if it is still running,
+        so values are always handed out in generator order."""
+        if self._refill is not None:
+            self._refill.join()
+            self._refill = None
+        if self._spare is None:
+            logger.debug("Entropy pool ran dry, refilling in place")
+            self._spare = self._generate()
+        self._buffer, self._spare = self._spare, None
+        self._values = self._buffer.tolist()
+        self._pos = 0
+
+
+    def _take(self, count: int) -> np.ndarray:
+        """Take the next `count` raw values from the buffer."""
+        parts = []
+        while count > 0:
+            if self._pos >= self.block_size:
+                self._next_block()
+            end = min(self._pos + count, self.block_size)
+            parts.append(self._buffer[self._pos:end])
+            count -= end - self._pos
+            self._pos = end
+        if self._pos >= self._refill_at:
+            self._start_refill()
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+
+    def roll(self, sides: int) -> int:
+        """Roll a single die with `sides` sides."""
+        limit = _UINT32_RANGE - _UINT32_RANGE % sides  # Inlined _acceptance_limit
+        while True:
+            if self._pos >= self.block_size:
+                self._next_block()
+            value = self._values[self._pos]
+            self._pos += 1
+            if value < limit:
+                break
+        if self._pos >= self._refill_at:
+            self._start_refill()
+        return value % sides + 1
+
+
+    def roll_faces(self, sides: int, count: int) -> np.ndarray:
+        """Roll `count` dice with `sides` sides."""
+        limit = _acceptance_limit(sides)
+        faces = np.empty(count, dtype=np.int64)
+        filled = 0
+        while filled < count:
+            values = self._take(count - filled)
+            accepted = values[values < limit]
+            faces[filled:filled + len(accepted)] = accepted % sides + 1
+            filled += len(accepted)
+        return faces
+
+
+class SharedEntropyPool(EntropyPool):
+    """Entropy pool that can be used from several threads.
+    Used for seeded campaigns, whose rolls must come
+    from a single sequence to be replayable."""
+
+    def __init__(
+            self,
+            seed: Optional[int] = None,
+            block_size: int = BLOCK_SIZE):
+        super().__init__(seed, block_size)
+        self._lock = threading.Lock()
+
+
+    def roll(self, sides: int) -> int:
+        """Roll a single die with `sides` sides."""
+        with self._lock:
+            return super().roll(sides)
+
+
+    def roll_faces(self, sides: int, count: int) -> np.ndarray:
+        """Roll `count` dice with `sides` sides."""
+        with self._lock:
+            return super().roll_faces(sides, count)
+
+
+# Pool registry
+_thread_pools = threading.local()  # One unseeded pool per thread, no locking
+_campaign_pools: Dict[int, SharedEntropyPool] = {}
+_registry_lock = threading.Lock()
+
+
+def _thread_pool() -> EntropyPool:
+    """Get the unseeded pool of the current thread."""
+    try:
+        return _thread_pools.pool
+    except AttributeError:
+        _thread_pools.pool = EntropyPool()
+        return _thread_pools.pool
+
+
+def get_pool(campaign_id: Optional[int] = None) -> EntropyPool:
+    """Get the seeded pool of a campaign,
+    or the pool of the current thread if the campaign has no seed."""
+    if campaign_id is not None and _campaign_pools:
+        pool = _campaign_pools.get(campaign_id)
+        if pool is not None:
+            return pool
+    return _thread_pool()
+
+
+def seed_campaign(campaign_id: int, seed: Optional[int]):
+    """Set the roll seed of a campaign in this process
+    (CampaignService stores it with the campaign).
+    Setting a seed (again) restarts its roll sequence,
+    None switches the campaign back to unseeded rolls."""
+    with _registry_lock:
+        if seed is None:
+            _campaign_pools.pop(campaign_id, None)
+            logger.info(f"Removed roll seed of Campaign {campaign_id}")
+            return
+        _campaign_pools[campaign_id] = SharedEntropyPool(
+            seed=seed,
+            block_size=CAMPAIGN_BLOCK_SIZE
+        )
+        logger.info(f"Seeded rolls of Campaign {campaign_id}")
+
+
+def drop_campaign(campaign_id: int):
+    """Forget the pool of a campaign (unseeded or deleted)."""
+    with _registry_lock:
+        _campaign_pools.pop(campaign_id, None)
+
+
+def seeded_campaign(
+        campaign_repo,
+        campaign_id: Optional[int],
+        user_id: Optional[int]) \
+        -> Optional[int]:
+    """The campaign whose seeded pool a roll of user_id uses,
+    None for unseeded rolls. The pool follows the seed stored with
+    the campaign (built on first use, e.g. after a restart or in
+    another worker, dropped once the seed was removed). Campaigns
+    of other users never use or advance the pool."""
+    if campaign_id is None or campaign_repo is None:
+        return None
+    stored = campaign_repo.get_roll_seed(campaign_id)
+    if stored is None or stored.seed is None:
+        if campaign_id in _campaign_pools:
+            drop_campaign(campaign_id)
+        return None
+    if stored.owner_id != user_id:
+        return None
+    pool = _campaign_pools.get(campaign_id)
+    if pool is None or pool.seed != stored.seed:
+        with _registry_lock:
+            pool = _campaign_pools.get(campaign_id)
+            if pool is None or pool.seed != stored.seed:
+                _campaign_pools[campaign_id] = SharedEntropyPool(
+                    seed=stored.seed,
+                    block_size=CAMPAIGN_BLOCK_SIZE
+                )
+                logger.info(f"Loaded roll seed of Campaign {campaign_id}")
+    return campaign_id
+
+
+def roll_face(sides: int, campaign_id: Optional[int] = None) -> int:
+    """Roll a single die."""
+    return get_pool(campaign_id).roll(sides)
+
+
+def roll_faces(
+        sides: int,
+        count: int,
+        campaign_id: Optional[int] = None) \
+        -> np.ndarray:
+    """Roll `count` dice with the same number of sides."""
+    return get_pool(campaign_id).roll_faces(sides, count)
+
+
+def randint(
+        low: int,
+        high: int,
+        campaign_id: Optional[int] = None) \
+        -> int:
+    """Drop-in for random.randint (both bounds inclusive)."""
+    return low - 1 + roll_face(high - low + 1, campaign_id)
@@ -0,0 +1,60 @@
+"""
+roll_engine.py
+
+Batched dice rolling with NumPy.
+
+All dice with the same number of sides are drawn in one call,
+so rolling a large pool costs about the same as a small one.
+Faces come from the entropy pool (seeded per campaign if set).
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.dice import entropy_pool
+
+
+
+def roll_faces(
+        sides: int,
+        count: int,
+        campaign_id: Optional[int] = None) \
+        -> np.ndarray:
+    """Roll `count` dice with `sides` sides in a single draw."""
+    return entropy_pool.roll_faces(sides, count, campaign_id)
+
+
+def roll_pool(
+        entries: Sequence[Tuple[int, int]],
+        campaign_id: Optional[int] = None) \
+        -> List[np.ndarray]:
+    """Roll a pool of (sides, quantity) entries.
+
+    Entries are grouped by sides and each group is drawn at once.
+    Returns one array of faces per entry, in entry order."""
+    needed: Dict[int, int] = {}
+    for sides, quantity in entries:
+        needed[sides] = needed.get(sides, 0) + quantity
+
+    drawn = {
+        sides: roll_faces(sides, count, campaign_id)
+        for sides, count in needed.items()
+    }
+
+    offsets: Dict[int, int] = {sides: 0 for sides in needed}
+    faces = []
+    for sides, quantity in entries:
+        start = offsets[sides]
+        faces.append(drawn[sides][start:start + quantity])
+        offsets[sides] = start + quantity
+    return faces
+
+
+def face_counts(faces: np.ndarray, sides: int) -> Dict[int, int]:
+    """Count how often each face was rolled (only rolled faces)."""
+    counts = np.bincount(faces, minlength=sides + 1)
+    return {
+        face: int(count)
+        for face, count in enumerate(counts)
+        if face > 0 and count
+    }
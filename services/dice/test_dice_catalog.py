@@ -0,0 +1,121 @@
+"""
+test_dice_catalog.py
+
+Tests for the in-memory dice catalog.
+"""
+import pytest
+from unittest.mock import Mock
+from sqlmodel import Session
+from models.db_models.test_db import test_engine
+from models.schemas.dice_schema import DiceCreate, DicePublic
+from repositories.sql_dice_repository import SqlAlchemyDiceRepository
+from repositories.unit_of_work import transaction
+from services.dice.dice_service import DiceService
+from services.dice import dice_catalog
+from services.dice.dice_catalog import (
+    DiceCatalog,
+    clear_catalog,
+    get_catalog,
+    load_catalog,
+    refresh_catalog
+)
+
+
+@pytest.fixture(autouse=True)
+def unload_catalog():
+    """Unload the catalog after each test."""
+    yield
+    clear_catalog()
+
+
+@pytest.fixture
+def mock_dice_repo():
+    """Fixture for mocked dice repository."""
+    repo = Mock()
+    repo.list_all.return_value = [
+        DicePublic(id=1, name="d4", sides=4),
+        DicePublic(id=6, name="d20", sides=20),
+    ]
+    return repo
+
+
+def test_catalog_lookups():
+    """Test lookups by ID and by name."""
+    catalog = DiceCatalog.from_dices([DicePublic(id=6, name="d20", sides=20)])
+
+    assert catalog.get(6).sides == 20
+    assert catalog.get(7) is None
+    assert catalog.id_for("d20") == 6
+    assert 6 in catalog
+    assert len(catalog) == 1
+
+
+def test_catalog_is_read_only():
+    """Test the lookup tables cannot be changed."""
+    catalog = DiceCatalog.from_dices([DicePublic(id=6, name="d20", sides=20)])
+
+    with pytest.raises(TypeError):
+        catalog.by_id[7] = DicePublic(id=7, name="d30", sides=30)
+
+
+def test_load_catalog(mock_dice_repo):
+    """Test the catalog is loaded once from the repository."""
+    assert get_catalog() is None
+
+    load_catalog(mock_dice_repo)
+
+    assert get_catalog().get(1).name == "d4"
+    mock_dice_repo.list_all.assert_called_once_with(
+        offset=0,
+        limit=dice_catalog.CATALOG_LIMIT
+    )
+
+
+def test_refresh_swaps_catalog(mock_dice_repo):
+    """Test a refresh builds a new catalog after the commit."""
+    old = load_catalog(mock_dice_repo)
+    mock_dice_repo.list_all.return_value = [DicePublic(id=8, name="d100", sides=100)]
+
+    refresh_catalog(mock_dice_repo)
+    assert get_catalog(mock_dice_repo) is old  # Not committed yet
+    committed = mock_dice_repo.after_commit.call_args.args[0]
+    committed()
+
+    assert get_catalog() is None  # Stale, look up in the database
+    assert 1 not in get_catalog(mock_dice_repo)
+    assert get_catalog() is not old
+    assert 1 in old
+
+
+def test_refresh_without_catalog(mock_dice_repo):
+    """Test a refresh does not load a catalog that was never loaded."""
+    refresh_catalog(mock_dice_repo)
+
+    assert get_catalog() is None
+    mock_dice_repo.list_all.assert_not_called()
+
+
+def test_refresh_only_after_commit():
+    """Test a rolled back change leaves the catalog as it is
+    and a committed one is in the next catalog."""
+    with Session(test_engine) as session:
+        loaded = load_catalog(SqlAlchemyDiceRepository(session))
+
+    with Session(test_engine) as session:
+        with pytest.raises(RuntimeError), transaction(session):
+            DiceService(SqlAlchemyDiceRepository(session)).create_dice(
+                DiceCreate(name="d3", sides=3)
+            )
+            raise RuntimeError("request failed")
+    assert get_catalog() is loaded
+
+    with Session(test_engine) as session:
+        with transaction(session):
+            repo = SqlAlchemyDiceRepository(session)
+            created = DiceService(repo).create_dice(DiceCreate(name="d3", sides=3))
+            assert get_catalog(repo) is loaded  # Uncommitted
+        try:
+            assert get_catalog(SqlAlchemyDiceRepository(session)).get(created.id).name == "d3"
+        finally:
+            with transaction(session):
+                SqlAlchemyDiceRepository(session).delete(created.id)
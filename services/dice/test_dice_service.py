@@ -229,6 +229,7 @@ from services.dice.dice_service_exceptions import (
 )
 from models.schemas.dice_schema import DiceCreate, DiceUpdate, DicePublic, DiceRollResult
 from models.schemas.dicelog_schema import DiceLogCreate
+from services.dice.dice_catalog import clear_catalog, get_catalog, load_catalog
 
 
 @pytest.fixture
@@ -347,7 +348,7 @@ def test_list_dices_success(dice_service, mock_dice_repo):
 
     result = dice_service.list_dices(offset=0, limit=100)
 
-    mock_dice_repo.list_all.assert_called_once_with(offset=0, limit=100)
+    mock_dice_repo.list_all.assert_called_once_with(offset=0, limit=100, after_id=None)
     assert len(result) == 2
     assert result[0].name == "d6"
     assert result[1].name == "d20"
@@ -498,7 +499,7 @@ def test_roll_dice_success(dice_service, mock_dice_repo, sample_dice):
     """Test successful dice roll."""
     mock_dice_repo.get_by_id.return_value = sample_dice
 
-    with patch('services.dice.dice_service.randint', return_value=15):
+    with patch('services.dice.dice_service.roll_face', return_value=15):
         result = dice_service.roll_dice(
             dice_id=1,
             user_id=None,
@@ -533,7 +534,7 @@ def test_roll_dice_with_logging(dice_service, mock_dice_repo, mock_log_repo, sam
     """Test dice roll with logging."""
     mock_dice_repo.get_by_id.return_value = sample_dice
 
-    with patch('services.dice.dice_service.randint', return_value=18):
+    with patch('services.dice.dice_service.roll_face', return_value=18):
         result = dice_service.roll_dice(
             dice_id=1,
             user_id=1,
@@ -550,7 +551,7 @@ def test_roll_dice_without_logging_partial_params(dice_service, mock_dice_repo,
     """Test dice roll without logging when some params are None."""
     mock_dice_repo.get_by_id.return_value = sample_dice
 
-    with patch('services.dice.dice_service.randint', return_value=10):
+    with patch('services.dice.dice_service.roll_face', return_value=10):
         result = dice_service.roll_dice(
             dice_id=1,
             user_id=1,
@@ -568,8 +569,8 @@ def test_roll_dice_result_in_range(dice_service, mock_dice_repo, sample_dice):
     mock_dice_repo.get_by_id.return_value = sample_dice
 
     # Run multiple times to check randomness is within bounds
-    with patch('services.dice.dice_service.randint') as mock_randint:
-        mock_randint.return_value = 1
+    with patch('services.dice.dice_service.roll_face') as mock_roll_face:
+        mock_roll_face.return_value = 1
         result = dice_service.roll_dice(
             dice_id=1,
             user_id=None,
@@ -577,6 +578,37 @@ def test_roll_dice_result_in_range(dice_service, mock_dice_repo, sample_dice):
             dnd_class_id=None
         )
 
-        # Verify randint was called with correct parameters
-        mock_randint.assert_called_once_with(1, sample_dice.sides)
+        # Verify roll_face was called with correct parameters
+        mock_roll_face.assert_called_once_with(sample_dice.sides, None)
         assert result.result == 1
+
+
+def test_roll_dice_uses_catalog(dice_service, mock_dice_repo, sample_dice):
+    """Test rolls look the dice up in the catalog instead of the database."""
+    load_catalog(Mock(list_all=Mock(return_value=[sample_dice])))
+    try:
+        with patch('services.dice.dice_service.roll_face', return_value=7):
+            result = dice_service.roll_dice(
+                dice_id=sample_dice.id,
+                user_id=None,
+                campaign_id=None,
+                dnd_class_id=None
+            )
+    finally:
+        clear_catalog()
+
+    mock_dice_repo.get_by_id.assert_not_called()
+    assert result.result == 7
+
+
+def test_create_dice_refreshes_catalog(dice_service, mock_dice_repo, sample_dice_data, sample_dice):
+    """Test creating a dice reloads the catalog."""
+    mock_dice_repo.add.return_value = sample_dice
+    mock_dice_repo.list_all.return_value = [sample_dice]
+    load_catalog(Mock(list_all=Mock(return_value=[])))
+    try:
+        dice_service.create_dice(sample_dice_data)
+        mock_dice_repo.after_commit.call_args.args[0]()  # Commit
+        assert sample_dice.id in get_catalog(mock_dice_repo)
+    finally:
+        clear_catalog()
@@ -0,0 +1,151 @@
+"""
+test_entropy_pool.py
+
+Tests for the buffered entropy pool.
+"""
+import numpy as np
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+from services.dice import entropy_pool
+from repositories.campaign_repository import RollSeed
+from services.dice.entropy_pool import EntropyPool, SharedEntropyPool, randint, seeded_campaign
+
+
+@pytest.fixture(autouse=True)
+def clear_campaign_seeds():
+    """Remove campaign seeds set by a test."""
+    yield
+    entropy_pool._campaign_pools.clear()
+
+
+def test_roll_in_range():
+    """Test single rolls stay between 1 and sides."""
+    pool = EntropyPool(block_size=256)
+    rolls = {pool.roll(6) for _ in range(2000)}
+
+    assert rolls == {1, 2, 3, 4, 5, 6}
+
+
+def test_roll_faces_in_range():
+    """Test bulk rolls stay between 1 and sides."""
+    faces = EntropyPool().roll_faces(20, 10_000)
+
+    assert len(faces) == 10_000
+    assert faces.min() == 1
+    assert faces.max() == 20
+
+
+def test_rejection_sampling():
+    """Test values above the last full multiple of sides are skipped."""
+    pool = EntropyPool(block_size=4)
+    pool._buffer = np.array([2 ** 32 - 1, 5, 2 ** 32 - 2, 6], dtype=np.uint32)
+    pool._values = pool._buffer.tolist()
+    pool._pos = 0
+
+    assert pool.roll(6) == 6  # 5 % 6 + 1
+    assert pool.roll_faces(6, 1).tolist() == [1]  # 6 % 6 + 1
+
+
+def test_same_seed_same_rolls():
+    """Test equal seeds replay the same rolls across several refills."""
+    first = EntropyPool(seed=7, block_size=64)
+    second = EntropyPool(seed=7, block_size=64)
+
+    rolls_first = [first.roll(20) for _ in range(100)] + first.roll_faces(6, 300).tolist()
+    rolls_second = [second.roll(20) for _ in range(100)] + second.roll_faces(6, 300).tolist()
+
+    assert rolls_first == rolls_second
+
+
+def test_refills_in_background():
+    """Test the next block is prepared before the buffer runs dry."""
+    pool = EntropyPool(block_size=64)
+    pool.roll_faces(6, 60)
+
+    assert pool._refill is not None
+    pool._refill.join()
+    assert pool._spare is not None
+    assert len(pool._spare) == 64
+
+
+def test_seed_campaign():
+    """Test a seeded campaign replays its rolls and can be unseeded."""
+    entropy_pool.seed_campaign(1, 42)
+    first = [entropy_pool.roll_face(20, campaign_id=1) for _ in range(20)]
+    entropy_pool.seed_campaign(1, 42)
+    second = [entropy_pool.roll_face(20, campaign_id=1) for _ in range(20)]
+
+    assert first == second
+    assert entropy_pool.get_pool(1).seed == 42
+    assert entropy_pool.get_pool(2) is entropy_pool.get_pool()
+    assert isinstance(entropy_pool.get_pool(1), SharedEntropyPool)
+
+    entropy_pool.seed_campaign(1, None)
+    assert 1 not in entropy_pool._campaign_pools
+
+
+def stored_seed(owner_id, seed):
+    """Campaign repository mock with a stored roll seed."""
+    repo = Mock()
+    repo.get_roll_seed.return_value = RollSeed(owner_id=owner_id, seed=seed)
+    return repo
+
+
+def test_seeded_campaign_builds_pool_from_stored_seed():
+    """Test the pool is rebuilt from the stored seed (restart,
+    other worker) and replays the seeded sequence."""
+    expected = SharedEntropyPool(seed=42).roll_faces(20, 10).tolist()
+
+    campaign_id = seeded_campaign(stored_seed(owner_id=7, seed=42), 1, user_id=7)
+
+    assert campaign_id == 1
+    assert entropy_pool.roll_faces(20, 10, campaign_id).tolist() == expected
+    assert seeded_campaign(stored_seed(7, 42), 1, 7) == 1  # Same pool, continues
+    assert entropy_pool.roll_faces(20, 10, 1).tolist() != expected
+
+
+def test_seeded_campaign_only_for_the_owner():
+    """Test other users' rolls neither use nor advance the pool."""
+    entropy_pool.seed_campaign(1, 42)
+    pool = entropy_pool.get_pool(1)
+    position = pool._pos
+
+    assert seeded_campaign(stored_seed(owner_id=7, seed=42), 1, user_id=8) is None
+    assert pool._pos == position
+    assert seeded_campaign(None, 1, 7) is None
+    assert seeded_campaign(stored_seed(7, 42), None, 7) is None
+
+
+def test_seeded_campaign_follows_the_stored_seed():
+    """Test a pool is dropped when the seed was removed (e.g. by
+    another worker) and rebuilt when it was changed."""
+    entropy_pool.seed_campaign(1, 42)
+
+    assert seeded_campaign(stored_seed(7, 43), 1, 7) == 1
+    assert entropy_pool.get_pool(1).seed == 43
+
+    assert seeded_campaign(stored_seed(7, None), 1, 7) is None
+    assert 1 not in entropy_pool._campaign_pools
+
+    missing = Mock()
+    missing.get_roll_seed.return_value = None
+    assert seeded_campaign(missing, 1, 7) is None
+
+
+def test_shared_pool_across_threads():
+    """Test a shared pool hands out every value once across threads."""
+    pool = SharedEntropyPool(seed=3, block_size=128)
+    expected = SharedEntropyPool(seed=3, block_size=128).roll_faces(6, 4000)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        chunks = list(executor.map(lambda _: pool.roll_faces(6, 100), range(40)))
+
+    assert sorted(np.concatenate(chunks).tolist()) == sorted(expected.tolist())
+
+
+def test_randint_bounds():
+    """Test randint includes both bounds like random.randint."""
+    values = {randint(3, 5) for _ in range(500)}
+
+    assert values == {3, 4, 5}
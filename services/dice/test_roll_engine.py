@@ -0,0 +1,44 @@
+"""
+test_roll_engine.py
+
+Tests for the batched dice roll engine.
+"""
+import numpy as np
+from unittest.mock import patch
+from services.dice import roll_engine
+from services.dice.roll_engine import face_counts, roll_faces, roll_pool
+
+
+def test_roll_faces_in_range():
+    """Test all rolled faces are between 1 and sides."""
+    faces = roll_faces(6, 5000)
+
+    assert len(faces) == 5000
+    assert faces.min() >= 1
+    assert faces.max() <= 6
+
+
+def test_roll_pool_keeps_entry_order():
+    """Test each entry gets its own quantity of faces."""
+    faces = roll_pool([(20, 1), (6, 3), (8, 2)])
+
+    assert [len(f) for f in faces] == [1, 3, 2]
+    assert faces[0].max() <= 20
+    assert faces[1].max() <= 6
+    assert faces[2].max() <= 8
+
+
+def test_roll_pool_draws_once_per_sides():
+    """Test entries with equal sides share a single draw."""
+    with patch.object(roll_engine, "roll_faces", wraps=roll_engine.roll_faces) as spy:
+        faces = roll_pool([(6, 2), (20, 1), (6, 3)])
+
+    assert spy.call_count == 2
+    assert [len(f) for f in faces] == [2, 1, 3]
+
+
+def test_face_counts():
+    """Test faces are counted per face value."""
+    counts = face_counts(np.array([1, 6, 6, 3]), 6)
+
+    assert counts == {1: 1, 3: 1, 6: 2}
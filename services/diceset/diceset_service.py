@@ -3,21 +3,38 @@ diceset_service.py
 
 Business logic for dice sets.
 """
-from random import randint
 from datetime import timezone
+from typing import NamedTuple, Optional, Tuple
 
 from repositories.dice_repository import *
+from repositories.roll_plan_cache import RollPlan
+from repositories.campaign_repository import CampaignRepository
 from repositories.dicelog_repository import *
 from repositories.sql_diceset_repository import *
 from repositories.diceset_repository import *
+from repositories.version_cache import ResourceVersion
 from models.schemas.dicelog_schema import *
 from services.diceset.diceset_service_exceptions import *
+from services.dice.dice_catalog import get_catalog
+from services.dice.entropy_pool import seeded_campaign
+from services.dice.roll_engine import face_counts, roll_pool
+from services.diceset.distribution import distribution_for
 import logging
 
 
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+class DiceSetPool(NamedTuple):
+    """Dice of a set as (sides, quantity) pairs with its owner."""
+    diceset_id: int
+    name: str
+    user_id: int
+    dice: Tuple[Tuple[int, int], ...]
+
 
 class DiceSetService:
     """Business logic for dice set service."""
@@ -26,10 +43,12 @@ class DiceSetService:
             self,
             dice_repo: DiceRepository,
             diceset_repo: DiceSetRepository,
-            dicelog_repo: DiceLogRepository):
+            dicelog_repo: DiceLogRepository,
+            campaign_repo: Optional[CampaignRepository] = None):
         self.dice_repo = dice_repo
         self.diceset_repo = diceset_repo
         self.dicelog_repo = dicelog_repo
+        self.campaign_repo = campaign_repo  # Seeded campaign rolls
         logger.debug("DiceSetService initialized")
 
     def create_diceset(
@@ -56,10 +75,13 @@ class DiceSetService:
                     "per dnd_class reached."
                 )
 
-            # Check dice existence
-            if self.dice_repo and diceset.dice_ids:
-                for dice_id in diceset.dice_ids:
-                    if not self.dice_repo.get_by_id(dice_id):
+            # Check dice existence (catalog first, no DB round trip)
+            catalog = get_catalog(self.dice_repo)
+            if diceset.dice_ids and (catalog or self.dice_repo):
+                for dice_id in dict.fromkeys(diceset.dice_ids):
+                    exists = (dice_id in catalog if catalog is not None
+                              else self.dice_repo.get_by_id(dice_id))
+                    if not exists:
                         logger.warning(
                             f"Dice ID {dice_id} "
                             f"not found for new DiceSet"
@@ -141,16 +163,38 @@ class DiceSetService:
             )
 
 
+    def get_diceset_version(
+            self,
+            diceset_id: int) \
+            -> Optional[ResourceVersion]:
+        """Get version and owner of a dice set
+        (None if it does not exist)."""
+        try:
+            return self.diceset_repo.get_version(diceset_id)
+        except Exception:
+            logger.exception(
+                f"Error while retrieving the version "
+                f"of DiceSet {diceset_id}",
+                exc_info=True
+            )
+            raise DiceSetServiceError(
+                "Error while retrieving dice set version."
+            )
+
+
     def list_dicesets(
             self,
             offset: int = 0,
-            limit: int = 100) \
+            limit: int = 100,
+            after_id: Optional[int] = None) \
             -> List[DiceSetPublic]:
-        """Get a list of all dice sets."""
+        """Get a list of all dice sets
+        (after_id for keyset paging)."""
         try:
             return self.diceset_repo.list_all(
                 offset=offset,
-                limit=limit
+                limit=limit,
+                after_id=after_id
             )
         except Exception:
             logger.exception(
@@ -204,22 +248,12 @@ class DiceSetService:
             self,
             diceset_id: int) \
             -> Optional[DiceSetPublic]:
-        """Remove a dnd_class and the belonging entries:
-        dice sets and dice logs."""
+        """Remove a dice set and the belonging entries:
+        dice entries and dice logs (set-based, one transaction).
+        Returns the dice set with the deleted rows per table."""
         try:
-            # Delete dice logs
-            logs = (self.dicelog_repo
-                    .list_by_diceset(diceset_id))
-            for log in logs:
-                self.dicelog_repo.delete(log.id)
-                logger.info(
-                    f"Deleted DiceLog {log.id} "
-                    f"from DiceSet {diceset_id}"
-                )
-
-            # Finally delete diceset
-            deleted = self.diceset_repo.delete(diceset_id)
-            if not deleted:
+            existing = self.diceset_repo.get_by_id(diceset_id)
+            if not existing:
                 logger.warning(
                     f"DiceSet {diceset_id} "
                     f"not found for deletion"
@@ -228,11 +262,22 @@ class DiceSetService:
                     f"Dice set with ID {diceset_id} "
                     f"not found."
                 )
+
+            # Dice logs, dice entries and the dice set
+            deleted_rows = self.diceset_repo.delete_cascade(diceset_id)
+            if not deleted_rows.get("diceset"):
+                raise DiceSetNotFoundError(
+                    f"Dice set with ID {diceset_id} "
+                    f"not found."
+                )
             logger.info(
                 f"Deleted DiceSet {diceset_id} "
-                f"- {deleted.name}"
+                f"- {existing.name} {deleted_rows}"
+            )
+            return DiceSetDeleted(
+                **existing.model_dump(),
+                deleted_rows=deleted_rows
             )
-            return deleted
 
         except DiceSetNotFoundError:
             raise
@@ -256,7 +301,8 @@ class DiceSetService:
             name: str,
             results: list,
             total: int):
-        """Function for dice set log entrys."""
+        """Function for dice set log entrys.
+        Results can be roll results or plain face values."""
         if not self.dicelog_repo:
             logger.warning(
                 "DiceLogRepository not provided, "
@@ -269,7 +315,7 @@ class DiceSetService:
                 campaign_id=campaign_id,
                 dnd_class_id=dnd_class_id,
                 diceset_id=diceset_id,
-                roll=f"{name}: {[r.result for r in results]}",
+                roll=f"{name}: {[getattr(r, 'result', r) for r in results]}",
                 result=total,
                 timestamp=datetime.now(timezone.utc)
             )
@@ -295,41 +341,40 @@ class DiceSetService:
             user_id: int,
             campaign_id: int,
             dnd_class_id: int,
-            diceset_id: int):
+            diceset_id: int,
+            summary: bool = False):
         """Roll all dices in a set
-        and return each result + total sum."""
+        and return each result + total sum.
+        In summary mode the face counts per dice entry
+        are returned instead of one result per dice."""
         try:
-            diceset = (self.diceset_repo
-                       .get_orm_by_id(diceset_id))
-            if not diceset or not diceset.dice_entries:
+            # Compiled plan, cached after the first roll
+            plan = self.get_roll_plan(diceset_id)
+            if not plan.entries:
                 logger.warning(
                     f"DiceSet {diceset_id} "
-                    f"not found or has no dices"
+                    f"has no dices"
                 )
                 raise DiceSetNotFoundError(
                     "Dice set not found or has no dices."
                 )
-            results = []
-            total_sum = 0
-
-            for dice_entry in diceset.dice_entries:
-                dice = dice_entry.dice
-                quantity = dice_entry.quantity
-
-                for _ in range(quantity):
-                    roll_value = randint(1, dice.sides)
-                    results.append(DiceRollResult(
-                        id=dice.id,
-                        name=dice.name,
-                        sides=dice.sides,
-                        result=roll_value
-                    ))
-                    total_sum += roll_value
+
+            # One draw per distinct sides instead of one per dice
+            faces_per_entry = roll_pool(
+                plan.dice,
+                seeded_campaign(self.campaign_repo, campaign_id, user_id)
+            )
+            values = [
+                value
+                for faces in faces_per_entry
+                for value in faces.tolist()
+            ]
+            total_sum = sum(values)
 
             logger.info(
                 f"Rolled DiceSet {diceset_id} "
                 f"by User {user_id}: "
-                f"Results {[r.result for r in results]}, "
+                f"{len(values)} dices, "
                 f"Total: {total_sum}"
             )
 
@@ -338,14 +383,43 @@ class DiceSetService:
                 campaign_id,
                 dnd_class_id,
                 diceset_id,
-                diceset.name,
-                results,
+                plan.name,
+                values,
                 total_sum
             )
 
+            if summary:
+                return DiceSetRollSummary(
+                    diceset_id=plan.diceset_id,
+                    name=plan.name,
+                    dices=[
+                        DiceRollSummary(
+                            id=entry.dice_id,
+                            name=entry.name,
+                            sides=entry.sides,
+                            quantity=entry.quantity,
+                            counts=face_counts(faces, entry.sides),
+                            total=int(faces.sum())
+                        )
+                        for entry, faces
+                        in zip(plan.entries, faces_per_entry)
+                    ],
+                    total=total_sum
+                )
+
+            results = [
+                DiceRollResult(
+                    id=entry.dice_id,
+                    name=entry.name,
+                    sides=entry.sides,
+                    result=value
+                )
+                for entry, faces in zip(plan.entries, faces_per_entry)
+                for value in faces.tolist()
+            ]
             return DiceSetRollResult(
-                diceset_id=diceset.id,
-                name=diceset.name,
+                diceset_id=plan.diceset_id,
+                name=plan.name,
                 results=results,
                 total=total_sum
             )
@@ -358,3 +432,102 @@ class DiceSetService:
             raise DiceSetServiceError(
                 "Error while rolling dice set."
             )
+
+
+    def get_roll_plan(
+            self,
+            diceset_id: int) \
+            -> RollPlan:
+        """Get the compiled roll plan of a dice set
+        (no query once the plan is cached)."""
+        plan = self.diceset_repo.get_roll_plan(diceset_id)
+        if plan is None:
+            logger.warning(
+                f"DiceSet {diceset_id} "
+                f"not found"
+            )
+            raise DiceSetNotFoundError(
+                f"Dice set with ID {diceset_id} "
+                f"not found."
+            )
+        return plan
+
+
+    def get_dice_pool(
+            self,
+            diceset_id: int) \
+            -> DiceSetPool:
+        """Get the dice of a set as (sides, quantity) pairs."""
+        plan = self.get_roll_plan(diceset_id)
+        if not plan.entries:
+            logger.warning(
+                f"DiceSet {diceset_id} "
+                f"has no dices"
+            )
+            raise DiceSetNotFoundError(
+                "Dice set not found or has no dices."
+            )
+        return DiceSetPool(
+            diceset_id=plan.diceset_id,
+            name=plan.name,
+            user_id=plan.user_id,
+            dice=plan.dice
+        )
+
+
+    def get_distribution(
+            self,
+            diceset_id: int,
+            dc: Optional[int] = None) \
+            -> DiceSetDistribution:
+        """Exact distribution (PMF/CDF, mean, variance,
+        percentiles) of a dice set total and optionally
+        the probability to meet a DC."""
+        try:
+            pool = self.get_dice_pool(diceset_id)
+            distribution = distribution_for(pool.dice)
+            logger.info(
+                f"Calculated distribution for "
+                f"DiceSet {diceset_id}"
+            )
+
+            return DiceSetDistribution(
+                diceset_id=pool.diceset_id,
+                name=pool.name,
+                min=distribution.minimum,
+                max=distribution.maximum,
+                mean=distribution.mean,
+                variance=distribution.variance,
+                percentiles={
+                    p: distribution.percentile(p)
+                    for p in DEFAULT_PERCENTILES
+                },
+                dc=dc,
+                probability_at_least=(
+                    distribution.probability_at_least(dc)
+                    if dc is not None else None
+                ),
+                distribution=[
+                    DistributionPoint(
+                        total=distribution.minimum + i,
+                        probability=probability,
+                        cumulative=cumulative
+                    )
+                    for i, (probability, cumulative) in enumerate(
+                        zip(distribution.pmf.tolist(),
+                            distribution.cdf.tolist())
+                    )
+                ]
+            )
+
+        except DiceSetNotFoundError:
+            raise
+        except Exception:
+            logger.exception(
+                f"Error while calculating distribution "
+                f"for DiceSet {diceset_id}",
+                exc_info=True
+            )
+            raise DiceSetServiceError(
+                "Error while calculating dice set distribution."
+            )
@@ -0,0 +1,131 @@
+"""
+distribution.py
+
+Exact probability distributions for the total of a dice pool.
+
+Per-dice distributions are convolved (via FFT for large pools)
+and cached by the dice composition (sides -> quantity), so
+dice sets with the same dice share one calculation.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+
+
+FFT_THRESHOLD = 512  # Use FFT when the pool has more possible totals
+DISTRIBUTION_CACHE_SIZE = 256
+
+Composition = Tuple[Tuple[int, int], ...]
+
+
+@dataclass(frozen=True)
+class DiceDistribution:
+    """Probability distribution of a dice pool total."""
+    minimum: int
+    pmf: np.ndarray
+    cdf: np.ndarray
+    mean: float
+    variance: float
+
+    @property
+    def maximum(self) -> int:
+        return self.minimum + len(self.pmf) - 1
+
+
+    def probability_at_least(self, target: int) -> float:
+        """Probability that the total meets a DC (total >= target)."""
+        index = target - self.minimum
+        if index <= 0:
+            return 1.0
+        if index > len(self.cdf) - 1:
+            return 0.0
+        return float(max(0.0, 1.0 - self.cdf[index - 1]))
+
+
+    def percentile(self, percent: float) -> int:
+        """Smallest total whose cumulative probability
+        reaches the percentile (binary search over the CDF)."""
+        index = int(np.searchsorted(self.cdf, percent / 100, side="left"))
+        return self.minimum + min(index, len(self.cdf) - 1)
+
+
+def composition_key(dice: Iterable[Tuple[int, int]]) -> Composition:
+    """Normalize (sides, quantity) pairs into a hashable cache key."""
+    merged: Dict[int, int] = {}
+    for sides, quantity in dice:
+        if quantity > 0:
+            merged[sides] = merged.get(sides, 0) + quantity
+    return tuple(sorted(merged.items()))
+
+
+def distribution_for(dice: Iterable[Tuple[int, int]]) -> DiceDistribution:
+    """Get the (cached) distribution for (sides, quantity) pairs."""
+    key = composition_key(dice)
+    if not key:
+        raise ValueError("A distribution needs at least one dice.")
+    return _distribution(key)
+
+
+def distribution_cache_info():
+    """Hit/miss statistics of the distribution cache."""
+    return _distribution.cache_info()
+
+
+def clear_distribution_cache():
+    """Remove all cached distributions."""
+    _distribution.cache_clear()
+
+
+@lru_cache(maxsize=DISTRIBUTION_CACHE_SIZE)
+def _distribution(key: Composition) -> DiceDistribution:
+    """Calculate the distribution of a composition (cached)."""
+    minimum = sum(quantity for _, quantity in key)
+    length = sum(quantity * (sides - 1) for sides, quantity in key) + 1
+
+    if length > FFT_THRESHOLD:
+        pmf = _convolve_fft(key, length)
+    else:
+        pmf = _convolve_direct(key)
+
+    cdf = np.cumsum(pmf)
+    cdf[-1] = 1.0
+    pmf.setflags(write=False)
+    cdf.setflags(write=False)
+
+    mean = sum(quantity * (sides + 1) / 2 for sides, quantity in key)
+    variance = sum(
+        quantity * (sides * sides - 1) / 12
+        for sides, quantity in key
+    )
+    return DiceDistribution(
+        minimum=minimum,
+        pmf=pmf,
+        cdf=cdf,
+        mean=mean,
+        variance=variance
+    )
+
+
+def _convolve_direct(key: Composition) -> np.ndarray:
+    """Convolve the dice one after another (small pools)."""
+    pmf = np.ones(1)
+    for sides, quantity in key:
+        die = np.full(sides, 1 / sides)
+        for _ in range(quantity):
+            pmf = np.convolve(pmf, die)
+    return pmf
+
+
+def _convolve_fft(key: Composition, length: int) -> np.ndarray:
+    """Multiply the dice spectra (large pools)."""
+    size = 1 << (length - 1).bit_length()
+    spectrum = np.ones(size // 2 + 1, dtype=complex)
+    for sides, quantity in key:
+        die = np.full(sides, 1 / sides)
+        spectrum *= np.fft.rfft(die, size) ** quantity
+    pmf = np.fft.irfft(spectrum, size)[:length]
+    np.clip(pmf, 0.0, None, out=pmf)
+    return pmf / pmf.sum()
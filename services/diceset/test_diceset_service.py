@@ -360,6 +360,7 @@
 
 # Independent functional unit tests with mocks
 import pytest
+import numpy as np
 from unittest.mock import Mock, patch
 from datetime import datetime, timezone
 from services.diceset.diceset_service import DiceSetService
@@ -371,9 +372,11 @@ from services.diceset.diceset_service_exceptions import (
     DiceSetDeleteError,
     DiceSetRollError
 )
-from models.schemas.diceset_schema import DiceSetCreate, DiceSetUpdate, DiceSetPublic, DiceSetRollResult
-from models.schemas.dice_schema import DiceRollResult
+from models.schemas.diceset_schema import DiceSetCreate, DiceSetUpdate, DiceSetPublic, DiceSetRollResult, DiceSetRollSummary
+from models.schemas.dice_schema import DicePublic, DiceRollResult
 from models.schemas.dicelog_schema import DiceLogCreate
+from services.dice.dice_catalog import clear_catalog, load_catalog
+from repositories.roll_plan_cache import RollPlan, RollPlanEntry
 
 
 @pytest.fixture
@@ -493,6 +496,25 @@ def test_create_diceset_with_quantities(diceset_service, mock_dice_repo, mock_di
     assert call_args[0] == sample_diceset.id
 
 
+
+def test_create_diceset_validates_with_catalog(diceset_service, mock_dice_repo, mock_diceset_repo, sample_diceset_data, sample_diceset):
+    """Test dice ids are checked against the catalog without DB lookups."""
+    mock_diceset_repo.get_by_class_id.return_value = []
+    mock_diceset_repo.add.return_value = sample_diceset
+    mock_diceset_repo.get_by_id.return_value = sample_diceset
+    load_catalog(Mock(list_all=Mock(return_value=[
+        DicePublic(id=dice_id, name=f"d{dice_id}", sides=dice_id)
+        for dice_id in (1, 2)
+    ])))
+    try:
+        with pytest.raises(DiceSetNotFoundError):
+            diceset_service.create_diceset(sample_diceset_data)  # Dice 3 is unknown
+    finally:
+        clear_catalog()
+
+    mock_dice_repo.get_by_id.assert_not_called()
+    mock_diceset_repo.add.assert_not_called()
+
 # Tests for get_diceset function
 def test_get_diceset_success(diceset_service, mock_diceset_repo, sample_diceset):
     """Test successful dice set retrieval."""
@@ -536,7 +558,7 @@ def test_list_dicesets_success(diceset_service, mock_diceset_repo):
 
     result = diceset_service.list_dicesets(offset=0, limit=100)
 
-    mock_diceset_repo.list_all.assert_called_once_with(offset=0, limit=100)
+    mock_diceset_repo.list_all.assert_called_once_with(offset=0, limit=100, after_id=None)
     assert len(result) == 2
     assert result[0].name == "Set 1"
     assert result[1].name == "Set 2"
@@ -609,32 +631,34 @@ def test_update_diceset_exception(diceset_service, mock_diceset_repo):
 
 # Tests for delete_diceset function
 def test_delete_diceset_success(diceset_service, mock_diceset_repo, mock_dicelog_repo, sample_diceset):
-    """Test successful dice set deletion with related dice logs."""
-    mock_dicelog_repo.list_by_diceset.return_value = [Mock(id=1), Mock(id=2)]
-    mock_diceset_repo.delete.return_value = sample_diceset
+    """Test dice set deletion with one cascade and the row counts."""
+    mock_diceset_repo.get_by_id.return_value = sample_diceset
+    mock_diceset_repo.delete_cascade.return_value = {"dicelog": 2, "dicesetdice": 1, "diceset": 1}
 
     result = diceset_service.delete_diceset(1)
 
-    # Verify dice logs were deleted
-    assert mock_dicelog_repo.delete.call_count == 2
-    mock_diceset_repo.delete.assert_called_once_with(1)
-    assert result == sample_diceset
+    mock_diceset_repo.delete_cascade.assert_called_once_with(1)
+    mock_dicelog_repo.delete.assert_not_called()
+    mock_diceset_repo.delete.assert_not_called()
+    assert result.id == sample_diceset.id
+    assert result.deleted_rows == {"dicelog": 2, "dicesetdice": 1, "diceset": 1}
 
 
-def test_delete_diceset_not_found(diceset_service, mock_diceset_repo, mock_dicelog_repo):
+def test_delete_diceset_not_found(diceset_service, mock_diceset_repo):
     """Test delete dice set raises error when not found."""
-    mock_dicelog_repo.list_by_diceset.return_value = []
-    mock_diceset_repo.delete.return_value = None
+    mock_diceset_repo.get_by_id.return_value = None
 
     with pytest.raises(DiceSetNotFoundError) as exc_info:
         diceset_service.delete_diceset(999)
 
     assert "Dice set with ID 999 not found" in str(exc_info.value)
+    mock_diceset_repo.delete_cascade.assert_not_called()
 
 
-def test_delete_diceset_exception(diceset_service, mock_dicelog_repo):
+def test_delete_diceset_exception(diceset_service, mock_diceset_repo, sample_diceset):
     """Test delete dice set handles exceptions."""
-    mock_dicelog_repo.list_by_diceset.side_effect = Exception("Database error")
+    mock_diceset_repo.get_by_id.return_value = sample_diceset
+    mock_diceset_repo.delete_cascade.side_effect = Exception("Database error")
 
     with pytest.raises(DiceSetServiceError) as exc_info:
         diceset_service.delete_diceset(1)
@@ -642,17 +666,14 @@ def test_delete_diceset_exception(diceset_service, mock_dicelog_repo):
     assert "Error while deleting dice set" in str(exc_info.value)
 
 
-def test_delete_diceset_no_logs(diceset_service, mock_diceset_repo, mock_dicelog_repo, sample_diceset):
+def test_delete_diceset_no_logs(diceset_service, mock_diceset_repo, sample_diceset):
     """Test deleting dice set with no related dice logs."""
-    mock_dicelog_repo.list_by_diceset.return_value = []
-    mock_diceset_repo.delete.return_value = sample_diceset
+    mock_diceset_repo.get_by_id.return_value = sample_diceset
+    mock_diceset_repo.delete_cascade.return_value = {"dicelog": 0, "dicesetdice": 0, "diceset": 1}
 
     result = diceset_service.delete_diceset(1)
 
-    # Verify no deletions for dice logs
-    mock_dicelog_repo.delete.assert_not_called()
-    mock_diceset_repo.delete.assert_called_once_with(1)
-    assert result == sample_diceset
+    assert result.deleted_rows["dicelog"] == 0
 
 
 # Tests for _log_roll function
@@ -703,35 +724,25 @@ def test_log_roll_exception(diceset_service, mock_dicelog_repo):
 
 
 # Tests for roll_diceset function
-def test_roll_diceset_success(diceset_service, mock_diceset_repo, mock_dicelog_repo):
-    """Test successful dice set roll."""
-    # Create mock dice set with dice entries using spec_set
-    mock_dice1 = Mock()
-    mock_dice1.id = 1
-    mock_dice1.name = "d20"
-    mock_dice1.sides = 20
-
-    mock_dice2 = Mock()
-    mock_dice2.id = 2
-    mock_dice2.name = "d6"
-    mock_dice2.sides = 6
-
-    mock_entry1 = Mock()
-    mock_entry1.dice = mock_dice1
-    mock_entry1.quantity = 1
-
-    mock_entry2 = Mock()
-    mock_entry2.dice = mock_dice2
-    mock_entry2.quantity = 2
+def make_plan(name, *entries, diceset_id=1, user_id=1):
+    """Build a roll plan from (dice_id, name, sides, quantity) entries."""
+    return RollPlan.build(
+        diceset_id=diceset_id,
+        name=name,
+        user_id=user_id,
+        entries=tuple(RollPlanEntry(*entry) for entry in entries)
+    )
 
-    mock_diceset = Mock()
-    mock_diceset.id = 1
-    mock_diceset.name = "Attack Set"
-    mock_diceset.dice_entries = [mock_entry1, mock_entry2]
 
-    mock_diceset_repo.get_orm_by_id.return_value = mock_diceset
+def test_roll_diceset_success(diceset_service, mock_diceset_repo, mock_dicelog_repo):
+    """Test successful dice set roll."""
+    mock_diceset_repo.get_roll_plan.return_value = make_plan(
+        "Attack Set",
+        (1, "d20", 20, 1),
+        (2, "d6", 6, 2)
+    )
 
-    with patch('services.diceset.diceset_service.randint', side_effect=[15, 4, 3]):
+    with patch('services.diceset.diceset_service.roll_pool', return_value=[np.array([15]), np.array([4, 3])]):
         result = diceset_service.roll_diceset(
             user_id=1,
             campaign_id=10,
@@ -743,12 +754,14 @@ def test_roll_diceset_success(diceset_service, mock_diceset_repo, mock_dicelog_r
     assert result.diceset_id == 1
     assert result.name == "Attack Set"
     assert len(result.results) == 3
+    assert result.results[1].name == "d6"
     assert result.total == 22  # 15 + 4 + 3
+    mock_diceset_repo.get_orm_by_id.assert_not_called()
 
 
 def test_roll_diceset_not_found(diceset_service, mock_diceset_repo):
     """Test roll dice set raises error when not found."""
-    mock_diceset_repo.get_orm_by_id.return_value = None
+    mock_diceset_repo.get_roll_plan.return_value = None
 
     with pytest.raises((DiceSetNotFoundError, DiceSetServiceError)):
         diceset_service.roll_diceset(
@@ -761,12 +774,7 @@ def test_roll_diceset_not_found(diceset_service, mock_diceset_repo):
 
 def test_roll_diceset_no_dices(diceset_service, mock_diceset_repo):
     """Test roll dice set raises error when set has no dices."""
-    mock_diceset = Mock()
-    mock_diceset.id = 1
-    mock_diceset.name = "Empty Set"
-    mock_diceset.dice_entries = []
-
-    mock_diceset_repo.get_orm_by_id.return_value = mock_diceset
+    mock_diceset_repo.get_roll_plan.return_value = make_plan("Empty Set")
 
     with pytest.raises((DiceSetNotFoundError, DiceSetServiceError)):
         diceset_service.roll_diceset(
@@ -779,7 +787,7 @@ def test_roll_diceset_no_dices(diceset_service, mock_diceset_repo):
 
 def test_roll_diceset_exception(diceset_service, mock_diceset_repo):
     """Test roll dice set handles exceptions."""
-    mock_diceset_repo.get_orm_by_id.side_effect = Exception("Database error")
+    mock_diceset_repo.get_roll_plan.side_effect = Exception("Database error")
 
     with pytest.raises(DiceSetServiceError) as exc_info:
         diceset_service.roll_diceset(
@@ -794,23 +802,12 @@ def test_roll_diceset_exception(diceset_service, mock_diceset_repo):
 
 def test_roll_diceset_multiple_quantities(diceset_service, mock_diceset_repo, mock_dicelog_repo):
     """Test roll dice set with multiple quantities of same dice."""
-    mock_dice = Mock()
-    mock_dice.id = 1
-    mock_dice.name = "d6"
-    mock_dice.sides = 6
-
-    mock_entry = Mock()
-    mock_entry.dice = mock_dice
-    mock_entry.quantity = 3
-
-    mock_diceset = Mock()
-    mock_diceset.id = 1
-    mock_diceset.name = "Triple d6"
-    mock_diceset.dice_entries = [mock_entry]
-
-    mock_diceset_repo.get_orm_by_id.return_value = mock_diceset
+    mock_diceset_repo.get_roll_plan.return_value = make_plan(
+        "Triple d6",
+        (1, "d6", 6, 3)
+    )
 
-    with patch('services.diceset.diceset_service.randint', side_effect=[2, 5, 4]):
+    with patch('services.diceset.diceset_service.roll_pool', return_value=[np.array([2, 5, 4])]):
         result = diceset_service.roll_diceset(
             user_id=1,
             campaign_id=10,
@@ -822,3 +819,71 @@ def test_roll_diceset_multiple_quantities(diceset_service, mock_diceset_repo, mo
     assert result.total == 11  # 2 + 5 + 4
     # Verify logging was called
     mock_dicelog_repo.log_roll.assert_called_once()
+
+
+def test_roll_diceset_summary(diceset_service, mock_diceset_repo, mock_dicelog_repo):
+    """Test roll dice set in summary mode returns face counts."""
+    mock_diceset_repo.get_roll_plan.return_value = make_plan(
+        "Fireball Swarm",
+        (2, "d6", 6, 1000)
+    )
+
+    result = diceset_service.roll_diceset(
+        user_id=1,
+        campaign_id=10,
+        dnd_class_id=5,
+        diceset_id=1,
+        summary=True
+    )
+
+    assert isinstance(result, DiceSetRollSummary)
+    assert result.dices[0].quantity == 1000
+    assert sum(result.dices[0].counts.values()) == 1000
+    assert set(result.dices[0].counts) <= {1, 2, 3, 4, 5, 6}
+    assert result.dices[0].total == result.total
+    assert 1000 <= result.total <= 6000
+    mock_dicelog_repo.log_roll.assert_called_once()
+
+
+def test_get_roll_plan_not_found(diceset_service, mock_diceset_repo):
+    """Test a missing roll plan raises DiceSetNotFoundError."""
+    mock_diceset_repo.get_roll_plan.return_value = None
+
+    with pytest.raises(DiceSetNotFoundError):
+        diceset_service.get_roll_plan(999)
+
+
+def test_get_distribution_success(diceset_service, mock_diceset_repo):
+    """Test the exact distribution of a dice set."""
+    mock_diceset_repo.get_roll_plan.return_value = make_plan(
+        "2d6",
+        (2, "d6", 6, 2)
+    )
+
+    result = diceset_service.get_distribution(1, dc=10)
+
+    assert result.min == 2
+    assert result.max == 12
+    assert result.mean == 7
+    assert result.percentiles[50] == 7
+    assert result.probability_at_least == pytest.approx(6 / 36)
+    assert len(result.distribution) == 11
+    assert result.distribution[-1].cumulative == pytest.approx(1.0)
+
+
+def test_get_distribution_not_found(diceset_service, mock_diceset_repo):
+    """Test distribution raises error when dice set not found."""
+    mock_diceset_repo.get_roll_plan.return_value = None
+
+    with pytest.raises(DiceSetNotFoundError):
+        diceset_service.get_distribution(999)
+
+
+def test_get_distribution_exception(diceset_service, mock_diceset_repo):
+    """Test distribution handles exceptions."""
+    mock_diceset_repo.get_roll_plan.side_effect = Exception("Database error")
+
+    with pytest.raises(DiceSetServiceError) as exc_info:
+        diceset_service.get_distribution(1)
+
+    assert "Error while calculating dice set distribution" in str(exc_info.value)
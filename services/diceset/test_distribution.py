@@ -0,0 +1,79 @@
+"""
+test_distribution.py
+
+Tests for dice pool probability distributions.
+"""
+import pytest
+import numpy as np
+from services.diceset.distribution import (
+    clear_distribution_cache,
+    composition_key,
+    distribution_cache_info,
+    distribution_for
+)
+
+
+def test_single_die_is_uniform():
+    """Test a d6 has six equally likely totals."""
+    dist = distribution_for([(6, 1)])
+
+    assert dist.minimum == 1
+    assert dist.maximum == 6
+    assert np.allclose(dist.pmf, 1 / 6)
+    assert dist.mean == 3.5
+
+
+def test_two_d6():
+    """Test the classic 2d6 triangle distribution."""
+    dist = distribution_for([(6, 2)])
+
+    assert dist.minimum == 2
+    assert dist.maximum == 12
+    assert dist.pmf[7 - 2] == pytest.approx(6 / 36)
+    assert dist.probability_at_least(12) == pytest.approx(1 / 36)
+    assert dist.probability_at_least(2) == 1.0
+    assert dist.probability_at_least(13) == 0.0
+    assert dist.percentile(50) == 7
+    assert dist.variance == pytest.approx(35 / 6)
+
+
+def test_mixed_pool():
+    """Test a pool of different dice."""
+    dist = distribution_for([(20, 1), (4, 1)])
+
+    assert dist.minimum == 2
+    assert dist.maximum == 24
+    assert dist.pmf.sum() == pytest.approx(1.0)
+    assert dist.mean == pytest.approx(10.5 + 2.5)
+
+
+def test_fft_matches_direct_convolution():
+    """Test large pools (FFT) agree with the analytic moments."""
+    dist = distribution_for([(6, 200), (8, 50)])
+    totals = np.arange(dist.minimum, dist.maximum + 1)
+
+    assert dist.pmf.min() >= 0
+    assert dist.pmf.sum() == pytest.approx(1.0)
+    assert float((totals * dist.pmf).sum()) == pytest.approx(dist.mean)
+    assert dist.probability_at_least(int(dist.mean)) == pytest.approx(0.5, abs=0.05)
+
+
+def test_composition_key_merges_entries():
+    """Test entries with equal sides share the same key."""
+    assert composition_key([(6, 1), (20, 1), (6, 2)]) == ((6, 3), (20, 1))
+
+
+def test_distributions_are_cached_by_composition():
+    """Test equal compositions reuse the cached distribution."""
+    clear_distribution_cache()
+    first = distribution_for([(6, 2), (20, 1)])
+    second = distribution_for([(20, 1), (6, 1), (6, 1)])
+
+    assert first is second
+    assert distribution_cache_info().hits == 1
+
+
+def test_empty_composition():
+    """Test an empty pool raises ValueError."""
+    with pytest.raises(ValueError):
+        distribution_for([])
@@ -4,11 +4,12 @@ class_service.py
 Business logic for classes.
 """
 import logging
-from typing import List
+from typing import List, Optional
 
-from dependencies import ClassQueryParams
+from dependencies import ClassQueryParams, SearchQueryParams
 from models.schemas.class_schema import *
 from repositories.class_repository import ClassRepository
+from repositories.version_cache import ResourceVersion
 from repositories.diceset_repository import DiceSetRepository
 from repositories.dicelog_repository import DiceLogRepository
 from services.dnd_class.class_service_exceptions import *
@@ -115,19 +116,42 @@ class ClassService:
             )
 
 
+    def get_class_version(
+            self,
+            class_id: int) \
+            -> Optional[ResourceVersion]:
+        """Get version and owner of a dnd_class
+        (None if it does not exist)."""
+        try:
+            return self.class_repo.get_version(class_id)
+        except Exception:
+            logger.exception(
+                f"Error while retrieving the version "
+                f"of Class {class_id}",
+                exc_info=True
+            )
+            raise ClassServiceError(
+                "Error while retrieving dnd_class version."
+            )
+
+
     def list_classes(
             self,
             filters: ClassQueryParams,
             offset: int = 0,
-            limit: int = 100) \
-            -> List[ClassPublic]:
-        """Get a list of all classes."""
+            limit: int = 100,
+            after_id: Optional[int] = None) \
+            -> List[ClassListItem]:
+        """Get a list of all classes with the fields
+        of the filters (after_id for keyset paging)."""
         try:
             classes = self.class_repo.list_all(
                 campaign_id=filters.campaign_id,
                 name=filters.name,
                 offset=offset,
-                limit=limit
+                limit=limit,
+                after_id=after_id,
+                fields=filters.fields
             )
             logger.info(
                 f"Listed {len(classes)} "
@@ -147,6 +171,33 @@ class ClassService:
             )
 
 
+    def search_classes(
+            self,
+            user_id: int,
+            params: SearchQueryParams) \
+            -> List[ClassListItem]:
+        """Search the classes of a user by name, best matches first."""
+        try:
+            classes = self.class_repo.search(
+                text=params.q,
+                prefix=params.prefix,
+                limit=params.limit,
+                user_id=user_id
+            )
+            logger.info(f"Found {len(classes)} Classes for User {user_id}")
+            return classes
+
+        except Exception:
+            logger.exception(
+                "Error while "
+                "searching Classes",
+                exc_info=True
+            )
+            raise ClassServiceError(
+                "Error while searching classes."
+            )
+
+
     def update_class(
             self,
             class_id: int,
@@ -187,7 +238,8 @@ class ClassService:
             self,
             class_id: int):
         """Remove a dnd_class and the belonging entries:
-        dice sets and dice logs."""
+        dice sets and dice logs (set-based, one transaction).
+        Returns the dnd_class with the deleted rows per table."""
         try:
             existing_class = self.class_repo.get_by_id(class_id)
             if not existing_class:
@@ -199,22 +251,9 @@ class ClassService:
                     f"Class with ID {class_id} not found."
                 )
 
-            # Delete dice logs
-            for log in (self.dicelog_repo
-                    .list_by_class(class_id)):
-                self.dicelog_repo.delete(log.id)
-
-            # Delete dice sets (and their logs)
-            for diceset in (self.diceset_repo
-                    .list_by_class(class_id)):
-                for log in (self.dicelog_repo
-                        .list_by_diceset(diceset.id)):
-                    self.dicelog_repo.delete(log.id)
-                self.diceset_repo.delete(diceset.id)
-
-            # Finally delete dnd_class
-            deleted_class = self.class_repo.delete(class_id)
-            if not deleted_class:
+            # Dice logs, dice sets and the dnd_class
+            deleted_rows = self.class_repo.delete_cascade(class_id)
+            if not deleted_rows.get("dnd_class"):
                 logger.warning(
                     f"Failed to delete "
                     f"Class {class_id}"
@@ -224,9 +263,12 @@ class ClassService:
                 )
             logger.info(
                 f"Deleted Class {class_id} "
-                f"- {deleted_class}"
+                f"- {deleted_rows}"
+            )
+            return ClassDeleted(
+                **existing_class.model_dump(),
+                deleted_rows=deleted_rows
             )
-            return deleted_class
 
         except ClassNotFoundError:
             raise
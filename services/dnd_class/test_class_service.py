@@ -515,29 +515,20 @@ def test_update_class_exception(class_service, mock_class_repo):
 # Tests for delete_class function
 def test_delete_class_success(class_service, mock_class_repo, mock_diceset_repo,
                               mock_dicelog_repo, sample_class):
-    """Test successful class deletion with related entities."""
-    # Setup mocks
+    """Test class deletion with one cascade and the row counts."""
+    counts = {"dicelog": 5, "dicesetdice": 2, "diceset": 2, "dnd_class": 1}
     mock_class_repo.get_by_id.return_value = sample_class
-    mock_dicelog_repo.list_by_class.return_value = [Mock(id=1), Mock(id=2)]
-
-    diceset1 = Mock(id=10)
-    diceset2 = Mock(id=11)
-    mock_diceset_repo.list_by_class.return_value = [diceset1, diceset2]
-
-    mock_dicelog_repo.list_by_diceset.side_effect = [
-        [Mock(id=3), Mock(id=4)],  # Logs for diceset1
-        [Mock(id=5)]                # Logs for diceset2
-    ]
-
-    mock_class_repo.delete.return_value = sample_class
+    mock_class_repo.delete_cascade.return_value = counts
 
     result = class_service.delete_class(1)
 
-    # Verify deletion order: dice logs by class, dice logs by diceset, dice sets, class
-    assert mock_dicelog_repo.delete.call_count == 5  # 2 from class + 3 from dicesets
-    assert mock_diceset_repo.delete.call_count == 2
-    mock_class_repo.delete.assert_called_once_with(1)
-    assert result == sample_class
+    # No per row deletes
+    mock_class_repo.delete_cascade.assert_called_once_with(1)
+    mock_dicelog_repo.delete.assert_not_called()
+    mock_diceset_repo.delete.assert_not_called()
+    mock_class_repo.delete.assert_not_called()
+    assert result.id == sample_class.id
+    assert result.deleted_rows == counts
 
 
 def test_delete_class_not_found(class_service, mock_class_repo):
@@ -550,13 +541,10 @@ def test_delete_class_not_found(class_service, mock_class_repo):
     assert "Class with ID 999 not found" in str(exc_info.value)
 
 
-def test_delete_class_deletion_fails(class_service, mock_class_repo, mock_diceset_repo,
-                                     mock_dicelog_repo, sample_class):
-    """Test delete class when final deletion returns None."""
+def test_delete_class_deletion_fails(class_service, mock_class_repo, sample_class):
+    """Test delete class when the class row was not deleted."""
     mock_class_repo.get_by_id.return_value = sample_class
-    mock_dicelog_repo.list_by_class.return_value = []
-    mock_diceset_repo.list_by_class.return_value = []
-    mock_class_repo.delete.return_value = None
+    mock_class_repo.delete_cascade.return_value = {"dicelog": 0, "dnd_class": 0}
 
     with pytest.raises(ClassServiceError) as exc_info:
         class_service.delete_class(1)
@@ -574,18 +562,15 @@ def test_delete_class_exception(class_service, mock_class_repo):
     assert "Error while deleting dnd_class" in str(exc_info.value)
 
 
-def test_delete_class_no_related_entities(class_service, mock_class_repo, mock_diceset_repo,
-                                          mock_dicelog_repo, sample_class):
+def test_delete_class_no_related_entities(class_service, mock_class_repo, sample_class):
     """Test deleting class with no related entities."""
     mock_class_repo.get_by_id.return_value = sample_class
-    mock_dicelog_repo.list_by_class.return_value = []
-    mock_diceset_repo.list_by_class.return_value = []
-    mock_class_repo.delete.return_value = sample_class
+    mock_class_repo.delete_cascade.return_value = {
+        "dicelog": 0, "dicesetdice": 0, "diceset": 0, "dnd_class": 1
+    }
 
     result = class_service.delete_class(1)
 
-    # Verify no deletions for related entities
-    mock_dicelog_repo.delete.assert_not_called()
-    mock_diceset_repo.delete.assert_not_called()
-    mock_class_repo.delete.assert_called_once_with(1)
-    assert result == sample_class
+    assert result.deleted_rows["dnd_class"] == 1
+    assert result.deleted_rows["diceset"] == 0
+
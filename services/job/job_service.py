@@ -0,0 +1,76 @@
+"""
+job_service.py
+
+Business logic for background jobs.
+"""
+import logging
+
+from models.schemas.job_schema import *
+from repositories.job_repository import JobRepository
+from services.job.job_service_exceptions import *
+from services.job.job_worker import get_job_worker
+
+
+
+logger = logging.getLogger(__name__)
+
+
+class JobService:
+    """Initialise the business logic
+    for background job operations."""
+    def __init__(self, job_repo: JobRepository):
+        self.job_repo = job_repo
+        logger.debug("JobService initialized")
+
+
+    def get_job(self, job_id: str) \
+            -> JobPublic:
+        """Get a job by ID."""
+        job = self.job_repo.get_by_id(job_id)
+        if not job:
+            logger.warning(f"Job {job_id} not found")
+            raise JobNotFoundError(f"Job {job_id} not found.")
+        return job
+
+
+    def enqueue(self, job: JobCreate) \
+            -> JobPublic:
+        """Store a job and hand it to the worker.
+        A target with an open job gets that job back."""
+        try:
+            existing = self.job_repo.get_open(job.kind, job.target_id)
+            if existing:
+                logger.info(f"Job {existing.id} already open for {job.kind} {job.target_id}")
+                return existing
+            created = self.job_repo.add(job)
+        except Exception:
+            logger.exception(
+                f"Error while queueing {job.kind} {job.target_id}",
+                exc_info=True
+            )
+            raise JobCreateError("Error while queueing job.")
+
+        worker = get_job_worker()
+        if worker is None or not worker.submit(created.id):
+            logger.warning(f"No job worker running, Job {created.id} stays pending")
+        return created
+
+
+    def delete_user(self, user_id: int) \
+            -> JobPublic:
+        """Queue the deletion of a user and all related resources."""
+        return self.enqueue(JobCreate(
+            kind=DELETE_USER,
+            target_id=user_id,
+            user_id=user_id
+        ))
+
+
+    def delete_campaign(self, campaign_id: int, user_id: int) \
+            -> JobPublic:
+        """Queue the deletion of a campaign and all related resources."""
+        return self.enqueue(JobCreate(
+            kind=DELETE_CAMPAIGN,
+            target_id=campaign_id,
+            user_id=user_id
+        ))
@@ -0,0 +1,20 @@
+"""
+job_service_exceptions.py
+
+Custom exceptions for job services.
+"""
+
+
+class JobServiceError(Exception):
+    """Base exception for JobService errors."""
+    pass
+
+
+class JobNotFoundError(JobServiceError):
+    """Raised when a job is not found."""
+    pass
+
+
+class JobCreateError(JobServiceError):
+    """Raised when queueing a job fails."""
+    pass
@@ -0,0 +1,219 @@
+"""
+job_worker.py
+
+In-process worker pool for background jobs.
+
+Deleting a user or a campaign with many dice logs can take longer
+than a client waits for a response. Such deletions are stored as
+jobs in the job table and run here: the rows are deleted chunk by
+chunk, each chunk in its own short transaction together with the
+job progress, with a short pause between chunks so live requests
+get the database in between. The last step removes the remaining
+rows and the root in one transaction (delete_cascade).
+
+Jobs that were pending or running at shutdown are resumed on the
+next start, the chunked delete continues where it stopped. Several
+processes may start workers (one per app worker): a job is claimed
+with a conditional UPDATE before it runs, so only one of them runs
+it. The claim is a lease, renewed with every chunk; the job of a
+worker that died is taken over once its lease ran out.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import Counter as Tally
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from metrics import registry
+from models.schemas.job_schema import *
+from repositories.cascade_delete import (
+    campaign_scope,
+    delete_cascade,
+    delete_chunks,
+    user_scope
+)
+from repositories.sql_job_repository import SqlAlchemyJobRepository
+
+
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 1))
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", 1000))
+JOB_CHUNK_PAUSE = float(os.getenv("JOB_CHUNK_PAUSE", 0.05))  # seconds
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", 60))
+
+# Job kind -> rows to delete
+SCOPES = {
+    DELETE_USER: user_scope,
+    DELETE_CAMPAIGN: campaign_scope,
+}
+
+jobs_finished_total = registry.counter(
+    "jobs_finished_total",
+    "Background jobs run to the end."
+)
+jobs_failed_total = registry.counter(
+    "jobs_failed_total",
+    "Failed background jobs."
+)
+job_seconds = registry.summary(
+    "job_seconds",
+    "Run time of one background job."
+)
+
+
+class JobWorker:
+    """Thread pool that runs
+    queued jobs in the background."""
+
+    def __init__(
+            self,
+            engine: Engine,
+            workers: int = JOB_WORKERS,
+            chunk_size: int = JOB_CHUNK_SIZE,
+            pause: float = JOB_CHUNK_PAUSE,
+            lease_seconds: float = JOB_LEASE_SECONDS):
+        self.engine = engine
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stopping = threading.Event()
+
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+
+    def start(self):
+        """Start the threads and resume the open jobs
+        (the ones another worker runs are skipped by the claim)."""
+        if self.running:
+            return
+        self._stopping.clear()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="job-worker"
+        )
+        with Session(self.engine) as session:
+            open_jobs = SqlAlchemyJobRepository(session).list_open()
+        for job in open_jobs:
+            self.submit(job.id)
+        logger.info(
+            f"Job worker started with {self.workers} threads, "
+            f"{len(open_jobs)} jobs resumed"
+        )
+
+
+    def submit(self, job_id: str) -> bool:
+        """Queue a stored job. Returns False if the worker
+        is stopped, the job stays pending until the next start."""
+        if not self.running:
+            return False
+        self._executor.submit(self.run, job_id)
+        return True
+
+
+    def stop(self):
+        """Stop after the current chunks. Interrupted and
+        queued jobs stay open and are resumed on the next start."""
+        if not self.running:
+            return
+        self._stopping.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+        logger.info("Job worker stopped")
+
+
+    def run(self, job_id: str) -> Optional[JobPublic]:
+        """Run a job to the end (or until the worker stops),
+        if this worker can claim it."""
+        started = time.perf_counter()
+        with Session(self.engine) as session:
+            repo = SqlAlchemyJobRepository(session)
+            job = repo.claim(job_id, self.owner, self.lease_seconds)
+            session.commit()
+            if job is None:
+                return repo.get_by_id(job_id)
+            deleted_rows = Tally(job.deleted_rows)  # Resumed jobs keep their counts
+            try:
+                scope = SCOPES[job.kind](job.target_id)
+                for table, count in delete_chunks(session, scope, self.chunk_size):
+                    deleted_rows[table] += count
+                    repo.record_progress(job_id, deleted_rows)
+                    if not repo.renew(job_id, self.owner, self.lease_seconds):
+                        session.rollback()
+                        logger.warning(f"Job {job_id} taken over by another worker")
+                        return repo.get_by_id(job_id)
+                    session.commit()
+                    if self._stopping.is_set():
+                        repo.release(job_id)
+                        session.commit()
+                        logger.info(f"Job {job_id} interrupted, resumed on the next start")
+                        return repo.get_by_id(job_id)
+                    time.sleep(self.pause)  # Let live requests write in between
+
+                # Rows added meanwhile and the root, in one transaction,
+                # committed only while this worker holds the lease
+                deleted_rows.update(delete_cascade(session, scope))
+                job = repo.finish(job_id, self.owner, DONE, deleted_rows)
+                if job is None:
+                    session.rollback()
+                    logger.warning(f"Job {job_id} taken over by another worker")
+                    return repo.get_by_id(job_id)
+                session.commit()
+                jobs_finished_total.inc()
+                return job
+            except Exception:
+                session.rollback()
+                jobs_failed_total.inc()
+                logger.exception(
+                    f"Error while running Job {job_id}",
+                    exc_info=True
+                )
+                job = repo.finish(
+                    job_id, self.owner, FAILED, deleted_rows, error="Deletion failed."
+                )
+                if job is None:
+                    session.rollback()
+                    return repo.get_by_id(job_id)
+                session.commit()
+                return job
+            finally:
+                job_seconds.observe(time.perf_counter() - started)
+
+
+_worker: Optional[JobWorker] = None
+
+
+def get_job_worker() -> Optional[JobWorker]:
+    """Get the running worker (None if jobs are not run)."""
+    return _worker if _worker is not None and _worker.running else None
+
+
+def start_job_worker(engine: Engine) -> JobWorker:
+    """Start the process-wide worker (app startup)."""
+    global _worker
+    if _worker is None or not _worker.running:
+        _worker = JobWorker(engine)
+        _worker.start()
+    return _worker
+
+
+def stop_job_worker():
+    """Stop the worker, open jobs resume on the next start (app shutdown)."""
+    global _worker
+    if _worker is not None:
+        _worker.stop()
+        _worker = None
@@ -0,0 +1,102 @@
+"""
+test_job_service.py
+
+Tests for the job service - business logic.
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import Mock, patch
+from models.schemas.job_schema import *
+from services.job.job_service import JobService
+from services.job.job_service_exceptions import JobCreateError, JobNotFoundError
+
+
+@pytest.fixture
+def mock_repo():
+    """Fixture for a mocked job repository."""
+    return Mock()
+
+
+@pytest.fixture
+def service(mock_repo):
+    """Fixture for the job service."""
+    return JobService(mock_repo)
+
+
+def make_job(status=PENDING, kind=DELETE_CAMPAIGN):
+    """Create a public job."""
+    now = datetime.now()
+    return JobPublic(
+        id="abc",
+        kind=kind,
+        target_id=7,
+        user_id=1,
+        status=status,
+        created_at=now,
+        updated_at=now
+    )
+
+
+def test_get_job(service, mock_repo):
+    """Test getting a job by ID."""
+    mock_repo.get_by_id.return_value = make_job()
+
+    assert service.get_job("abc").id == "abc"
+
+
+def test_get_job_not_found(service, mock_repo):
+    """Test a missing job raises JobNotFoundError."""
+    mock_repo.get_by_id.return_value = None
+
+    with pytest.raises(JobNotFoundError):
+        service.get_job("missing")
+
+
+def test_delete_campaign_queues_job(service, mock_repo):
+    """Test a new job is stored and handed to the worker."""
+    mock_repo.get_open.return_value = None
+    mock_repo.add.return_value = make_job()
+    worker = Mock()
+
+    with patch("services.job.job_service.get_job_worker", return_value=worker):
+        job = service.delete_campaign(7, 1)
+
+    mock_repo.add.assert_called_once_with(
+        JobCreate(kind=DELETE_CAMPAIGN, target_id=7, user_id=1)
+    )
+    worker.submit.assert_called_once_with("abc")
+    assert job.status == PENDING
+
+
+def test_delete_user_returns_open_job(service, mock_repo):
+    """Test a target with an open job gets that job back."""
+    mock_repo.get_open.return_value = make_job(RUNNING, DELETE_USER)
+    worker = Mock()
+
+    with patch("services.job.job_service.get_job_worker", return_value=worker):
+        job = service.delete_user(7)
+
+    mock_repo.get_open.assert_called_once_with(DELETE_USER, 7)
+    mock_repo.add.assert_not_called()
+    worker.submit.assert_not_called()
+    assert job.status == RUNNING
+
+
+def test_job_stays_pending_without_worker(service, mock_repo):
+    """Test a job is stored if no worker runs (resumed on start)."""
+    mock_repo.get_open.return_value = None
+    mock_repo.add.return_value = make_job()
+
+    with patch("services.job.job_service.get_job_worker", return_value=None):
+        job = service.delete_campaign(7, 1)
+
+    assert job.status == PENDING
+
+
+def test_enqueue_error(service, mock_repo):
+    """Test repository errors raise JobCreateError."""
+    mock_repo.get_open.return_value = None
+    mock_repo.add.side_effect = Exception("DB error")
+
+    with pytest.raises(JobCreateError):
+        service.delete_campaign(7, 1)
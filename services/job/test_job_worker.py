@@ -0,0 +1,213 @@
+"""
+test_job_worker.py
+
+Tests for the background job worker (test database).
+"""
+import time
+import pytest
+from unittest.mock import patch
+from sqlalchemy import func
+from sqlmodel import Session, select
+from models.db_models.table_models import Campaign, Class, DiceLog, Job, User
+from models.db_models.test_db import test_engine
+from models.schemas.job_schema import *
+from repositories.cascade_delete import delete_cascade
+from repositories.sql_job_repository import SqlAlchemyJobRepository
+from repositories.test_cascade_delete import make_campaign, make_user
+from services.job.job_worker import JobWorker
+
+
+ALL_ROWS = {
+    "dicelog": 4,
+    "dicesetdice": 4,
+    "diceset": 2,
+    "dnd_class": 2,
+    "campaign": 1,
+}
+
+
+@pytest.fixture
+def session():
+    """Fixture for a test database session."""
+    with Session(test_engine) as session:
+        yield session
+
+
+def queue_job(session, kind, target_id, user_id):
+    """Store a pending job, return its ID."""
+    job = SqlAlchemyJobRepository(session).add(
+        JobCreate(kind=kind, target_id=target_id, user_id=user_id)
+    )
+    return job.id
+
+
+def count(session, model, *where):
+    return session.exec(select(func.count()).select_from(model).where(*where)).one()
+
+
+def test_campaign_deleted_in_chunks(session):
+    """Test a job deletes chunk by chunk and reports the rows."""
+    user = make_user(session)
+    campaign_id = make_campaign(session, user)
+    job_id = queue_job(session, DELETE_CAMPAIGN, campaign_id, user.id)
+    progress = []
+    worker = JobWorker(test_engine, chunk_size=1, pause=0)
+
+    with patch.object(SqlAlchemyJobRepository, "record_progress",
+                      side_effect=lambda self, _, rows: progress.append(sum(rows.values())),
+                      autospec=True):
+        job = worker.run(job_id)
+
+    assert job.status == DONE
+    assert job.deleted_rows == ALL_ROWS
+    assert job.finished_at is not None
+    assert progress == list(range(1, 13))  # One chunk per row, the campaign in the last step
+    assert count(session, Campaign, Campaign.id == campaign_id) == 0
+    assert count(session, DiceLog, DiceLog.campaign_id == campaign_id) == 0
+
+
+def test_interrupted_job_resumes(session):
+    """Test a stopped job stays running and continues later."""
+    user = make_user(session)
+    campaign_id = make_campaign(session, user)
+    job_id = queue_job(session, DELETE_CAMPAIGN, campaign_id, user.id)
+    worker = JobWorker(test_engine, chunk_size=3, pause=0)
+
+    worker._stopping.set()
+    job = worker.run(job_id)
+
+    assert job.status == RUNNING
+    assert job.deleted_rows == {"dicelog": 3}
+    session.expire_all()
+    assert session.get(Job, job_id).lease_until is None  # Any worker may resume it
+    assert count(session, DiceLog, DiceLog.campaign_id == campaign_id) == 1
+
+    worker._stopping.clear()
+    job = worker.run(job_id)
+
+    assert job.status == DONE
+    assert job.deleted_rows == ALL_ROWS
+
+
+def test_user_deletion_job(session):
+    """Test a user job removes the user with all campaigns."""
+    user = make_user(session)
+    user_id = user.id
+    make_campaign(session, user)
+    make_campaign(session, user)
+    job_id = queue_job(session, DELETE_USER, user_id, user_id)
+
+    job = JobWorker(test_engine, chunk_size=5, pause=0).run(job_id)
+
+    assert job.status == DONE
+    assert job.deleted_rows["user"] == 1
+    assert job.deleted_rows["campaign"] == 2
+    assert job.deleted_rows["dicelog"] == 8
+    assert count(session, User, User.id == user_id) == 0
+    assert count(session, Class, Class.user_id == user_id) == 0
+
+
+def test_failed_job(session):
+    """Test a failing job is marked failed, not retried,
+    and the campaign stays for a new attempt."""
+    user = make_user(session)
+    campaign_id = make_campaign(session, user)
+    job_id = queue_job(session, DELETE_CAMPAIGN, campaign_id, user.id)
+    worker = JobWorker(test_engine, chunk_size=100, pause=0)
+
+    with patch("services.job.job_worker.delete_cascade", side_effect=RuntimeError("boom")):
+        job = worker.run(job_id)
+
+    assert job.status == FAILED
+    assert job.error == "Deletion failed."
+    assert job.deleted_rows["dicelog"] == 4  # Committed chunks
+    assert worker.run(job_id).status == FAILED  # Finished jobs are not run again
+    assert count(session, Campaign, Campaign.id == campaign_id) == 1
+
+
+def test_job_runs_in_one_worker(session):
+    """Test a job claimed by one worker is not run by another
+    (two app processes resuming the same open jobs)."""
+    user = make_user(session)
+    campaign_id = make_campaign(session, user)
+    job_id = queue_job(session, DELETE_CAMPAIGN, campaign_id, user.id)
+    first = JobWorker(test_engine, chunk_size=3, pause=0)
+    second = JobWorker(test_engine, chunk_size=3, pause=0)
+
+    repo = SqlAlchemyJobRepository(session)
+    assert repo.claim(job_id, first.owner, lease_seconds=60) is not None
+    session.commit()
+    assert repo.claim(job_id, second.owner, lease_seconds=60) is None
+    session.rollback()
+
+    job = second.run(job_id)
+    assert job.status == RUNNING
+    assert job.deleted_rows == {}
+    assert count(session, Campaign, Campaign.id == campaign_id) == 1
+
+
+def test_expired_lease_is_taken_over(session):
+    """Test the job of a worker that died runs once its lease ran out,
+    and the old worker stops when it comes back."""
+    user = make_user(session)
+    campaign_id = make_campaign(session, user)
+    job_id = queue_job(session, DELETE_CAMPAIGN, campaign_id, user.id)
+    dead = JobWorker(test_engine, chunk_size=3, pause=0)
+    repo = SqlAlchemyJobRepository(session)
+    repo.claim(job_id, dead.owner, lease_seconds=-1)  # Ran out
+    session.commit()
+
+    job = JobWorker(test_engine, chunk_size=3, pause=0).run(job_id)
+
+    assert job.status == DONE
+    assert job.deleted_rows == ALL_ROWS
+    assert not repo.renew(job_id, dead.owner, lease_seconds=60)
+
+
+def test_lost_lease_does_not_finish(session):
+    """Test a worker that stalled past its lease (the job was claimed
+    by another worker meanwhile) neither deletes the root nor
+    overwrites the status of the job."""
+    user = make_user(session)
+    campaign_id = make_campaign(session, user)
+    job_id = queue_job(session, DELETE_CAMPAIGN, campaign_id, user.id)
+    stalled = JobWorker(test_engine, chunk_size=100, pause=0)
+    real_delete_cascade = delete_cascade
+
+    def take_over(worker_session, scope):
+        with Session(test_engine) as other:
+            other.get(Job, job_id).owner = "other-worker"
+            other.commit()
+        return real_delete_cascade(worker_session, scope)
+
+    with patch("services.job.job_worker.delete_cascade", side_effect=take_over):
+        job = stalled.run(job_id)
+
+    assert job.status == RUNNING
+    assert job.finished_at is None
+    session.expire_all()
+    assert session.get(Job, job_id).owner == "other-worker"
+    assert count(session, Campaign, Campaign.id == campaign_id) == 1
+    assert SqlAlchemyJobRepository(session).finish(job_id, stalled.owner, DONE, {}) is None
+
+
+def test_start_resumes_open_jobs(session):
+    """Test pending jobs from before a restart run on start."""
+    user = make_user(session)
+    campaign_id = make_campaign(session, user)
+    job_id = queue_job(session, DELETE_CAMPAIGN, campaign_id, user.id)
+    worker = JobWorker(test_engine, pause=0)
+
+    worker.start()
+    try:
+        repo = SqlAlchemyJobRepository(session)
+        deadline = time.monotonic() + 5
+        while repo.get_by_id(job_id).status != DONE and time.monotonic() < deadline:
+            time.sleep(0.02)
+            session.expire_all()
+    finally:
+        worker.stop()
+
+    assert repo.get_by_id(job_id).status == DONE
+    assert not worker.running
+    assert not worker.submit(job_id)
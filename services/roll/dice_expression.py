@@ -0,0 +1,447 @@
+"""
+dice_expression.py
+
+Parser and evaluator for dice notation (e.g. 4d6kh3+2).
+
+Supported syntax:
+    NdM       roll N dice with M sides (N defaults to 1, d% is d100)
+    khX / kX  keep the X highest dice
+    klX       keep the X lowest dice
+    dhX       drop the X highest dice
+    dlX       drop the X lowest dice
+    !         exploding dice (roll again on the highest face)
+    rX        reroll once every die showing X or lower
+    + - * /   arithmetic with integer (floor) division and parentheses
+
+Constants are limited to MAX_CONSTANT and an expression whose
+total could leave +-MAX_TOTAL (the integer result column of the
+dice log) is rejected when it is parsed.
+
+Parsed expressions are cached by their normalized string,
+so repeated expressions are only parsed once.
+"""
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from typing import Callable, List, Optional, Tuple, Union
+
+from services.dice.entropy_pool import randint
+from services.roll.roll_service_exceptions import RollExpressionError
+
+
+
+MAX_EXPRESSION_LENGTH = 100
+MAX_DICE_PER_TERM = 1000
+MAX_SIDES = 1000
+MAX_EXPLOSIONS = 100
+MAX_CONSTANT = 1_000_000
+MAX_TOTAL = 2**31 - 1  # INT32, DiceLog.result
+EXPRESSION_CACHE_SIZE = 512
+
+_DICE_RE = re.compile(
+    r"(?P<count>\d*)d(?P<sides>\d+|%)"
+    r"(?P<mods>(?:(?:kh|kl|dh|dl|k|r)\d+|!)*)"
+)
+_MOD_RE = re.compile(r"(kh|kl|dh|dl|k|r)(\d+)|(!)")
+_NUMBER_RE = re.compile(r"\d+")
+_OPERATORS = "+-*/()"
+
+
+# Compiled expression nodes
+
+@dataclass(frozen=True)
+class Number:
+    """A constant modifier."""
+    value: int
+
+
+@dataclass(frozen=True)
+class DiceTerm:
+    """A group of dice with its modifiers."""
+    notation: str
+    count: int
+    sides: int
+    keep: Optional[Tuple[str, int]] = None  # ("h"|"l", amount)
+    drop: Optional[Tuple[str, int]] = None  # ("h"|"l", amount)
+    explode: bool = False
+    reroll: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class Negate:
+    """Unary minus."""
+    operand: "Node"
+
+
+@dataclass(frozen=True)
+class BinaryOp:
+    """Arithmetic between two nodes."""
+    op: str
+    left: "Node"
+    right: "Node"
+
+
+Node = Union[Number, DiceTerm, Negate, BinaryOp]
+
+
+@dataclass
+class TermResult:
+    """Outcome of a single dice term."""
+    notation: str
+    sides: int
+    rolls: List[int] = field(default_factory=list)
+    kept: List[int] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class CompiledExpression:
+    """A parsed dice expression ready to be evaluated."""
+    expression: str
+    root: Node
+    dice_count: int
+
+    def evaluate(
+            self,
+            roll: Optional[Callable[[int, int], int]] = None,
+            campaign_id: Optional[int] = None) \
+            -> Tuple[int, List[TermResult]]:
+        """Roll the expression and return
+        the total with the results per dice term.
+        Rolls of a seeded campaign come from its own pool."""
+        terms: List[TermResult] = []
+        roll = roll or partial(randint, campaign_id=campaign_id)
+        total = _evaluate(self.root, roll, terms)
+        return total, terms
+
+
+# Parsing
+
+def normalize_expression(expression: str) -> str:
+    """Lowercase the expression and strip all whitespace."""
+    return "".join(expression.lower().split())
+
+
+def compile_expression(expression: str) -> CompiledExpression:
+    """Parse an expression, using the cache for known expressions."""
+    normalized = normalize_expression(expression)
+    if not normalized:
+        raise RollExpressionError("Expression is empty.")
+    if len(normalized) > MAX_EXPRESSION_LENGTH:
+        raise RollExpressionError(
+            f"Expression longer than "
+            f"{MAX_EXPRESSION_LENGTH} characters."
+        )
+    return _compile_normalized(normalized)
+
+
+def expression_cache_info():
+    """Hit/miss statistics of the expression cache."""
+    return _compile_normalized.cache_info()
+
+
+def clear_expression_cache():
+    """Remove all cached expressions."""
+    _compile_normalized.cache_clear()
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def _compile_normalized(normalized: str) -> CompiledExpression:
+    """Parse a normalized expression (cached)."""
+    parser = _Parser(_tokenize(normalized))
+    root = parser.parse()
+    dice_count = _count_dice(root)
+    if dice_count > MAX_DICE_PER_TERM:
+        raise RollExpressionError(
+            f"Expression rolls more than "
+            f"{MAX_DICE_PER_TERM} dice."
+        )
+    if _max_magnitude(root) > MAX_TOTAL:
+        raise RollExpressionError(
+            f"Expression total can exceed "
+            f"{MAX_TOTAL}."
+        )
+    return CompiledExpression(
+        expression=normalized,
+        root=root,
+        dice_count=dice_count
+    )
+
+
+def _tokenize(text: str) -> List[Node | str]:
+    """Split the normalized text into dice terms,
+    numbers and operators."""
+    tokens: List[Node | str] = []
+    position = 0
+    while position < len(text):
+        dice_match = _DICE_RE.match(text, position)
+        if dice_match:
+            tokens.append(_build_dice_term(dice_match))
+            position = dice_match.end()
+            continue
+
+        number_match = _NUMBER_RE.match(text, position)
+        if number_match:
+            value = int(number_match.group())
+            if value > MAX_CONSTANT:
+                raise RollExpressionError(
+                    f"Constants must not exceed {MAX_CONSTANT}."
+                )
+            tokens.append(Number(value))
+            position = number_match.end()
+            continue
+
+        char = text[position]
+        if char in _OPERATORS:
+            tokens.append(char)
+            position += 1
+            continue
+
+        raise RollExpressionError(
+            f"Unexpected character '{char}' "
+            f"at position {position}."
+        )
+    return tokens
+
+
+def _build_dice_term(match: re.Match) -> DiceTerm:
+    """Validate a matched dice term and its modifiers."""
+    count = int(match.group("count") or 1)
+    sides_text = match.group("sides")
+    sides = 100 if sides_text == "%" else int(sides_text)
+
+    if count < 1 or count > MAX_DICE_PER_TERM:
+        raise RollExpressionError(
+            f"Dice count must be between 1 "
+            f"and {MAX_DICE_PER_TERM}."
+        )
+    if sides < 1 or sides > MAX_SIDES:
+        raise RollExpressionError(
+            f"Dice sides must be between 1 and {MAX_SIDES}."
+        )
+
+    keep = None
+    drop = None
+    explode = False
+    reroll = None
+    for mod_match in _MOD_RE.finditer(match.group("mods")):
+        name, value, bang = mod_match.groups()
+        if bang:
+            if sides == 1:
+                raise RollExpressionError(
+                    "A d1 can not explode."
+                )
+            explode = True
+            continue
+
+        amount = int(value)
+        if name == "r":
+            if amount >= sides:
+                raise RollExpressionError(
+                    "Reroll threshold must be "
+                    "lower than the dice sides."
+                )
+            reroll = amount
+            continue
+
+        if keep is not None or drop is not None:
+            raise RollExpressionError(
+                "Only one keep or drop modifier "
+                "per dice term is allowed."
+            )
+        if amount > count:
+            raise RollExpressionError(
+                f"Can not keep or drop {amount} "
+                f"of {count} dice."
+            )
+        if name in ("k", "kh"):
+            keep = ("h", amount)
+        elif name == "kl":
+            keep = ("l", amount)
+        elif name == "dh":
+            drop = ("h", amount)
+        else:  # dl
+            drop = ("l", amount)
+
+    return DiceTerm(
+        notation=match.group(),
+        count=count,
+        sides=sides,
+        keep=keep,
+        drop=drop,
+        explode=explode,
+        reroll=reroll
+    )
+
+
+class _Parser:
+    """Recursive descent parser:
+    expr := term (('+'|'-') term)*
+    term := unary (('*'|'/') unary)*
+    unary := '-' unary | atom
+    atom := number | dice | '(' expr ')'"""
+
+    def __init__(self, tokens: List[Node | str]):
+        self.tokens = tokens
+        self.position = 0
+
+
+    def parse(self) -> Node:
+        """Parse all tokens into a single node."""
+        node = self._expr()
+        if self.position != len(self.tokens):
+            raise RollExpressionError(
+                f"Unexpected token "
+                f"'{self.tokens[self.position]}'."
+            )
+        return node
+
+
+    def _peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+
+    def _next(self):
+        token = self._peek()
+        if token is None:
+            raise RollExpressionError(
+                "Unexpected end of expression."
+            )
+        self.position += 1
+        return token
+
+
+    def _expr(self) -> Node:
+        node = self._term()
+        while self._peek() in ("+", "-"):
+            op = self._next()
+            node = BinaryOp(op, node, self._term())
+        return node
+
+
+    def _term(self) -> Node:
+        node = self._unary()
+        while self._peek() in ("*", "/"):
+            op = self._next()
+            node = BinaryOp(op, node, self._unary())
+        return node
+
+
+    def _unary(self) -> Node:
+        if self._peek() == "-":
+            self._next()
+            return Negate(self._unary())
+        return self._atom()
+
+
+    def _atom(self) -> Node:
+        token = self._next()
+        if token == "(":
+            node = self._expr()
+            if self._next() != ")":
+                raise RollExpressionError(
+                    "Missing closing parenthesis."
+                )
+            return node
+        if isinstance(token, (Number, DiceTerm)):
+            return token
+        raise RollExpressionError(f"Unexpected token '{token}'.")
+
+
+def _count_dice(node: Node) -> int:
+    """Count the dice of an expression (without explosions)."""
+    if isinstance(node, DiceTerm):
+        return node.count
+    if isinstance(node, Negate):
+        return _count_dice(node.operand)
+    if isinstance(node, BinaryOp):
+        return _count_dice(node.left) + _count_dice(node.right)
+    return 0
+
+
+def _max_magnitude(node: Node) -> int:
+    """Upper bound of the absolute total of an expression
+    (every die on its highest face, all explosions)."""
+    if isinstance(node, Number):
+        return node.value
+    if isinstance(node, DiceTerm):
+        count = node.count + (MAX_EXPLOSIONS if node.explode else 0)
+        return count * node.sides
+    if isinstance(node, Negate):
+        return _max_magnitude(node.operand)
+    left = _max_magnitude(node.left)
+    if node.op == "/":
+        return left  # |a // b| <= |a| for integers b != 0
+    right = _max_magnitude(node.right)
+    if node.op == "*":
+        return left * right
+    return left + right
+
+
+# Evaluation
+
+def _evaluate(
+        node: Node,
+        roll: Callable[[int, int], int],
+        terms: List[TermResult]) -> int:
+    """Evaluate a node and collect the dice term results."""
+    if isinstance(node, Number):
+        return node.value
+    if isinstance(node, DiceTerm):
+        result = _roll_term(node, roll)
+        terms.append(result)
+        return sum(result.kept)
+    if isinstance(node, Negate):
+        return -_evaluate(node.operand, roll, terms)
+
+    left = _evaluate(node.left, roll, terms)
+    right = _evaluate(node.right, roll, terms)
+    if node.op == "+":
+        return left + right
+    if node.op == "-":
+        return left - right
+    if node.op == "*":
+        return left * right
+    if right == 0:
+        raise RollExpressionError("Division by zero.")
+    return left // right
+
+
+def _roll_term(
+        term: DiceTerm,
+        roll: Callable[[int, int], int]) -> TermResult:
+    """Roll all dice of a term and apply its modifiers."""
+    rolls = []
+    for _ in range(term.count):
+        value = roll(1, term.sides)
+        if term.reroll is not None and value <= term.reroll:
+            value = roll(1, term.sides)
+        rolls.append(value)
+
+    if term.explode:
+        explosions = 0
+        index = 0
+        while index < len(rolls) and explosions < MAX_EXPLOSIONS:
+            if rolls[index] == term.sides:
+                rolls.append(roll(1, term.sides))
+                explosions += 1
+            index += 1
+
+    kept = rolls
+    if term.keep is not None:
+        direction, amount = term.keep
+        ordered = sorted(rolls, reverse=direction == "h")
+        kept = ordered[:amount]
+    elif term.drop is not None:
+        # Counted against all dice, explosions included
+        direction, amount = term.drop
+        ordered = sorted(rolls, reverse=direction == "l")
+        kept = ordered[:len(rolls) - amount]
+
+    return TermResult(
+        notation=term.notation,
+        sides=term.sides,
+        rolls=rolls,
+        kept=list(kept)
+    )
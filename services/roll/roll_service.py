@@ -0,0 +1,133 @@
+"""
+roll_service.py
+
+Business logic for rolling dice expressions.
+"""
+import logging
+from typing import Optional
+
+from models.schemas.dicelog_schema import DiceLogCreate
+from models.schemas.roll_schema import *
+from repositories.campaign_repository import CampaignRepository
+from repositories.dicelog_repository import DiceLogRepository
+from services.dice.entropy_pool import seeded_campaign
+from services.roll.dice_expression import compile_expression
+from services.roll.roll_service_exceptions import *
+
+
+
+logger = logging.getLogger(__name__)
+
+
+class RollService:
+    """Business logic
+    for dice expression rolls."""
+
+    def __init__(
+            self,
+            dicelog_repo: Optional[DiceLogRepository] = None,
+            campaign_repo: Optional[CampaignRepository] = None):
+        self.dicelog_repo = dicelog_repo
+        self.campaign_repo = campaign_repo  # Seeded campaign rolls
+        logger.debug("RollService initialized")
+
+
+    def _log_roll(
+            self,
+            user_id: int,
+            campaign_id: int,
+            dnd_class_id: int,
+            expression: str,
+            values: list,
+            total: int):
+        """Log the expression data after a roll."""
+        if not self.dicelog_repo:
+            logger.warning(
+                "DiceLogRepository not provided, "
+                "skipping roll log")
+            return
+        try:
+            log_entry = DiceLogCreate(
+                user_id=user_id,
+                campaign_id=campaign_id,
+                dnd_class_id=dnd_class_id,
+                diceset_id=None,
+                roll=f"{expression}: {values}",
+                result=total
+            )
+            self.dicelog_repo.log_roll(log_entry)
+            logger.info(
+                f"Logged roll for expression '{expression}' "
+                f"by User {user_id}"
+            )
+        except Exception:
+            logger.exception(
+                "Error while logging "
+                "expression roll",
+                exc_info=True
+            )
+            raise RollServiceError(
+                "Error while logging expression roll."
+            )
+
+
+    def roll_expression(
+            self,
+            expression: str,
+            user_id: int,
+            campaign_id: Optional[int] = None,
+            dnd_class_id: Optional[int] = None) \
+            -> RollExpressionResult:
+        """Roll a dice expression (e.g. 4d6kh3+2)
+        and optionally log the result."""
+        try:
+            compiled = compile_expression(expression)
+            total, terms = compiled.evaluate(campaign_id=seeded_campaign(
+                self.campaign_repo, campaign_id, user_id
+            ))
+        except RollExpressionError:
+            logger.warning(
+                f"Invalid dice expression '{expression}' "
+                f"by User {user_id}"
+            )
+            raise
+        except Exception:
+            logger.exception(
+                f"Error while rolling "
+                f"expression '{expression}'",
+                exc_info=True
+            )
+            raise RollServiceError(
+                "Error while rolling expression."
+            )
+
+        logger.info(
+            f"Rolled expression '{compiled.expression}' "
+            f"by User {user_id}: {total}"
+        )
+
+        if (user_id is not None
+                and campaign_id is not None
+                and dnd_class_id is not None):
+            self._log_roll(
+                user_id=user_id,
+                campaign_id=campaign_id,
+                dnd_class_id=dnd_class_id,
+                expression=compiled.expression,
+                values=[v for t in terms for v in t.kept],
+                total=total
+            )
+
+        return RollExpressionResult(
+            expression=compiled.expression,
+            terms=[
+                RollTermResult(
+                    notation=t.notation,
+                    sides=t.sides,
+                    rolls=t.rolls,
+                    kept=t.kept
+                )
+                for t in terms
+            ],
+            total=total
+        )
@@ -0,0 +1,15 @@
+"""
+roll_service_exceptions.py
+
+Custom exceptions for roll services.
+"""
+
+
+class RollServiceError(Exception):
+    """Base exception for RollService errors."""
+    pass
+
+
+class RollExpressionError(RollServiceError):
+    """Raised when a dice expression is invalid."""
+    pass
@@ -0,0 +1,140 @@
+"""
+test_dice_expression.py
+
+Tests for the dice expression parser and evaluator.
+"""
+import pytest
+from itertools import cycle
+from services.roll.dice_expression import (
+    compile_expression,
+    clear_expression_cache,
+    expression_cache_info,
+    normalize_expression,
+    DiceTerm
+)
+from services.roll.roll_service_exceptions import RollExpressionError
+
+
+def fixed_rolls(*values):
+    """Return a roll function that yields the given values in order."""
+    source = cycle(values)
+    return lambda low, high: next(source)
+
+
+def test_normalize_expression():
+    """Test whitespace is removed and the text is lowercased."""
+    assert normalize_expression(" 4D6 kh3 + 2 ") == "4d6kh3+2"
+
+
+def test_simple_dice_term():
+    """Test a plain NdM expression."""
+    compiled = compile_expression("2d6")
+    total, terms = compiled.evaluate(fixed_rolls(3, 5))
+
+    assert total == 8
+    assert terms[0].sides == 6
+    assert terms[0].rolls == [3, 5]
+
+
+def test_keep_highest_with_modifier():
+    """Test keep highest and a constant modifier."""
+    compiled = compile_expression("4d6kh3+2")
+    total, terms = compiled.evaluate(fixed_rolls(1, 4, 6, 3))
+
+    assert total == 15  # 6 + 4 + 3 + 2
+    assert terms[0].rolls == [1, 4, 6, 3]
+    assert sorted(terms[0].kept) == [3, 4, 6]
+
+
+def test_keep_lowest():
+    """Test keep lowest (disadvantage)."""
+    total, _ = compile_expression("2d20kl1").evaluate(fixed_rolls(17, 4))
+    assert total == 4
+
+
+def test_drop_lowest_and_highest():
+    """Test drop modifiers translate to keep."""
+    total, _ = compile_expression("4d6dl1").evaluate(fixed_rolls(1, 4, 6, 3))
+    assert total == 13
+    total, _ = compile_expression("4d6dh1").evaluate(fixed_rolls(1, 4, 6, 3))
+    assert total == 8
+
+
+def test_drop_counts_exploded_dice():
+    """Test drops apply to all dice of a term, explosions included."""
+    total, terms = compile_expression("2d6!dl1").evaluate(fixed_rolls(6, 2, 6, 1))
+    assert sorted(terms[0].kept) == [2, 6, 6]
+    assert total == 14
+    total, terms = compile_expression("2d6!dh1").evaluate(fixed_rolls(6, 2, 6, 1))
+    assert sorted(terms[0].kept) == [1, 2, 6]
+    assert total == 9
+
+
+def test_exploding_dice():
+    """Test exploding dice roll again on the highest face."""
+    total, terms = compile_expression("2d6!").evaluate(fixed_rolls(6, 2, 6, 1))
+
+    assert terms[0].rolls == [6, 2, 6, 1]
+    assert total == 15
+
+
+def test_reroll_once():
+    """Test dice at or below the threshold are rerolled once."""
+    total, terms = compile_expression("2d6r1").evaluate(fixed_rolls(1, 1, 5))
+
+    assert terms[0].rolls == [1, 5]
+    assert total == 6
+
+
+def test_arithmetic_precedence_and_parentheses():
+    """Test operator precedence, parentheses and unary minus."""
+    roll = fixed_rolls(4)
+    assert compile_expression("1+2*3").evaluate(roll)[0] == 7
+    assert compile_expression("(1+2)*3").evaluate(roll)[0] == 9
+    assert compile_expression("7/2").evaluate(roll)[0] == 3
+    assert compile_expression("-d6+10").evaluate(roll)[0] == 6
+
+
+def test_percentile_dice():
+    """Test d% is a d100."""
+    compiled = compile_expression("d%")
+    assert isinstance(compiled.root, DiceTerm)
+    assert compiled.root.sides == 100
+
+
+def test_compiled_expressions_are_cached():
+    """Test equal expressions are parsed only once."""
+    clear_expression_cache()
+    first = compile_expression("4d6kh3 + 2")
+    second = compile_expression("4D6KH3+2")
+    info = expression_cache_info()
+
+    assert first is second
+    assert info.hits == 1
+    assert info.misses == 1
+
+
+@pytest.mark.parametrize("expression", [
+    "",
+    "4d",
+    "2d6+",
+    "(1d6",
+    "1d6)",
+    "3d6kh4",
+    "1d6kh1kl1",
+    "1d1!",
+    "1d6r6",
+    "abc",
+    "1001d6",
+    "1d1001",
+    "600d6+600d6",
+    "1d6/0",
+    "1000001",
+    "1000d1000*99999999",
+    "1000d1000*1000*1000",
+    "-1000000*1000000*1000000",
+])
+def test_invalid_expressions(expression):
+    """Test invalid expressions raise RollExpressionError."""
+    with pytest.raises(RollExpressionError):
+        compile_expression(expression).evaluate(fixed_rolls(1))
@@ -0,0 +1,87 @@
+"""
+test_roll_service.py
+
+Tests for the roll service.
+"""
+import pytest
+from unittest.mock import Mock, patch
+from services.roll.roll_service import RollService
+from services.roll.roll_service_exceptions import (
+    RollExpressionError,
+    RollServiceError
+)
+from models.schemas.roll_schema import RollExpressionResult
+
+
+@pytest.fixture
+def mock_dicelog_repo():
+    """Fixture for mocked dice log repository."""
+    return Mock()
+
+
+@pytest.fixture
+def roll_service(mock_dicelog_repo):
+    """Fixture for RollService instance with mocked repository."""
+    return RollService(dicelog_repo=mock_dicelog_repo)
+
+
+def test_roll_expression_success(roll_service):
+    """Test rolling an expression returns the terms and total."""
+    with patch('services.roll.dice_expression.randint', side_effect=[2, 5, 6, 3]):
+        result = roll_service.roll_expression("4d6kh3+2", user_id=1)
+
+    assert isinstance(result, RollExpressionResult)
+    assert result.expression == "4d6kh3+2"
+    assert result.total == 16  # 6 + 5 + 3 + 2
+    assert result.terms[0].rolls == [2, 5, 6, 3]
+
+
+def test_roll_expression_with_logging(roll_service, mock_dicelog_repo):
+    """Test the roll is logged when campaign and class are given."""
+    with patch('services.roll.dice_expression.randint', return_value=4):
+        roll_service.roll_expression(
+            "2d6+1",
+            user_id=1,
+            campaign_id=10,
+            dnd_class_id=5
+        )
+
+    mock_dicelog_repo.log_roll.assert_called_once()
+    log_entry = mock_dicelog_repo.log_roll.call_args[0][0]
+    assert log_entry.user_id == 1
+    assert log_entry.campaign_id == 10
+    assert log_entry.dnd_class_id == 5
+    assert log_entry.diceset_id is None
+    assert log_entry.roll == "2d6+1: [4, 4]"
+    assert log_entry.result == 9
+
+
+def test_roll_expression_without_logging(roll_service, mock_dicelog_repo):
+    """Test no log is written without campaign and class."""
+    roll_service.roll_expression("1d20", user_id=1, campaign_id=10)
+
+    mock_dicelog_repo.log_roll.assert_not_called()
+
+
+def test_roll_expression_no_log_repository():
+    """Test rolling works without a log repository."""
+    service = RollService()
+    result = service.roll_expression("1d4", 1, 10, 5)
+
+    assert 1 <= result.total <= 4
+
+
+def test_roll_expression_invalid(roll_service):
+    """Test invalid expressions raise RollExpressionError."""
+    with pytest.raises(RollExpressionError):
+        roll_service.roll_expression("4d6kh", user_id=1)
+
+
+def test_roll_expression_log_exception(roll_service, mock_dicelog_repo):
+    """Test log errors raise RollServiceError."""
+    mock_dicelog_repo.log_roll.side_effect = Exception("Logging error")
+
+    with pytest.raises(RollServiceError) as exc_info:
+        roll_service.roll_expression("1d6", 1, 10, 5)
+
+    assert "Error while logging expression roll" in str(exc_info.value)
@@ -0,0 +1,207 @@
+"""
+simulation_service.py
+
+Business logic for Monte Carlo simulations of dice sets.
+
+Trials run in vectorized chunks on a process pool, so
+simulations never block the workers that serve live rolls.
+Simulations are never written to the dice logs.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import AsyncIterator, NamedTuple, Optional
+
+import numpy as np
+
+from models.schemas.simulation_schema import *
+from services.diceset.diceset_service import DiceSetPool, DiceSetService
+from services.simulation.simulation_service_exceptions import *
+from services.simulation.simulation_worker import simulate_chunk
+
+
+logger = logging.getLogger(__name__)
+
+MAX_SIMULATION_TRIALS = int(os.getenv("SIMULATION_MAX_TRIALS", 1_000_000))
+SIMULATION_TIMEOUT = float(os.getenv("SIMULATION_TIMEOUT", 30))
+SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS", 2))
+CHUNK_TRIALS = 25_000
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Get the shared simulation process pool (created on first use)."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=SIMULATION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(
+                f"Simulation process pool started "
+                f"with {SIMULATION_WORKERS} workers"
+            )
+        return _process_pool
+
+
+def shutdown_process_pool():
+    """Stop the simulation workers (called on app shutdown)."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+            logger.info("Simulation process pool stopped")
+
+
+class SimulationPlan(NamedTuple):
+    """Validated simulation request."""
+    pool: DiceSetPool
+    opponent: Optional[DiceSetPool]
+    dc: Optional[int]
+    trials: int
+
+
+class SimulationService:
+    """Business logic for
+    Monte Carlo simulations."""
+
+    def __init__(
+            self,
+            diceset_service: DiceSetService,
+            executor: Optional[Executor] = None,
+            timeout: float = SIMULATION_TIMEOUT):
+        self.diceset_service = diceset_service
+        self.executor = executor
+        self.timeout = timeout
+        logger.debug("SimulationService initialized")
+
+
+    def prepare(
+            self,
+            simulation: SimulationInput) \
+            -> SimulationPlan:
+        """Validate the request and load the dice sets."""
+        if simulation.trials > MAX_SIMULATION_TRIALS:
+            logger.warning(
+                f"Simulation with {simulation.trials} "
+                f"trials rejected"
+            )
+            raise SimulationLimitError(
+                f"A simulation can run at most "
+                f"{MAX_SIMULATION_TRIALS} trials."
+            )
+
+        pool = self.diceset_service.get_dice_pool(
+            simulation.diceset_id
+        )
+        opponent = None
+        if simulation.opponent_diceset_id is not None:
+            opponent = self.diceset_service.get_dice_pool(
+                simulation.opponent_diceset_id
+            )
+        return SimulationPlan(
+            pool=pool,
+            opponent=opponent,
+            dc=simulation.dc,
+            trials=simulation.trials
+        )
+
+
+    async def run(self, plan: SimulationPlan) -> AsyncIterator[SQLModel]:
+        """Run the trials in chunks and yield progress events,
+        followed by the final result."""
+        executor = self.executor or get_process_pool()
+        loop = asyncio.get_running_loop()
+
+        chunk_sizes = [CHUNK_TRIALS] * (plan.trials // CHUNK_TRIALS)
+        if plan.trials % CHUNK_TRIALS:
+            chunk_sizes.append(plan.trials % CHUNK_TRIALS)
+        seeds = np.random.SeedSequence().spawn(len(chunk_sizes))
+        opponent_dice = plan.opponent.dice if plan.opponent else None
+
+        futures = [
+            loop.run_in_executor(
+                executor,
+                simulate_chunk,
+                plan.pool.dice,
+                opponent_dice,
+                plan.dc,
+                size,
+                seed
+            )
+            for size, seed in zip(chunk_sizes, seeds)
+        ]
+        logger.info(
+            f"Simulating DiceSet {plan.pool.diceset_id} "
+            f"with {plan.trials} trials "
+            f"in {len(futures)} chunks"
+        )
+
+        totals = {
+            "trials": 0,
+            "total_sum": 0,
+            "wins": 0,
+            "ties": 0,
+            "successes": 0,
+            "opponent_sum": 0,
+        }
+        try:
+            for next_chunk in asyncio.as_completed(
+                    futures, timeout=self.timeout):
+                chunk = await next_chunk
+                for key, value in chunk.items():
+                    totals[key] += value
+                yield SimulationProgress(
+                    completed=totals["trials"],
+                    trials=plan.trials
+                )
+        except (asyncio.TimeoutError, TimeoutError):
+            logger.warning(
+                f"Simulation of DiceSet {plan.pool.diceset_id} "
+                f"timed out after {self.timeout}s"
+            )
+            raise SimulationTimeoutError(
+                f"Simulation timed out after {self.timeout} seconds."
+            )
+        except Exception:
+            logger.exception(
+                "Error while running simulation",
+                exc_info=True
+            )
+            raise SimulationServiceError(
+                "Error while running simulation."
+            )
+        finally:
+            for future in futures:
+                future.cancel()
+
+        yield self._result(plan, totals)
+
+
+    @staticmethod
+    def _result(plan: SimulationPlan, totals: dict) -> SimulationResult:
+        """Build the final result from the summed chunk counters."""
+        trials = totals["trials"]
+        result = SimulationResult(
+            diceset_id=plan.pool.diceset_id,
+            dc=plan.dc,
+            trials=trials,
+            mean=totals["total_sum"] / trials
+        )
+        if plan.opponent is not None:
+            losses = trials - totals["wins"] - totals["ties"]
+            result.opponent_diceset_id = plan.opponent.diceset_id
+            result.opponent_mean = totals["opponent_sum"] / trials
+            result.win_rate = totals["wins"] / trials
+            result.tie_rate = totals["ties"] / trials
+            result.loss_rate = losses / trials
+        if plan.dc is not None:
+            result.success_rate = totals["successes"] / trials
+        return result
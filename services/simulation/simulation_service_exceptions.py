@@ -0,0 +1,20 @@
+"""
+simulation_service_exceptions.py
+
+Custom exceptions for simulation services.
+"""
+
+
+class SimulationServiceError(Exception):
+    """Base exception for SimulationService errors."""
+    pass
+
+
+class SimulationLimitError(SimulationServiceError):
+    """Raised when a simulation exceeds the trial cap."""
+    pass
+
+
+class SimulationTimeoutError(SimulationServiceError):
+    """Raised when a simulation runs longer than allowed."""
+    pass
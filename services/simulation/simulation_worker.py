@@ -0,0 +1,62 @@
+"""
+simulation_worker.py
+
+Vectorized Monte Carlo chunks, executed in worker processes.
+
+Kept free of app imports so spawned workers start fast.
+"""
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+
+
+BLOCK_ELEMENTS = 1_000_000  # Max random values drawn at once
+
+DicePool = Sequence[Tuple[int, int]]  # (sides, quantity)
+
+
+def roll_totals(
+        rng: np.random.Generator,
+        pool: DicePool,
+        trials: int) -> np.ndarray:
+    """Roll the pool `trials` times and return the totals."""
+    totals = np.zeros(trials, dtype=np.int64)
+    block = max(1, BLOCK_ELEMENTS // trials)
+    for sides, quantity in pool:
+        remaining = quantity
+        while remaining > 0:
+            size = min(block, remaining)
+            draws = rng.integers(1, sides + 1, size=(trials, size))
+            totals += draws.sum(axis=1)
+            remaining -= size
+    return totals
+
+
+def simulate_chunk(
+        pool: DicePool,
+        opponent: Optional[DicePool],
+        dc: Optional[int],
+        trials: int,
+        seed: np.random.SeedSequence) -> dict:
+    """Run one chunk of trials and return the counters."""
+    rng = np.random.default_rng(seed)
+    totals = roll_totals(rng, pool, trials)
+    result = {
+        "trials": trials,
+        "total_sum": int(totals.sum()),
+        "wins": 0,
+        "ties": 0,
+        "successes": 0,
+        "opponent_sum": 0,
+    }
+
+    if opponent is not None:
+        opponent_totals = roll_totals(rng, opponent, trials)
+        result["wins"] = int((totals > opponent_totals).sum())
+        result["ties"] = int((totals == opponent_totals).sum())
+        result["opponent_sum"] = int(opponent_totals.sum())
+
+    if dc is not None:
+        result["successes"] = int((totals >= dc).sum())
+    return result
@@ -0,0 +1,142 @@
+"""
+test_simulation_service.py
+
+Tests for the simulation service and its worker chunks.
+"""
+import asyncio
+import time
+import numpy as np
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+from models.schemas.simulation_schema import (
+    SimulationInput,
+    SimulationProgress,
+    SimulationResult
+)
+from services.diceset.diceset_service import DiceSetPool
+from services.diceset.diceset_service_exceptions import DiceSetNotFoundError
+from services.simulation import simulation_service
+from services.simulation.simulation_service import SimulationService
+from services.simulation.simulation_service_exceptions import (
+    SimulationLimitError,
+    SimulationTimeoutError
+)
+from services.simulation.simulation_worker import roll_totals, simulate_chunk
+
+
+@pytest.fixture
+def mock_diceset_service():
+    """Fixture for mocked dice set service."""
+    service = Mock()
+    pools = {
+        1: DiceSetPool(diceset_id=1, name="Big", user_id=1, dice=((6, 10),)),
+        2: DiceSetPool(diceset_id=2, name="Small", user_id=1, dice=((4, 1),)),
+    }
+
+    def get_dice_pool(diceset_id):
+        if diceset_id not in pools:
+            raise DiceSetNotFoundError("Dice set not found or has no dices.")
+        return pools[diceset_id]
+
+    service.get_dice_pool.side_effect = get_dice_pool
+    return service
+
+
+@pytest.fixture
+def executor():
+    """Fixture for a thread pool standing in for the process pool."""
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        yield pool
+
+
+@pytest.fixture
+def simulation(mock_diceset_service, executor):
+    """Fixture for SimulationService instance."""
+    return SimulationService(mock_diceset_service, executor=executor)
+
+
+def collect(events):
+    """Run an async event stream to completion."""
+    async def run():
+        return [event async for event in events]
+    return asyncio.run(run())
+
+
+def test_roll_totals_in_range():
+    """Test totals stay between the pool minimum and maximum."""
+    rng = np.random.default_rng(1)
+    totals = roll_totals(rng, [(6, 3), (20, 1)], 1000)
+
+    assert len(totals) == 1000
+    assert totals.min() >= 4
+    assert totals.max() <= 38
+
+
+def test_simulate_chunk_is_reproducible():
+    """Test equal seeds give equal chunk results."""
+    seed = np.random.SeedSequence(42)
+    first = simulate_chunk([(6, 2)], [(4, 1)], 7, 500, seed)
+    second = simulate_chunk([(6, 2)], [(4, 1)], 7, 500, seed)
+
+    assert first == second
+    assert first["trials"] == 500
+
+
+def test_prepare_trial_cap(simulation):
+    """Test simulations above the trial cap are rejected."""
+    with patch.object(simulation_service, "MAX_SIMULATION_TRIALS", 100):
+        with pytest.raises(SimulationLimitError):
+            simulation.prepare(SimulationInput(diceset_id=1, trials=101))
+
+
+def test_prepare_not_found(simulation):
+    """Test a missing dice set raises DiceSetNotFoundError."""
+    with pytest.raises(DiceSetNotFoundError):
+        simulation.prepare(SimulationInput(diceset_id=999))
+
+
+def test_run_streams_progress_and_result(simulation):
+    """Test a simulation yields progress events and a final result."""
+    plan = simulation.prepare(SimulationInput(
+        diceset_id=1,
+        opponent_diceset_id=2,
+        dc=30,
+        trials=60_000
+    ))
+
+    events = collect(simulation.run(plan))
+    progress = [e for e in events if isinstance(e, SimulationProgress)]
+    result = events[-1]
+
+    assert len(progress) == 3  # 25k + 25k + 10k
+    assert progress[-1].completed == 60_000
+    assert isinstance(result, SimulationResult)
+    assert result.trials == 60_000
+    assert result.mean == pytest.approx(35, abs=0.5)
+    assert result.win_rate == 1.0  # 10d6 >= 10 always beats 1d4
+    assert result.tie_rate == 0.0
+    assert result.success_rate == pytest.approx(0.8, abs=0.05)
+
+
+def test_run_timeout(mock_diceset_service, executor):
+    """Test a simulation that runs too long raises a timeout."""
+    service = SimulationService(mock_diceset_service, executor=executor, timeout=0.05)
+    plan = service.prepare(SimulationInput(diceset_id=1, trials=10))
+
+    def slow_chunk(*args):
+        time.sleep(0.5)
+        return simulate_chunk(*args)
+
+    with patch.object(simulation_service, "simulate_chunk", slow_chunk):
+        with pytest.raises(SimulationTimeoutError):
+            collect(service.run(plan))
+
+
+def test_simulation_never_logs(simulation, mock_diceset_service):
+    """Test simulations do not touch the dice logs."""
+    plan = simulation.prepare(SimulationInput(diceset_id=2, trials=100))
+    collect(simulation.run(plan))
+
+    mock_diceset_service.dicelog_repo.log_roll.assert_not_called()
+    mock_diceset_service.roll_diceset.assert_not_called()
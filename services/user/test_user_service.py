@@ -487,26 +487,22 @@ def test_update_user_exception(user_service, mock_user_repo):
 # Tests for delete_user function
 def test_delete_user_success(user_service, mock_user_repo, mock_campaign_repo,
                              mock_class_repo, mock_diceset_repo, mock_dicelog_repo, sample_user):
-    """Test successful user deletion with related entities."""
+    """Test user deletion with one cascade and the row counts."""
+    counts = {"dicelog": 2, "dicesetdice": 2, "diceset": 2, "dnd_class": 1, "campaign": 1, "user": 1}
     mock_user_repo.get_by_id.return_value = sample_user
-
-    # Setup related entities
-    mock_dicelog_repo.list_by_user.return_value = [Mock(id=1), Mock(id=2)]
-    mock_diceset_repo.list_by_user.return_value = [Mock(id=10), Mock(id=11)]
-    mock_class_repo.list_by_user.return_value = [Mock(id=20)]
-    mock_campaign_repo.list_by_user.return_value = [Mock(id=30)]
-
-    mock_user_repo.delete.return_value = sample_user
+    mock_user_repo.delete_cascade.return_value = counts
 
     result = user_service.delete_user(1)
 
-    # Verify deletion order: dice logs, dice sets, classes, campaigns, user
-    assert mock_dicelog_repo.delete.call_count == 2
-    assert mock_diceset_repo.delete.call_count == 2
-    assert mock_class_repo.delete.call_count == 1
-    assert mock_campaign_repo.delete.call_count == 1
-    mock_user_repo.delete.assert_called_once_with(1)
-    assert result == sample_user
+    # No per row deletes
+    mock_user_repo.delete_cascade.assert_called_once_with(1)
+    mock_dicelog_repo.delete.assert_not_called()
+    mock_diceset_repo.delete.assert_not_called()
+    mock_class_repo.delete.assert_not_called()
+    mock_campaign_repo.delete.assert_not_called()
+    mock_user_repo.delete.assert_not_called()
+    assert result.id == sample_user.id
+    assert result.deleted_rows == counts
 
 
 def test_delete_user_not_found(user_service, mock_user_repo):
@@ -517,15 +513,10 @@ def test_delete_user_not_found(user_service, mock_user_repo):
         user_service.delete_user(999)
 
 
-def test_delete_user_deletion_fails(user_service, mock_user_repo, mock_campaign_repo,
-                                    mock_class_repo, mock_diceset_repo, mock_dicelog_repo, sample_user):
-    """Test delete user when final deletion returns None."""
+def test_delete_user_deletion_fails(user_service, mock_user_repo, sample_user):
+    """Test delete user when the user row was not deleted."""
     mock_user_repo.get_by_id.return_value = sample_user
-    mock_dicelog_repo.list_by_user.return_value = []
-    mock_diceset_repo.list_by_user.return_value = []
-    mock_class_repo.list_by_user.return_value = []
-    mock_campaign_repo.list_by_user.return_value = []
-    mock_user_repo.delete.return_value = None
+    mock_user_repo.delete_cascade.return_value = {"dicelog": 0, "user": 0}
 
     with pytest.raises(UserDeleteError) as exc_info:
         user_service.delete_user(1)
@@ -543,22 +534,15 @@ def test_delete_user_exception(user_service, mock_user_repo):
     assert "Error while deleting user" in str(exc_info.value)
 
 
-def test_delete_user_no_related_entities(user_service, mock_user_repo, mock_campaign_repo,
-                                         mock_class_repo, mock_diceset_repo, mock_dicelog_repo, sample_user):
+def test_delete_user_no_related_entities(user_service, mock_user_repo, sample_user):
     """Test deleting user with no related entities."""
     mock_user_repo.get_by_id.return_value = sample_user
-    mock_dicelog_repo.list_by_user.return_value = []
-    mock_diceset_repo.list_by_user.return_value = []
-    mock_class_repo.list_by_user.return_value = []
-    mock_campaign_repo.list_by_user.return_value = []
-    mock_user_repo.delete.return_value = sample_user
+    mock_user_repo.delete_cascade.return_value = {
+        "dicelog": 0, "dicesetdice": 0, "diceset": 0, "dnd_class": 0, "campaign": 0, "user": 1
+    }
 
     result = user_service.delete_user(1)
 
-    # Verify no deletions for related entities
-    mock_dicelog_repo.delete.assert_not_called()
-    mock_diceset_repo.delete.assert_not_called()
-    mock_class_repo.delete.assert_not_called()
-    mock_campaign_repo.delete.assert_not_called()
-    mock_user_repo.delete.assert_called_once_with(1)
-    assert result == sample_user
+    assert result.deleted_rows["user"] == 1
+    assert result.deleted_rows["campaign"] == 0
+
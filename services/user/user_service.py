@@ -4,9 +4,9 @@ user_service.py
 Business logic for user.
 """
 import logging
-from typing import List
+from typing import List, Optional
 
-from dependencies import UserQueryParams
+from dependencies import SearchQueryParams, UserQueryParams
 from models.schemas.user_schema import *
 from repositories.user_repository import UserRepository
 from repositories.campaign_repository import CampaignRepository
@@ -93,14 +93,17 @@ class UserService:
             self,
             filters: UserQueryParams,
             offset: int = 0,
-            limit: int = 100
+            limit: int = 100,
+            after_id: Optional[int] = None
     ) -> List[UserPublic]:
-        """Get a list of all users."""
+        """Get a list of all users
+        (after_id for keyset paging)."""
         try:
             users = self.user_repo.list_all(
                 name=filters.name,
                 offset=offset,
-                limit=limit
+                limit=limit,
+                after_id=after_id
             )
             logger.debug(
                 f"Listed {len(users)} users "
@@ -111,6 +114,21 @@ class UserService:
             raise UserServiceError("Error while listing users.")
 
 
+    def search_users(self, params: SearchQueryParams) \
+            -> List[UserPublic]:
+        """Search users by username, best matches first."""
+        try:
+            users = self.user_repo.search(
+                text=params.q,
+                prefix=params.prefix,
+                limit=params.limit
+            )
+            logger.debug(f"Found {len(users)} users for '{params.q}'")
+            return users
+        except Exception:
+            raise UserServiceError("Error while searching users.")
+
+
     def update_user(
             self,
             user_id: int,
@@ -155,9 +173,10 @@ class UserService:
             )
 
 
-    def delete_user(self, user_id: int) -> Optional[UserPublic]:
-        """Delete a user and the belonging campaign,
-        classes, dice sets and logs."""
+    def delete_user(self, user_id: int) -> Optional[UserDeleted]:
+        """Delete a user and the belonging campaigns,
+        classes, dice sets and logs (set-based, one transaction).
+        Returns the user with the deleted rows per table."""
         try:
             user = self.user_repo.get_by_id(user_id)
             if not user:
@@ -170,45 +189,9 @@ class UserService:
                     f"not found."
                 )
 
-            # Delete dice logs
-            for log in (self.dicelog_repo
-                    .list_by_user(user_id)):
-                self.dicelog_repo.delete(log.id)
-                logger.info(
-                    f"Deleted DiceLog {log.id} "
-                    f"for User {user_id}"
-                )
-
-            # Delete dice sets
-            for diceset in (self.diceset_repo
-                    .list_by_user(user_id)):
-                self.diceset_repo.delete(diceset.id)
-                logger.info(
-                    f"Deleted DiceSet {diceset.id} "
-                    f"for User {user_id}"
-                )
-
-            # Delete classes
-            for dnd_class in (self.class_repo
-                    .list_by_user(user_id)):
-                self.class_repo.delete(dnd_class.id)
-                logger.info(
-                    f"Deleted DnDClass {dnd_class.id} "
-                    f"for User {user_id}"
-                )
-
-            # Delete campaigns
-            for campaign in (self.campaign_repo
-                    .list_by_user(user_id)):
-                self.campaign_repo.delete(campaign.id)
-                logger.info(
-                    f"Deleted Campaign {campaign.id} "
-                    f"for User {user_id}"
-                )
-
-            # Finally delete user
-            deleted_user = self.user_repo.delete(user_id)
-            if not deleted_user:
+            # Dice logs, dice sets, classes, campaigns and the user
+            deleted_rows = self.user_repo.delete_cascade(user_id)
+            if not deleted_rows.get("user"):
                 logger.error(
                     f"Failed to delete User {user_id}"
                 )
@@ -217,9 +200,12 @@ class UserService:
                 )
             logger.info(
                 f"Deleted User {user_id} "
-                f"- {deleted_user.user_name}"
+                f"- {user.user_name} {deleted_rows}"
+            )
+            return UserDeleted(
+                **user.model_dump(),
+                deleted_rows=deleted_rows
             )
-            return deleted_user
 
         except Exception:
             logger.error(
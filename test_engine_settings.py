@@ -0,0 +1,93 @@
+"""
+test_engine_settings.py
+
+Tests for the engine settings, SQLite pragmas and pool metrics.
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from engine_settings import (
+    EngineSettings,
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    apply_sqlite_pragmas,
+    pool_checkout_seconds,
+    pool_timeouts_total
+)
+
+
+def make_engine(tmp_path, **settings):
+    settings = EngineSettings(**settings)
+    url = f"sqlite:///{tmp_path / 'engine.db'}"
+    engine = create_engine(url, **settings.engine_kwargs(url))
+    apply_sqlite_pragmas(engine, settings)
+    return engine
+
+
+def test_settings_from_env(monkeypatch):
+    """Test the settings are read from the environment."""
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "off")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "5000")
+    monkeypatch.setenv("SQLITE_SYNCHRONOUS", "FULL")
+
+    settings = EngineSettings.from_env()
+
+    assert settings.pool_size == 20
+    assert settings.max_overflow == 10
+    assert settings.pool_pre_ping is False
+    assert settings.pool_recycle == -1
+    assert settings.statement_timeout_ms == 5000
+    assert settings.sqlite_synchronous == "FULL"
+
+
+@pytest.mark.parametrize("url, is_async, poolclass, connect_args", [
+    ("postgresql+psycopg2://u:p@db/app", False, InstrumentedQueuePool,
+     {"options": "-c statement_timeout=5000"}),
+    ("postgresql+asyncpg://u:p@db/app", True, InstrumentedAsyncQueuePool,
+     {"server_settings": {"statement_timeout": "5000"}}),
+    ("sqlite:///./app.db", False, InstrumentedQueuePool, None),
+])
+def test_engine_kwargs(url, is_async, poolclass, connect_args):
+    """Test the pool settings and the statement timeout per driver."""
+    kwargs = EngineSettings(statement_timeout_ms=5000).engine_kwargs(url, is_async)
+
+    assert kwargs["poolclass"] is poolclass
+    assert kwargs["pool_size"] == 5
+    assert kwargs["pool_pre_ping"] is True
+    assert kwargs.get("connect_args") == connect_args
+
+
+def test_engine_kwargs_in_memory_sqlite():
+    """Test in-memory SQLite keeps its single connection pool."""
+    assert EngineSettings().engine_kwargs("sqlite://") == {"echo": False}
+
+
+def test_sqlite_pragmas_on_connect(tmp_path):
+    """Test every new connection gets the pragmas."""
+    engine = make_engine(tmp_path, sqlite_busy_timeout_ms=1234, sqlite_cache_size_kib=1000)
+
+    with engine.connect() as connection:
+        pragma = lambda name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("busy_timeout") == 1234
+        assert pragma("cache_size") == -1000
+    engine.dispose()
+
+
+def test_pool_checkout_metrics(tmp_path):
+    """Test checkouts are timed and timeouts counted."""
+    engine = make_engine(tmp_path, pool_size=1, max_overflow=0, pool_timeout=0.05)
+    checkouts = pool_checkout_seconds.count
+    timeouts = pool_timeouts_total.value
+
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    assert pool_checkout_seconds.count - checkouts == 2
+    assert pool_checkout_seconds.max >= 0.05
+    assert pool_timeouts_total.value - timeouts == 1
+    engine.dispose()